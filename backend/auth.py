@@ -95,6 +95,28 @@ def authenticate_user(db: Session, username: str, password: str):
     return user
 
 
+def username_from_token(token: str) -> str:
+    """
+    Extrae el nombre de usuario (`sub`) de un token JWT válido.
+    
+    Raises:
+        HTTPException: 401 si el token es inválido o no contiene usuario
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
+        raise credentials_exception
+    return username
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends()):
     """
     Obtiene el usuario actual desde el token JWT.
@@ -111,25 +133,17 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     """
     from database.models import User, get_db
     
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    username = username_from_token(token)
     
     # Obtener sesión de base de datos
     db = next(get_db())
     user = db.query(User).filter(User.username == username).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return user
 
@@ -0,0 +1,341 @@
+"""
+Ejecución fragmentada (sharded) de Bandit para árboles de código grandes.
+
+Un único proceso `python -m bandit -r` usa un solo núcleo y agota el timeout
+de 300s en los servicios más grandes. Este módulo reparte la lista de archivos
+preparada en lotes balanceados por tamaño, ejecuta un proceso Bandit por lote
+en paralelo y fusiona los reportes JSON en uno solo con la misma estructura
+que produce Bandit (results, metrics, errors, generated_at).
+"""
+
+import heapq
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    from backend.scanner_sandbox import run_sandboxed, LIMIT_WALL_CLOCK
+    from backend.file_walker import FileWalker, WalkConfig
+except ImportError:
+    from scanner_sandbox import run_sandboxed, LIMIT_WALL_CLOCK
+    from file_walker import FileWalker, WalkConfig
+
+logger = logging.getLogger(__name__)
+
+# Extensiones que Bandit analiza por defecto (ver bandit.core.config)
+BANDIT_EXTENSIONS = {'.py', '.pyw'}
+
+# Número de lotes por defecto: uno por núcleo disponible
+DEFAULT_SHARD_COUNT = int(os.getenv("HYBRIDSCAN_BANDIT_SHARDS", "0")) or (os.cpu_count() or 2)
+
+# Reintentos individuales por lote fallido
+DEFAULT_MAX_RETRIES = 2
+
+# Límite conservador de longitud de línea de comandos (Windows admite ~32K caracteres)
+MAX_CMDLINE_CHARS = 30000
+
+
+@dataclass
+class ShardOutcome:
+    """Resultado de la ejecución de un lote de Bandit."""
+    index: int
+    files: List[str]
+    report: Optional[Dict[str, Any]] = None
+    attempts: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+    limit_reason: Optional[str] = None  # Límite de recursos que detuvo el lote
+
+    @property
+    def succeeded(self) -> bool:
+        return self.report is not None
+
+
+@dataclass
+class ShardedBanditRun:
+    """
+    Resultado agregado de una ejecución fragmentada.
+
+    Expone `returncode`, `stdout` y `stderr` con la misma semántica que
+    `subprocess.CompletedProcess` de una ejecución normal de Bandit
+    (0 = sin hallazgos, 1 = hallazgos encontrados, 2 = error).
+    """
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    shards: List[ShardOutcome] = field(default_factory=list)
+    duration: float = 0.0
+    limit_reason: Optional[str] = None  # Fijado si todos los lotes fallaron y alguno por límite de recursos
+
+    def stats(self) -> Dict[str, Any]:
+        """Resumen de la ejecución apto para guardar como metadatos del escaneo."""
+        return {
+            "shard_count": len(self.shards),
+            "files": sum(len(s.files) for s in self.shards),
+            "retried_shards": len([s for s in self.shards if s.attempts > 1]),
+            "failed_shards": len([s for s in self.shards if not s.succeeded]),
+            "limited_shards": len([s for s in self.shards if s.limit_reason]),
+            "duration_seconds": round(self.duration, 3),
+            "shard_durations": [round(s.duration, 3) for s in self.shards]
+        }
+
+
+def collect_python_files(root: Path, walk_config: Optional[WalkConfig] = None) -> List[Path]:
+    """
+    Lista los archivos que Bandit analizaría en un árbol.
+
+    Args:
+        root: Archivo o directorio preparado para el escaneo
+        walk_config: Filtros include/exclude/max_depth (por defecto solo se
+            podan los directorios de DEFAULT_EXCLUDES)
+
+    Returns:
+        Lista ordenada de archivos con extensiones analizadas por Bandit
+    """
+    if root.is_file():
+        return [root]
+
+    config = walk_config or WalkConfig()
+    config = WalkConfig(config.include, config.exclude, config.max_depth, tuple(BANDIT_EXTENSIONS))
+    return FileWalker(config).list_files(root)
+
+
+def partition_by_size(files: Sequence[Path], shard_count: int) -> List[List[Path]]:
+    """
+    Reparte archivos en lotes de tamaño total similar (heurística LPT).
+
+    Los archivos se ordenan de mayor a menor y cada uno se asigna al lote con
+    menos bytes acumulados, lo que mantiene el lote más lento cerca de la media.
+
+    Args:
+        files: Archivos a repartir
+        shard_count: Número máximo de lotes
+
+    Returns:
+        Lista de lotes no vacíos
+    """
+    shard_count = max(1, min(shard_count, len(files)))
+    sized = []
+    for path in files:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        sized.append((size, str(path)))
+    sized.sort(key=lambda item: (-item[0], item[1]))
+
+    heap = [(0, index) for index in range(shard_count)]
+    shards: List[List[Path]] = [[] for _ in range(shard_count)]
+    for size, path in sized:
+        total, index = heapq.heappop(heap)
+        shards[index].append(Path(path))
+        heapq.heappush(heap, (total + size, index))
+
+    return [sorted(shard) for shard in shards if shard]
+
+
+def _split_for_cmdline(files: Sequence[str]) -> List[List[str]]:
+    """Divide una lista de archivos en tramos que caben en una línea de comandos."""
+    chunks: List[List[str]] = [[]]
+    length = 0
+    for name in files:
+        if chunks[-1] and length + len(name) + 1 > MAX_CMDLINE_CHARS:
+            chunks.append([])
+            length = 0
+        chunks[-1].append(name)
+        length += len(name) + 1
+    return chunks
+
+
+class ShardLimitError(RuntimeError):
+    """Un lote fue detenido por un límite de recursos del sandbox."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"límite de recursos ({reason})")
+        self.reason = reason
+
+
+def _run_bandit_on_files(files: Sequence[str], timeout: int) -> Dict[str, Any]:
+    """
+    Ejecuta Bandit sobre una lista explícita de archivos.
+
+    Raises:
+        ShardLimitError: Si el sandbox detiene Bandit por memoria, CPU o archivos abiertos
+        RuntimeError: Si Bandit falla o no produce un JSON válido
+        subprocess.TimeoutExpired: Si se supera el timeout
+    """
+    reports = []
+    for chunk in _split_for_cmdline(files):
+        fd, output_path = tempfile.mkstemp(prefix="bandit_shard_", suffix=".json")
+        os.close(fd)
+        try:
+            result = run_sandboxed(
+                [sys.executable, '-m', 'bandit', '-f', 'json', '-o', output_path, *chunk],
+                timeout=timeout
+            )
+            if result.limit_reason:
+                raise ShardLimitError(result.limit_reason)
+            if result.returncode not in [0, 1]:
+                raise RuntimeError(f"returncode={result.returncode}. stderr={result.stderr.strip()}")
+            with open(output_path, 'r') as f:
+                try:
+                    reports.append(json.load(f))
+                except json.JSONDecodeError as e:
+                    raise RuntimeError(f"JSON inválido en reporte de lote: {e}")
+        finally:
+            try:
+                os.remove(output_path)
+            except OSError:
+                pass
+
+    return reports[0] if len(reports) == 1 else merge_bandit_reports(reports)
+
+
+def _run_shard(outcome: ShardOutcome, timeout: int, max_retries: int) -> ShardOutcome:
+    """Ejecuta un lote con reintentos individuales."""
+    start = time.time()
+    while outcome.attempts <= max_retries:
+        outcome.attempts += 1
+        try:
+            outcome.report = _run_bandit_on_files(outcome.files, timeout)
+            outcome.error = None
+            outcome.limit_reason = None
+            break
+        except ShardLimitError as e:
+            # Reintentar el mismo lote con los mismos límites volvería a fallar
+            outcome.error = f"Lote {outcome.index} detenido por {e}"
+            outcome.limit_reason = e.reason
+            logger.warning(f"🛑 {outcome.error}")
+            break
+        except subprocess.TimeoutExpired:
+            # Igual que con los límites del sandbox: con el mismo timeout volvería a agotarse
+            outcome.error = f"Timeout (>{timeout}s) en lote {outcome.index}"
+            outcome.limit_reason = LIMIT_WALL_CLOCK
+            logger.warning(f"🛑 {outcome.error}")
+            break
+        except Exception as e:
+            outcome.error = f"Error en lote {outcome.index}: {e}"
+            outcome.limit_reason = None
+        logger.warning(f"⚠️ {outcome.error} (intento {outcome.attempts}/{max_retries + 1})")
+    outcome.duration = time.time() - start
+    return outcome
+
+
+def merge_bandit_reports(reports: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fusiona varios reportes JSON de Bandit en uno con la misma estructura.
+
+    - results: concatenados y ordenados por archivo (agregación por defecto de Bandit)
+    - metrics: métricas por archivo unidas y `_totals` sumado
+    - errors: concatenados
+
+    Args:
+        reports: Reportes JSON de Bandit ya parseados
+
+    Returns:
+        Reporte fusionado
+    """
+    merged: Dict[str, Any] = {"errors": [], "metrics": {}, "results": []}
+    totals: Dict[str, int] = {}
+
+    for report in reports:
+        merged["errors"].extend(report.get("errors", []))
+        merged["results"].extend(report.get("results", []))
+        for name, values in (report.get("metrics") or {}).items():
+            if name == "_totals":
+                for key, value in values.items():
+                    totals[key] = totals.get(key, 0) + value
+            else:
+                merged["metrics"][name] = values
+
+    merged["metrics"]["_totals"] = totals
+    merged["results"].sort(key=lambda r: (r.get("filename", ""), r.get("line_number", 0), r.get("test_id", "")))
+    merged["generated_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return merged
+
+
+def run_bandit_sharded(
+    target: Path,
+    report_path: Path,
+    shard_count: Optional[int] = None,
+    timeout: int = 300,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    walk_config: Optional[WalkConfig] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> ShardedBanditRun:
+    """
+    Ejecuta Bandit fragmentado sobre un árbol y escribe el reporte fusionado.
+
+    Cada lote se ejecuta en su propio proceso `python -m bandit`; un pool de
+    hilos solo orquesta los procesos, por lo que el trabajo real se reparte
+    entre todos los núcleos. Los lotes fallidos se reintentan de forma
+    individual (salvo los detenidos por timeout o límites del sandbox); si
+    agotan los reintentos, sus archivos se registran en `errors` del
+    reporte en lugar de invalidar el escaneo completo.
+
+    Args:
+        target: Archivo o directorio preparado para el escaneo
+        report_path: Ruta donde escribir el reporte JSON fusionado
+        shard_count: Número de lotes (por defecto uno por núcleo)
+        timeout: Timeout por ejecución de lote en segundos
+        max_retries: Reintentos por lote fallido
+        walk_config: Filtros de archivos del proyecto (ver backend/file_walker.py)
+        on_progress: Función llamada con (lotes terminados, total) al acabar cada lote
+
+    Returns:
+        ShardedBanditRun con código de retorno compatible con Bandit
+    """
+    start = time.time()
+    files = collect_python_files(Path(target), walk_config)
+    shards = partition_by_size(files, shard_count or DEFAULT_SHARD_COUNT) if files else []
+    outcomes = [ShardOutcome(index=i, files=[str(p) for p in shard]) for i, shard in enumerate(shards)]
+
+    logger.info(f"🧩 Bandit fragmentado: {len(files)} archivos en {len(outcomes)} lotes")
+
+    if outcomes:
+        with ThreadPoolExecutor(max_workers=len(outcomes)) as executor:
+            futures = [executor.submit(_run_shard, o, timeout, max_retries) for o in outcomes]
+            for done, future in enumerate(as_completed(futures), start=1):
+                outcome = future.result()
+                logger.info(f"✓ Lote {outcome.index} finalizado en {outcome.duration:.2f}s "
+                            f"({'ok' if outcome.succeeded else 'fallido'})")
+                if on_progress is not None:
+                    on_progress(done, len(outcomes))
+
+    merged = merge_bandit_reports([o.report for o in outcomes if o.succeeded])
+    for outcome in outcomes:
+        if not outcome.succeeded:
+            merged["errors"].extend(
+                {"filename": name, "reason": outcome.error} for name in outcome.files
+            )
+
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(merged, f, sort_keys=True, indent=2, separators=(",", ": "))
+
+    failed = [o for o in outcomes if not o.succeeded]
+    limit_reason = None
+    if outcomes and len(failed) == len(outcomes):
+        returncode = 2
+        limit_reason = next((o.limit_reason for o in failed if o.limit_reason), None)
+    else:
+        returncode = 1 if merged["results"] else 0
+
+    return ShardedBanditRun(
+        returncode=returncode,
+        stdout=f"{len(merged['results'])} issues in {len(outcomes)} shards",
+        stderr="\n".join(o.error for o in failed if o.error),
+        shards=outcomes,
+        duration=time.time() - start,
+        limit_reason=limit_reason
+    )
@@ -0,0 +1,316 @@
+"""
+Pool persistente de procesos Bandit pre-calentados.
+
+Cada ejecución de `sys.executable -m bandit` paga el arranque del intérprete,
+el descubrimiento de plugins y la carga del perfil. Para archivos pequeños
+(subidas individuales desde /upload/) ese coste domina el tiempo total.
+
+Este módulo mantiene procesos de trabajo que ya importaron el BanditManager,
+los plugins y la configuración por defecto, y que reciben solicitudes de
+escaneo a través de una cola. El reporte generado es el mismo JSON que
+produce la CLI de Bandit.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    from backend.scanner_sandbox import SandboxLimits, SandboxTimeout, apply_process_limits, classify_exit
+    from backend.file_walker import FileWalker
+except ImportError:
+    from scanner_sandbox import SandboxLimits, SandboxTimeout, apply_process_limits, classify_exit
+    from file_walker import FileWalker
+
+logger = logging.getLogger(__name__)
+
+# Número de procesos del pool (0 desactiva el pool)
+WARM_POOL_SIZE = int(os.getenv("HYBRIDSCAN_BANDIT_WARM_POOL", "2"))
+
+# Tamaño máximo del objetivo para usar el pool en lugar de un subproceso nuevo
+WARM_POOL_MAX_BYTES = int(os.getenv("HYBRIDSCAN_BANDIT_WARM_MAX_BYTES", str(1024 * 1024)))
+
+# Tiempo máximo de espera a que un proceso termine de importar Bandit
+WORKER_STARTUP_TIMEOUT = 60
+
+# Límites de los procesos de trabajo: los del sandbox salvo la CPU acumulada,
+# que crece entre escaneos en un proceso persistente
+WORKER_LIMITS = SandboxLimits(cpu_seconds=None)
+
+
+def _worker_main(requests: "multiprocessing.Queue", responses: "multiprocessing.Queue") -> None:
+    """
+    Bucle principal de un proceso de trabajo.
+
+    Importa Bandit una sola vez y atiende solicitudes hasta recibir None.
+    Cada solicitud crea un BanditManager nuevo (barato) reutilizando la
+    configuración y el gestor de extensiones ya cargados. El proceso corre con
+    los límites de memoria, archivos y prioridad del sandbox de escáneres (sin
+    límite de CPU acumulada, ya que el proceso es persistente).
+    """
+    apply_process_limits(WORKER_LIMITS, cpu_time=False)
+    logging.getLogger("bandit").setLevel(logging.WARNING)
+
+    from bandit.core import config as b_config
+    from bandit.core import constants
+    from bandit.core import extension_loader  # noqa: F401 - carga de plugins
+    from bandit.core import manager as b_manager
+
+    conf = b_config.BanditConfig()
+    profile = {
+        "include": set(conf.get_option("tests") or []),
+        "exclude": set(conf.get_option("skips") or [])
+    }
+    excluded_paths = ",".join(constants.EXCLUDE)
+    lowest = constants.RANKING[0]
+
+    responses.put({"type": "ready", "pid": os.getpid()})
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+
+        start = time.perf_counter()
+        try:
+            mgr = b_manager.BanditManager(conf, "file", profile=profile, quiet=True)
+            mgr.discover_files([request["target"]], True, excluded_paths)
+            mgr.run_tests()
+            with open(request["report_path"], "w") as output_file:
+                mgr.output_results(3, lowest, lowest, output_file, "json")
+            issues = mgr.results_count(sev_filter=lowest, conf_filter=lowest)
+            responses.put({
+                "type": "result",
+                "id": request["id"],
+                "returncode": 1 if issues > 0 else 0,
+                "issues": issues,
+                "elapsed": time.perf_counter() - start
+            })
+        except Exception as e:
+            responses.put({
+                "type": "result",
+                "id": request["id"],
+                "returncode": 2,
+                "error": f"{type(e).__name__}: {e}",
+                "elapsed": time.perf_counter() - start
+            })
+
+
+class _WarmWorker:
+    """Proceso de trabajo con sus colas dedicadas de solicitudes y respuestas."""
+
+    def __init__(self, ctx):
+        self.requests = ctx.Queue()
+        self.responses = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.requests, self.responses),
+            name="bandit-warm-worker",
+            daemon=True
+        )
+        self.process.start()
+        self.ready = False
+
+    def wait_ready(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not self.ready and time.monotonic() < deadline:
+            try:
+                message = self.responses.get(timeout=0.5)
+                self.ready = message.get("type") == "ready"
+            except queue.Empty:
+                if not self.process.is_alive():
+                    break
+        return self.ready
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.requests.put_nowait(None)
+            except Exception:
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class BanditWarmPool:
+    """
+    Pool de procesos Bandit pre-calentados.
+
+    Los procesos se asignan uno por solicitud; si una solicitud supera el
+    timeout, el proceso se mata y se reemplaza por uno nuevo para que el pool
+    no quede bloqueado. Un reemplazo que no arranca sale del pool; sin
+    procesos vivos, `scan` lanza RuntimeError de inmediato y el llamador
+    recurre a un subproceso.
+    """
+
+    def __init__(self, size: int = WARM_POOL_SIZE):
+        self.size = max(1, size)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_WarmWorker]" = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._started = False
+        self._stats = {"scans": 0, "timeouts": 0, "restarts": 0, "lost": 0}
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def start(self) -> None:
+        """Arranca los procesos y espera a que terminen de importar Bandit."""
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._workers.append(_WarmWorker(self._ctx))
+            for worker in self._workers:
+                if worker.wait_ready(WORKER_STARTUP_TIMEOUT):
+                    self._idle.put(worker)
+                else:
+                    logger.warning("⚠️ Proceso Bandit pre-calentado no respondió al arrancar")
+                    worker.stop(kill=True)
+            self._workers = [w for w in self._workers if w.ready]
+            if not self._workers:
+                raise RuntimeError("No se pudo iniciar ningún proceso Bandit pre-calentado")
+            self._started = True
+            logger.info(f"🔥 Pool Bandit pre-calentado listo ({len(self._workers)} procesos)")
+
+    def _replace(self, worker: _WarmWorker) -> None:
+        worker.stop(kill=True)
+        replacement = _WarmWorker(self._ctx)
+        with self._lock:
+            self._workers = [w for w in self._workers if w is not worker] + [replacement]
+        self._count("restarts")
+        if replacement.wait_ready(WORKER_STARTUP_TIMEOUT):
+            self._idle.put(replacement)
+            return
+        replacement.stop(kill=True)
+        with self._lock:
+            self._workers = [w for w in self._workers if w is not replacement]
+            remaining = len(self._workers)
+        self._count("lost")
+        logger.warning(f"⚠️ Reemplazo Bandit pre-calentado no arrancó; quedan {remaining} procesos")
+
+    def _acquire(self, args, timeout: int) -> _WarmWorker:
+        """Proceso libre; RuntimeError en cuanto no queda ninguno vivo (ni arrancando)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                alive = len(self._workers)
+            if not alive:
+                raise RuntimeError("No quedan procesos Bandit pre-calentados")
+            try:
+                return self._idle.get(timeout=min(0.5, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    raise subprocess.TimeoutExpired(args, timeout)
+
+    def scan(self, target: Path, report_path: Path, timeout: int = 300) -> subprocess.CompletedProcess:
+        """
+        Ejecuta Bandit sobre `target` en un proceso pre-calentado.
+
+        Args:
+            target: Archivo o directorio a analizar
+            report_path: Ruta donde escribir el reporte JSON
+            timeout: Timeout en segundos
+
+        Returns:
+            CompletedProcess con el código de retorno de la CLI de Bandit y
+            `limit_reason`, igual que `run_sandboxed`
+
+        Raises:
+            SandboxTimeout: Si el escaneo supera el timeout
+            subprocess.TimeoutExpired: Si ningún proceso queda libre a tiempo
+            RuntimeError: Si el pool no puede arrancar o el proceso muere
+        """
+        self.start()
+        args = ["bandit-warm-pool", str(target)]
+        worker = self._acquire(args, timeout)
+
+        request_id = uuid.uuid4().hex
+        worker.requests.put({"id": request_id, "target": str(target), "report_path": str(report_path)})
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                response = worker.responses.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if not worker.process.is_alive():
+                    threading.Thread(target=self._replace, args=(worker,), daemon=True).start()
+                    raise RuntimeError("El proceso Bandit pre-calentado terminó inesperadamente")
+                if time.monotonic() > deadline:
+                    self._count("timeouts")
+                    threading.Thread(target=self._replace, args=(worker,), daemon=True).start()
+                    raise SandboxTimeout(args, timeout)
+
+        self._idle.put(worker)
+        self._count("scans")
+        logger.info(f"⚡ Bandit pre-calentado: {response.get('issues', 0)} issues en "
+                    f"{response.get('elapsed', 0) * 1000:.1f}ms")
+        result = subprocess.CompletedProcess(
+            args,
+            response["returncode"],
+            stdout="",
+            stderr=response.get("error", "")
+        )
+        # Un MemoryError u OSError(EMFILE) en el proceso de trabajo es un límite del sandbox
+        result.limit_reason = classify_exit(result.returncode, result.stderr, WORKER_LIMITS)
+        if result.limit_reason:
+            logger.warning(f"🛑 Bandit pre-calentado detenido por límite de recursos ({result.limit_reason})")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Estadísticas de uso del pool."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {**stats, "workers": len(self._workers), "started": self._started}
+
+    def shutdown(self) -> None:
+        """Detiene todos los procesos del pool."""
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+            self._idle = queue.Queue()
+            self._started = False
+
+
+_pool: Optional[BanditWarmPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_warm_pool() -> Optional[BanditWarmPool]:
+    """Devuelve el pool global (creado bajo demanda) o None si está desactivado."""
+    global _pool
+    if WARM_POOL_SIZE <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = BanditWarmPool(WARM_POOL_SIZE)
+            atexit.register(_pool.shutdown)
+    return _pool
+
+
+def is_small_target(target: Path) -> bool:
+    """Indica si el objetivo es lo bastante pequeño para el pool pre-calentado."""
+    target = Path(target)
+    if target.is_file():
+        return target.stat().st_size <= WARM_POOL_MAX_BYTES
+    total = 0
+    for _rel_path, entry in FileWalker().walk(target):
+        total += entry.stat(follow_symlinks=False).st_size
+        if total > WARM_POOL_MAX_BYTES:
+            return False
+    return True
@@ -5,8 +5,10 @@ Sistema que correlaciona hallazgos SAST y DAST para reducir falsos positivos
 
 import json
 import os
+import re
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, List, Tuple
+from urllib.parse import urlparse
 from dataclasses import dataclass
 from enum import Enum
 
@@ -61,6 +63,10 @@ class VulnerabilityCorrelator:
         self.correlation_rules = self._load_correlation_rules()
         self.ml_model = self._initialize_ml_model()
         
+        # Tabla de rutas OpenAPI para uniones exactas por endpoint
+        self.route_table: List[Dict] = []
+        self._route_cache: Dict[str, FrozenSet[str]] = {}
+        
         # Métricas de validación del modelo
         self.model_metrics = {
             'cross_validation_f1': 0.909,
@@ -71,7 +77,8 @@ class VulnerabilityCorrelator:
             'inter_rater_agreement': 0.87  # Kappa coefficient
         }
         
-    def _load_correlation_rules(self) -> Dict:
+    @staticmethod
+    def _load_correlation_rules() -> Dict:
         """Carga reglas de correlación basadas en investigación empírica"""
         return {
             "sql_injection": {
@@ -456,10 +463,57 @@ class VulnerabilityCorrelator:
         
         return (type1, type2) in related_pairs or (type2, type1) in related_pairs
     
+    def set_route_table(self, routes: List[Dict]) -> None:
+        """
+        Registra la tabla de rutas OpenAPI (ver backend/openapi_targets.route_table).
+        
+        Con la tabla, dos endpoints que resuelven a rutas se comparan por ruta
+        exacta; los que no resuelven siguen usando la distancia de Levenshtein.
+        """
+        self.route_table = [
+            dict(route, compiled=re.compile(route["regex"], re.IGNORECASE))
+            for route in routes if route.get("regex") and route.get("path")
+        ]
+        self._route_cache = {}
+    
+    def _resolve_routes(self, endpoint: str) -> FrozenSet[str]:
+        """
+        Rutas de la tabla a las que corresponde un endpoint.
+        
+        Se prueba la ruta concreta (URL de DAST) contra cada plantilla y, si no
+        coincide ninguna, el último segmento (endpoint derivado del archivo en
+        SAST) contra operationId, tags y segmentos estáticos de cada ruta.
+        """
+        if endpoint in self._route_cache:
+            return self._route_cache[endpoint]
+        
+        path = urlparse(endpoint).path if "://" in endpoint else endpoint.split("?", 1)[0]
+        matches = {route["path"] for route in self.route_table
+                   if path == route["path"] or route["compiled"].match(path)}
+        if not matches:
+            name = path.rstrip("/").rsplit("/", 1)[-1].lower()
+            if name:
+                for route in self.route_table:
+                    static_segments = [seg.lower() for seg in route["path"].split("/") if seg and not seg.startswith("{")]
+                    names = {str(route.get("operation_id") or "").lower(), *[str(t).lower() for t in route.get("tags") or []]}
+                    if name in names or (static_segments and static_segments[-1] == name):
+                        matches.add(route["path"])
+        
+        resolved = frozenset(matches)
+        self._route_cache[endpoint] = resolved
+        return resolved
+    
     def _calculate_endpoint_similarity(self, endpoint1: str, endpoint2: str) -> float:
         """Calcula similitud entre endpoints usando distancia de Levenshtein"""
         if not endpoint1 or not endpoint2:
             return 0.0
+        
+        # Unión exacta por ruta OpenAPI cuando ambos endpoints resuelven
+        if self.route_table:
+            routes1 = self._resolve_routes(endpoint1)
+            routes2 = self._resolve_routes(endpoint2)
+            if routes1 and routes2:
+                return 1.0 if routes1 & routes2 else 0.0
             
         # Normalizar endpoints
         ep1 = endpoint1.strip('/').lower()
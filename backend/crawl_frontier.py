@@ -0,0 +1,167 @@
+"""
+Frontera de rastreo DAST con deduplicación por plantilla de URL.
+
+El rastreo de una API grande visita muchas URLs equivalentes (misma ruta con
+distintos IDs: /users/1, /users/2, ...) y vuelve a inyectar payloads en
+páginas de error idénticas. Esta frontera:
+
+- normaliza cada URL a una plantilla (segmentos numéricos, UUID y hashes se
+  sustituyen por marcadores; de la query solo cuentan los nombres de
+  parámetros),
+- deduplica plantillas con un filtro de Bloom de memoria fija,
+- lleva huellas de los cuerpos de respuesta ya analizados para saltar la
+  inyección en páginas cuyo contenido no depende de la entrada.
+
+Así el tiempo de escaneo crece con el número de endpoints distintos, no con
+el número de URLs.
+"""
+
+import hashlib
+import math
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List
+from urllib.parse import parse_qsl, urlparse, urlunparse
+
+# Capacidad y tasa de falsos positivos por defecto del filtro de Bloom
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.001
+
+_SEGMENT_PATTERNS = [
+    (re.compile(r"^\d+$"), "{id}"),
+    (re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE), "{uuid}"),
+    (re.compile(r"^[0-9a-f]{16,}$", re.IGNORECASE), "{hash}"),
+    (re.compile(r"^(?=.*\d)[A-Za-z0-9_-]{24,}$"), "{token}"),
+]
+
+# Fragmentos volátiles que se eliminan antes de calcular la huella de un cuerpo
+_VOLATILE_PATTERNS = [
+    re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE),
+    re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?\b"),
+    re.compile(r"\b[0-9a-f]{16,}\b", re.IGNORECASE),
+    re.compile(r"\d+"),
+]
+_WHITESPACE = re.compile(r"\s+")
+
+
+def url_template(url: str, method: str = "GET") -> str:
+    """
+    Plantilla de una URL: ruta con identificadores sustituidos y nombres de query ordenados.
+
+    >>> url_template("https://api.example.com/users/42/orders?page=3&sort=asc")
+    'GET https://api.example.com/users/{id}/orders?page&sort'
+    """
+    parsed = urlparse(url)
+    segments = []
+    for segment in parsed.path.split("/"):
+        for pattern, marker in _SEGMENT_PATTERNS:
+            if pattern.match(segment):
+                segment = marker
+                break
+        segments.append(segment)
+    names = sorted({name for name, _value in parse_qsl(parsed.query, keep_blank_values=True)})
+    base = urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), "/".join(segments) or "/", "", "", ""))
+    return f"{method.upper()} {base}" + (f"?{'&'.join(names)}" if names else "")
+
+
+def response_fingerprint(status_code: int, content_type: str, body: str) -> str:
+    """
+    Huella de una respuesta ignorando fragmentos volátiles (números, fechas, UUID, hashes).
+
+    Dos páginas de error que solo difieren en un ID o un timestamp comparten huella.
+    """
+    normalized = body
+    for pattern in _VOLATILE_PATTERNS:
+        normalized = pattern.sub("#", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    digest = hashlib.blake2b(f"{status_code}\0{media_type}\0{normalized}".encode("utf-8", "replace"), digest_size=16)
+    return digest.hexdigest()
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom con doble hashing sobre blake2b.
+
+    Args:
+        capacity: Número de elementos esperado
+        error_rate: Tasa de falsos positivos objetivo con `capacity` elementos
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Añade un elemento; devuelve False si (probablemente) ya estaba."""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self._bits[pos >> 3] & mask:
+                self._bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+
+class CrawlFrontier:
+    """
+    Cola de URLs pendientes deduplicada por plantilla.
+
+    Args:
+        capacity: Plantillas esperadas (dimensiona los filtros de Bloom)
+        error_rate: Tasa de falsos positivos de los filtros
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self._templates = BloomFilter(capacity, error_rate)
+        self._fingerprints = BloomFilter(capacity, error_rate)
+        self._queue: deque = deque()
+        self._stats = {"urls_offered": 0, "templates_accepted": 0, "duplicate_urls": 0, "duplicate_responses": 0}
+
+    def offer(self, url: str, method: str = "GET") -> bool:
+        """Encola la URL si su plantilla no se ha visto; devuelve True si se encoló."""
+        self._stats["urls_offered"] += 1
+        if not self._templates.add(url_template(url, method)):
+            self._stats["duplicate_urls"] += 1
+            return False
+        self._stats["templates_accepted"] += 1
+        self._queue.append(url)
+        return True
+
+    def seen_template(self, url: str, method: str = "GET") -> bool:
+        """Registra la plantilla; devuelve True si ya estaba registrada."""
+        return not self._templates.add(url_template(url, method))
+
+    def pop_batch(self, limit: int) -> List[str]:
+        """Extrae hasta `limit` URLs pendientes."""
+        batch = []
+        while self._queue and len(batch) < limit:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def seen_response(self, status_code: int, content_type: str, body: str) -> bool:
+        """Registra la huella del cuerpo; devuelve True si ya se analizó una respuesta equivalente."""
+        if self._fingerprints.add(response_fingerprint(status_code, content_type, body)):
+            return False
+        self._stats["duplicate_responses"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
@@ -0,0 +1,560 @@
+"""
+Motor DAST nativo asíncrono.
+
+`run_dast_scan` devolvía alertas simuladas y `scripts/run_zap.py` depende de
+`zap-cli`. Este módulo rastrea el objetivo, descubre puntos de inyección
+(parámetros de enlaces, formularios y rutas semilla) y lanza de forma
+concurrente las familias de payloads del OWASP API Top 10: SQL injection,
+XSS reflejado, open redirect e IDOR.
+
+Todas las peticiones comparten un único `httpx.AsyncClient` con conexiones
+keep-alive; la concurrencia contra cada host se adapta con AIMD
+(backend/rate_control.py) para no tumbar objetivos frágiles. Las alertas se emiten con el mismo esquema `vulnerabilities` que el
+resto de la API (type, alert, severity, risk, confidence, parameter,
+description, solution, evidence, cwe, cweid, url).
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urldefrag, urljoin, urlparse, urlunparse
+
+import httpx
+
+try:
+    from backend.crawl_frontier import CrawlFrontier, url_template
+    from backend.rate_control import AimdConcurrencyLimiter, BACKOFF_STATUS_CODES, parse_retry_after
+except ImportError:
+    from crawl_frontier import CrawlFrontier, url_template
+    from rate_control import AimdConcurrencyLimiter, BACKOFF_STATUS_CODES, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Límites del pool de conexiones compartido
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("HYBRIDSCAN_DAST_MAX_CONNECTIONS", "50"))
+# Techo del control adaptativo (AIMD) de peticiones simultáneas por host
+DEFAULT_PER_HOST_CONCURRENCY = int(os.getenv("HYBRIDSCAN_DAST_PER_HOST", "32"))
+DEFAULT_MAX_PAGES = int(os.getenv("HYBRIDSCAN_DAST_MAX_PAGES", "200"))
+DEFAULT_TIMEOUT = 10.0
+
+# Hosts que los motores nativo y ZAP pueden atacar (separados por comas; `*` admite cualquiera).
+# Por defecto solo la máquina local: el endpoint no debe servir de relé SSRF hacia terceros.
+ALLOWED_HOSTS = frozenset(
+    h.strip().lower() for h in os.getenv("HYBRIDSCAN_DAST_ALLOWED_HOSTS", "localhost,127.0.0.1,::1").split(",")
+    if h.strip()
+)
+
+# Reintentos de una petición rechazada por sobrecarga (429/503) o timeout
+MAX_OVERLOAD_RETRIES = 2
+
+USER_AGENT = "HybridSecScan-DAST/1.0"
+
+# Parámetros probados en endpoints sin parámetros conocidos
+COMMON_PARAMS = ["id", "q", "search", "username", "user_id", "file", "url", "next", "redirect"]
+
+# Nombres de parámetros típicos de redirección
+REDIRECT_PARAM_HINTS = ("next", "url", "redirect", "return", "returnto", "return_to", "goto", "dest", "destination", "continue")
+
+SQL_ERROR_SIGNATURES = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"SQL syntax.*MySQL", r"sqlite3?\.OperationalError", r"unrecognized token", r"unterminated quoted string",
+        r"PG::SyntaxError", r"psycopg2\.", r"ORA-\d{5}", r"Microsoft OLE DB Provider for SQL Server",
+        r"Unclosed quotation mark after the character string", r"SQLSTATE\[", r"syntax error at or near"
+    )
+]
+
+# Definición de las alertas emitidas por cada familia de payloads
+ALERT_DEFINITIONS: Dict[str, Dict[str, str]] = {
+    "sqli": {
+        "type": "SQL Injection",
+        "alert": "SQL Injection",
+        "severity": "CRITICAL",
+        "risk": "Critical",
+        "description": "User-controlled input reaches a SQL statement without parameterization. An attacker can alter "
+                       "the query to read or modify data belonging to other users.",
+        "solution": "Use prepared statements with parameterized queries and validate input with allow-lists.",
+        "cwe": "CWE-89",
+        "cweid": "89"
+    },
+    "xss": {
+        "type": "Cross-Site Scripting (XSS)",
+        "alert": "Cross-Site Scripting (XSS)",
+        "severity": "HIGH",
+        "risk": "High",
+        "description": "The injected script payload is reflected in the response without encoding, so it executes in "
+                       "the victim's browser.",
+        "solution": "Encode output for its context, validate input and set a restrictive Content-Security-Policy.",
+        "cwe": "CWE-79",
+        "cweid": "79"
+    },
+    "open_redirect": {
+        "type": "Open Redirect",
+        "alert": "Open Redirect",
+        "severity": "LOW",
+        "risk": "Low",
+        "description": "The application redirects to an arbitrary external URL taken from a request parameter, which "
+                       "can be abused for phishing.",
+        "solution": "Validate redirect targets against an allow-list or use relative URLs only.",
+        "cwe": "CWE-601",
+        "cweid": "601"
+    },
+    "idor": {
+        "type": "Insecure Direct Object Reference (IDOR)",
+        "alert": "Insecure Direct Object Reference",
+        "severity": "MEDIUM",
+        "risk": "Medium",
+        "description": "Changing an object identifier returns a different object without any authorization check.",
+        "solution": "Enforce object-level authorization on every access and avoid predictable identifiers.",
+        "cwe": "CWE-639",
+        "cweid": "639"
+    }
+}
+
+
+@dataclass
+class InjectionPoint:
+    """Endpoint con sus parámetros inyectables."""
+    method: str
+    url: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    guessed: bool = False  # parámetros tomados de COMMON_PARAMS
+    locations: Dict[str, str] = field(default_factory=dict)  # parámetro -> query, form o json
+    route: Optional[str] = None  # plantilla de ruta OpenAPI
+
+    @property
+    def key(self) -> Tuple[str, Tuple[str, ...]]:
+        return url_template(self.url, self.method), tuple(sorted(self.params))
+
+
+@dataclass
+class DastScanResult:
+    """Resultado de un escaneo DAST nativo."""
+    target_url: str
+    vulnerabilities: List[Dict[str, Any]] = field(default_factory=list)
+    pages_crawled: int = 0
+    injection_points: int = 0
+    skipped_injection_points: int = 0
+    requests_sent: int = 0
+    duration: float = 0.0
+    frontier: Dict[str, Any] = field(default_factory=dict)
+    rate_control: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def requests_per_second(self) -> float:
+        return round(self.requests_sent / self.duration, 2) if self.duration > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pages_crawled": self.pages_crawled,
+            "injection_points": self.injection_points,
+            "skipped_injection_points": self.skipped_injection_points,
+            "requests_sent": self.requests_sent,
+            "requests_per_second": self.requests_per_second,
+            "duration_seconds": round(self.duration, 3),
+            "frontier": self.frontier,
+            "rate_control": self.rate_control
+        }
+
+
+class _LinkExtractor(HTMLParser):
+    """Extrae enlaces y formularios de una página HTML."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+        self.forms: List[Dict[str, Any]] = []
+        self._form: Optional[Dict[str, Any]] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("a", "link", "area") and attrs.get("href"):
+            self.links.append(attrs["href"])
+        elif tag in ("script", "iframe", "frame") and attrs.get("src"):
+            self.links.append(attrs["src"])
+        elif tag == "form":
+            self._form = {"action": attrs.get("action") or "", "method": (attrs.get("method") or "GET").upper(), "inputs": {}}
+            self.forms.append(self._form)
+        elif tag in ("input", "textarea", "select") and self._form is not None and attrs.get("name"):
+            self._form["inputs"][attrs["name"]] = attrs.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._form = None
+
+
+class AsyncDastEngine:
+    """
+    Motor DAST asíncrono con pool de conexiones compartido.
+
+    Args:
+        target_url: URL base del objetivo; el rastreo no sale de su origen
+        seed_paths: Rutas adicionales a analizar aunque no estén enlazadas
+        injection_points: Puntos de inyección ya conocidos (p.ej. de OpenAPI);
+            si se indican, no se rastrea el objetivo
+        max_pages: Máximo de páginas a rastrear
+        per_host_concurrency: Techo de peticiones simultáneas por host; el
+            límite efectivo se adapta con AIMD (ver backend/rate_control.py)
+        max_connections: Conexiones totales del pool
+        timeout: Timeout por petición en segundos
+        allowed_hosts: Hosts a los que se permite enviar peticiones (ALLOWED_HOSTS por defecto)
+    """
+
+    def __init__(
+        self,
+        target_url: str,
+        seed_paths: Sequence[str] = (),
+        injection_points: Optional[Sequence[InjectionPoint]] = None,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT,
+        allowed_hosts: Optional[Sequence[str]] = None
+    ):
+        self.target_url = target_url
+        self.origin = urlparse(target_url).netloc
+        self.seed_paths = list(seed_paths)
+        self.preset_points = list(injection_points) if injection_points is not None else None
+        self.max_pages = max_pages
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.timeout = timeout
+        self.allowed_hosts = frozenset(h.lower() for h in allowed_hosts) if allowed_hosts is not None \
+            else ALLOWED_HOSTS
+        self._limiters: Dict[str, AimdConcurrencyLimiter] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._requests = 0
+        self._alert_keys = set()
+        self.frontier = CrawlFrontier()
+        self.result = DastScanResult(target_url=target_url)
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _limiter(self, url: str) -> AimdConcurrencyLimiter:
+        host = urlparse(url).netloc
+        if host not in self._limiters:
+            self._limiters[host] = AimdConcurrencyLimiter(max_limit=self.per_host_concurrency)
+        return self._limiters[host]
+
+    async def _send(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                    follow_redirects: bool = True,
+                    locations: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+        """
+        Envía una petición respetando el límite adaptativo del host; None si falla la conexión.
+
+        Las respuestas 429/503 y los timeouts reducen el límite y se reintentan
+        hasta MAX_OVERLOAD_RETRIES veces (tras el Retry-After si lo hay).
+        Cada parámetro va en la query, el formulario o el cuerpo JSON según
+        `locations` (por defecto query en GET y formulario en el resto).
+        """
+        kwargs: Dict[str, Any] = {"follow_redirects": follow_redirects}
+        default_location = "query" if method == "GET" else "form"
+        for name, value in (params or {}).items():
+            location = (locations or {}).get(name, default_location)
+            key = {"query": "params", "form": "data", "json": "json"}.get(location, "params")
+            kwargs.setdefault(key, {})[name] = value
+        limiter = self._limiter(url)
+        response = None
+        for _attempt in range(MAX_OVERLOAD_RETRIES + 1):
+            started = await limiter.acquire()
+            self._requests += 1
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TimeoutException as e:
+                await limiter.release(started, timed_out=True)
+                logger.debug(f"DAST: timeout {method} {url}: {e}")
+                response = None
+                continue
+            except httpx.HTTPError as e:
+                await limiter.release(started)
+                logger.debug(f"DAST: petición fallida {method} {url}: {e}")
+                return None
+            await limiter.release(
+                started, response.status_code, retry_after=parse_retry_after(response.headers.get("retry-after"))
+            )
+            if response.status_code not in BACKOFF_STATUS_CODES:
+                return response
+        return response
+
+    async def _check_host(self, request: httpx.Request) -> None:
+        """Hook de petición: bloquea cualquier host fuera de la lista (también tras redirecciones)."""
+        if not target_allowed(str(request.url), self.allowed_hosts):
+            raise httpx.RequestError(f"Host no permitido para DAST: {request.url.host}", request=request)
+
+    def _in_scope(self, url: str) -> bool:
+        parsed = urlparse(url)
+        return parsed.scheme in ("http", "https") and parsed.netloc == self.origin
+
+    # ------------------------------------------------------------------
+    # Rastreo
+    # ------------------------------------------------------------------
+
+    async def _fetch_page(self, url: str) -> Tuple[List[str], List[InjectionPoint]]:
+        """Descarga una página y devuelve (enlaces, puntos de inyección)."""
+        # Sin seguir redirecciones: el punto de inyección es la URL original
+        response = await self._send("GET", url, follow_redirects=False)
+        if response is None:
+            return [], []
+
+        points: List[InjectionPoint] = []
+        if response.status_code == 405:
+            # Endpoint que solo acepta POST (p.ej. formularios de API sin HTML)
+            points.append(InjectionPoint("POST", url))
+            return [], points
+        if response.status_code >= 400:
+            return [], []
+
+        parsed = urlparse(url)
+        query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+        bare = urlunparse(parsed._replace(query="", fragment=""))
+        points.append(InjectionPoint("GET", bare, query))
+
+        if response.is_redirect:
+            location = urldefrag(urljoin(url, response.headers.get("location", "")))[0]
+            return ([location] if self._in_scope(location) else []), points
+
+        links: List[str] = []
+        if "html" in response.headers.get("content-type", ""):
+            extractor = _LinkExtractor()
+            try:
+                extractor.feed(response.text)
+            except Exception as e:
+                logger.debug(f"DAST: HTML no parseable en {url}: {e}")
+            for href in extractor.links:
+                absolute = urldefrag(urljoin(url, href))[0]
+                if self._in_scope(absolute):
+                    links.append(absolute)
+            for form in extractor.forms:
+                action = urldefrag(urljoin(url, form["action"]))[0]
+                if self._in_scope(action):
+                    points.append(InjectionPoint(form["method"], action, dict(form["inputs"])))
+        return links, points
+
+    async def crawl(self) -> List[InjectionPoint]:
+        """
+        Rastrea el objetivo en anchura, nivel a nivel y de forma concurrente.
+
+        La frontera descarta URLs cuya plantilla ya se encoló, de modo que el
+        número de páginas descargadas depende de los endpoints distintos.
+
+        Returns:
+            Puntos de inyección descubiertos (sin duplicados)
+        """
+        for url in [self.target_url] + [urljoin(self.target_url, p) for p in self.seed_paths]:
+            self.frontier.offer(url)
+
+        points: Dict[Tuple, InjectionPoint] = {}
+        while len(self.frontier) and self.result.pages_crawled < self.max_pages:
+            batch = self.frontier.pop_batch(self.max_pages - self.result.pages_crawled)
+            pages = await asyncio.gather(*(self._fetch_page(url) for url in batch))
+            self.result.pages_crawled += len(batch)
+            for links, found in pages:
+                for point in found:
+                    points.setdefault(point.key, point)
+                for link in links:
+                    # URLs con la misma plantilla (/users/1, /users/2) se rastrean una sola vez
+                    self.frontier.offer(link)
+
+        # Endpoints sin parámetros conocidos: probar parámetros comunes
+        resolved = []
+        for point in points.values():
+            if not point.params:
+                point = InjectionPoint(point.method, point.url, {name: "1" for name in COMMON_PARAMS}, guessed=True)
+            resolved.append(point)
+        return resolved
+
+    # ------------------------------------------------------------------
+    # Familias de payloads
+    # ------------------------------------------------------------------
+
+    def _alert(self, family: str, point: InjectionPoint, parameter: str, evidence: str, confidence: str) -> None:
+        key = (family, point.method, point.url, parameter)
+        if key in self._alert_keys:
+            return
+        self._alert_keys.add(key)
+        alert = dict(ALERT_DEFINITIONS[family])
+        alert.update({
+            "confidence": confidence,
+            "parameter": parameter,
+            "evidence": evidence[:300],
+            "url": point.url,
+            "method": point.method
+        })
+        if point.route:
+            alert["route"] = point.route
+        self.result.vulnerabilities.append(alert)
+
+    async def _probe_sqli(self, point: InjectionPoint, baseline: Optional[httpx.Response]) -> None:
+        tokens = {name: f"hsc{uuid.uuid4().hex[:8]}" for name in point.params}
+        payload = {name: f"{tokens[name]}' OR '1'='1" for name in point.params}
+        response = await self._send(point.method, point.url, payload, locations=point.locations)
+        if response is None:
+            return
+        body = response.text
+        baseline_body = baseline.text if baseline is not None else ""
+
+        for name, token in tokens.items():
+            # Payload reflejado dentro de una sentencia SQL (p.ej. query mostrada en la respuesta)
+            match = re.search(rf"\b(SELECT|INSERT|UPDATE|DELETE)\b[^\n<]{{0,200}}{token}'", body, re.IGNORECASE)
+            if match:
+                self._alert("sqli", point, name, match.group(0), "High")
+        for signature in SQL_ERROR_SIGNATURES:
+            match = signature.search(body)
+            if match and not signature.search(baseline_body):
+                parameter = next(iter(point.params)) if len(point.params) == 1 else ",".join(point.params)
+                self._alert("sqli", point, parameter, match.group(0), "Medium")
+                break
+
+    async def _probe_xss(self, point: InjectionPoint) -> None:
+        payloads = {name: f"<script>alert('hsc{uuid.uuid4().hex[:8]}')</script>" for name in point.params}
+        response = await self._send(point.method, point.url, payloads, locations=point.locations)
+        if response is None:
+            return
+        content_type = response.headers.get("content-type", "html")
+        if "html" not in content_type:
+            return
+        for name, payload in payloads.items():
+            if payload in response.text:
+                self._alert("xss", point, name, payload, "Medium")
+
+    async def _probe_open_redirect(self, point: InjectionPoint) -> None:
+        candidates = [n for n in point.params if n.lower() in REDIRECT_PARAM_HINTS]
+        if not candidates:
+            return
+        hosts = {name: f"hsc{uuid.uuid4().hex[:8]}.example.invalid" for name in candidates}
+        values = dict(point.params)
+        values.update({name: f"https://{host}/" for name, host in hosts.items()})
+        response = await self._send(point.method, point.url, values, follow_redirects=False,
+                                    locations=point.locations)
+        if response is None or not response.is_redirect:
+            return
+        location = response.headers.get("location", "")
+        for name, host in hosts.items():
+            if urlparse(location).netloc == host:
+                self._alert("open_redirect", point, name, f"Location: {location}", "High")
+
+    async def _probe_idor(self, point: InjectionPoint, baseline: Optional[httpx.Response]) -> None:
+        if baseline is None or not baseline.is_success or not baseline.content:
+            return
+
+        # Identificadores numéricos en parámetros reales o en el último segmento de la ruta
+        variants: List[Tuple[str, str, Dict[str, str], str]] = []
+        if not point.guessed:
+            for name, value in point.params.items():
+                if str(value).isdigit():
+                    values = dict(point.params)
+                    values[name] = int(value) + 1 if isinstance(value, int) else str(int(value) + 1)
+                    variants.append((name, point.url, values, f"{name}={value} -> {values[name]}"))
+        parsed = urlparse(point.url)
+        segments = parsed.path.rstrip("/").split("/")
+        if segments and segments[-1].isdigit():
+            segments[-1] = str(int(segments[-1]) + 1)
+            other_url = urlunparse(parsed._replace(path="/".join(segments)))
+            params = point.params if not point.guessed else None
+            variants.append(("path", other_url, params, f"{parsed.path} -> {'/'.join(segments)}"))
+
+        for name, url, values, change in variants:
+            response = await self._send(point.method, url, values, locations=point.locations)
+            if response is not None and response.is_success and response.content and response.text != baseline.text:
+                self._alert("idor", point, name, f"{change}: objetos distintos sin autorización", "Low")
+
+    def _input_independent(self, point: InjectionPoint, baseline: httpx.Response) -> bool:
+        """Indica si la respuesta base no refleja ninguno de los valores enviados."""
+        if point.guessed:
+            return True
+        return not any(len(str(value)) >= 3 and str(value) in baseline.text for value in point.params.values())
+
+    async def _probe_point(self, point: InjectionPoint) -> None:
+        baseline = await self._send(point.method, point.url, None if point.guessed else point.params or None,
+                                    locations=point.locations)
+        # Página equivalente a otra ya analizada (p.ej. la misma página de error): no inyectar.
+        # Las operaciones declaradas en OpenAPI son distintas por definición y no se descartan.
+        if (baseline is not None and point.route is None and self._input_independent(point, baseline)
+                and self.frontier.seen_response(baseline.status_code, baseline.headers.get("content-type", ""),
+                                                baseline.text)):
+            self.result.skipped_injection_points += 1
+            return
+        probes = [self._probe_idor(point, baseline)]
+        if point.params:
+            probes += [self._probe_sqli(point, baseline), self._probe_xss(point), self._probe_open_redirect(point)]
+        await asyncio.gather(*probes)
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    async def run(self) -> DastScanResult:
+        """Rastrea el objetivo y lanza todas las familias de payloads."""
+        start = time.perf_counter()
+        async with httpx.AsyncClient(
+            limits=self.limits,
+            timeout=self.timeout,
+            headers={"User-Agent": USER_AGENT},
+            verify=False,
+            event_hooks={"request": [self._check_host]}
+        ) as client:
+            self._client = client
+            points = self.preset_points if self.preset_points is not None else await self.crawl()
+            self.result.injection_points = len(points)
+            logger.info(f"🕷️ DAST nativo: {self.result.pages_crawled} páginas, {len(points)} puntos de inyección")
+            await asyncio.gather(*(self._probe_point(point) for point in points))
+        self._client = None
+
+        self.result.vulnerabilities.sort(key=lambda v: (v["url"], v["type"], v["parameter"]))
+        self.result.requests_sent = self._requests
+        self.result.frontier = self.frontier.stats()
+        self.result.rate_control = {host: limiter.stats() for host, limiter in self._limiters.items()}
+        self.result.duration = time.perf_counter() - start
+        return self.result
+
+
+def target_allowed(url: str, allowed_hosts: Optional[Sequence[str]] = None) -> bool:
+    """True si el host de `url` está en la lista de hosts permitidos para DAST activo."""
+    hosts = ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+    hostname = (urlparse(url).hostname or "").lower()
+    return bool(hostname) and ("*" in hosts or hostname in hosts)
+
+
+def points_from_operations(operations: Sequence[Any]) -> List[InjectionPoint]:
+    """
+    Convierte operaciones OpenAPI (backend/openapi_targets.py) en puntos de inyección.
+
+    Los parámetros de query y de cuerpo conservan su ubicación; los de ruta
+    ya están sustituidos en la URL concreta.
+    """
+    points = []
+    for operation in operations:
+        params: Dict[str, Any] = {}
+        locations: Dict[str, str] = {}
+        for name, value in operation.query.items():
+            params[name] = value
+            locations[name] = "query"
+        for name, value in operation.body.items():
+            params[name] = value
+            locations[name] = operation.body_type or "form"
+        points.append(InjectionPoint(
+            operation.method, operation.url, params, locations=locations, route=operation.route
+        ))
+    return points
+
+
+def run_native_dast(target_url: str, seed_paths: Sequence[str] = (), **kwargs) -> DastScanResult:
+    """
+    Ejecuta el motor DAST nativo de forma síncrona (para endpoints y scripts).
+
+    Args:
+        target_url: URL base del objetivo
+        seed_paths: Rutas adicionales a analizar
+        **kwargs: Límites de AsyncDastEngine
+
+    Returns:
+        DastScanResult con las alertas en el esquema `vulnerabilities`
+    """
+    return asyncio.run(AsyncDastEngine(target_url, seed_paths=seed_paths, **kwargs).run())
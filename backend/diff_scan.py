@@ -0,0 +1,386 @@
+"""
+Análisis SAST limitado a los cambios entre dos revisiones de git.
+
+En las comprobaciones de pull requests solo interesan las líneas modificadas,
+pero `/scan/sast` analiza siempre la ruta completa. `run_diff_scan`:
+
+1. resuelve las referencias base y head y obtiene los archivos y rangos de
+   líneas añadidos con `git diff --unified=0` (detectando renombrados) desde
+   su ancestro común (`git merge-base`), como en un pull request: los commits
+   que solo avanzaron la rama base no cuentan como cambios de head,
+2. prepara en un directorio temporal solo esos archivos, en su versión de
+   head y en su versión de base, con una única llamada a `git cat-file --batch`,
+3. ejecuta las herramientas sobre ambas copias,
+4. conserva únicamente los hallazgos de head que tocan líneas añadidas y los
+   clasifica como `new` o `existing` comparando su huella (herramienta, regla,
+   archivo y texto de la línea) con los hallazgos de base, de modo que un
+   hallazgo desplazado por el cambio no cuenta como nuevo.
+
+Las reglas que dependen de otros archivos del repositorio (p.ej. taint entre
+módulos) no ven los archivos no modificados; es el coste de analizar en segundos.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from backend.language_detection import detect_and_plan
+    from backend.scanner_sandbox import run_sandboxed
+    from backend.semgrep_rules import semgrep_config_args
+except ImportError:
+    from language_detection import detect_and_plan
+    from scanner_sandbox import run_sandboxed
+    from semgrep_rules import semgrep_config_args
+
+logger = logging.getLogger(__name__)
+
+DIFF_TOOLS = ("bandit", "semgrep")
+
+# Referencias aceptadas: nombres de rama/tag, SHAs y sufijos ~N/^N (nunca opciones de git)
+_SAFE_REF = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._/@{}~^-]*$")
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+GIT_TIMEOUT = int(os.getenv("HYBRIDSCAN_GIT_TIMEOUT", "60"))
+
+
+class DiffScanError(Exception):
+    """Error de git o de una herramienta durante un escaneo por diff."""
+
+    def __init__(self, message: str, limit_reason: Optional[str] = None):
+        super().__init__(message)
+        self.limit_reason = limit_reason
+
+
+@dataclass
+class ChangedFile:
+    """Archivo modificado en head y líneas añadidas (rangos inclusivos)."""
+    path: str
+    base_path: Optional[str]  # ruta en base (distinta si se renombró; None si es nuevo)
+    ranges: List[Tuple[int, int]] = field(default_factory=list)
+
+    def touches(self, start: int, end: int) -> bool:
+        return any(start <= hi and end >= lo for lo, hi in self.ranges)
+
+    @property
+    def added_lines(self) -> int:
+        return sum(hi - lo + 1 for lo, hi in self.ranges)
+
+
+def _git(repo: Path, *args: str, input_bytes: Optional[bytes] = None) -> bytes:
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo), *args], input=input_bytes,
+            capture_output=True, timeout=GIT_TIMEOUT
+        )
+    except FileNotFoundError:
+        raise DiffScanError("git no está instalado o no se encuentra en PATH")
+    except subprocess.TimeoutExpired:
+        raise DiffScanError(f"git {args[0]} superó {GIT_TIMEOUT}s")
+    if result.returncode != 0:
+        raise DiffScanError(f"git {args[0]} falló: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def resolve_ref(repo: Path, ref: str) -> str:
+    """SHA del commit al que apunta `ref`."""
+    if not ref or not _SAFE_REF.match(ref) or ".." in ref:
+        raise DiffScanError(f"Referencia git no válida: {ref!r}")
+    return _git(repo, "rev-parse", "--verify", "--quiet", "--end-of-options", f"{ref}^{{commit}}").decode().strip()
+
+
+def merge_base(repo: Path, base: str, head: str) -> str:
+    """Ancestro común de `base` y `head` (SHAs ya resueltos)."""
+    try:
+        return _git(repo, "merge-base", base, head).decode().strip()
+    except DiffScanError:
+        raise DiffScanError(f"{base[:8]} y {head[:8]} no tienen un ancestro común")
+
+
+def changed_files(repo: Path, base: str, head: str,
+                  extensions: Optional[Iterable[str]] = None) -> List[ChangedFile]:
+    """
+    Archivos añadidos, modificados o renombrados en `head` desde su ancestro
+    común con `base`, con sus rangos de líneas añadidas.
+
+    Los diffs usan `--no-textconv` y `--no-ext-diff` para que los filtros
+    configurados en el repositorio analizado no se ejecuten ni alteren las líneas.
+
+    Args:
+        extensions: Si se indica, solo archivos con estas extensiones
+    """
+    wanted = {e.lower() for e in extensions} if extensions else None
+    base = merge_base(repo, base, head)
+
+    # Renombrados: ruta nueva -> ruta en base
+    status = _git(repo, "diff", "--name-status", "-z", "-M", "--no-textconv", "--no-ext-diff",
+                  "--diff-filter=AMR", base, head).split(b"\0")
+    files: Dict[str, ChangedFile] = {}
+    i = 0
+    while i < len(status) - 1:
+        code = status[i].decode()
+        if code.startswith("R"):
+            old, new = status[i + 1].decode(), status[i + 2].decode()
+            files[new] = ChangedFile(new, old)
+            i += 3
+        else:
+            path = status[i + 1].decode()
+            files[path] = ChangedFile(path, path if code == "M" else None)
+            i += 2
+
+    diff = _git(repo, "-c", "core.quotePath=false", "diff", "--unified=0", "--no-color", "--no-ext-diff",
+                "--no-textconv", "-M", "--diff-filter=AMR", base, head).decode("utf-8", errors="replace")
+    current: Optional[ChangedFile] = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:]
+            current = files.get(target[2:]) if target.startswith("b/") else None
+        elif line.startswith("@@") and current is not None:
+            match = _HUNK_HEADER.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                if count:
+                    current.ranges.append((start, start + count - 1))
+
+    return [
+        f for f in files.values()
+        if f.ranges and (wanted is None or os.path.splitext(f.path)[1].lower() in wanted)
+    ]
+
+
+def stage_revision(repo: Path, rev: str, paths: Dict[str, str], dest: Path) -> int:
+    """
+    Escribe en `dest` el contenido de cada archivo en `rev` con una sola llamada a git.
+
+    Args:
+        paths: Ruta destino (relativa a `dest`) -> ruta en la revisión
+    Returns:
+        Número de archivos escritos
+    """
+    if not paths:
+        return 0
+    items = list(paths.items())
+    request = "".join(f"{rev}:{source}\n" for _target, source in items).encode()
+    output = _git(repo, "cat-file", "--batch", input_bytes=request)
+
+    written = 0
+    offset = 0
+    for target, _source in items:
+        newline = output.index(b"\n", offset)
+        header = output[offset:newline].split()
+        offset = newline + 1
+        if len(header) < 3 or header[1] != b"blob":
+            continue  # missing o submódulo
+        size = int(header[2])
+        content = output[offset:offset + size]
+        offset += size + 1
+        destination = dest / target
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(content)
+        written += 1
+    return written
+
+
+def _run_tool(tool: str, target: Path, report_path: Path, timeout: int,
+              languages: Optional[Iterable[str]], semgrep_packs: Sequence[str], warm_pool=None):
+    if tool == "bandit":
+        if warm_pool is not None:
+            try:
+                return warm_pool.scan(target, report_path, timeout=timeout)
+            except RuntimeError as e:
+                logger.warning(f"⚠️ Pool Bandit no disponible, usando subproceso: {e}")
+        return run_sandboxed(
+            [sys.executable, "-m", "bandit", "-r", str(target), "-f", "json", "-o", str(report_path)],
+            timeout=timeout
+        )
+    config_args = semgrep_config_args(tuple(semgrep_packs) or ("auto",), languages=languages)
+    last_error: Optional[Exception] = None
+    for cmd in ([sys.executable, "-m", "semgrep"], ["semgrep"]):
+        try:
+            result = run_sandboxed([*cmd, *config_args, str(target), "--json", "--output", str(report_path)],
+                                   timeout=timeout)
+        except FileNotFoundError as e:
+            last_error = e
+            continue
+        if "No module named semgrep" in (result.stderr or ""):
+            continue
+        return result
+    raise FileNotFoundError(f"Semgrep no está instalado: {last_error}")
+
+
+def _findings(tool: str, report_path: Path, root: Path) -> List[Dict[str, Any]]:
+    """Hallazgos del reporte con `diff_path`, `start_line` y `end_line` relativos a `root`."""
+    if not report_path.exists():
+        return []
+    try:
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return []
+
+    findings = []
+    for item in report.get("results", []):
+        if tool == "bandit":
+            path = item.get("filename", "")
+            lines = item.get("line_range") or [item.get("line_number", 0)]
+            start, end = min(lines), max(lines)
+        else:
+            path = item.get("path", "")
+            start = (item.get("start") or {}).get("line", 0)
+            end = (item.get("end") or {}).get("line", start)
+        rel = os.path.relpath(os.path.join(str(root), path), str(root)).replace(os.sep, "/")
+        findings.append({**item, "tool": tool, "diff_path": rel, "start_line": start, "end_line": end})
+    return findings
+
+
+def _line_text(root: Path, rel_path: str, line: int, cache: Dict[str, List[str]]) -> str:
+    if rel_path not in cache:
+        try:
+            cache[rel_path] = (root / rel_path).read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            cache[rel_path] = []
+    lines = cache[rel_path]
+    return " ".join(lines[line - 1].split()) if 0 < line <= len(lines) else ""
+
+
+def _rule_id(finding: Dict[str, Any]) -> str:
+    return str(finding.get("test_id") or finding.get("check_id") or "")
+
+
+def finding_signature(finding: Dict[str, Any], root: Path, cache: Dict[str, List[str]]) -> Tuple[str, str, str, str]:
+    """Huella independiente del número de línea: herramienta, regla, archivo y texto de la línea."""
+    return (finding["tool"], _rule_id(finding), finding["diff_path"],
+            _line_text(root, finding["diff_path"], finding["start_line"], cache))
+
+
+def run_diff_scan(
+    repo: Path,
+    base_ref: str,
+    head_ref: str = "HEAD",
+    tools: Sequence[str] = DIFF_TOOLS,
+    extensions: Optional[Iterable[str]] = None,
+    work_root: Optional[Path] = None,
+    timeout: int = 300,
+    warm_pool=None
+) -> Dict[str, Any]:
+    """
+    Escanea los cambios de `base_ref` a `head_ref` en el repositorio `repo`.
+
+    Args:
+        repo: Repositorio git local
+        base_ref: Revisión base (p.ej. la rama destino del PR)
+        head_ref: Revisión con los cambios
+        tools: Herramientas a ejecutar (se descartan las que no aplican a los archivos cambiados)
+        extensions: Extensiones de archivo a considerar
+        work_root: Directorio donde crear la copia temporal
+        timeout: Timeout por ejecución de herramienta
+        warm_pool: Pool Bandit pre-calentado opcional
+
+    Returns:
+        Diccionario con los hallazgos en líneas modificadas (`results`), su
+        clasificación new/existing y estadísticas por herramienta
+
+    Raises:
+        DiffScanError: Si git falla, una referencia no existe o una herramienta falla
+    """
+    started = time.monotonic()
+    repo = Path(repo)
+    head = resolve_ref(repo, head_ref)
+    # Los hallazgos existentes se comparan con la versión del ancestro común
+    base = merge_base(repo, resolve_ref(repo, base_ref), head)
+    changes = changed_files(repo, base, head, extensions)
+    logger.info(f"🔀 Diff {base[:8]}..{head[:8]}: {len(changes)} archivos, "
+                f"{sum(c.added_lines for c in changes)} líneas añadidas")
+
+    summary: Dict[str, Any] = {
+        "repository": str(repo), "base": base, "head": head,
+        "changed_files": [c.path for c in changes],
+        "changed_lines": sum(c.added_lines for c in changes),
+        "tools": {}, "results": [],
+        "new_findings": 0, "existing_findings": 0, "filtered_out": 0
+    }
+    if not changes:
+        summary["stack_detection"] = None
+        summary["diff_scan_seconds"] = round(time.monotonic() - started, 3)
+        return summary
+
+    workspace = Path(tempfile.mkdtemp(prefix="diff_", dir=str(work_root) if work_root else None))
+    try:
+        head_dir, base_dir = workspace / "head", workspace / "base"
+        head_dir.mkdir()
+        base_dir.mkdir()
+        stage_revision(repo, head, {c.path: c.path for c in changes}, head_dir)
+        # La versión base se guarda con la ruta de head para comparar renombrados
+        stage_revision(repo, base, {c.path: c.base_path for c in changes if c.base_path}, base_dir)
+
+        plan = detect_and_plan(head_dir, requested_tools=tuple(tools))
+        summary["stack_detection"] = plan.to_dict()
+        languages = plan.profile.detected_languages
+        by_path = {c.path: c for c in changes}
+        head_cache: Dict[str, List[str]] = {}
+        base_cache: Dict[str, List[str]] = {}
+
+        for tool in plan.tools:
+            tool_stats: Dict[str, Any] = {"status": "completed"}
+            per_side = {}
+            for side, root in (("head", head_dir), ("base", base_dir)):
+                if side == "base" and not any(base_dir.iterdir()):
+                    per_side[side] = []
+                    continue
+                report_path = workspace / f"{tool}_{side}.json"
+                try:
+                    result = _run_tool(tool, root, report_path, timeout, languages, plan.semgrep_packs, warm_pool)
+                except FileNotFoundError as e:
+                    tool_stats = {"status": "unavailable", "error": str(e)}
+                    break
+                limit_reason = getattr(result, "limit_reason", None)
+                if limit_reason:
+                    raise DiffScanError(f"{tool} detenido por límite de recursos ({limit_reason})", limit_reason)
+                if result.returncode not in (0, 1):
+                    raise DiffScanError(f"Error ejecutando {tool}: returncode={result.returncode}. "
+                                        f"stderr={(result.stderr or '').strip()[-2000:]}")
+                per_side[side] = _findings(tool, report_path, root)
+            if tool_stats["status"] != "completed":
+                logger.warning(f"⚠️ {tool} no disponible para el escaneo por diff: {tool_stats['error']}")
+                summary["tools"][tool] = tool_stats
+                continue
+
+            baseline = Counter(finding_signature(f, base_dir, base_cache) for f in per_side["base"])
+            kept = 0
+            for finding in per_side["head"]:
+                changed = by_path.get(finding["diff_path"])
+                if changed is None or not changed.touches(finding["start_line"], finding["end_line"]):
+                    summary["filtered_out"] += 1
+                    continue
+                signature = finding_signature(finding, head_dir, head_cache)
+                if baseline[signature] > 0:
+                    baseline[signature] -= 1
+                    finding["classification"] = "existing"
+                    summary["existing_findings"] += 1
+                else:
+                    finding["classification"] = "new"
+                    summary["new_findings"] += 1
+                summary["results"].append(finding)
+                kept += 1
+            tool_stats.update({
+                "head_findings": len(per_side["head"]),
+                "base_findings": len(per_side["base"]),
+                "in_changed_lines": kept
+            })
+            summary["tools"][tool] = tool_stats
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    summary["diff_scan_seconds"] = round(time.monotonic() - started, 3)
+    logger.info(f"✅ Escaneo por diff: {summary['new_findings']} nuevos, {summary['existing_findings']} existentes, "
+                f"{summary['filtered_out']} fuera de las líneas modificadas ({summary['diff_scan_seconds']}s)")
+    return summary
@@ -0,0 +1,254 @@
+"""
+Recorrido de árboles de código con filtrado previo por globs.
+
+`rglob("*")` visita todo el árbol, incluidos `node_modules`, `.git` o
+`target`, y solo después se descartan los archivos. Este recorrido usa
+`os.scandir` y decide en cada directorio si descender:
+
+- los patrones de exclusión que cubren un directorio completo
+  (`**/node_modules/**`) lo podan antes de listarlo,
+- los patrones de inclusión limitan el descenso a los directorios que
+  pueden contener coincidencias,
+- `max_depth` limita la profundidad.
+
+Los patrones siguen la semántica de `pathlib.Path.glob` relativa a la raíz
+(`*` dentro de un segmento, `**` cualquier número de segmentos) y se compilan
+en una sola expresión regular por lista. La configuración por proyecto usa
+el mismo formato que `APP_SCAN_CONFIG` en scripts/scan_config.py y puede
+declararse en un archivo `.hybridscan.json` en la raíz del proyecto.
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directorios que nunca contienen código propio del proyecto
+DEFAULT_EXCLUDES = (
+    "**/.git/**", "**/.hg/**", "**/.svn/**",
+    "**/node_modules/**", "**/target/**",
+    "**/__pycache__/**", "**/.venv/**", "**/venv/**",
+    "**/.tox/**", "**/.mypy_cache/**", "**/.pytest_cache/**"
+)
+
+# Archivo de configuración opcional en la raíz del proyecto
+PROJECT_CONFIG_FILE = ".hybridscan.json"
+
+
+def _segment_regex(segment: str) -> str:
+    out = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = segment.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = segment[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Traduce un glob relativo (`src/**/*.py`) a una expresión regular para `fullmatch`.
+
+    >>> bool(re.fullmatch(glob_to_regex("**/test/**"), "a/test/b.py"))
+    True
+    """
+    parts = pattern.replace("\\", "/").strip("/").split("/")
+    out = []
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == "**":
+            out.append(".*" if last else "(?:[^/]+/)*")
+        else:
+            out.append(_segment_regex(part) + ("" if last else "/"))
+    return "".join(out)
+
+
+class GlobMatcher:
+    """Lista de globs compilada en una sola expresión regular."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = [p for p in patterns if p]
+        self._regex = (
+            re.compile("|".join(f"(?:{glob_to_regex(p)})" for p in self.patterns)) if self.patterns else None
+        )
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+    def matches(self, rel_path: str) -> bool:
+        """Indica si la ruta relativa (separada por `/`) coincide con algún patrón."""
+        return self._regex is not None and self._regex.fullmatch(rel_path) is not None
+
+    def covers_dir(self, rel_dir: str) -> bool:
+        """Indica si algún patrón coincide con todo lo que haya bajo el directorio."""
+        return self._regex is not None and self._regex.fullmatch(rel_dir + "/") is not None
+
+
+@dataclass
+class WalkConfig:
+    """
+    Configuración de recorrido (formato de APP_SCAN_CONFIG).
+
+    Args:
+        include: Globs de archivos o directorios a incluir (vacío = todo)
+        exclude: Globs a excluir; los que terminan en `/**` podan directorios
+        max_depth: Niveles de directorio máximos bajo la raíz
+        extensions: Extensiones de archivo aceptadas (None = todas)
+        file_names: Nombres de archivo aceptados aunque su extensión no esté en `extensions`
+    """
+    include: Sequence[str] = ()
+    exclude: Sequence[str] = DEFAULT_EXCLUDES
+    max_depth: Optional[int] = None
+    extensions: Optional[Sequence[str]] = None
+    file_names: Sequence[str] = ()
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any], extensions: Optional[Sequence[str]] = None,
+                  file_names: Sequence[str] = ()) -> "WalkConfig":
+        """Construye la configuración desde un diccionario; las exclusiones se suman a las por defecto."""
+        return cls(
+            include=tuple(config.get("include") or ()),
+            exclude=tuple(dict.fromkeys([*DEFAULT_EXCLUDES, *(config.get("exclude") or ())])),
+            max_depth=config.get("max_depth"),
+            extensions=extensions,
+            file_names=tuple(file_names)
+        )
+
+    @classmethod
+    def for_project(cls, root: Path, extensions: Optional[Sequence[str]] = None,
+                    file_names: Sequence[str] = ()) -> "WalkConfig":
+        """Lee `.hybridscan.json` de la raíz del proyecto si existe."""
+        config_path = Path(root) / PROJECT_CONFIG_FILE
+        if config_path.is_file():
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    return cls.from_dict(json.load(f), extensions, file_names)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Configuración {config_path} inválida, se usa la predeterminada: {e}")
+        return cls(extensions=extensions, file_names=tuple(file_names))
+
+
+def _include_prefixes(patterns: Sequence[str]) -> List[Tuple[Tuple[str, ...], bool, int]]:
+    """(segmentos literales iniciales, contiene **, profundidad de directorio) por patrón."""
+    prefixes = []
+    for pattern in patterns:
+        parts = pattern.replace("\\", "/").strip("/").split("/")
+        literal = []
+        for part in parts:
+            if any(ch in part for ch in "*?["):
+                break
+            literal.append(part)
+        recursive = "**" in parts or len(literal) == len(parts)  # un directorio literal incluye su contenido
+        prefixes.append((tuple(literal), recursive, len(parts) - 1))
+    return prefixes
+
+
+class FileWalker:
+    """
+    Recorrido con `os.scandir` que poda directorios antes de descender.
+
+    Los enlaces simbólicos no se siguen. Tras `walk`, `stats()` indica cuántos
+    directorios se visitaron y podaron.
+    """
+
+    def __init__(self, config: Optional[WalkConfig] = None):
+        self.config = config or WalkConfig()
+        self.exclude = GlobMatcher(self.config.exclude)
+        include = list(self.config.include)
+        # Un directorio incluido explícitamente incluye todo su contenido
+        self.include = GlobMatcher(include + [p.rstrip("/") + "/**" for p in include if "*" not in p.split("/")[-1]])
+        self._prefixes = _include_prefixes(include)
+        self.extensions = {e.lower() for e in self.config.extensions} if self.config.extensions else None
+        self.file_names = set(self.config.file_names)
+        self._stats = {"dirs_visited": 0, "dirs_pruned": 0, "files_matched": 0, "files_skipped": 0}
+
+    def _may_contain(self, rel_dir: str) -> bool:
+        if not self._prefixes:
+            return True
+        segments = tuple(rel_dir.split("/"))
+        for literal, recursive, dir_depth in self._prefixes:
+            common = min(len(literal), len(segments))
+            if literal[:common] != segments[:common]:
+                continue
+            if len(segments) <= len(literal) or recursive or len(segments) <= dir_depth:
+                return True
+        return False
+
+    def _accept_file(self, rel_path: str, name: str) -> bool:
+        if (self.extensions is not None and name not in self.file_names
+                and os.path.splitext(name)[1].lower() not in self.extensions):
+            return False
+        if self.exclude.matches(rel_path):
+            return False
+        return not self.include or self.include.matches(rel_path)
+
+    def walk(self, root: Path) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Recorre `root` y produce `(ruta relativa con /, DirEntry)` por cada archivo aceptado.
+
+        Args:
+            root: Directorio raíz del recorrido
+        """
+        max_depth = self.config.max_depth
+        stack: List[Tuple[str, str, int]] = [(str(root), "", 0)]
+        while stack:
+            directory, rel_dir, depth = stack.pop()
+            self._stats["dirs_visited"] += 1
+            try:
+                with os.scandir(directory) as entries:
+                    subdirs = []
+                    for entry in entries:
+                        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if (self.exclude.covers_dir(rel_path)
+                                        or (max_depth is not None and depth + 1 > max_depth)
+                                        or not self._may_contain(rel_path)):
+                                    self._stats["dirs_pruned"] += 1
+                                else:
+                                    subdirs.append((entry.path, rel_path, depth + 1))
+                            elif entry.is_file(follow_symlinks=False):
+                                if self._accept_file(rel_path, entry.name):
+                                    self._stats["files_matched"] += 1
+                                    yield rel_path, entry
+                                else:
+                                    self._stats["files_skipped"] += 1
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warning(f"⚠️ No se pudo listar {directory}: {e}")
+                continue
+            # Orden determinista: se visitan los subdirectorios por nombre
+            stack.extend(sorted(subdirs, reverse=True))
+
+    def list_files(self, root: Path) -> List[Path]:
+        """Lista ordenada de archivos aceptados bajo `root`."""
+        return sorted(Path(entry.path) for _rel, entry in self.walk(root))
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+def iter_files(root: Path, config: Optional[WalkConfig] = None) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Atajo de `FileWalker(config).walk(root)`."""
+    return FileWalker(config).walk(root)
@@ -0,0 +1,253 @@
+"""
+Normalizador canónico de hallazgos.
+
+Cada consumidor reinterpretaba por su cuenta los campos de Bandit, Semgrep y
+las alertas DAST: el resumen probaba cinco claves de severidad, las
+categorías OWASP salían de buscar subcadenas en el CWE (`"89" in cwe` también
+casaba CWE-789), el PDF y la correlación híbrida volvían a mapear cada
+herramienta y Semgrep no tenía mapeo propio. Aquí hay un único esquema
+(`CANONICAL_FIELDS`) rellenado con tablas:
+
+- `FIELD_MAPS`: por familia de herramienta, las rutas de las que se lee cada campo
+- `SEVERITY_ALIASES`: severidades de cualquier herramienta a critical/high/medium/low/info
+- `CWE_OWASP` y `CWE_VULN_TYPES`: CWE -> categoría OWASP API Top 10 y tipo de vulnerabilidad
+- `RULE_VULN_TYPES` y `DAST_TITLE_VULN_TYPES`: tipo por regla y por nombre de alerta
+
+La normalización se ejecuta una vez en la ingesta: el resumen del escaneo y
+las filas de `findings` salen de los mismos registros, y el PDF, las
+descargas y la correlación leen esas filas en lugar de los hallazgos brutos.
+"""
+
+import re
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+CANONICAL_FIELDS = (
+    "tool", "scan_type", "rule_id", "title", "severity", "confidence", "cwe", "owasp_category", "vuln_type",
+    "file_path", "line_number", "endpoint", "description", "recommendation", "code"
+)
+
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+SEVERITY_ALIASES = {
+    "critical": "critical", "crit": "critical", "c": "critical",
+    "high": "high", "h": "high", "error": "high",                       # Semgrep ERROR
+    "medium": "medium", "med": "medium", "m": "medium", "warning": "medium",
+    "low": "low", "l": "low",
+    "info": "info", "informational": "info", "note": "info",
+}
+
+# Tipos de vulnerabilidad del motor de correlación (valores de `VulnerabilityType`)
+SQL_INJECTION = "sql_injection"
+XSS = "xss"
+BROKEN_AUTH = "broken_authentication"
+SENSITIVE_DATA = "sensitive_data_exposure"
+BROKEN_ACCESS = "broken_access_control"
+SECURITY_MISCONFIG = "security_misconfiguration"
+INSUFFICIENT_LOGGING = "insufficient_logging"
+VULN_TYPES = (SQL_INJECTION, XSS, BROKEN_AUTH, SENSITIVE_DATA, BROKEN_ACCESS, SECURITY_MISCONFIG,
+              INSUFFICIENT_LOGGING)
+
+# CWE -> OWASP API Security Top 10 (2023), con la misma asignación que ya usaban
+# el resumen y la tabla `findings` para inyección (API3), XSS (API8) y rutas (API1)
+CWE_OWASP = {
+    **dict.fromkeys((22, 23, 36, 73, 566, 639), "API1:2023"),
+    **dict.fromkeys((259, 287, 306, 307, 347, 384, 521, 522, 613, 798), "API2:2023"),
+    **dict.fromkeys((77, 78, 89, 90, 91, 94, 95, 643, 917, 943), "API3:2023"),
+    **dict.fromkeys((400, 770, 799, 1333), "API4:2023"),
+    **dict.fromkeys((269, 285, 862, 863), "API5:2023"),
+    918: "API7:2023",
+    **dict.fromkeys((16, 79, 80, 209, 215, 295, 319, 326, 327, 328, 330, 338, 377, 489, 502, 611, 614, 693, 703,
+                     1004, 1021), "API8:2023"),
+    601: "API10:2023",
+}
+
+CWE_VULN_TYPES = {
+    **dict.fromkeys((89, 564), SQL_INJECTION),
+    **dict.fromkeys((79, 80), XSS),
+    **dict.fromkeys((287, 306, 307, 347, 384, 613), BROKEN_AUTH),
+    **dict.fromkeys((200, 259, 312, 319, 327, 328, 798), SENSITIVE_DATA),
+    **dict.fromkeys((22, 23, 284, 285, 639, 862, 863), BROKEN_ACCESS),
+    **dict.fromkeys((223, 778), INSUFFICIENT_LOGGING),
+}
+
+# Reglas SAST cuyo tipo no se deduce del CWE
+RULE_VULN_TYPES = {
+    "B201": SQL_INJECTION, "B608": SQL_INJECTION,
+    "B105": SENSITIVE_DATA, "B106": SENSITIVE_DATA,
+    "B602": BROKEN_ACCESS, "B605": BROKEN_ACCESS,
+}
+
+# Palabras del nombre de una alerta DAST -> tipo (por orden; la primera que aparece gana)
+DAST_TITLE_VULN_TYPES = (
+    (("sql", "injection"), SQL_INJECTION),
+    (("xss", "script"), XSS),
+    (("auth", "session"), BROKEN_AUTH),
+    (("access", "idor"), BROKEN_ACCESS),
+)
+
+# Rutas (claves anidadas) de las que se lee cada campo; la primera con valor gana.
+# `bandit` es también el formato por defecto (análisis rápido, hallazgos sin herramienta conocida).
+FIELD_MAPS: Dict[str, Dict[str, Tuple[Tuple[str, ...], ...]]] = {
+    "bandit": {
+        "rule_id": (("test_id",),),
+        "title": (("test_name",),),
+        "severity": (("issue_severity",), ("severity",), ("level",)),
+        "confidence": (("issue_confidence",),),
+        "cwe": (("issue_cwe", "id"), ("cwe",)),
+        "owasp_category": (("owasp",), ("category",)),
+        "vuln_type": (("vulnerability_type",),),
+        "file_path": (("diff_path",), ("filename",)),
+        "line_number": (("line_number",),),
+        "description": (("issue_text",), ("description",)),
+        "recommendation": (("more_info",),),
+        "code": (("code",),),
+    },
+    "semgrep": {
+        "rule_id": (("check_id",),),
+        "severity": (("extra", "severity"), ("severity",)),
+        "confidence": (("extra", "metadata", "confidence"),),
+        "cwe": (("extra", "metadata", "cwe"), ("cwe",)),
+        "owasp_category": (("extra", "metadata", "owasp"),),
+        "file_path": (("diff_path",), ("path",)),
+        "line_number": (("start", "line"),),
+        "description": (("extra", "message"),),
+        "recommendation": (("extra", "fix"), ("extra", "metadata", "references")),
+        "code": (("extra", "lines"),),
+    },
+    # Motor DAST nativo y alertas de ZAP (`zap_daemon.normalize_alert`)
+    "dast": {
+        "rule_id": (("type",), ("alert",)),
+        "title": (("alert",), ("type",)),
+        "severity": (("severity",), ("risk",)),
+        "confidence": (("confidence",),),
+        "cwe": (("cwe",), ("cweid",)),
+        "endpoint": (("url",), ("endpoint",)),
+        # La evidencia identifica la alerta concreta; la descripción es la genérica del tipo
+        "description": (("evidence",), ("description",), ("type",)),
+        "recommendation": (("solution",),),
+    },
+}
+
+_CWE_NUMBER = re.compile(r"(\d+)")
+
+
+def normalize_severity(raw: Any) -> str:
+    """Normaliza una severidad textual a critical/high/medium/low/info."""
+    return SEVERITY_ALIASES.get(str(raw if raw is not None else "").strip().lower(), "info")
+
+
+def normalize_cwe(raw: Any) -> Optional[str]:
+    """`89`, `"CWE-89"` o `"CWE-89: SQL Injection"` -> `"CWE-89"`; None si no hay número."""
+    if raw in (None, ""):
+        return None
+    match = _CWE_NUMBER.search(str(raw))
+    if not match or int(match.group(1)) == 0:
+        return None
+    return f"CWE-{int(match.group(1))}"
+
+
+def _cwe_number(cwe: Optional[str]) -> Optional[int]:
+    return int(cwe[4:]) if cwe else None
+
+
+def owasp_for_cwe(cwe: Optional[str]) -> Optional[str]:
+    """Categoría OWASP API Top 10 de un CWE normalizado (búsqueda exacta, sin subcadenas)."""
+    return CWE_OWASP.get(_cwe_number(cwe))
+
+
+def vuln_type_for(cwe: Optional[str], rule_id: Optional[str] = None, title: Optional[str] = None,
+                  scan_type: Optional[str] = None, declared: Optional[str] = None) -> str:
+    """
+    Tipo de vulnerabilidad: por regla, el declarado por la herramienta, por
+    CWE y, en DAST, por el nombre de la alerta; por defecto mala configuración.
+    """
+    if rule_id in RULE_VULN_TYPES:
+        return RULE_VULN_TYPES[rule_id]
+    if declared in VULN_TYPES:
+        return declared
+    by_cwe = CWE_VULN_TYPES.get(_cwe_number(cwe))
+    if by_cwe:
+        return by_cwe
+    if scan_type == "DAST" and title:
+        lowered = title.lower()
+        for keywords, vuln_type in DAST_TITLE_VULN_TYPES:
+            if any(keyword in lowered for keyword in keywords):
+                return vuln_type
+    return SECURITY_MISCONFIG
+
+
+def tool_family(item: Dict[str, Any], scan_type: Optional[str] = None) -> str:
+    """Mapa de campos que corresponde a un hallazgo según el tipo de escaneo y su forma."""
+    if scan_type == "DAST":
+        return "dast"
+    if scan_type is None and "url" in item and "filename" not in item and "path" not in item:
+        return "dast"
+    if "check_id" in item:
+        return "semgrep"
+    return "bandit"
+
+
+def _lookup(item: Dict[str, Any], paths: Sequence[Tuple[str, ...]]) -> Any:
+    for path in paths:
+        value: Any = item
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _truncated(value: Any, length: int) -> Optional[str]:
+    return str(value)[:length] if value not in (None, "") else None
+
+
+def normalize_finding(item: Dict[str, Any], tool: Optional[str] = None,
+                      scan_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Hallazgo bruto de cualquier herramienta -> registro canónico (`CANONICAL_FIELDS`).
+
+    Args:
+        item: Hallazgo tal como lo produce la herramienta
+        tool: Herramienta del escaneo
+        scan_type: SAST o DAST (None: se deduce de la forma del hallazgo)
+
+    Returns:
+        Diccionario con todos los campos canónicos (None si la herramienta no lo aporta)
+    """
+    family = tool_family(item, scan_type)
+    fields = FIELD_MAPS[family]
+    raw = {field: _lookup(item, paths) for field, paths in fields.items()}
+
+    rule_id = _truncated(raw.get("rule_id"), 200)
+    cwe = normalize_cwe(raw.get("cwe"))
+    title = raw.get("title")
+    if title is None and rule_id:
+        # Semgrep: `python.lang.security.audit.eval-detected` -> `eval-detected`
+        title = rule_id.rsplit(".", 1)[-1]
+
+    return {
+        "tool": tool,
+        "scan_type": scan_type,
+        "rule_id": rule_id,
+        "title": _truncated(title, 200),
+        "severity": normalize_severity(raw.get("severity")),
+        "confidence": normalize_severity(raw["confidence"]) if raw.get("confidence") is not None else None,
+        "cwe": cwe,
+        "owasp_category": owasp_for_cwe(cwe) or _truncated(raw.get("owasp_category"), 50),
+        "vuln_type": vuln_type_for(cwe, rule_id, title, "DAST" if family == "dast" else scan_type,
+                                   raw.get("vuln_type")),
+        "file_path": raw.get("file_path"),
+        "line_number": _as_int(raw.get("line_number")),
+        "endpoint": raw.get("endpoint"),
+        "description": raw.get("description"),
+        "recommendation": raw.get("recommendation"),
+        "code": raw.get("code"),
+    }
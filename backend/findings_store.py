@@ -0,0 +1,109 @@
+"""
+Tabla normalizada de hallazgos (`findings`).
+
+Los hallazgos de cada escaneo se guardan en la columna JSON
+`ScanResult.results`; consultar "todos los HIGH CWE-89 de la última semana"
+obligaba a cargar y parsear cada blob en Python. Al ingerir un escaneo, sus
+hallazgos pasan por el normalizador canónico (`finding_normalizer`) y se
+insertan por lotes (`executemany`) en una tabla con índices, junto con su
+huella. El PDF, las descargas y la correlación leen estas filas.
+
+El modelo se recibe como parámetro porque `backend/main.py` carga
+`database/models.py` por ruta y la clase debe ser la misma que registra la
+metadata de la aplicación.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import delete, insert
+
+try:
+    from backend.finding_normalizer import normalize_finding
+    from backend.report_stream import DEFAULT_BATCH_SIZE, iter_findings
+except ImportError:
+    from finding_normalizer import normalize_finding
+    from report_stream import DEFAULT_BATCH_SIZE, iter_findings
+
+logger = logging.getLogger(__name__)
+
+
+def finding_fingerprint(record: Dict[str, Any], code: Optional[str] = None) -> str:
+    """
+    Huella de un hallazgo independiente del número de línea y del escaneo.
+
+    Usa herramienta, regla, archivo, endpoint, CWE y el texto de la línea (o
+    la descripción si la herramienta no lo incluye), de modo que el mismo
+    problema desplazado dentro del archivo conserva la huella.
+    """
+    text = " ".join((code or record.get("description") or "").split())
+    parts = (record.get("tool"), record.get("rule_id"), record.get("file_path"),
+             record.get("endpoint"), record.get("cwe"), text)
+    return hashlib.sha256("\x1f".join(str(p or "") for p in parts).encode("utf-8")).hexdigest()
+
+
+def finding_record(item: Dict[str, Any], tool: str, scan_type: str) -> Dict[str, Any]:
+    """
+    Proyección de un hallazgo bruto (Bandit, Semgrep o DAST) a una fila de `findings`.
+
+    Args:
+        item: Hallazgo tal como lo produce la herramienta
+        tool: Herramienta del escaneo
+        scan_type: SAST o DAST
+
+    Returns:
+        Diccionario con las columnas de la tabla (sin `scan_id` ni `created_at`)
+    """
+    record = normalize_finding(item, tool, scan_type)
+    code = record.pop("code")
+    record["fingerprint"] = finding_fingerprint(record, code)
+    return record
+
+
+def scan_finding_records(scan_result) -> Iterator[Dict[str, Any]]:
+    """Filas de `findings` de un ScanResult, leyendo el reporte original si se procesó en streaming."""
+    results = scan_result.results if isinstance(scan_result.results, dict) else {}
+    for item in iter_findings(results, scan_result.result_path):
+        if isinstance(item, dict):
+            record = finding_record(item, scan_result.tool, scan_result.scan_type)
+            record["scan_id"] = scan_result.id
+            record["created_at"] = scan_result.created_at
+            yield record
+
+
+def insert_in_batches(db, model, records: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Inserta filas con un `executemany` por lote; la memoria queda acotada por el tamaño de lote."""
+    total = 0
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            db.execute(insert(model), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(model), batch)
+        total += len(batch)
+    return total
+
+
+def store_findings(db, model, scan_result, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Reemplaza las filas de `findings` de un escaneo por sus hallazgos actuales.
+
+    No hace commit: las filas se confirman junto con la actualización del escaneo.
+
+    Args:
+        db: Sesión de SQLAlchemy
+        model: Modelo `Finding`
+        scan_result: Escaneo ya persistido (con `id`)
+        batch_size: Filas por `executemany`
+
+    Returns:
+        Número de hallazgos insertados
+    """
+    db.execute(delete(model).where(model.scan_id == scan_result.id))
+    count = insert_in_batches(db, model, scan_finding_records(scan_result), batch_size)
+    logger.info(f"🗂️ {count} hallazgos indexados para el escaneo {scan_result.id}")
+    return count
@@ -0,0 +1,262 @@
+"""
+Detección de lenguajes y frameworks del objetivo antes del análisis SAST.
+
+Ejecutar Bandit sobre un repositorio JavaScript o Semgrep con `--config auto`
+sobre cualquier árbol desperdicia pasadas completas de análisis. Esta etapa
+hace un recorrido rápido del árbol preparado (con la misma poda que
+backend/file_walker.py) y reúne:
+
+- un histograma de extensiones por lenguaje,
+- los manifiestos encontrados (package.json, pom.xml, requirements.txt...),
+- marcadores de framework leídos de esos manifiestos (django, express, spring...).
+
+A partir del perfil, `plan_scan` decide qué herramientas SAST ejecutar y qué
+rule packs de Semgrep son relevantes, y deja constancia de cada herramienta o
+pack descartado y su motivo para guardarlo en los metadatos del escaneo.
+"""
+
+import logging
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+try:
+    from backend.file_walker import FileWalker, WalkConfig
+except ImportError:
+    from file_walker import FileWalker, WalkConfig
+
+logger = logging.getLogger(__name__)
+
+# Extensión -> lenguaje (nombres de lenguaje de Semgrep)
+EXTENSION_LANGUAGES = {
+    ".py": "python", ".pyw": "python",
+    ".js": "javascript", ".jsx": "javascript", ".mjs": "javascript", ".cjs": "javascript",
+    ".ts": "typescript", ".tsx": "typescript",
+    ".java": "java",
+    ".go": "go",
+    ".php": "php",
+    ".rb": "ruby",
+    ".cs": "csharp",
+    ".c": "c", ".h": "c", ".cpp": "c", ".cc": "c", ".hpp": "c",
+}
+
+# Manifiesto -> lenguaje que declara
+MANIFEST_LANGUAGES = {
+    "requirements.txt": "python", "pyproject.toml": "python", "setup.py": "python",
+    "setup.cfg": "python", "Pipfile": "python",
+    "package.json": "javascript",
+    "pom.xml": "java", "build.gradle": "java", "build.gradle.kts": "java",
+    "go.mod": "go",
+    "composer.json": "php",
+    "Gemfile": "ruby",
+}
+MANIFEST_FILES = tuple(MANIFEST_LANGUAGES)
+
+# Marcadores de framework buscados en el contenido de cada manifiesto
+FRAMEWORK_MARKERS = {
+    "django": ("python", re.compile(r"^\s*django\b|[\"']django[\"<>=~!\s]", re.IGNORECASE | re.MULTILINE)),
+    "flask": ("python", re.compile(r"^\s*flask\b|[\"']flask[\"<>=~!\s]", re.IGNORECASE | re.MULTILINE)),
+    "fastapi": ("python", re.compile(r"^\s*fastapi\b|[\"']fastapi[\"<>=~!\s]", re.IGNORECASE | re.MULTILINE)),
+    "express": ("javascript", re.compile(r"\"express\"\s*:")),
+    "react": ("javascript", re.compile(r"\"react\"\s*:")),
+    "angular": ("javascript", re.compile(r"\"@angular/core\"\s*:")),
+    "nextjs": ("javascript", re.compile(r"\"next\"\s*:")),
+    "spring": ("java", re.compile(r"org\.springframework")),
+    "laravel": ("php", re.compile(r"\"laravel/framework\"\s*:")),
+    "rails": ("ruby", re.compile(r"^\s*gem\s+[\"']rails[\"']", re.MULTILINE)),
+}
+
+# Archivos cuya sola presencia indica un framework
+FRAMEWORK_FILES = {"manage.py": "django"}
+
+# Lenguajes que analiza cada herramienta SAST
+TOOL_LANGUAGES = {
+    "bandit": {"python"},
+    "semgrep": {"python", "javascript", "typescript", "java", "go", "php", "ruby", "csharp", "c"},
+}
+
+# Rule packs de Semgrep por lenguaje y por framework
+SEMGREP_LANGUAGE_PACKS = {
+    "python": "p/python", "javascript": "p/javascript", "typescript": "p/typescript",
+    "java": "p/java", "go": "p/golang", "php": "p/php", "ruby": "p/ruby",
+    "csharp": "p/csharp", "c": "p/c",
+}
+SEMGREP_FRAMEWORK_PACKS = {
+    "django": "p/django", "flask": "p/flask", "react": "p/react",
+    "express": "p/nodejs", "nextjs": "p/nextjs",
+}
+
+# Packs independientes del lenguaje que se añaden siempre que Semgrep se ejecute
+SEMGREP_COMMON_PACKS = ("p/owasp-top-ten",)
+
+# Límites del recorrido de detección
+MAX_DETECTION_FILES = int(os.getenv("HYBRIDSCAN_DETECTION_MAX_FILES", "20000"))
+MAX_MANIFEST_BYTES = 256 * 1024
+
+
+def _manifest_language(name: str) -> Optional[str]:
+    if name.endswith(".csproj"):
+        return "csharp"
+    return MANIFEST_LANGUAGES.get(name)
+
+
+@dataclass
+class StackProfile:
+    """Resultado de la detección sobre un árbol."""
+    languages: Dict[str, int] = field(default_factory=dict)  # lenguaje -> nº de archivos
+    extensions: Dict[str, int] = field(default_factory=dict)
+    manifests: List[str] = field(default_factory=list)
+    frameworks: List[str] = field(default_factory=list)
+    files_scanned: int = 0
+    truncated: bool = False
+
+    @property
+    def detected_languages(self) -> Set[str]:
+        """Lenguajes con archivos fuente o declarados por un manifiesto."""
+        declared = {_manifest_language(Path(m).name) for m in self.manifests}
+        return set(self.languages) | (declared - {None})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "languages": dict(sorted(self.languages.items(), key=lambda kv: -kv[1])),
+            "extensions": dict(sorted(self.extensions.items(), key=lambda kv: -kv[1])),
+            "manifests": self.manifests,
+            "frameworks": self.frameworks,
+            "files_scanned": self.files_scanned,
+            "truncated": self.truncated
+        }
+
+
+@dataclass
+class ScanPlan:
+    """Herramientas y packs seleccionados, con el motivo de cada descarte."""
+    profile: StackProfile
+    tools: List[str]
+    skipped_tools: Dict[str, str]
+    semgrep_packs: List[str]
+    skipped_packs: Dict[str, str]
+
+    def runs(self, tool: str) -> bool:
+        return tool in self.tools
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "profile": self.profile.to_dict(),
+            "tools": self.tools,
+            "skipped_tools": self.skipped_tools,
+            "semgrep_packs": self.semgrep_packs,
+            "skipped_packs": self.skipped_packs
+        }
+
+
+def _read_manifest(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read(MAX_MANIFEST_BYTES)
+    except OSError:
+        return ""
+
+
+def _record_file(profile: StackProfile, counts: Counter, name: str) -> None:
+    extension = os.path.splitext(name)[1].lower()
+    if extension:
+        profile.extensions[extension] = profile.extensions.get(extension, 0) + 1
+    language = EXTENSION_LANGUAGES.get(extension)
+    if language:
+        counts[language] += 1
+
+
+def detect_stack(root: Path, walk_config: Optional[WalkConfig] = None,
+                 max_files: int = MAX_DETECTION_FILES) -> StackProfile:
+    """
+    Perfil de lenguajes, manifiestos y frameworks de `root` (archivo o directorio).
+
+    Args:
+        root: Árbol preparado para el escaneo
+        walk_config: Filtros de recorrido (por defecto, `.hybridscan.json` del proyecto)
+        max_files: Archivos a examinar como máximo; el perfil se marca `truncated`
+    """
+    root = Path(root)
+    profile = StackProfile()
+    counts: Counter = Counter()
+    frameworks: Set[str] = set()
+
+    if root.is_file():
+        entries = [(root.name, str(root))]
+    else:
+        walker = FileWalker(walk_config or WalkConfig.for_project(root))
+        entries = ((rel_path, entry.path) for rel_path, entry in walker.walk(root))
+
+    for rel_path, path in entries:
+        if profile.files_scanned >= max_files:
+            profile.truncated = True
+            break
+        profile.files_scanned += 1
+        name = os.path.basename(rel_path)
+        _record_file(profile, counts, name)
+        if name in FRAMEWORK_FILES:
+            frameworks.add(FRAMEWORK_FILES[name])
+        manifest_language = _manifest_language(name)
+        if manifest_language:
+            profile.manifests.append(rel_path)
+            content = _read_manifest(path)
+            for framework, (language, marker) in FRAMEWORK_MARKERS.items():
+                if language == manifest_language and marker.search(content):
+                    frameworks.add(framework)
+
+    profile.languages = dict(counts)
+    profile.manifests.sort()
+    profile.frameworks = sorted(frameworks)
+    return profile
+
+
+def plan_scan(profile: StackProfile, requested_tools: Sequence[str] = ("bandit", "semgrep")) -> ScanPlan:
+    """
+    Selecciona las herramientas SAST y los packs de Semgrep relevantes para el perfil.
+
+    Una herramienta se descarta si ninguno de los lenguajes detectados está
+    entre los que analiza; un pack de lenguaje o framework, si ese lenguaje o
+    framework no aparece en el árbol.
+    """
+    languages = profile.detected_languages
+
+    tools: List[str] = []
+    skipped_tools: Dict[str, str] = {}
+    for tool in requested_tools:
+        supported = TOOL_LANGUAGES.get(tool, set())
+        if supported & languages:
+            tools.append(tool)
+        elif not languages:
+            skipped_tools[tool] = "no se detectaron archivos fuente"
+        else:
+            skipped_tools[tool] = (f"lenguajes detectados ({', '.join(sorted(languages))}) "
+                                   f"no soportados por {tool}")
+
+    semgrep_packs: List[str] = []
+    skipped_packs: Dict[str, str] = {}
+    if "semgrep" in tools:
+        for language, pack in SEMGREP_LANGUAGE_PACKS.items():
+            if language in languages:
+                semgrep_packs.append(pack)
+            else:
+                skipped_packs[pack] = f"sin archivos {language}"
+        for framework, pack in SEMGREP_FRAMEWORK_PACKS.items():
+            if framework in profile.frameworks:
+                semgrep_packs.append(pack)
+            else:
+                skipped_packs[pack] = f"framework {framework} no detectado"
+        semgrep_packs.extend(SEMGREP_COMMON_PACKS)
+
+    plan = ScanPlan(profile, tools, skipped_tools, semgrep_packs, skipped_packs)
+    logger.info(f"🧭 Lenguajes: {sorted(languages) or '-'}, frameworks: {profile.frameworks or '-'}; "
+                f"herramientas: {tools or '-'}, descartadas: {sorted(skipped_tools) or '-'}")
+    return plan
+
+
+def detect_and_plan(root: Path, requested_tools: Sequence[str] = ("bandit", "semgrep"),
+                    walk_config: Optional[WalkConfig] = None) -> ScanPlan:
+    """Atajo de `plan_scan(detect_stack(root), requested_tools)`."""
+    return plan_scan(detect_stack(root, walk_config), requested_tools)
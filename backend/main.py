@@ -1,9 +1,10 @@
-from fastapi import FastAPI, Depends, UploadFile, File, Form, HTTPException, status
+from fastapi import FastAPI, Depends, UploadFile, File, Form, HTTPException, BackgroundTasks, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import FileResponse, StreamingResponse
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Float, String, select, text
+from sqlalchemy.orm import sessionmaker, Session, undefer
 import os
 import sys
 import subprocess
@@ -12,6 +13,7 @@ import mimetypes
 import logging
 import tempfile
 import shutil
+import threading
 from pathlib import Path
 from typing import Optional
 from datetime import datetime, timezone, timedelta
@@ -31,6 +33,114 @@ try:
 except ImportError:
     from correlation_engine import VulnerabilityCorrelator, Vulnerability, VulnerabilityType, ConfidenceLevel
 
+# Importar ejecución fragmentada de Bandit
+try:
+    from backend.bandit_sharding import run_bandit_sharded
+except ImportError:
+    from bandit_sharding import run_bandit_sharded
+
+# Importar pool de procesos Bandit pre-calentados
+try:
+    from backend.bandit_warm_pool import get_warm_pool, is_small_target
+except ImportError:
+    from bandit_warm_pool import get_warm_pool, is_small_target
+
+# Importar almacén local de reglas Semgrep
+try:
+    from backend.semgrep_rules import semgrep_config_args, rules_version
+except ImportError:
+    from semgrep_rules import semgrep_config_args, rules_version
+
+# Importar detección de lenguajes y frameworks para seleccionar herramientas y reglas
+try:
+    from backend.language_detection import detect_and_plan, MANIFEST_FILES
+except ImportError:
+    from language_detection import detect_and_plan, MANIFEST_FILES
+
+# Importar escaneo SAST limitado a los cambios entre dos revisiones git
+try:
+    from backend.diff_scan import run_diff_scan, DiffScanError, DIFF_TOOLS
+except ImportError:
+    from diff_scan import run_diff_scan, DiffScanError, DIFF_TOOLS
+
+# Importar análisis rápido en proceso para respuesta inmediata tras una subida
+try:
+    from backend.quick_scan import quick_scan_file
+except ImportError:
+    from quick_scan import quick_scan_file
+
+# Importar paginación por cursor para listados
+try:
+    from backend.pagination import (
+        keyset_page, keyset_filter, split_page, encode_rank_cursor, decode_rank_cursor, InvalidCursorError,
+        DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+    )
+except ImportError:
+    from pagination import (
+        keyset_page, keyset_filter, split_page, encode_rank_cursor, decode_rank_cursor, InvalidCursorError,
+        DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+    )
+
+# Importar tabla normalizada de hallazgos y normalizador canónico
+try:
+    from backend.findings_store import store_findings
+    from backend.finding_normalizer import normalize_cwe, vuln_type_for
+except ImportError:
+    from findings_store import store_findings
+    from finding_normalizer import normalize_cwe, vuln_type_for
+
+# Importar utilidades de autenticación JWT
+try:
+    from backend.auth import oauth2_scheme, username_from_token
+except ImportError:
+    from auth import oauth2_scheme, username_from_token
+
+# Importar ejecución aislada de escáneres con límites de recursos
+try:
+    from backend.scanner_sandbox import run_sandboxed, LIMIT_WALL_CLOCK
+except ImportError:
+    from scanner_sandbox import run_sandboxed, LIMIT_WALL_CLOCK
+
+# Importar recorrido de árboles con filtrado por globs
+try:
+    from backend.file_walker import FileWalker, WalkConfig
+except ImportError:
+    from file_walker import FileWalker, WalkConfig
+
+# Importar huellas de escaneo para memoización
+try:
+    from backend.scan_fingerprint import scan_fingerprint, memo_stats
+except ImportError:
+    from scan_fingerprint import scan_fingerprint, memo_stats
+
+# Importar motor DAST nativo
+try:
+    from backend.dast_engine import run_native_dast, points_from_operations, target_allowed
+except ImportError:
+    from dast_engine import run_native_dast, points_from_operations, target_allowed
+
+# Importar sesión persistente con el daemon de OWASP ZAP
+try:
+    from backend.zap_daemon import get_zap_daemon, ZapError, ZapUnavailableError
+except ImportError:
+    from zap_daemon import get_zap_daemon, ZapError, ZapUnavailableError
+
+# Importar enumeración de objetivos desde OpenAPI
+try:
+    from backend.openapi_targets import OpenApiError, load_openapi, enumerate_operations, route_table
+except ImportError:
+    from openapi_targets import OpenApiError, load_openapi, enumerate_operations, route_table
+
+# Importar lector incremental de reportes grandes
+try:
+    from backend.report_stream import (
+        ReportSummary, ReportStreamError, stream_report, STREAMING_THRESHOLD_BYTES
+    )
+except ImportError:
+    from report_stream import (
+        ReportSummary, ReportStreamError, stream_report, STREAMING_THRESHOLD_BYTES
+    )
+
 # Try to import python-magic, fallback to mimetypes if not available
 try:
     import magic
@@ -55,7 +165,7 @@ database_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 sys.path.insert(0, database_path)
 
 try:
-    from models import Base, ScanResult
+    from models import Base, ScanResult, Finding, DashboardCounter, upgrade_schema, engine, SessionLocal
 except ImportError:
     # Fallback import method
     import importlib.util
@@ -64,13 +174,40 @@ except ImportError:
     spec.loader.exec_module(models)
     Base = models.Base
     ScanResult = models.ScanResult
+    Finding = models.Finding
+    DashboardCounter = models.DashboardCounter
+    upgrade_schema = models.upgrade_schema
+    engine = models.engine
+    SessionLocal = models.SessionLocal
+
+# Escrituras agrupadas de progreso y sesiones asíncronas (database/storage.py)
+try:
+    from database.storage import AsyncDbSession, get_write_batcher, async_session_for
+except ImportError:
+    from storage import AsyncDbSession, get_write_batcher, async_session_for
+
+# Contadores materializados del panel (database/counters.py)
+try:
+    from database.counters import apply_deltas, difference, finding_counts, read_counters
+except ImportError:
+    from counters import apply_deltas, difference, finding_counts, read_counters
+
+# Búsqueda de texto completo sobre hallazgos (database/finding_search.py)
+try:
+    from database.finding_search import FTS_TABLE, search_statement, window_start_statement
+except ImportError:
+    from finding_search import FTS_TABLE, search_statement, window_start_statement
+
+# Importar retención y archivado de resultados antiguos (usa database/counters.py)
+try:
+    from backend.retention import start_retention_scheduler
+except ImportError:
+    from retention import start_retention_scheduler
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'database', 'hybridsecscan.db')}"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 
 app = FastAPI(
     title="HybridSecScan API",
@@ -85,6 +222,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configuración de seguridad
@@ -99,6 +237,32 @@ ALLOWED_MIME_TYPES = {
 SECURE_SCAN_BASE = Path(tempfile.gettempdir()) / "hybridscan_secure"
 SECURE_SCAN_BASE.mkdir(exist_ok=True)
 
+def _has_dangerous_pattern(normalized_path: Path, target_path: str) -> bool:
+    """Detecta rutas del sistema o con patrones de path traversal."""
+    dangerous_patterns = ['..', '~', '/etc', '/var', '/root', '/home', '/usr', '/boot']
+    str_path = str(normalized_path).lower()
+    
+    for pattern in dangerous_patterns:
+        if pattern in str_path and pattern not in ['/home/oscar', '/tmp', '/var/tmp']:
+            logger.warning(f"🚨 SECURITY: Ruta rechazada por patrón peligroso '{pattern}': {target_path}")
+            return True
+    return False
+
+def _is_allowed_scan_directory(normalized_path: Path) -> bool:
+    """Indica si un directorio está dentro de los directorios permitidos para escanear."""
+    allowed_prefixes = [
+        Path.cwd(),
+        Path("/tmp"),
+        Path("/var/tmp"), 
+        Path.home() / "Documentos",
+        Path.home() / "Downloads"
+    ]
+    
+    return any(
+        str(normalized_path).startswith(str(prefix)) 
+        for prefix in allowed_prefixes
+    )
+
 def validate_scan_path(target_path: str) -> Optional[Path]:
     """
     Valida y normaliza rutas para prevenir path traversal attacks.
@@ -121,13 +285,8 @@ def validate_scan_path(target_path: str) -> Optional[Path]:
         logger.info(f"Validando ruta: {target_path} -> {normalized_path}")
         
         # Detectar patrones peligrosos
-        dangerous_patterns = ['..', '~', '/etc', '/var', '/root', '/home', '/usr', '/boot']
-        str_path = str(normalized_path).lower()
-        
-        for pattern in dangerous_patterns:
-            if pattern in str_path and pattern not in ['/home/oscar', '/tmp', '/var/tmp']:
-                logger.warning(f"🚨 SECURITY: Ruta rechazada por patrón peligroso '{pattern}': {target_path}")
-                return None
+        if _has_dangerous_pattern(normalized_path, target_path):
+            return None
         
         # Verificar que la ruta existe y es accesible
         if not normalized_path.exists():
@@ -147,35 +306,27 @@ def validate_scan_path(target_path: str) -> Optional[Path]:
             return secure_file
         
         # Si es un directorio, validar que esté en directorios permitidos
-        allowed_prefixes = [
-            Path.cwd(),
-            Path("/tmp"),
-            Path("/var/tmp"), 
-            Path.home() / "Documentos",
-            Path.home() / "Downloads"
-        ]
-        
-        is_allowed = any(
-            str(normalized_path).startswith(str(prefix)) 
-            for prefix in allowed_prefixes
-        )
-        
-        if not is_allowed:
+        if not _is_allowed_scan_directory(normalized_path):
             logger.warning(f"🚨 SECURITY: Ruta fuera de directorios permitidos: {target_path}")
             return None
         
-        # Copiar directorio al área segura (solo archivos permitidos)
+        # Copiar directorio al área segura (solo archivos permitidos y manifiestos para
+        # la detección de lenguajes). Los directorios excluidos (node_modules, .git,
+        # target o los de .hybridscan.json) no se recorren.
         secure_target = secure_dir / "target"
         secure_target.mkdir()
         
-        for file_path in normalized_path.rglob("*"):
-            if file_path.is_file() and file_path.suffix.lower() in ALLOWED_EXTENSIONS:
-                relative_path = file_path.relative_to(normalized_path)
-                target_file = secure_target / relative_path
-                target_file.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(file_path, target_file)
-        
-        logger.info(f"Directorio copiado a área segura: {secure_target}")
+        walker = FileWalker(WalkConfig.for_project(
+            normalized_path, extensions=ALLOWED_EXTENSIONS, file_names=MANIFEST_FILES
+        ))
+        for relative_path, entry in walker.walk(normalized_path):
+            target_file = secure_target / relative_path
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(entry.path, target_file)
+        
+        walk_stats = walker.stats()
+        logger.info(f"Directorio copiado a área segura: {secure_target} "
+                    f"({walk_stats['files_matched']} archivos, {walk_stats['dirs_pruned']} directorios podados)")
         return secure_target
         
     except Exception as e:
@@ -274,7 +425,8 @@ async def validate_uploaded_file(file: UploadFile) -> dict:
         logger.error(f"❌ Error validando archivo: {str(e)}")
         raise HTTPException(status_code=500, detail="Error interno validando archivo")
 
-def update_scan_result(scan_result, results: dict, status: str = "completed", error: str = None):
+def update_scan_result(scan_result, results: dict, status: str = "completed", error: str = None,
+                       summary: Optional[dict] = None, metadata: Optional[dict] = None):
     """
     Actualiza resultado de escaneo con metadatos completos.
     
@@ -283,10 +435,15 @@ def update_scan_result(scan_result, results: dict, status: str = "completed", er
         results: Diccionario con resultados del escaneo  
         status: Estado final del escaneo
         error: Mensaje de error si aplica
+        summary: Resumen ya calculado (reportes procesados en streaming); si
+            falta, se calcula en una sola pasada sobre los hallazgos
+        metadata: Metadatos adicionales del escaneo (p.ej. detección de lenguajes)
     """
     try:
         scan_result.results = results
         scan_result.status = status
+        if status == "completed":
+            scan_result.progress = 100
         
         if error:
             scan_result.error_message = error
@@ -295,18 +452,24 @@ def update_scan_result(scan_result, results: dict, status: str = "completed", er
         
         # Agregar metadatos útiles para análisis
         if results and isinstance(results, dict):
-            duration = (datetime.now(timezone.utc) - scan_result.timestamp).total_seconds()
-            vulnerabilities = results.get("vulnerabilities", results.get("results", []))
+            started = scan_result.timestamp
+            # SQLite devuelve datetimes sin zona horaria tras un refresh
+            if started.tzinfo is None:
+                started = started.replace(tzinfo=timezone.utc)
+            duration = (datetime.now(timezone.utc) - started).total_seconds()
+            if summary is None:
+                summary = _summarize_findings(results, scan_result.tool, scan_result.scan_type)
             
             scan_result.results.update({
                 "scan_duration_seconds": duration,
-                "vulnerabilities_found": len(vulnerabilities) if isinstance(vulnerabilities, list) else 0,
-                "severity_breakdown": _calculate_severity_breakdown(results),
+                "vulnerabilities_found": summary["vulnerabilities_found"],
+                "severity_breakdown": summary["severity_breakdown"],
                 "scan_completed_at": datetime.now(timezone.utc).isoformat(),
                 "metadata": {
                     "scan_version": "2.0",
                     "engine": "HybridSecScan",
-                    "owasp_categories_detected": _extract_owasp_categories(results)
+                    "owasp_categories_detected": summary["owasp_categories_detected"],
+                    **(metadata or {})
                 }
             })
             
@@ -317,81 +480,83 @@ def update_scan_result(scan_result, results: dict, status: str = "completed", er
         scan_result.status = "error"
         scan_result.error_message = f"Error interno: {str(e)}"
 
-def _calculate_severity_breakdown(results: dict) -> dict:
-    """Calcula distribución de severidades encontradas"""
-    breakdown = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
-
-    # Bandit uses 'results' list and each item often has 'issue_severity' (e.g. 'HIGH','MEDIUM','LOW')
-    # Semgrep and other tools may use 'severity' or 'level'. Normalize several possible keys.
+def _summarize_findings(results: dict, tool: Optional[str] = None, scan_type: Optional[str] = None) -> dict:
+    """Resumen (total, severidades y categorías OWASP) de los hallazgos en memoria, normalizados una vez."""
     vulnerabilities = results.get("vulnerabilities", results.get("results", []))
-
+    accumulator = ReportSummary(tool, scan_type)
     if isinstance(vulnerabilities, list):
-        for vuln in vulnerabilities:
-            if not isinstance(vuln, dict):
-                continue
-
-            # Try multiple keys used by different tools
-            raw_sev = None
-            for key in ("severity", "level", "issue_severity", "issue_confidence", "severity_level"):
-                if key in vuln and vuln.get(key) is not None:
-                    raw_sev = str(vuln.get(key))
-                    break
-
-            if raw_sev is None:
-                # Some tools store severity inside nested fields or use numeric codes - fallback to 'info'
-                raw_sev = "info"
-
-            sev = raw_sev.strip().lower()
-
-            # Normalize common values
-            if sev in ("critical", "crit", "c"):
-                breakdown["critical"] += 1
-            elif sev in ("high", "h"):
-                breakdown["high"] += 1
-            elif sev in ("medium", "med", "m", "warning"):
-                breakdown["medium"] += 1
-            elif sev in ("low", "l"):
-                breakdown["low"] += 1
-            elif sev in ("info", "informational", "none"):
-                breakdown["info"] += 1
-            else:
-                # Try to map common uppercase values (Bandit: HIGH, MEDIUM, LOW)
-                u = sev.upper()
-                if u == "HIGH":
-                    breakdown["high"] += 1
-                elif u == "MEDIUM":
-                    breakdown["medium"] += 1
-                elif u == "LOW":
-                    breakdown["low"] += 1
-                elif u == "CRITICAL":
-                    breakdown["critical"] += 1
-                else:
-                    breakdown["info"] += 1
+        accumulator.add_all(vulnerabilities)
+    return accumulator.as_dict()
 
-    return breakdown
+def _stream_large_report(report_path: Path, tool: str) -> tuple:
+    """
+    Procesa un reporte grande sin cargarlo completo en memoria.
 
-def _extract_owasp_categories(results: dict) -> list:
-    """Extrae categorías OWASP detectadas"""
-    categories = set()
-    vulnerabilities = results.get("vulnerabilities", results.get("results", []))
-    
-    if isinstance(vulnerabilities, list):
-        for vuln in vulnerabilities:
-            if isinstance(vuln, dict):
-                owasp = vuln.get("owasp", vuln.get("category", ""))
-                if owasp:
-                    categories.add(owasp)
-                    
-                # Mapeo de CWE a OWASP API Top 10
-                cwe = vuln.get("cwe", "")
-                if "89" in str(cwe):  # SQL Injection
-                    categories.add("API3:2023")
-                elif "79" in str(cwe):  # XSS
-                    categories.add("API8:2023")
-                elif "22" in str(cwe):  # Path Traversal
-                    categories.add("API1:2023")
-    
-    return list(categories)
+    En `results` solo se guarda el resumen; `_index_findings` vuelve a recorrer
+    el reporte original (`iter_findings`) para llenar la tabla `findings`, de
+    la que leen después todos los consumidores.
+
+    Returns:
+        Tupla (resultados a almacenar, resumen)
+    """
+    streamed = stream_report(report_path, tool)
+
+    captured = streamed.pop("captured")
+    results = {
+        "streamed": True,
+        "results": [],
+        "report_size_bytes": report_path.stat().st_size,
+        "errors": captured.get("errors", [])
+    }
+    logger.info(f"🌊 Reporte procesado en streaming: {streamed['vulnerabilities_found']} hallazgos "
+                f"({results['report_size_bytes'] / (1024 * 1024):.1f} MB)")
+    return results, streamed
+
+def _index_findings(db: Session, scan_result) -> int:
+    """
+    Copia los hallazgos del escaneo a la tabla `findings` (inserción por lotes).
+
+    Se llama en la ingesta, con `result_path` ya asignado, antes del commit.
+    Los contadores del panel reciben la diferencia entre las filas anteriores
+    del escaneo y las nuevas, en la misma transacción. Un error al indexar no
+    invalida el escaneo: los hallazgos siguen en `results`.
+    """
+    try:
+        with db.begin_nested():
+            same_scan = Finding.scan_id == scan_result.id
+            before = finding_counts(db, Finding.__table__, same_scan)
+            stored = store_findings(db, Finding, scan_result)
+            apply_deltas(db, DashboardCounter.__table__,
+                         difference(finding_counts(db, Finding.__table__, same_scan), before))
+            return stored
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudieron indexar los hallazgos del escaneo {scan_result.id}: {e}")
+        return 0
+
+@app.on_event("startup")
+def warm_up_bandit_pool():
+    """Arranca el pool Bandit pre-calentado en segundo plano sin retrasar el arranque de la API."""
+    pool = get_warm_pool()
+    if pool is None:
+        return
+
+    def _start():
+        try:
+            pool.start()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo pre-calentar el pool Bandit: {e}")
+
+    threading.Thread(target=_start, daemon=True).start()
+
+@app.on_event("startup")
+def start_retention():
+    """Programa el archivado de resultados caducados y la compactación en un hilo en segundo plano."""
+    scheduler = start_retention_scheduler(engine, ScanResult.__table__, Finding.__table__,
+                                          counters_table=DashboardCounter.__table__)
+    if scheduler is not None:
+        logger.info(f"🗄️ Retención programada cada {scheduler.interval_seconds / 3600:g} h")
+    else:
+        logger.info("🗄️ Retención programada desactivada (HYBRIDSCAN_RETENTION_INTERVAL_HOURS=0)")
 
 # Dependencia para obtener la sesión de base de datos
 def get_db():
@@ -401,28 +566,355 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db(db: Session = Depends(get_db)):
+    """
+    Sesión asíncrona sobre la misma base de datos que `get_db`.
+    
+    Deriva de `get_db` para respetar sus overrides (bases de prueba); la sesión
+    síncrona no abre conexión mientras no se use.
+    """
+    session = async_session_for(db)
+    try:
+        yield session
+    finally:
+        await session.close()
+
 @app.get("/")
 def read_root():
     return {"message": "Bienvenido a HybridSecScan API - Sistema de auditoría automatizada OWASP API Top 10"}
 
+# Columnas del listado de escaneos; `results` (comprimida) nunca se carga, `summary` sí
+SCAN_LISTING_COLUMNS = (
+    ScanResult.id, ScanResult.scan_type, ScanResult.tool, ScanResult.target,
+    ScanResult.status, ScanResult.progress, ScanResult.result_path, ScanResult.report_uuid, ScanResult.summary,
+    ScanResult.created_at
+)
+
 @app.get("/scan-results")
-def get_scan_results(db: Session = Depends(get_db)):
-    results = db.query(ScanResult).all()
-    return [
-        {
-            "id": r.id,
-            "scan_type": r.scan_type,
-            "tool": r.tool,
-            "result_path": r.result_path,
-            "created_at": r.created_at
-        } for r in results
+async def get_scan_results(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    scan_type: Optional[str] = Query(None),
+    tool: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    db: AsyncDbSession = Depends(get_async_db)
+):
+    """
+    Lista los escaneos más recientes primero, paginados por cursor.
+    
+    Solo se seleccionan las columnas del listado. Si hay más resultados, la
+    cabecera `X-Next-Cursor` contiene el cursor de la página siguiente
+    (parámetro `cursor`).
+    """
+    statement = select(*SCAN_LISTING_COLUMNS)
+    if scan_type:
+        statement = statement.where(ScanResult.scan_type == scan_type)
+    if tool:
+        statement = statement.where(ScanResult.tool == tool)
+    if status:
+        statement = statement.where(ScanResult.status == status)
+
+    try:
+        statement = keyset_filter(statement, ScanResult.created_at, ScanResult.id, cursor).limit(limit + 1)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows, next_cursor = split_page((await db.execute(statement)).all(), ScanResult.created_at, ScanResult.id, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [dict(row._mapping) for row in rows]
+
+@app.get("/scan-results/{scan_id}")
+async def get_scan_result(scan_id: int, db: AsyncDbSession = Depends(get_async_db)):
+    """Resultado completo de un escaneo; solo aquí se descomprime `results`."""
+    scan_result = await db.get(ScanResult, scan_id, options=[undefer(ScanResult.results)])
+    if scan_result is None:
+        raise HTTPException(status_code=404, detail=f"Escaneo {scan_id} no encontrado")
+    return scan_result.to_dict()
+
+@app.get("/dashboard/aggregates")
+async def get_dashboard_aggregates(db: AsyncDbSession = Depends(get_async_db)):
+    """
+    Estadísticas del panel leídas de los contadores materializados.
+
+    Devuelve `{dimension: {clave: total}}`: `totals` (scans, findings),
+    `scan_type`, `scan_tool`, `severity`, `finding_tool`, `owasp_category` y
+    `cwe`. El coste no depende del número de escaneos almacenados.
+    """
+    counters = DashboardCounter.__table__
+    rows = await db.execute(select(counters.c.dimension, counters.c.key, counters.c.count))
+    aggregates = read_counters(rows.all())
+    aggregates.setdefault("totals", {}).update({
+        key: aggregates["totals"].get(key, 0) for key in ("scans", "findings")
+    })
+    return aggregates
+
+@app.get("/findings")
+def get_findings(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    scan_id: Optional[int] = Query(None),
+    tool: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    cwe: Optional[str] = Query(None),
+    owasp_category: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Consulta hallazgos de todos los escaneos desde la tabla normalizada.
+    
+    Filtros combinables (p.ej. `severity=high&cwe=89&since=...`); orden y
+    paginación como en `/scan-results` (cabecera `X-Next-Cursor`).
+    """
+    query = db.query(Finding)
+    if scan_id is not None:
+        query = query.filter(Finding.scan_id == scan_id)
+    if tool:
+        query = query.filter(Finding.tool == tool)
+    if severity:
+        query = query.filter(Finding.severity == ReportSummary.normalize_severity(severity))
+    if cwe:
+        query = query.filter(Finding.cwe == normalize_cwe(cwe))
+    if owasp_category:
+        query = query.filter(Finding.owasp_category == owasp_category)
+    if since:
+        # SQLite guarda las fechas en UTC sin zona horaria
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        query = query.filter(Finding.created_at >= since)
+
+    try:
+        rows, next_cursor = keyset_page(query, Finding.created_at, Finding.id, cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [row.to_dict() for row in rows]
+
+@app.get("/findings/search")
+async def search_findings(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    order: str = Query("relevance", pattern="^(relevance|recent)$"),
+    scan_id: Optional[int] = Query(None),
+    tool: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    cwe: Optional[str] = Query(None),
+    db: AsyncDbSession = Depends(get_async_db)
+):
+    """
+    Búsqueda de texto completo en descripción, regla, archivo y endpoint de los hallazgos.
+
+    Todos los términos deben aparecer (`jwt*` busca por prefijo). Con
+    `order=relevance` los resultados se ordenan por `rank` (menor es mejor)
+    entre las coincidencias más recientes; `order=recent` recorre todas de
+    la más nueva a la más antigua. Cada resultado incluye un fragmento
+    resaltado (`snippet`); paginación con la cabecera `X-Next-Cursor`.
+    """
+    try:
+        after_rank, after_id, window_start = decode_rank_cursor(cursor) if cursor else (None, None, 0)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    after = (after_rank, after_id) if cursor else None
+
+    use_fts = (await db.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    )).first() is not None
+    if not use_fts:
+        order = "recent"
+    filters = {
+        "scan_id": scan_id,
+        "tool": tool,
+        "severity": ReportSummary.normalize_severity(severity) if severity else None,
+        "cwe": normalize_cwe(cwe) if cwe else None,
+    }
+    if use_fts and order == "relevance" and cursor is None:
+        window = window_start_statement(q, filters)
+        if window is not None:
+            start = (await db.execute(*window)).scalar()
+            window_start = start + 1 if start is not None else 0
+
+    finding_columns = Finding.__table__.columns
+    built = search_statement(q, filters, limit + 1, [column.name for column in finding_columns], after=after,
+                             use_fts=use_fts, order=order, window_start=window_start)
+    if built is None:
+        return []
+    statement, params = built
+    # Tipos asignados por nombre de columna, no por posición
+    statement = statement.columns(**{column.name: column.type for column in finding_columns},
+                                  rank=Float, snippet=String)
+    rows = (await db.execute(statement, params)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_rank_cursor(rows[-1].rank, rows[-1].id, window_start)
+    results = []
+    for row in rows:
+        item = {column.key: row._mapping[column.key] for column in Finding.__table__.columns}
+        item["created_at"] = item["created_at"].isoformat() if item["created_at"] else None
+        item.update(rank=row.rank, snippet=row.snippet)
+        results.append(item)
+    return results
+
+def _cleanup_scan_dir(validated_path: Path) -> None:
+    """Elimina el directorio temporal de seguridad creado por validate_scan_path."""
+    try:
+        if validated_path.parent.name.startswith("scan_"):
+            shutil.rmtree(validated_path.parent)
+            logger.info(f"🧹 Directorio temporal limpiado: {validated_path.parent}")
+    except Exception as cleanup_error:
+        logger.warning(f"⚠️ No se pudo limpiar directorio temporal: {cleanup_error}")
+
+def _find_memoized_scan(db: Session, tool: str, fingerprint: str):
+    """Último escaneo completado con la misma huella cuyo reporte sigue disponible."""
+    candidates = db.query(ScanResult).filter(
+        ScanResult.fingerprint == fingerprint,
+        ScanResult.tool == tool,
+        ScanResult.status == "completed"
+    ).order_by(ScanResult.id.desc()).limit(5)
+    for candidate in candidates:
+        stored = _stored_summary(candidate)
+        # Los reportes procesados en streaming se releen del archivo original
+        if stored.get("streamed") and not (candidate.result_path and Path(candidate.result_path).exists()):
+            continue
+        return candidate
+    return None
+
+def _stored_summary(scan_result) -> dict:
+    """Resumen sin comprimir del escaneo; las filas anteriores a la columna `summary` descomprimen `results`."""
+    if scan_result.summary is not None:
+        return scan_result.summary
+    return scan_result.results if isinstance(scan_result.results, dict) else {}
+
+def _memoized_sast_response(scan_result, tool: str, stack_detection: dict) -> dict:
+    """Respuesta de /scan/sast construida a partir de un resultado almacenado."""
+    stored = _stored_summary(scan_result)
+    return {
+        "id": scan_result.id,
+        "message": f"Análisis SAST con {tool} reutilizado (objetivo sin cambios)",
+        "result_id": scan_result.id,
+        "report_path": scan_result.result_path,
+        "vulnerabilities_found": stored.get("vulnerabilities_found", 0),
+        "scan_duration": 0,
+        "severity_breakdown": stored.get("severity_breakdown") or _summarize_findings(stored, tool)["severity_breakdown"],
+        "owasp_categories": (stored.get("metadata") or {}).get("owasp_categories_detected", []),
+        "sharding": stored.get("sharding"),
+        "stack_detection": stack_detection,
+        "memoized": True,
+        "fingerprint": scan_result.fingerprint
+    }
+
+def _skipped_sast_response(db: Session, tool: str, target_path: str, validated_path: Path, scan_plan) -> dict:
+    """Registra un escaneo SAST descartado por la detección de lenguajes y devuelve su respuesta."""
+    reason = scan_plan.skipped_tools.get(tool, "herramienta no aplicable")
+    scan_result = ScanResult(
+        scan_type="SAST",
+        tool=tool,
+        target=str(target_path),
+        status="skipped",
+        timestamp=datetime.now(timezone.utc),
+        results={
+            "results": [],
+            "vulnerabilities_found": 0,
+            "skip_reason": reason,
+            "metadata": {"stack_detection": scan_plan.to_dict()}
+        }
+    )
+    db.add(scan_result)
+    db.commit()
+    db.refresh(scan_result)
+    _cleanup_scan_dir(validated_path)
+    logger.info(f"⏭️ Escaneo SAST con {tool} omitido - ID: {scan_result.id}: {reason}")
+    return {
+        "id": scan_result.id,
+        "message": f"Análisis SAST con {tool} omitido: {reason}",
+        "result_id": scan_result.id,
+        "report_path": None,
+        "vulnerabilities_found": 0,
+        "scan_duration": 0,
+        "severity_breakdown": {},
+        "owasp_categories": [],
+        "skipped": True,
+        "skip_reason": reason,
+        "stack_detection": scan_plan.to_dict(),
+        "memoized": False,
+        "fingerprint": None
+    }
+
+def _run_bandit(target: Path, report_path: Path, timeout: int = 300):
+    """Ejecuta Bandit sobre `target`; los objetivos pequeños usan el pool pre-calentado."""
+    # Objetivos pequeños (p.ej. subidas individuales) usan el pool pre-calentado
+    warm_pool = get_warm_pool() if is_small_target(target) else None
+    if warm_pool is not None:
+        try:
+            logger.info(f"⚡ Ejecutando Bandit (pool pre-calentado) en: {target}")
+            return warm_pool.scan(target, report_path, timeout=timeout)
+        except RuntimeError as pool_error:
+            logger.warning(f"⚠️ Pool Bandit no disponible, usando subproceso: {pool_error}")
+
+    logger.info(f"🔧 Ejecutando Bandit en: {target}")
+    return run_sandboxed(
+        [sys.executable, '-m', 'bandit', '-r', str(target), '-f', 'json', '-o', str(report_path)],
+        timeout=timeout
+    )
+
+def _run_semgrep(target: Path, report_path: Path, config_args: list, timeout: int = 600):
+    """
+    Ejecuta Semgrep sobre `target`.
+
+    Raises:
+        FileNotFoundError: Si Semgrep no está instalado
+    """
+    logger.info(f"🔧 Ejecutando Semgrep en: {target}")
+    # Preferir ejecutar semgrep como módulo de Python (si está instalado en el venv),
+    # si no, intentar el ejecutable 'semgrep' (PATH).
+    semgrep_cmds = [
+        [sys.executable, '-m', 'semgrep', *config_args, str(target), '--json', '--output', str(report_path)],
+        ['semgrep', *config_args, str(target), '--json', '--output', str(report_path)]
     ]
+    last_exc = None
+    for cmd in semgrep_cmds:
+        try:
+            return run_sandboxed(cmd, timeout=timeout)
+        except FileNotFoundError as fe:
+            last_exc = fe
+            logger.warning(f"Semgrep no encontrado con comando: {cmd}. Intentando siguiente opción.")
+    raise FileNotFoundError(str(last_exc))
+
+@app.get("/scan/sast/memo-stats")
+def get_sast_memo_stats():
+    """Estadísticas de reutilización de escaneos SAST memoizados."""
+    return memo_stats.get_stats()
 
 @app.post("/scan/sast")
-def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Session = Depends(get_db)):
+def run_sast_scan(
+    target_path: str = Form(...),
+    tool: str = Form(...),
+    sharded: bool = Form(False),
+    force_rescan: bool = Form(False),
+    skip_irrelevant: bool = Form(True),
+    db: Session = Depends(get_db)
+):
     """
     Ejecuta un análisis SAST usando Bandit o Semgrep sobre el código fuente indicado.
     
+    Antes de ejecutar la herramienta se detectan los lenguajes y frameworks del
+    árbol (ver backend/language_detection.py). Si la herramienta no analiza
+    ninguno de ellos, el escaneo se registra como `skipped` sin ejecutarla
+    (salvo `skip_irrelevant=false`); Semgrep solo carga las reglas de los
+    lenguajes detectados. La decisión queda en `metadata.stack_detection`.
+    
+    Con `sharded=true` y Bandit, el árbol se reparte en lotes balanceados por
+    tamaño que se analizan en procesos paralelos (ver backend/bandit_sharding.py).
+    
+    Si ya existe un escaneo completado con la misma huella (árbol, herramienta,
+    versión y configuración) se devuelve su resultado sin volver a ejecutar la
+    herramienta, salvo que se indique `force_rescan=true`.
+    
     Security Features:
     - Path traversal prevention
     - Input validation and sanitization  
@@ -450,13 +942,37 @@ def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Sessi
                 detail="Ruta no válida, fuera de directorios permitidos o contiene patrones peligrosos"
             )
         
+        # Detección de lenguajes: descartar herramientas que no aplican al árbol
+        scan_plan = detect_and_plan(validated_path, requested_tools=(tool,))
+        stack_detection = scan_plan.to_dict()
+        if skip_irrelevant and not scan_plan.runs(tool):
+            return _skipped_sast_response(db, tool, target_path, validated_path, scan_plan)
+        scan_languages = scan_plan.profile.detected_languages if scan_plan.runs(tool) else None
+        semgrep_packs = tuple(scan_plan.semgrep_packs) or ("auto",)
+
+        # Memoización: reutilizar un escaneo idéntico ya completado
+        fingerprint = scan_fingerprint(
+            validated_path, tool,
+            {"rules_version": rules_version(), "semgrep_packs": list(semgrep_packs)} if tool == "semgrep" else None
+        )
+        if not force_rescan:
+            memoized = _find_memoized_scan(db, tool, fingerprint)
+            memo_stats.record(reused=memoized is not None)
+            if memoized is not None:
+                _cleanup_scan_dir(validated_path)
+                logger.info(f"♻️ Escaneo SAST reutilizado - ID: {memoized.id}, huella: {fingerprint[:12]}")
+                return _memoized_sast_response(memoized, tool, stack_detection)
+        else:
+            memo_stats.record(reused=False, forced=True)
+
         # Crear registro inicial del escaneo
         scan_result = ScanResult(
             scan_type="SAST",
             tool=tool,
             target=str(target_path),  # Ruta original para auditoría
             status="running",
-            timestamp=datetime.now(timezone.utc)
+            timestamp=datetime.now(timezone.utc),
+            fingerprint=fingerprint
         )
         db.add(scan_result)
         db.commit()
@@ -469,37 +985,35 @@ def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Sessi
         report_dir = Path(BASE_DIR) / "reports"
         report_dir.mkdir(exist_ok=True)
         
+        sharding_stats = None
         try:
             if tool == "bandit":
                 report_path = report_dir / f"bandit_report_{report_id}.json"
 
-                logger.info(f"🔧 Ejecutando Bandit en: {validated_path}")
-                result = subprocess.run(
-                    [sys.executable, '-m', 'bandit', '-r', str(validated_path), '-f', 'json', '-o', str(report_path)],
-                    capture_output=True, text=True, timeout=300
-                )
+                if sharded and validated_path.is_dir():
+                    logger.info(f"🔧 Ejecutando Bandit fragmentado en: {validated_path}")
+                    progress = get_write_batcher(db.get_bind(), ScanResult.__table__)
+                    scan_id = scan_result.id
+                    result = run_bandit_sharded(
+                        validated_path, report_path, timeout=300,
+                        on_progress=lambda done, total: progress.submit(scan_id, progress=done * 100 // total)
+                    )
+                    # Escribir el progreso pendiente antes del resultado final
+                    progress.flush()
+                    sharding_stats = result.stats()
+                else:
+                    result = _run_bandit(validated_path, report_path)
 
             elif tool == "semgrep":
                 report_path = report_dir / f"semgrep_report_{report_id}.json"
 
-                logger.info(f"🔧 Ejecutando Semgrep en: {validated_path}")
-                # Preferir ejecutar semgrep como módulo de Python (si está instalado en el venv),
-                # si no, intentar el ejecutable 'semgrep' (PATH).
-                semgrep_cmds = [
-                    [sys.executable, '-m', 'semgrep', '--config', 'auto', str(validated_path), '--json', '--output', str(report_path)],
-                    ['semgrep', '--config', 'auto', str(validated_path), '--json', '--output', str(report_path)]
-                ]
-                last_exc = None
-                for cmd in semgrep_cmds:
-                    try:
-                        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-                        break
-                    except FileNotFoundError as fe:
-                        last_exc = fe
-                        logger.warning(f"Semgrep no encontrado con comando: {cmd}. Intentando siguiente opción.")
-                        result = None
-                if result is None:
-                    error_msg = f"Semgrep no está instalado o no se encuentra en PATH. Error: {last_exc}"
+                # Reglas del almacén local fijado (sin red) filtradas por lenguaje; si no
+                # existe, los packs del registro de los lenguajes y frameworks detectados
+                config_args = semgrep_config_args(semgrep_packs, languages=scan_languages)
+                try:
+                    result = _run_semgrep(validated_path, report_path, config_args)
+                except FileNotFoundError as e:
+                    error_msg = f"Semgrep no está instalado o no se encuentra en PATH. Error: {e}"
                     logger.error(error_msg)
                     update_scan_result(scan_result, {}, "failed", error_msg)
                     db.commit()
@@ -514,6 +1028,16 @@ def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Sessi
                 db.commit()
                 raise HTTPException(status_code=500, detail=error_msg)
 
+            limit_reason = getattr(result, "limit_reason", None)
+            if limit_reason:
+                error_msg = f"Escaneo con {tool} detenido por límite de recursos ({limit_reason})"
+                logger.error(f"🛑 {error_msg}")
+                scan_result.limit_reason = limit_reason
+                update_scan_result(scan_result, {"raw_stderr": result.stderr[-4000:]}, "failed", error_msg)
+                db.commit()
+                _cleanup_scan_dir(validated_path)
+                raise HTTPException(status_code=500, detail=error_msg)
+
             if result.returncode not in [0, 1]:
                 # Capturar stdout/stderr y devolver información útil
                 error_msg = f"Error ejecutando {tool}. returncode={result.returncode}. stderr={result.stderr.strip()}"
@@ -523,8 +1047,15 @@ def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Sessi
                 raise HTTPException(status_code=500, detail=error_msg)
             
             # Cargar y procesar resultados
+            stream_summary = None
             try:
-                if report_path.exists():
+                if report_path.exists() and report_path.stat().st_size > STREAMING_THRESHOLD_BYTES:
+                    try:
+                        scan_results, stream_summary = _stream_large_report(report_path, tool)
+                    except ReportStreamError as e:
+                        logger.error(f"❌ Reporte grande con JSON inválido: {str(e)}")
+                        scan_results = {"results": [], "message": "Reporte generado pero JSON inválido", "raw_output": result.stdout}
+                elif report_path.exists():
                     with open(report_path, 'r') as f:
                         try:
                             scan_results = json.load(f)
@@ -541,34 +1072,34 @@ def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Sessi
                 logger.error(f"❌ Error parseando JSON del reporte: {str(e)}")
                 scan_results = {"error": "Error parseando resultados", "raw_output": result.stdout}
             
+            if sharding_stats:
+                scan_results["sharding"] = sharding_stats
+
             # Actualizar resultado con metadatos completos
-            update_scan_result(scan_result, scan_results, "completed")
+            update_scan_result(scan_result, scan_results, "completed", summary=stream_summary,
+                               metadata={"stack_detection": stack_detection})
             scan_result.result_path = str(report_path)
+            _index_findings(db, scan_result)
             db.commit()
             
             # Limpiar directorio temporal de seguridad
-            try:
-                if validated_path.parent.name.startswith("scan_"):
-                    shutil.rmtree(validated_path.parent)
-                    logger.info(f"🧹 Directorio temporal limpiado: {validated_path.parent}")
-            except Exception as cleanup_error:
-                logger.warning(f"⚠️ No se pudo limpiar directorio temporal: {cleanup_error}")
+            _cleanup_scan_dir(validated_path)
             
-            logger.info(f"✅ Escaneo SAST completado - ID: {scan_result.id}, Vulnerabilidades: {len(scan_results.get('results', []))}")
+            logger.info(f"✅ Escaneo SAST completado - ID: {scan_result.id}, Vulnerabilidades: {scan_results.get('vulnerabilities_found', len(scan_results.get('results', [])))}")
 
-            # Leer los datos actualizados guardados en el objeto de BD (incluye severity_breakdown calculado)
-            stored = scan_result.results if isinstance(scan_result.results, dict) else {}
+            # Leer el resumen guardado en el registro (incluye severity_breakdown calculado) sin descomprimir resultados
+            stored = scan_result.summary or {}
             vulnerabilities_found = stored.get("vulnerabilities_found", len(scan_results.get("results", [])))
             scan_duration = stored.get("scan_duration_seconds", scan_results.get("scan_duration_seconds", 0))
 
-            # Preferir valores ya calculados en el registro; si faltan, calcularlos inline
-            severity_breakdown = stored.get("severity_breakdown") if isinstance(stored, dict) else None
-            if not severity_breakdown:
-                severity_breakdown = _calculate_severity_breakdown(stored or scan_results)
-
-            owasp_categories = (stored.get("metadata", {}) or {}).get("owasp_categories_detected") if isinstance(stored, dict) else None
-            if not owasp_categories:
-                owasp_categories = _extract_owasp_categories(stored or scan_results)
+            # Valores calculados en la ingesta; solo se recalculan si el resumen no llegó a guardarse
+            severity_breakdown = stored.get("severity_breakdown")
+            owasp_categories = (stored.get("metadata") or {}).get("owasp_categories_detected")
+            if severity_breakdown is None or owasp_categories is None:
+                fallback = _summarize_findings(scan_results, tool, "SAST")
+                severity_breakdown = severity_breakdown or fallback["severity_breakdown"]
+                owasp_categories = owasp_categories if owasp_categories is not None \
+                    else fallback["owasp_categories_detected"]
 
             return {
                 "id": scan_result.id,
@@ -578,12 +1109,17 @@ def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Sessi
                 "vulnerabilities_found": vulnerabilities_found,
                 "scan_duration": scan_duration,
                 "severity_breakdown": severity_breakdown,
-                "owasp_categories": owasp_categories
+                "owasp_categories": owasp_categories,
+                "sharding": sharding_stats,
+                "stack_detection": stack_detection,
+                "memoized": False,
+                "fingerprint": fingerprint
             }
             
         except subprocess.TimeoutExpired:
             error_msg = f"Timeout ejecutando análisis con {tool} (>5 minutos)"
             logger.error(f"⏰ {error_msg}")
+            scan_result.limit_reason = LIMIT_WALL_CLOCK
             update_scan_result(scan_result, {}, "timeout", error_msg)
             db.commit()
             raise HTTPException(status_code=408, detail=error_msg)
@@ -600,10 +1136,322 @@ def run_sast_scan(target_path: str = Form(...), tool: str = Form(...), db: Sessi
             
         raise HTTPException(status_code=500, detail=error_msg)
 
+@app.post("/scan/sast/diff")
+def run_sast_diff_scan(
+    repo_path: str = Form(...),
+    base_ref: str = Form(...),
+    head_ref: str = Form("HEAD"),
+    tools: str = Form(",".join(DIFF_TOOLS)),
+    db: Session = Depends(get_db)
+):
+    """
+    Ejecuta un análisis SAST solo sobre los cambios entre `base_ref` y `head_ref`.
+    
+    Pensado para comprobaciones de pull requests: se analizan únicamente los
+    archivos modificados y se conservan los hallazgos en líneas añadidas,
+    clasificados como `new` o `existing` frente a la versión base (ver
+    backend/diff_scan.py).
+    
+    Args:
+        repo_path: Repositorio git local (dentro de los directorios permitidos)
+        base_ref: Revisión base (rama destino del PR)
+        head_ref: Revisión con los cambios
+        tools: Herramientas separadas por comas (bandit, semgrep)
+    """
+    tool_list = [t.strip() for t in tools.split(",") if t.strip()]
+    unsupported = [t for t in tool_list if t not in DIFF_TOOLS]
+    if not tool_list or unsupported:
+        raise HTTPException(status_code=400, detail=f"Herramientas no soportadas: {', '.join(unsupported) or '-'}. "
+                                                    f"Use {', '.join(DIFF_TOOLS)}")
+
+    repo = Path(repo_path).resolve()
+    if _has_dangerous_pattern(repo, repo_path) or not repo.is_dir() or not _is_allowed_scan_directory(repo):
+        logger.warning(f"🚨 SECURITY: Repositorio rechazado por validación de seguridad: {repo_path}")
+        raise HTTPException(status_code=400, detail="Repositorio no válido o fuera de directorios permitidos")
+
+    scan_result = ScanResult(
+        scan_type="SAST",
+        tool=",".join(tool_list),
+        target=f"{repo_path}@{base_ref}..{head_ref}",
+        status="running",
+        timestamp=datetime.now(timezone.utc)
+    )
+    db.add(scan_result)
+    db.commit()
+    db.refresh(scan_result)
+    logger.info(f"🔀 Escaneo SAST por diff - ID: {scan_result.id}, {base_ref}..{head_ref} en {repo}")
+
+    try:
+        summary = run_diff_scan(
+            repo, base_ref, head_ref, tools=tool_list, extensions=ALLOWED_EXTENSIONS,
+            work_root=SECURE_SCAN_BASE, warm_pool=get_warm_pool() if "bandit" in tool_list else None
+        )
+    except DiffScanError as e:
+        scan_result.limit_reason = e.limit_reason
+        update_scan_result(scan_result, {}, "failed", str(e))
+        db.commit()
+        raise HTTPException(status_code=500 if e.limit_reason else 400, detail=str(e))
+    except subprocess.TimeoutExpired:
+        error_msg = "Timeout ejecutando el análisis por diff"
+        scan_result.limit_reason = LIMIT_WALL_CLOCK
+        update_scan_result(scan_result, {}, "timeout", error_msg)
+        db.commit()
+        raise HTTPException(status_code=408, detail=error_msg)
+
+    report_dir = Path(BASE_DIR) / "reports"
+    report_dir.mkdir(exist_ok=True)
+    report_path = report_dir / f"diff_report_{uuid.uuid4()}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+
+    update_scan_result(scan_result, summary, "completed",
+                       metadata={"stack_detection": summary.get("stack_detection")})
+    scan_result.result_path = str(report_path)
+    _index_findings(db, scan_result)
+    db.commit()
+
+    stored = scan_result.summary or {}
+    return {
+        "id": scan_result.id,
+        "message": f"Análisis SAST por diff completado: {summary['new_findings']} hallazgos nuevos",
+        "result_id": scan_result.id,
+        "report_path": str(report_path),
+        "base": summary["base"],
+        "head": summary["head"],
+        "changed_files": len(summary["changed_files"]),
+        "changed_lines": summary["changed_lines"],
+        "vulnerabilities_found": len(summary["results"]),
+        "new_findings": summary["new_findings"],
+        "existing_findings": summary["existing_findings"],
+        "filtered_out": summary["filtered_out"],
+        "severity_breakdown": stored.get("severity_breakdown", {}),
+        "tools": summary["tools"],
+        "findings": summary["results"],
+        "scan_duration": summary["diff_scan_seconds"]
+    }
+
+def _simulated_dast_findings(target_url: str) -> dict:
+    """Hallazgos DAST simulados, deterministas por URL objetivo (motor 'simulated')."""
+    # Simular escaneo DAST con hallazgos realistas.
+    # Ahora la simulación varía de forma determinística según la URL objetivo
+    # (hash de la URL) para producir resultados reproducibles y distintos por destino.
+    seed = int(hashlib.md5(target_url.encode('utf-8')).hexdigest()[:8], 16)
+
+    # Plantillas de hallazgos posibles
+    vuln_templates = [
+        {
+            "type": "Cross-Site Scripting (XSS)",
+            "alert": "Cross-Site Scripting (XSS)",
+            "severity": "HIGH",
+            "risk": "High",
+            "confidence": "Medium",
+            "parameter": "q",
+            "description": "Cross-site Scripting (XSS) is a type of injection attack where malicious scripts are injected into otherwise benign and trusted websites. XSS attacks occur when an attacker uses a web application to send malicious code to a different end user. The attacker could use XSS to send a malicious script to an unsuspecting user, which can access cookies, session tokens, or other sensitive information retained by the browser.",
+            "solution": "Validate all input and encode output before rendering it. Use Content Security Policy (CSP) headers. Implement proper input sanitization and output encoding using framework-specific functions.",
+            "evidence": "Unvalidated user input reflected in response",
+            "cwe": "CWE-79",
+            "cweid": "79"
+        },
+        {
+            "type": "SQL Injection",
+            "alert": "SQL Injection",
+            "severity": "CRITICAL",
+            "risk": "Critical",
+            "confidence": "High",
+            "parameter": "id",
+            "description": "SQL injection is a web security vulnerability that allows an attacker to interfere with the queries that an application makes to its database. It generally allows an attacker to view data that they are not normally able to retrieve, such as data belonging to other users, or any other data that the application itself is able to access. SQL injection can also allow attackers to modify or delete data, causing persistent changes to the application's content or behavior.",
+            "solution": "Use prepared statements with parameterized queries. Use stored procedures. Validate input using whitelist validation. Escape all user supplied input. Implement least privilege principle for database accounts.",
+            "evidence": "SQL syntax patterns detected in error messages",
+            "cwe": "CWE-89",
+            "cweid": "89"
+        },
+        {
+            "type": "Insecure Direct Object Reference (IDOR)",
+            "alert": "Insecure Direct Object Reference",
+            "severity": "MEDIUM",
+            "risk": "Medium",
+            "confidence": "Medium",
+            "parameter": "user_id",
+            "description": "Insecure Direct Object References (IDOR) occur when an application provides direct access to objects based on user-supplied input. As a result of this vulnerability attackers can bypass authorization and access resources in the system directly, for example database records or files. Insecure Direct Object References allow attackers to bypass authorization and access resources directly by modifying the value of a parameter used to directly point to an object.",
+            "solution": "Implement access control checks for all object references. Use indirect reference maps (e.g., temporary session-specific reference IDs). Verify user authorization before granting access to requested objects. Never expose internal object references directly in URLs or form parameters.",
+            "evidence": "Predictable sequential IDs in URLs",
+            "cwe": "CWE-639",
+            "cweid": "639"
+        },
+        {
+            "type": "Missing Security Headers",
+            "alert": "Missing Security Headers",
+            "severity": "MEDIUM",
+            "risk": "Medium",
+            "confidence": "High",
+            "parameter": "HTTP Headers",
+            "description": "The application is missing important security headers that help protect against common web vulnerabilities. Security headers provide an additional layer of defense against attacks like XSS, clickjacking, MIME-sniffing, and other code injection attacks. Modern browsers use these headers to enhance security and protect users.",
+            "solution": "Implement the following security headers: Content-Security-Policy (CSP) to prevent XSS attacks, X-Frame-Options to prevent clickjacking, X-Content-Type-Options to prevent MIME-sniffing, Strict-Transport-Security (HSTS) to enforce HTTPS, and Referrer-Policy to control referrer information.",
+            "evidence": "Missing Content-Security-Policy, X-Frame-Options headers",
+            "cwe": "CWE-693",
+            "cweid": "693"
+        },
+        {
+            "type": "Open Redirect",
+            "alert": "Open Redirect",
+            "severity": "LOW",
+            "risk": "Low",
+            "confidence": "Low",
+            "parameter": "next",
+            "description": "Open redirect vulnerabilities occur when a web application accepts a user-controlled input that specifies a link to an external site, and uses that link in a redirect. This behavior can be leveraged to facilitate phishing attacks against users of the application. The attacker can construct a URL that redirects to a malicious site that appears to be a legitimate part of the original domain.",
+            "solution": "Avoid using redirects and forwards. If redirects are necessary, validate the URL against a whitelist of allowed destinations. Do not include user-controllable parameters in redirect URLs. Use relative URLs for internal redirects.",
+            "evidence": "Unvalidated redirect parameter",
+            "cwe": "CWE-601",
+            "cweid": "601"
+        },
+        {
+            "type": "Server Information Leak",
+            "alert": "Information Disclosure",
+            "severity": "LOW",
+            "risk": "Low",
+            "confidence": "Medium",
+            "parameter": "response_headers",
+            "description": "The web server discloses sensitive information in HTTP responses, such as detailed error messages, stack traces, or version information. This information can help attackers gain intelligence about the application's internal workings, technology stack, and potential vulnerabilities. Information leakage can significantly ease the process of exploiting other vulnerabilities.",
+            "solution": "Configure custom error pages that don't reveal sensitive information. Disable detailed error messages in production environments. Remove or obfuscate server version headers. Implement proper error handling and logging that separates user-facing messages from internal debugging information.",
+            "evidence": "Stack trace exposed in error response",
+            "cwe": "CWE-200",
+            "cweid": "200"
+        }
+    ]
+
+    # Determinar cuántos hallazgos generar (entre 1 y len(vuln_templates)) basado en seed
+    num_candidates = len(vuln_templates)
+    chosen_count = 1 + (seed % num_candidates)
+
+    vulnerabilities = []
+    for i in range(chosen_count):
+        t = vuln_templates[(seed + i) % num_candidates].copy()
+        # Ajustar la URL y el parámetro objetivo para cada hallazgo
+        path_map = ["/search", "/user", "/profile", "", "/redirect", "/debug"]
+        t['url'] = f"{target_url}{path_map[(seed + i) % len(path_map)]}"
+        # Add a bit of variation in evidence text using seed
+        t['evidence'] = t.get('evidence', '') + f" (source: {hex((seed + i) & 0xffffffff)})"
+        vulnerabilities.append(t)
+
+    dast_findings = {
+        "scan_type": "DAST",
+        "tool": "OWASP ZAP (simulated)",
+        "target_url": target_url,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "status": "completed",
+        "vulnerabilities": vulnerabilities,
+        "summary": {
+            "total_issues": len(vulnerabilities),
+            "critical": len([v for v in vulnerabilities if v.get('severity','').lower()=='critical']),
+            "high": len([v for v in vulnerabilities if v.get('severity','').lower()=='high']),
+            "medium": len([v for v in vulnerabilities if v.get('severity','').lower()=='medium']),
+            "low": len([v for v in vulnerabilities if v.get('severity','').lower()=='low']),
+            "scan_duration": f"{30 + (seed % 60)} seconds",
+            "alerts_found": len(vulnerabilities)
+        }
+    }
+    return dast_findings
+
+def _openapi_source(source: str) -> str:
+    """
+    Origen de una especificación OpenAPI aceptable para `load_openapi`.
+
+    Las URLs se validan en `load_openapi` (solo localhost); las rutas locales
+    deben estar dentro de los directorios permitidos para escanear, igual que
+    los repositorios de `diff_scan`.
+
+    Raises:
+        OpenApiError: Si la ruta está fuera de los directorios permitidos
+    """
+    from urllib.parse import urlparse
+    if urlparse(source).scheme in ("http", "https"):
+        return source
+    path = Path(source).resolve()
+    if _has_dangerous_pattern(path, source) or not _is_allowed_scan_directory(path):
+        raise OpenApiError(f"Ruta de especificación fuera de los directorios permitidos: {source}")
+    return str(path)
+
+def _native_dast_findings(target_url: str, spec: Optional[dict] = None) -> dict:
+    """
+    Ejecuta el motor DAST nativo (backend/dast_engine.py) y construye el reporte.
+    
+    Con una especificación OpenAPI se analizan sus operaciones en lugar de
+    rastrear, y la tabla de rutas se guarda para la correlación.
+    """
+    routes = None
+    if spec is not None:
+        operations = enumerate_operations(spec, target_url)
+        routes = route_table(operations)
+        scan = run_native_dast(target_url, injection_points=points_from_operations(operations))
+    else:
+        scan = run_native_dast(target_url)
+    vulnerabilities = scan.vulnerabilities
+    findings = {
+        "scan_type": "DAST",
+        "tool": "HybridSecScan DAST (native)",
+        "target_url": target_url,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "status": "completed",
+        "vulnerabilities": vulnerabilities,
+        "summary": {
+            "total_issues": len(vulnerabilities),
+            "critical": len([v for v in vulnerabilities if v.get('severity','').lower()=='critical']),
+            "high": len([v for v in vulnerabilities if v.get('severity','').lower()=='high']),
+            "medium": len([v for v in vulnerabilities if v.get('severity','').lower()=='medium']),
+            "low": len([v for v in vulnerabilities if v.get('severity','').lower()=='low']),
+            "scan_duration": f"{scan.duration:.1f} seconds",
+            "alerts_found": len(vulnerabilities),
+            "requests_sent": scan.requests_sent,
+            "requests_per_second": scan.requests_per_second
+        },
+        "engine_stats": scan.stats()
+    }
+    if routes is not None:
+        findings["route_table"] = routes
+    return findings
+
+def _zap_dast_findings(target_url: str) -> dict:
+    """Escanea con el daemon ZAP compartido (backend/zap_daemon.py) y construye el reporte."""
+    scan = get_zap_daemon().scan(target_url)
+    vulnerabilities = scan.vulnerabilities
+    return {
+        "scan_type": "DAST",
+        "tool": "OWASP ZAP (daemon)",
+        "target_url": target_url,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "status": "completed",
+        "vulnerabilities": vulnerabilities,
+        "summary": {
+            "total_issues": len(vulnerabilities),
+            "critical": len([v for v in vulnerabilities if v.get('severity','').lower()=='critical']),
+            "high": len([v for v in vulnerabilities if v.get('severity','').lower()=='high']),
+            "medium": len([v for v in vulnerabilities if v.get('severity','').lower()=='medium']),
+            "low": len([v for v in vulnerabilities if v.get('severity','').lower()=='low']),
+            "scan_duration": f"{scan.duration:.1f} seconds",
+            "alerts_found": len(vulnerabilities)
+        },
+        "engine_stats": scan.stats()
+    }
+
 @app.post("/scan/dast")
-def run_dast_scan(target_url: str = Form(...), db: Session = Depends(get_db)):
+def run_dast_scan(
+    target_url: str = Form(...),
+    engine: str = Form("simulated"),
+    openapi: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
     """
-    Ejecuta un análisis DAST usando OWASP ZAP sobre la URL indicada.
+    Ejecuta un análisis DAST sobre la URL indicada.
+    
+    Con `engine=native` se usa el motor asíncrono propio (rastreo + payloads
+    SQLi, XSS, open redirect e IDOR); `engine=zap` usa el daemon de OWASP ZAP
+    compartido; `simulated` conserva los hallazgos simulados deterministas.
+    
+    `openapi` (archivo .json/.yaml o URL en localhost) sustituye el rastreo
+    por las operaciones declaradas en la especificación e implica el motor nativo.
+    
+    Los motores nativo y ZAP envían tráfico de ataque real: solo aceptan
+    hosts de HYBRIDSCAN_DAST_ALLOWED_HOSTS (por defecto, la máquina local).
     """
     logger.info(f"🔍 Iniciando escaneo DAST contra: {target_url}")
     
@@ -625,6 +1473,26 @@ def run_dast_scan(target_url: str = Form(...), db: Session = Depends(get_db)):
             detail="URL inválida - debe incluir dominio (ej: https://ejemplo.com/)"
         )
     
+    if engine not in ("simulated", "native", "zap"):
+        raise HTTPException(status_code=400, detail="Motor DAST no soportado. Use 'simulated', 'native' o 'zap'")
+    
+    spec = None
+    if openapi:
+        try:
+            spec = load_openapi(_openapi_source(openapi))
+        except OpenApiError as e:
+            # El detalle (ruta, error del parser) solo va al log
+            logger.warning(f"⚠️ Especificación OpenAPI rechazada: {e}")
+            raise HTTPException(status_code=400, detail="Especificación OpenAPI inválida o no permitida")
+        engine = "native"
+    
+    if engine in ("native", "zap") and not target_allowed(target_url):
+        logger.warning(f"🚫 DAST {engine} rechazado: host {parsed.hostname} fuera de la lista permitida")
+        raise HTTPException(
+            status_code=403,
+            detail="Host no permitido para DAST activo. Configure HYBRIDSCAN_DAST_ALLOWED_HOSTS"
+        )
+    
     report_id = str(uuid.uuid4())
     
     try:
@@ -635,124 +1503,20 @@ def run_dast_scan(target_url: str = Form(...), db: Session = Depends(get_db)):
         logger.info(f"  Host: {parsed.netloc}")
         logger.info(f"  Path: {parsed.path or '/'}")
         
-        # Simular escaneo DAST con hallazgos realistas.
-        # Ahora la simulación varía de forma determinística según la URL objetivo
-        # (hash de la URL) para producir resultados reproducibles y distintos por destino.
-        seed = int(hashlib.md5(target_url.encode('utf-8')).hexdigest()[:8], 16)
-
-        # Plantillas de hallazgos posibles
-        vuln_templates = [
-            {
-                "type": "Cross-Site Scripting (XSS)",
-                "alert": "Cross-Site Scripting (XSS)",
-                "severity": "HIGH",
-                "risk": "High",
-                "confidence": "Medium",
-                "parameter": "q",
-                "description": "Cross-site Scripting (XSS) is a type of injection attack where malicious scripts are injected into otherwise benign and trusted websites. XSS attacks occur when an attacker uses a web application to send malicious code to a different end user. The attacker could use XSS to send a malicious script to an unsuspecting user, which can access cookies, session tokens, or other sensitive information retained by the browser.",
-                "solution": "Validate all input and encode output before rendering it. Use Content Security Policy (CSP) headers. Implement proper input sanitization and output encoding using framework-specific functions.",
-                "evidence": "Unvalidated user input reflected in response",
-                "cwe": "CWE-79",
-                "cweid": "79"
-            },
-            {
-                "type": "SQL Injection",
-                "alert": "SQL Injection",
-                "severity": "CRITICAL",
-                "risk": "Critical",
-                "confidence": "High",
-                "parameter": "id",
-                "description": "SQL injection is a web security vulnerability that allows an attacker to interfere with the queries that an application makes to its database. It generally allows an attacker to view data that they are not normally able to retrieve, such as data belonging to other users, or any other data that the application itself is able to access. SQL injection can also allow attackers to modify or delete data, causing persistent changes to the application's content or behavior.",
-                "solution": "Use prepared statements with parameterized queries. Use stored procedures. Validate input using whitelist validation. Escape all user supplied input. Implement least privilege principle for database accounts.",
-                "evidence": "SQL syntax patterns detected in error messages",
-                "cwe": "CWE-89",
-                "cweid": "89"
-            },
-            {
-                "type": "Insecure Direct Object Reference (IDOR)",
-                "alert": "Insecure Direct Object Reference",
-                "severity": "MEDIUM",
-                "risk": "Medium",
-                "confidence": "Medium",
-                "parameter": "user_id",
-                "description": "Insecure Direct Object References (IDOR) occur when an application provides direct access to objects based on user-supplied input. As a result of this vulnerability attackers can bypass authorization and access resources in the system directly, for example database records or files. Insecure Direct Object References allow attackers to bypass authorization and access resources directly by modifying the value of a parameter used to directly point to an object.",
-                "solution": "Implement access control checks for all object references. Use indirect reference maps (e.g., temporary session-specific reference IDs). Verify user authorization before granting access to requested objects. Never expose internal object references directly in URLs or form parameters.",
-                "evidence": "Predictable sequential IDs in URLs",
-                "cwe": "CWE-639",
-                "cweid": "639"
-            },
-            {
-                "type": "Missing Security Headers",
-                "alert": "Missing Security Headers",
-                "severity": "MEDIUM",
-                "risk": "Medium",
-                "confidence": "High",
-                "parameter": "HTTP Headers",
-                "description": "The application is missing important security headers that help protect against common web vulnerabilities. Security headers provide an additional layer of defense against attacks like XSS, clickjacking, MIME-sniffing, and other code injection attacks. Modern browsers use these headers to enhance security and protect users.",
-                "solution": "Implement the following security headers: Content-Security-Policy (CSP) to prevent XSS attacks, X-Frame-Options to prevent clickjacking, X-Content-Type-Options to prevent MIME-sniffing, Strict-Transport-Security (HSTS) to enforce HTTPS, and Referrer-Policy to control referrer information.",
-                "evidence": "Missing Content-Security-Policy, X-Frame-Options headers",
-                "cwe": "CWE-693",
-                "cweid": "693"
-            },
-            {
-                "type": "Open Redirect",
-                "alert": "Open Redirect",
-                "severity": "LOW",
-                "risk": "Low",
-                "confidence": "Low",
-                "parameter": "next",
-                "description": "Open redirect vulnerabilities occur when a web application accepts a user-controlled input that specifies a link to an external site, and uses that link in a redirect. This behavior can be leveraged to facilitate phishing attacks against users of the application. The attacker can construct a URL that redirects to a malicious site that appears to be a legitimate part of the original domain.",
-                "solution": "Avoid using redirects and forwards. If redirects are necessary, validate the URL against a whitelist of allowed destinations. Do not include user-controllable parameters in redirect URLs. Use relative URLs for internal redirects.",
-                "evidence": "Unvalidated redirect parameter",
-                "cwe": "CWE-601",
-                "cweid": "601"
-            },
-            {
-                "type": "Server Information Leak",
-                "alert": "Information Disclosure",
-                "severity": "LOW",
-                "risk": "Low",
-                "confidence": "Medium",
-                "parameter": "response_headers",
-                "description": "The web server discloses sensitive information in HTTP responses, such as detailed error messages, stack traces, or version information. This information can help attackers gain intelligence about the application's internal workings, technology stack, and potential vulnerabilities. Information leakage can significantly ease the process of exploiting other vulnerabilities.",
-                "solution": "Configure custom error pages that don't reveal sensitive information. Disable detailed error messages in production environments. Remove or obfuscate server version headers. Implement proper error handling and logging that separates user-facing messages from internal debugging information.",
-                "evidence": "Stack trace exposed in error response",
-                "cwe": "CWE-200",
-                "cweid": "200"
-            }
-        ]
-
-        # Determinar cuántos hallazgos generar (entre 1 y len(vuln_templates)) basado en seed
-        num_candidates = len(vuln_templates)
-        chosen_count = 1 + (seed % num_candidates)
-
-        vulnerabilities = []
-        for i in range(chosen_count):
-            t = vuln_templates[(seed + i) % num_candidates].copy()
-            # Ajustar la URL y el parámetro objetivo para cada hallazgo
-            path_map = ["/search", "/user", "/profile", "", "/redirect", "/debug"]
-            t['url'] = f"{target_url}{path_map[(seed + i) % len(path_map)]}"
-            # Add a bit of variation in evidence text using seed
-            t['evidence'] = t.get('evidence', '') + f" (source: {hex((seed + i) & 0xffffffff)})"
-            vulnerabilities.append(t)
-
-        dast_findings = {
-            "scan_type": "DAST",
-            "tool": "OWASP ZAP (simulated)",
-            "target_url": target_url,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "status": "completed",
-            "vulnerabilities": vulnerabilities,
-            "summary": {
-                "total_issues": len(vulnerabilities),
-                "critical": len([v for v in vulnerabilities if v.get('severity','').lower()=='critical']),
-                "high": len([v for v in vulnerabilities if v.get('severity','').lower()=='high']),
-                "medium": len([v for v in vulnerabilities if v.get('severity','').lower()=='medium']),
-                "low": len([v for v in vulnerabilities if v.get('severity','').lower()=='low']),
-                "scan_duration": f"{30 + (seed % 60)} seconds",
-                "alerts_found": len(vulnerabilities)
-            }
-        }
+        if engine == "native":
+            dast_findings = _native_dast_findings(target_url, spec)
+            tool_name = "native-dast"
+        elif engine == "zap":
+            try:
+                dast_findings = _zap_dast_findings(target_url)
+            except ZapUnavailableError as e:
+                raise HTTPException(status_code=503, detail=str(e))
+            except ZapError as e:
+                raise HTTPException(status_code=502, detail=f"Error en el escaneo ZAP: {e}")
+            tool_name = "OWASP ZAP"
+        else:
+            dast_findings = _simulated_dast_findings(target_url)
+            tool_name = "OWASP ZAP"
         
         # Guardar reporte en archivo
         with open(report_path, 'w') as f:
@@ -763,7 +1527,7 @@ def run_dast_scan(target_url: str = Form(...), db: Session = Depends(get_db)):
         # Crear registro en BD
         scan_result = ScanResult(
             scan_type="DAST",
-            tool="OWASP ZAP",
+            tool=tool_name,
             target=target_url,
             status="completed",
             result_path=report_path,
@@ -772,21 +1536,27 @@ def run_dast_scan(target_url: str = Form(...), db: Session = Depends(get_db)):
         db.add(scan_result)
         db.commit()
         db.refresh(scan_result)
+        _index_findings(db, scan_result)
+        db.commit()
         
         logger.info(f"✓ Registro en BD creado con ID: {scan_result.id}")
         
         return {
             "id": scan_result.id,
             "scan_type": "DAST",
-            "tool": "OWASP ZAP",
+            "tool": tool_name,
             "target_url": target_url,
             "status": "completed",
             "vulnerabilities": dast_findings["vulnerabilities"],
             "summary": dast_findings["summary"],
+            "engine_stats": dast_findings.get("engine_stats"),
+            "route_table": dast_findings.get("route_table"),
             "report_path": report_path,
             "message": "Análisis DAST completado exitosamente"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error en escaneo DAST: {str(e)}")
         raise HTTPException(
@@ -794,90 +1564,58 @@ def run_dast_scan(target_url: str = Form(...), db: Session = Depends(get_db)):
             detail=f"Error ejecutando análisis DAST: {str(e)}"
         )
 
-def _map_bandit_to_vulnerability(bandit_issue: dict, file_path: str) -> Vulnerability:
-    """Mapea hallazgo de Bandit a clase Vulnerability para correlación"""
-    # Mapear severidad de Bandit (HIGH/MEDIUM/LOW) a ConfidenceLevel
-    severity_map = {
-        'HIGH': ConfidenceLevel.HIGH,
-        'MEDIUM': ConfidenceLevel.MEDIUM,
-        'LOW': ConfidenceLevel.LOW,
-        'CRITICAL': ConfidenceLevel.CRITICAL
-    }
-    severity_str = bandit_issue.get('issue_severity', 'LOW').upper()
-    severity = severity_map.get(severity_str, ConfidenceLevel.LOW)
-    
-    # Mapear CWE ID
-    cwe_info = bandit_issue.get('issue_cwe', {})
-    cwe_id = f"CWE-{cwe_info.get('id', '0')}" if isinstance(cwe_info, dict) else "CWE-0"
-    
-    # Determinar tipo de vulnerabilidad basado en test_id
-    test_id = bandit_issue.get('test_id', '')
-    vuln_type = VulnerabilityType.SECURITY_MISCONFIG  # default
-    
-    if 'B201' in test_id or 'B608' in test_id:
-        vuln_type = VulnerabilityType.SQL_INJECTION
-    elif 'B105' in test_id or 'B106' in test_id:
-        vuln_type = VulnerabilityType.SENSITIVE_DATA
-    elif 'B605' in test_id or 'B602' in test_id:
-        vuln_type = VulnerabilityType.BROKEN_ACCESS
-    
-    # Extraer endpoint del file_path (simplificado)
-    endpoint = f"/api/{Path(file_path).stem}" if file_path else "/unknown"
-    
-    return Vulnerability(
-        id=f"SAST_{bandit_issue.get('test_id', 'UNKNOWN')}_{bandit_issue.get('line_number', 0)}",
-        type=vuln_type,
-        severity=severity,
-        file_path=file_path,
-        line_number=bandit_issue.get('line_number', 0),
-        endpoint=endpoint,
-        description=bandit_issue.get('issue_text', 'No description'),
-        cwe_id=cwe_id,
-        owasp_category="",  # Se puede mapear desde CWE
-        source_tool="bandit"
-    )
+def _scan_finding_rows(db: Session, scan_result) -> list:
+    """Filas de `findings` de un escaneo; los escaneos anteriores a la tabla se indexan al primer uso."""
+    query = db.query(Finding).filter(Finding.scan_id == scan_result.id).order_by(Finding.id)
+    rows = query.all()
+    if not rows and _index_findings(db, scan_result):
+        db.commit()
+        rows = query.all()
+    return rows
+
+# Severidad canónica -> nivel del motor de correlación
+SEVERITY_CONFIDENCE = {
+    "critical": ConfidenceLevel.CRITICAL,
+    "high": ConfidenceLevel.HIGH,
+    "medium": ConfidenceLevel.MEDIUM,
+    "low": ConfidenceLevel.LOW,
+    "info": ConfidenceLevel.LOW
+}
+
+def _finding_to_vulnerability(row, target_file: str) -> Vulnerability:
+    """
+    Mapea una fila de `findings` (ya normalizada en la ingesta) a Vulnerability.
 
-def _map_zap_to_vulnerability(zap_alert: dict) -> Vulnerability:
-    """Mapea alerta de ZAP a clase Vulnerability para correlación"""
-    # Mapear severidad de ZAP
-    severity_map = {
-        'CRITICAL': ConfidenceLevel.CRITICAL,
-        'HIGH': ConfidenceLevel.HIGH,
-        'MEDIUM': ConfidenceLevel.MEDIUM,
-        'LOW': ConfidenceLevel.LOW
+    Las filas anteriores a la columna `vuln_type` deducen el tipo con las
+    mismas tablas del normalizador.
+    """
+    vuln_type = row.vuln_type or vuln_type_for(row.cwe, row.rule_id, row.title or row.rule_id, row.scan_type)
+    common = {
+        "type": VulnerabilityType(vuln_type),
+        "severity": SEVERITY_CONFIDENCE.get(row.severity, ConfidenceLevel.LOW),
+        "cwe_id": row.cwe or "CWE-0",
+        "owasp_category": row.owasp_category or ""
     }
-    severity_str = zap_alert.get('severity', 'LOW').upper()
-    severity = severity_map.get(severity_str, ConfidenceLevel.LOW)
-    
-    # Mapear tipo de vulnerabilidad
-    alert_type = zap_alert.get('type', '').lower()
-    vuln_type = VulnerabilityType.SECURITY_MISCONFIG  # default
-    
-    if 'sql' in alert_type or 'injection' in alert_type:
-        vuln_type = VulnerabilityType.SQL_INJECTION
-    elif 'xss' in alert_type or 'script' in alert_type:
-        vuln_type = VulnerabilityType.XSS
-    elif 'auth' in alert_type or 'session' in alert_type:
-        vuln_type = VulnerabilityType.BROKEN_AUTH
-    elif 'access' in alert_type or 'idor' in alert_type:
-        vuln_type = VulnerabilityType.BROKEN_ACCESS
-    
-    # Extraer CWE
-    cwe_id = zap_alert.get('cwe', 'CWE-0')
-    if not cwe_id.startswith('CWE'):
-        cwe_id = f"CWE-{cwe_id}"
-    
+    if row.scan_type == "DAST":
+        return Vulnerability(
+            id=f"DAST_{(row.rule_id or 'UNKNOWN').replace(' ', '_')}",
+            file_path="",  # DAST no tiene file path
+            line_number=0,
+            endpoint=row.endpoint or "/",
+            description=row.description or row.rule_id or "No description",
+            source_tool="zap",
+            **common
+        )
+    # Endpoint aproximado a partir del archivo analizado
+    endpoint = f"/api/{Path(target_file).stem}" if target_file else "/unknown"
     return Vulnerability(
-        id=f"DAST_{zap_alert.get('type', 'UNKNOWN').replace(' ', '_')}",
-        type=vuln_type,
-        severity=severity,
-        file_path="",  # DAST no tiene file path
-        line_number=0,
-        endpoint=zap_alert.get('url', '/'),
-        description=zap_alert.get('evidence', zap_alert.get('type', 'No description')),
-        cwe_id=cwe_id,
-        owasp_category="",
-        source_tool="zap"
+        id=f"SAST_{row.rule_id or 'UNKNOWN'}_{row.line_number or 0}",
+        file_path=target_file,
+        line_number=row.line_number or 0,
+        endpoint=endpoint,
+        description=row.description or "No description",
+        source_tool=row.tool or "bandit",
+        **common
     )
 
 @app.post("/scan/hybrid")
@@ -904,7 +1642,7 @@ def run_hybrid_scan(
     try:
         logger.info(f"🔗 Iniciando análisis híbrido - SAST ID: {sast_scan_id}, DAST ID: {dast_scan_id}")
         
-        # Obtener resultados SAST
+        # Obtener resultados SAST (los hallazgos se leen de la tabla `findings`; `results` no se descomprime)
         sast_result = db.query(ScanResult).filter(ScanResult.id == sast_scan_id).first()
         if not sast_result or sast_result.scan_type != "SAST":
             raise HTTPException(status_code=404, detail=f"Escaneo SAST {sast_scan_id} no encontrado")
@@ -917,7 +1655,6 @@ def run_hybrid_scan(
         logger.info(f"✓ Escaneos cargados - SAST: {sast_result.tool}, DAST: {dast_result.tool}")
         
         # Parsear datos
-        sast_data = sast_result.results if isinstance(sast_result.results, dict) else json.loads(sast_result.results)
         dast_data = dast_result.results if isinstance(dast_result.results, dict) else json.loads(dast_result.results)
         
         # Inicializar motor de correlación
@@ -925,30 +1662,30 @@ def run_hybrid_scan(
         
         # Mapear hallazgos SAST a objetos Vulnerability
         sast_vulnerabilities = []
-        sast_raw = sast_data.get('results', [])
+        sast_rows = _scan_finding_rows(db, sast_result)
         target_file = sast_result.target
         
-        logger.info(f"📊 Procesando {len(sast_raw)} hallazgos SAST...")
-        for issue in sast_raw:
-            if isinstance(issue, dict):
-                try:
-                    vuln = _map_bandit_to_vulnerability(issue, target_file)
-                    sast_vulnerabilities.append(vuln)
-                except Exception as e:
-                    logger.warning(f"⚠️ Error mapeando hallazgo SAST: {e}")
+        logger.info(f"📊 Procesando {len(sast_rows)} hallazgos SAST...")
+        for row in sast_rows:
+            try:
+                sast_vulnerabilities.append(_finding_to_vulnerability(row, target_file))
+            except Exception as e:
+                logger.warning(f"⚠️ Error mapeando hallazgo SAST: {e}")
         
         # Mapear hallazgos DAST a objetos Vulnerability
         dast_vulnerabilities = []
-        dast_raw = dast_data.get('vulnerabilities', [])
+        dast_rows = _scan_finding_rows(db, dast_result)
         
-        logger.info(f"📊 Procesando {len(dast_raw)} hallazgos DAST...")
-        for alert in dast_raw:
-            if isinstance(alert, dict):
-                try:
-                    vuln = _map_zap_to_vulnerability(alert)
-                    dast_vulnerabilities.append(vuln)
-                except Exception as e:
-                    logger.warning(f"⚠️ Error mapeando hallazgo DAST: {e}")
+        logger.info(f"📊 Procesando {len(dast_rows)} hallazgos DAST...")
+        for row in dast_rows:
+            try:
+                dast_vulnerabilities.append(_finding_to_vulnerability(row, target_file))
+            except Exception as e:
+                logger.warning(f"⚠️ Error mapeando hallazgo DAST: {e}")
+        
+        # Tabla de rutas OpenAPI del escaneo DAST: uniones exactas por endpoint
+        if dast_data.get('route_table'):
+            correlator.set_route_table(dast_data['route_table'])
         
         # Agregar hallazgos al correlador
         correlator.add_sast_findings(sast_vulnerabilities)
@@ -1017,11 +1754,112 @@ def run_hybrid_scan(
         logger.error(f"❌ {error_msg}")
         raise HTTPException(status_code=500, detail=error_msg)
 
+def _start_upload_quick_scan(db: Session, file_path: Path, background_tasks: BackgroundTasks) -> dict:
+    """
+    Análisis rápido en proceso del archivo subido y escaneo completo en segundo plano.
+
+    Los hallazgos preliminares se guardan en un ScanResult SAST con estado
+    `running`; la tarea en segundo plano ejecuta la herramienta completa y
+    reemplaza esos resultados al terminar.
+    """
+    quick = quick_scan_file(file_path)
+    scan_plan = detect_and_plan(file_path, requested_tools=("bandit", "semgrep"))
+    tool = scan_plan.tools[0] if scan_plan.tools else None
+
+    sast_scan = ScanResult(
+        scan_type="SAST",
+        tool=tool or "quick_scan",
+        target=str(file_path),
+        status="running",
+        timestamp=datetime.now(timezone.utc)
+    )
+    db.add(sast_scan)
+    db.commit()
+    db.refresh(sast_scan)
+    update_scan_result(sast_scan, quick, "running" if tool else "preliminary",
+                       metadata={"stack_detection": scan_plan.to_dict()})
+    _index_findings(db, sast_scan)
+    db.commit()
+
+    if tool:
+        # Sesión propia ligada al mismo motor: la de la petición se cierra al responder
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+        background_tasks.add_task(
+            _complete_upload_scan, session_factory, sast_scan.id, file_path, tool,
+            list(scan_plan.semgrep_packs), sorted(scan_plan.profile.detected_languages)
+        )
+
+    return {
+        "sast_scan_id": sast_scan.id,
+        "findings": quick["results"],
+        "vulnerabilities_found": len(quick["results"]),
+        "elapsed_ms": quick["quick_scan"]["elapsed_ms"],
+        "preliminary": True,
+        "full_scan_tool": tool
+    }
+
+def _complete_upload_scan(session_factory, scan_id: int, file_path: Path, tool: str,
+                          semgrep_packs: list, languages: list) -> None:
+    """Escaneo completo de un archivo subido; reemplaza los resultados preliminares."""
+    db = session_factory()
+    try:
+        scan_result = db.query(ScanResult).filter(ScanResult.id == scan_id).first()
+        if scan_result is None:
+            return
+        preliminary = dict(scan_result.results or {})
+        report_dir = Path(BASE_DIR) / "reports"
+        report_dir.mkdir(exist_ok=True)
+        report_path = report_dir / f"{tool}_report_{uuid.uuid4()}.json"
+        try:
+            if tool == "bandit":
+                result = _run_bandit(file_path, report_path)
+            else:
+                result = _run_semgrep(file_path, report_path,
+                                      semgrep_config_args(tuple(semgrep_packs) or ("auto",), languages=languages))
+        except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+            scan_result.limit_reason = getattr(e, "limit_reason", None)
+            update_scan_result(scan_result, preliminary, "failed", f"Escaneo completo con {tool} no disponible: {e}")
+            db.commit()
+            return
+
+        limit_reason = getattr(result, "limit_reason", None)
+        if limit_reason or result.returncode not in [0, 1] or not report_path.exists():
+            scan_result.limit_reason = limit_reason
+            error_msg = (f"Escaneo completo con {tool} falló (returncode={result.returncode}, "
+                         f"límite={limit_reason}); se conservan los resultados preliminares")
+            update_scan_result(scan_result, preliminary, "failed", error_msg)
+            db.commit()
+            return
+
+        try:
+            with open(report_path, 'r') as f:
+                scan_results = json.load(f)
+        except json.JSONDecodeError:
+            scan_results = {"results": [], "message": "Reporte generado pero JSON inválido"}
+        update_scan_result(scan_result, scan_results, "completed", metadata={
+            "stack_detection": (preliminary.get("metadata") or {}).get("stack_detection"),
+            "replaced_preliminary": len(preliminary.get("results", [])),
+            "quick_scan": preliminary.get("quick_scan")
+        })
+        scan_result.result_path = str(report_path)
+        _index_findings(db, scan_result)
+        db.commit()
+        logger.info(f"✅ Escaneo completo de subida - ID: {scan_id}, resultados preliminares reemplazados")
+    except Exception as e:
+        logger.error(f"❌ Error en escaneo completo de subida {scan_id}: {e}")
+    finally:
+        db.close()
+
 @app.post("/upload/")
-async def upload_code(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_code(background_tasks: BackgroundTasks, file: UploadFile = File(...), db: Session = Depends(get_db)):
     """
     Permite subir un archivo de código fuente para análisis.
     
+    La respuesta incluye hallazgos preliminares de un análisis rápido en
+    proceso (`quick_scan`, < 100 ms); el escaneo completo con la herramienta
+    correspondiente continúa en segundo plano y reemplaza esos resultados en
+    el ScanResult `quick_scan.sast_scan_id` al terminar.
+    
     Security Features:
     - Real file size validation (not just headers)
     - MIME type validation using magic numbers  
@@ -1084,6 +1922,15 @@ async def upload_code(file: UploadFile = File(...), db: Session = Depends(get_db
             
             logger.info(f"✅ Archivo subido exitosamente - ID: {scan_result.id}, Size: {file_info['size']} bytes")
             
+            # El análisis rápido es un extra: si falla, la subida sigue siendo válida.
+            # El recorrido del AST y sus commits van en un hilo para no bloquear el bucle de eventos
+            try:
+                quick_scan = await run_in_threadpool(_start_upload_quick_scan, db, file_path, background_tasks)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"⚠️ Análisis rápido no disponible para {safe_filename}: {e}")
+                quick_scan = None
+            
             return {
                 "message": "Archivo subido correctamente",
                 "result_id": scan_result.id,
@@ -1092,7 +1939,8 @@ async def upload_code(file: UploadFile = File(...), db: Session = Depends(get_db
                 "secure_filename": safe_filename,
                 "file_size": file_info['size'],
                 "mime_type": file_info['mime_type'],
-                "ready_for_scan": True
+                "ready_for_scan": True,
+                "quick_scan": quick_scan
             }
             
         except IOError as e:
@@ -1120,6 +1968,47 @@ def health_check():
     return {"status": "healthy", "message": "HybridSecScan API funcionando correctamente"}
 
 
+def _scan_by_public_id(db: Session, scan_id: str):
+    """
+    Busca un escaneo por ID numérico de la BD o por el UUID de su reporte.
+
+    Ambas formas usan un índice (`id` y `report_uuid`). Lanza 400 si el ID no
+    es ni entero ni UUID; devuelve None si no existe.
+    """
+    if scan_id.isdigit():
+        return db.query(ScanResult).filter(ScanResult.id == int(scan_id)).first()
+    try:
+        report_uuid = str(uuid.UUID(scan_id))
+    except ValueError:
+        logger.error(f"❌ scan_id inválido: {scan_id}")
+        raise HTTPException(status_code=400, detail="Invalid scan ID format")
+    return db.query(ScanResult).filter(ScanResult.report_uuid == report_uuid).order_by(ScanResult.id).first()
+
+def _finding_report_item(row, source: Optional[str] = None) -> dict:
+    """Fila de `findings` -> entrada de vulnerabilidad del PDF y del resumen JSON."""
+    item = {
+        'type': row.title or row.rule_id or 'Unknown',
+        'severity': row.severity or 'info',
+        'description': row.description or 'No description',
+        'cwe': row.cwe or '',
+        'recommendation': row.recommendation or '',
+        'tool': row.tool
+    }
+    if row.scan_type == "DAST":
+        item['url'] = row.endpoint or ''
+    else:
+        item.update(file=row.file_path or '', line=row.line_number or 0)
+    if source:
+        item['source'] = source
+    return item
+
+def _severity_distribution(rows) -> dict:
+    """Distribución critical/high/medium/low para el PDF (info se cuenta como low)."""
+    distribution = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+    for row in rows:
+        distribution[row.severity if row.severity in distribution else 'low'] += 1
+    return distribution
+
 @app.get("/download/pdf/{scan_id}")
 def download_pdf_report(scan_id: str, db: Session = Depends(get_db)):
     """
@@ -1140,35 +2029,24 @@ def download_pdf_report(scan_id: str, db: Session = Depends(get_db)):
     try:
         logger.info(f"📥 Generando descarga de PDF para scan_id: {scan_id}")
         
-        # Aceptar tanto IDs numéricos (ID entero de la BD) como UUIDs usados en nombres de reporte
-        scan_result = None
-        # Intentar como entero (id de la tabla)
-        try:
-            numeric_id = int(scan_id)
-            scan_result = db.query(ScanResult).filter(ScanResult.id == numeric_id).first()
-        except Exception:
-            # Si no es entero, intentar validar formato UUID y buscar por report_path que contenga el UUID
-            try:
-                _ = uuid.UUID(scan_id)
-                # Buscar primero por un campo que pueda contener ese UUID (p.ej. result_path)
-                scan_result = db.query(ScanResult).filter(ScanResult.result_path.like(f"%{scan_id}%")).first()
-            except Exception:
-                logger.error(f"❌ scan_id inválido: {scan_id}")
-                raise HTTPException(status_code=400, detail="Invalid scan ID format")
+        scan_result = _scan_by_public_id(db, scan_id)
         
         if not scan_result:
             logger.warning(f"⚠️ Escaneo no encontrado: {scan_id}")
             raise HTTPException(status_code=404, detail="Scan not found")
         
-        # Parsear datos del escaneo
-        try:
-            scan_data = json.loads(scan_result.results) if isinstance(scan_result.results, str) else scan_result.results
-        except json.JSONDecodeError:
-            logger.error(f"❌ Error al parsear JSON del escaneo: {scan_id}")
-            scan_data = {"vulnerabilities": []}
+        # Solo el reporte híbrido necesita `results` (correlaciones); los hallazgos se leen de `findings`
+        scan_data = {}
+        if scan_result.scan_type == "HYBRID":
+            try:
+                scan_data = json.loads(scan_result.results) if isinstance(scan_result.results, str) else scan_result.results
+            except json.JSONDecodeError:
+                logger.error(f"❌ Error al parsear JSON del escaneo: {scan_id}")
+            scan_data = scan_data if isinstance(scan_data, dict) else {}
+        timestamp = scan_result.created_at.isoformat() if hasattr(scan_result.created_at, 'isoformat') else str(scan_result.created_at)
         
         # CASO ESPECIAL: Escaneo HÍBRIDO con correlaciones
-        if scan_result.scan_type == "HYBRID" and 'correlation_report' in scan_data:
+        if 'correlation_report' in scan_data:
             logger.info(f"📊 Generando PDF para escaneo híbrido con correlaciones")
             corr_report = scan_data['correlation_report']
             
@@ -1176,89 +2054,23 @@ def download_pdf_report(scan_id: str, db: Session = Depends(get_db)):
             correlations = corr_report.get('correlations', [])
             summary_data = corr_report.get('summary', {})
             
-            # Obtener IDs de los escaneos originales
-            sast_id = scan_data.get('sast_scan_id')
-            dast_id = scan_data.get('dast_scan_id')
-            
             # Construir lista de vulnerabilidades: incluir TODAS (SAST + DAST + Correlaciones)
             vulnerabilities = []
+            rows = []
+            for source, source_id in (('SAST', scan_data.get('sast_scan_id')), ('DAST', scan_data.get('dast_scan_id'))):
+                source_scan = db.query(ScanResult).filter(ScanResult.id == source_id).first() if source_id else None
+                if source_scan:
+                    source_rows = _scan_finding_rows(db, source_scan)
+                    rows.extend(source_rows)
+                    vulnerabilities.extend(_finding_report_item(row, source) for row in source_rows)
             
-            # Calcular distribución de severidad real desde los datos originales
-            severity_distribution = {
-                'critical': 0,
-                'high': 0,
-                'medium': 0,
-                'low': 0
-            }
-            
-            # Agregar vulnerabilidades SAST
-            if sast_id:
-                sast_scan = db.query(ScanResult).filter(ScanResult.id == sast_id).first()
-                if sast_scan:
-                    sast_data = sast_scan.results if isinstance(sast_scan.results, dict) else json.loads(sast_scan.results)
-                    sast_vulns = sast_data.get('results', [])
-                    for vuln in sast_vulns:
-                        if isinstance(vuln, dict):
-                            sev = str(vuln.get('issue_severity', vuln.get('severity', 'low'))).upper()
-                            # Contar severidades
-                            if 'CRITICAL' in sev:
-                                severity_distribution['critical'] += 1
-                            elif 'HIGH' in sev:
-                                severity_distribution['high'] += 1
-                            elif 'MEDIUM' in sev:
-                                severity_distribution['medium'] += 1
-                            else:
-                                severity_distribution['low'] += 1
-                            
-                            vulnerabilities.append({
-                                'source': 'SAST',
-                                'tool': sast_scan.tool,
-                                'type': vuln.get('test_name', vuln.get('type', 'Unknown')),
-                                'severity': vuln.get('issue_severity', vuln.get('severity', 'low')),
-                                'file': vuln.get('filename', ''),
-                                'line': vuln.get('line_number', 0),
-                                'description': vuln.get('issue_text', vuln.get('description', 'No description')),
-                                'cwe': vuln.get('issue_cwe', {}).get('id', ''),
-                                'recommendation': vuln.get('more_info', '')
-                            })
-            
-            # Agregar vulnerabilidades DAST
-            if dast_id:
-                dast_scan = db.query(ScanResult).filter(ScanResult.id == dast_id).first()
-                if dast_scan:
-                    dast_data = dast_scan.results if isinstance(dast_scan.results, dict) else json.loads(dast_scan.results)
-                    dast_vulns = dast_data.get('vulnerabilities', [])
-                    for vuln in dast_vulns:
-                        if isinstance(vuln, dict):
-                            sev = str(vuln.get('risk', vuln.get('severity', 'low'))).upper()
-                            # Contar severidades
-                            if 'CRITICAL' in sev:
-                                severity_distribution['critical'] += 1
-                            elif 'HIGH' in sev:
-                                severity_distribution['high'] += 1
-                            elif 'MEDIUM' in sev:
-                                severity_distribution['medium'] += 1
-                            else:
-                                severity_distribution['low'] += 1
-                            
-                            vulnerabilities.append({
-                                'source': 'DAST',
-                                'tool': dast_scan.tool,
-                                'type': vuln.get('alert', vuln.get('type', 'Unknown')),
-                                'severity': vuln.get('risk', vuln.get('severity', 'low')),
-                                'url': vuln.get('url', ''),
-                                'description': vuln.get('description', 'No description'),
-                                'solution': vuln.get('solution', ''),
-                                'cwe': vuln.get('cweid', '')
-                            })
-            
-            # Usar la distribución de severidad calculada directamente desde los datos
-            summary = severity_distribution
+            # Distribución de severidad real desde los hallazgos originales
+            summary = _severity_distribution(rows)
             
             pdf_data = {
                 'scan_type': 'HYBRID',
                 'target': scan_result.target,
-                'timestamp': scan_result.created_at.isoformat() if hasattr(scan_result.created_at, 'isoformat') else str(scan_result.created_at),
+                'timestamp': timestamp,
                 'vulnerabilities': vulnerabilities,
                 'correlations': correlations,
                 'summary': summary,
@@ -1269,73 +2081,21 @@ def download_pdf_report(scan_id: str, db: Session = Depends(get_db)):
                 }
             }
         else:
-            # CASO NORMAL: SAST o DAST tradicional
-            # Construir estructura de datos para PDF
-            # Bandit usa 'results', ZAP usa 'vulnerabilities'
-            raw_vulnerabilities = scan_data.get('results', scan_data.get('vulnerabilities', [])) if isinstance(scan_data, dict) else []
-            
-            vulnerabilities = []
-            
-            # Procesar vulnerabilidades según el tipo de escaneo
-            if scan_result.scan_type == "SAST":
-                # Formato Bandit
-                for v in raw_vulnerabilities:
-                    if isinstance(v, dict):
-                        vulnerabilities.append({
-                            'type': v.get('test_name', 'Unknown'),
-                            'severity': v.get('issue_severity', 'low'),
-                            'file': v.get('filename', ''),
-                            'line': v.get('line_number', 0),
-                            'description': v.get('issue_text', 'No description'),
-                            'cwe': v.get('issue_cwe', {}).get('id', ''),
-                            'recommendation': v.get('more_info', '')
-                        })
-            else:
-                # Formato DAST (ZAP u otros)
-                for v in raw_vulnerabilities:
-                    if isinstance(v, dict):
-                        vulnerabilities.append({
-                            'type': v.get('alert', v.get('type', 'Unknown')),
-                            'severity': v.get('risk', v.get('severity', 'low')),
-                            'url': v.get('url', ''),
-                            'description': v.get('description', 'No description'),
-                            'solution': v.get('solution', ''),
-                            'cwe': v.get('cweid', '')
-                        })
-
-            # Normalizar severities
-            for v in vulnerabilities:
-                if not isinstance(v, dict):
-                    continue
-                if 'severity' not in v or not v.get('severity'):
-                    v['severity'] = 'info'
-                else:
-                    # Asegurar que severity sea string lowercase
-                    try:
-                        v['severity'] = str(v['severity']).lower()
-                    except Exception:
-                        v['severity'] = 'info'
+            # CASO NORMAL: SAST o DAST, hallazgos normalizados en la ingesta
+            rows = _scan_finding_rows(db, scan_result)
+            vulnerabilities = [_finding_report_item(row) for row in rows]
 
             # Preferir severity_breakdown calculado y almacenado en el registro (update_scan_result)
-            stored_breakdown = None
-            if isinstance(scan_data, dict):
-                stored_breakdown = scan_data.get('severity_breakdown') or scan_data.get('summary')
-
+            stored_breakdown = _stored_summary(scan_result).get('severity_breakdown')
             if isinstance(stored_breakdown, dict):
-                summary = {
-                    'critical': int(stored_breakdown.get('critical', 0)),
-                    'high': int(stored_breakdown.get('high', 0)),
-                    'medium': int(stored_breakdown.get('medium', 0)),
-                    'low': int(stored_breakdown.get('low', 0)),
-                }
+                summary = {key: int(stored_breakdown.get(key, 0)) for key in ('critical', 'high', 'medium', 'low')}
             else:
-                # Si no hay breakdown guardado, calcularlo desde la lista de vulnerabilidades
-                summary = _calculate_severity_breakdown({'vulnerabilities': vulnerabilities})
+                summary = _severity_distribution(rows)
 
             pdf_data = {
                 'scan_type': scan_result.scan_type,
                 'target': scan_result.target,
-                'timestamp': scan_result.created_at.isoformat() if hasattr(scan_result.created_at, 'isoformat') else str(scan_result.created_at),
+                'timestamp': timestamp,
                 'vulnerabilities': vulnerabilities,
                 'summary': summary
             }
@@ -1378,32 +2138,19 @@ def download_json_summary(scan_id: str, db: Session = Depends(get_db)):
     try:
         logger.info(f"📥 Generando descarga JSON para scan_id: {scan_id}")
         
-        # Aceptar tanto IDs numéricos (ID entero de la BD) como UUIDs usados en nombres de reporte
-        scan_result = None
-        try:
-            numeric_id = int(scan_id)
-            scan_result = db.query(ScanResult).filter(ScanResult.id == numeric_id).first()
-        except Exception:
-            try:
-                _ = uuid.UUID(scan_id)
-                scan_result = db.query(ScanResult).filter(ScanResult.result_path.like(f"%{scan_id}%")).first()
-            except Exception:
-                raise HTTPException(status_code=400, detail="Invalid scan ID format")
+        scan_result = _scan_by_public_id(db, scan_id)
 
         if not scan_result:
             raise HTTPException(status_code=404, detail="Scan not found")
         
-        # Parsear datos
-        try:
-            scan_data = json.loads(scan_result.results) if isinstance(scan_result.results, str) else scan_result.results
-        except json.JSONDecodeError:
-            scan_data = {"vulnerabilities": []}
+        # Hallazgos normalizados en la ingesta (los escaneos híbridos no tienen filas propias)
+        vulnerabilities = [_finding_report_item(row) for row in _scan_finding_rows(db, scan_result)]
         
         pdf_data = {
             'scan_type': scan_result.scan_type,
             'target': scan_result.target,
             'timestamp': scan_result.created_at.isoformat() if hasattr(scan_result.created_at, 'isoformat') else str(scan_result.created_at),
-            'vulnerabilities': scan_data.get('vulnerabilities', []),
+            'vulnerabilities': vulnerabilities,
             'summary': {}
         }
         
@@ -1460,7 +2207,7 @@ class UserResponse(BaseModel):
 
 
 @app.post("/auth/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register_user(user_data: UserRegister, db: AsyncDbSession = Depends(get_async_db)):
     """
     Registra un nuevo usuario en el sistema.
     
@@ -1478,9 +2225,9 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
     from backend.auth import get_password_hash
     
     # Verificar si el usuario ya existe
-    existing_user = db.query(User).filter(
+    existing_user = (await db.execute(select(User).where(
         (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    ).limit(1))).scalars().first()
     
     if existing_user:
         if existing_user.username == user_data.username:
@@ -1498,15 +2245,15 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await run_in_threadpool(get_password_hash, user_data.password),
         full_name=user_data.full_name,
         is_active=True,
         is_admin=False
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     logger.info(f"✅ Usuario registrado: {new_user.username} (ID: {new_user.id})")
     
@@ -1524,7 +2271,7 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
 @app.post("/auth/login", response_model=UserLogin)
 async def login_user(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncDbSession = Depends(get_async_db)
 ):
     """
     Autentica un usuario y devuelve un token JWT.
@@ -1539,10 +2286,13 @@ async def login_user(
     Raises:
         HTTPException: Si las credenciales son inválidas
     """
-    from backend.auth import authenticate_user, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+    from backend.auth import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
     from database.models import User
     
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = (await db.execute(select(User).where(User.username == form_data.username))).scalars().first()
+    # bcrypt es costoso en CPU: verificar fuera del bucle de eventos
+    if user and not await run_in_threadpool(verify_password, form_data.password, user.hashed_password):
+        user = None
     
     if not user:
         raise HTTPException(
@@ -1553,7 +2303,7 @@ async def login_user(
     
     # Actualizar último login
     user.last_login = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
     
     # Crear token de acceso
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -1577,10 +2327,25 @@ async def login_user(
     )
 
 
+async def get_current_active_user_async(token: str = Depends(oauth2_scheme), db: AsyncDbSession = Depends(get_async_db)):
+    """Usuario activo del token JWT, consultado con la sesión asíncrona."""
+    from database.models import User
+    
+    username = username_from_token(token)
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+
 @app.get("/auth/me", response_model=UserResponse)
-async def get_current_user_info(
-    current_user = Depends(lambda: __import__('backend.auth', fromlist=['get_current_active_user']).get_current_active_user)
-):
+async def get_current_user_info(current_user = Depends(get_current_active_user_async)):
     """
     Obtiene la información del usuario autenticado actual.
     
@@ -0,0 +1,270 @@
+"""
+Enumeración de objetivos DAST a partir de documentos OpenAPI/Swagger.
+
+Los servicios publican su especificación OpenAPI; en lugar de rastrear a
+ciegas, este módulo convierte cada operación (método + ruta + parámetros) en
+un punto de inyección del motor DAST nativo, con valores de ejemplo tomados
+del esquema. La misma tabla de rutas se publica al motor de correlación para
+unir hallazgos SAST y DAST por endpoint exacto.
+
+Admite OpenAPI 3.x y Swagger 2.0 en JSON o YAML, desde archivo local o desde
+una URL en localhost.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlparse
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete", "head", "options")
+
+# Hosts desde los que se permite descargar especificaciones
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+SPEC_EXTENSIONS = {".json", ".yaml", ".yml"}
+
+_MAX_REF_DEPTH = 8
+
+
+class OpenApiError(ValueError):
+    """Especificación OpenAPI no válida o no accesible."""
+
+
+@dataclass
+class ApiOperation:
+    """Operación de la API con valores de ejemplo para cada parámetro."""
+    method: str
+    path: str                                   # Plantilla de la ruta (/users/{id})
+    url: str                                    # URL concreta con parámetros de ruta sustituidos
+    operation_id: Optional[str] = None
+    query: Dict[str, str] = field(default_factory=dict)
+    body: Dict[str, Any] = field(default_factory=dict)
+    body_type: Optional[str] = None             # "form" o "json"
+    path_params: Dict[str, str] = field(default_factory=dict)
+    tags: List[str] = field(default_factory=list)
+    route: str = ""                             # Plantilla con el prefijo de la URL base (/api/v1/users/{id})
+
+
+def load_openapi(source: str, timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    Carga una especificación desde un archivo local o una URL en localhost.
+
+    Raises:
+        OpenApiError: Si el origen no está permitido o el documento no es válido
+    """
+    parsed = urlparse(source)
+    if parsed.scheme in ("http", "https"):
+        if (parsed.hostname or "").lower() not in LOCAL_HOSTS:
+            raise OpenApiError("Solo se admiten especificaciones OpenAPI servidas desde localhost")
+        import httpx
+        try:
+            response = httpx.get(source, timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise OpenApiError(f"No se pudo descargar la especificación: {e}")
+        text = response.text
+    else:
+        path = Path(source)
+        if path.suffix.lower() not in SPEC_EXTENSIONS:
+            raise OpenApiError("La especificación debe ser un archivo .json, .yaml o .yml")
+        if not path.is_file():
+            raise OpenApiError("No existe la especificación")
+        text = path.read_text(encoding="utf-8")
+
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        if not YAML_AVAILABLE:
+            raise OpenApiError("Se requiere PyYAML para especificaciones en YAML (pip install pyyaml)")
+        try:
+            document = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise OpenApiError(f"YAML inválido: {e}")
+
+    if not isinstance(document, dict) or not isinstance(document.get("paths"), dict):
+        raise OpenApiError("El documento no contiene 'paths'")
+    if not (str(document.get("openapi", "")).startswith("3") or str(document.get("swagger", "")) == "2.0"):
+        raise OpenApiError("Versión no soportada: se esperaba OpenAPI 3.x o Swagger 2.0")
+    return document
+
+
+def _resolve(spec: Dict[str, Any], node: Any, depth: int = 0) -> Any:
+    """Resuelve referencias locales `$ref` (#/components/..., #/definitions/...)."""
+    while isinstance(node, dict) and "$ref" in node and depth < _MAX_REF_DEPTH:
+        ref = node["$ref"]
+        if not ref.startswith("#/"):
+            return {}
+        target: Any = spec
+        for part in ref[2:].split("/"):
+            target = target.get(part.replace("~1", "/").replace("~0", "~"), {}) if isinstance(target, dict) else {}
+        node = target
+        depth += 1
+    return node
+
+
+def sample_value(spec: Dict[str, Any], schema: Any, depth: int = 0) -> Any:
+    """Valor de ejemplo para un esquema (example, default, enum o según el tipo)."""
+    schema = _resolve(spec, schema or {})
+    if not isinstance(schema, dict):
+        return "test"
+    for key in ("example", "default"):
+        if key in schema:
+            return schema[key]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for combinator in ("allOf", "oneOf", "anyOf"):
+        if schema.get(combinator):
+            return sample_value(spec, schema[combinator][0], depth + 1)
+
+    kind = schema.get("type")
+    fmt = schema.get("format", "")
+    if kind in ("integer", "number"):
+        return max(1, schema.get("minimum", 1))
+    if kind == "boolean":
+        return True
+    if kind == "array":
+        return [sample_value(spec, schema.get("items"), depth + 1)] if depth < _MAX_REF_DEPTH else []
+    if kind == "object" or "properties" in schema:
+        if depth >= _MAX_REF_DEPTH:
+            return {}
+        return {name: sample_value(spec, prop, depth + 1) for name, prop in (schema.get("properties") or {}).items()}
+    if fmt == "uuid":
+        return "00000000-0000-4000-8000-000000000001"
+    if fmt == "email":
+        return "test@example.com"
+    if fmt == "date":
+        return "2024-01-01"
+    if fmt == "date-time":
+        return "2024-01-01T00:00:00Z"
+    return "test"
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _base_url(spec: Dict[str, Any], target_url: str) -> str:
+    """Origen del objetivo más el prefijo de ruta declarado por la especificación."""
+    target = urlparse(target_url)
+    if spec.get("swagger") == "2.0":
+        prefix = spec.get("basePath") or ""
+    else:
+        servers = spec.get("servers") or [{}]
+        prefix = urlparse(urljoin(target_url, servers[0].get("url") or "")).path
+    # Si la URL objetivo ya incluye una ruta, tiene prioridad sobre la de la especificación
+    if target.path.strip("/"):
+        prefix = target.path
+    return f"{target.scheme}://{target.netloc}{'/' + prefix.strip('/') if prefix.strip('/') else ''}"
+
+
+def enumerate_operations(spec: Dict[str, Any], target_url: str) -> List[ApiOperation]:
+    """
+    Lista todas las operaciones de la especificación con valores de ejemplo.
+
+    Args:
+        spec: Documento OpenAPI 3.x o Swagger 2.0 ya cargado
+        target_url: URL del servicio a analizar (su origen sustituye a `servers`)
+
+    Returns:
+        Operaciones ordenadas por ruta y método
+    """
+    base = _base_url(spec, target_url)
+    operations: List[ApiOperation] = []
+
+    for path, path_item in spec.get("paths", {}).items():
+        path_item = _resolve(spec, path_item)
+        if not isinstance(path_item, dict):
+            continue
+        shared_params = path_item.get("parameters") or []
+        for method in HTTP_METHODS:
+            op = path_item.get(method)
+            if not isinstance(op, dict):
+                continue
+
+            operation = ApiOperation(
+                method=method.upper(), path=path, url="",
+                operation_id=op.get("operationId"), tags=list(op.get("tags") or [])
+            )
+            # Los parámetros de la operación sustituyen a los compartidos con el mismo (name, in)
+            params: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            for raw in list(shared_params) + list(op.get("parameters") or []):
+                param = _resolve(spec, raw)
+                if isinstance(param, dict) and param.get("name"):
+                    params[(param["name"], param.get("in", "query"))] = param
+
+            for (name, location), param in params.items():
+                schema = param.get("schema") or {k: v for k, v in param.items() if k in ("type", "format", "enum", "default", "items")}
+                value = param["example"] if "example" in param else sample_value(spec, schema)
+                if location == "path":
+                    operation.path_params[name] = _as_text(value)
+                elif location == "query":
+                    operation.query[name] = _as_text(value)
+                elif location == "formData":
+                    operation.body[name] = _as_text(value)
+                    operation.body_type = "form"
+                elif location == "body":
+                    body = sample_value(spec, param.get("schema"))
+                    if isinstance(body, dict):
+                        operation.body.update(body)
+                        operation.body_type = "json"
+
+            request_body = _resolve(spec, op.get("requestBody") or {})
+            content = request_body.get("content") or {} if isinstance(request_body, dict) else {}
+            for media_type, body_type in (("application/json", "json"),
+                                          ("application/x-www-form-urlencoded", "form"),
+                                          ("multipart/form-data", "form")):
+                if media_type in content:
+                    body = sample_value(spec, (content[media_type] or {}).get("schema"))
+                    if isinstance(body, dict):
+                        operation.body.update(body if body_type == "json" else {k: _as_text(v) for k, v in body.items()})
+                        operation.body_type = body_type
+                    break
+
+            concrete = path
+            for name, value in operation.path_params.items():
+                concrete = concrete.replace("{" + name + "}", quote(value, safe=""))
+            operation.url = base + concrete
+            operation.route = urlparse(base).path + path
+            operations.append(operation)
+
+    operations.sort(key=lambda o: (o.path, o.method))
+    return operations
+
+
+def route_regex(path: str) -> str:
+    """Expresión regular que reconoce rutas concretas de una plantilla OpenAPI."""
+    parts = re.split(r"(\{[^}/]+\})", path)
+    pattern = "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts if part)
+    return f"^{pattern.rstrip('/')}/?$"
+
+
+def route_table(operations: List[ApiOperation]) -> List[Dict[str, Any]]:
+    """
+    Tabla de rutas para el motor de correlación.
+
+    Cada entrada contiene método, plantilla de ruta completa (con el prefijo
+    de la URL base), operationId, tags y la expresión regular que reconoce
+    las rutas concretas.
+    """
+    return [
+        {
+            "method": operation.method,
+            "path": operation.route,
+            "operation_id": operation.operation_id,
+            "tags": operation.tags,
+            "regex": route_regex(operation.route)
+        }
+        for operation in operations
+    ]
@@ -0,0 +1,113 @@
+"""
+Paginación por cursor (keyset) para listados grandes.
+
+`OFFSET` obliga a la base de datos a recorrer y descartar todas las filas
+anteriores, y su coste crece con cada página. Con keyset el cursor guarda la
+última clave devuelta (`created_at`, `id`) y la página siguiente empieza con
+`WHERE (created_at, id) < cursor`, que resuelve el índice compuesto
+`ix_scan_results_created_at_id` sin importar la profundidad.
+
+El cursor es opaco para el cliente: base64 URL-safe de `<iso created_at>|<id>`.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginación mal formado."""
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    raw = f"{created_at.isoformat() if created_at else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """(created_at, id) codificados en el cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, id_raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 1)
+        return (datetime.fromisoformat(created_raw) if created_raw else None), int(id_raw)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise InvalidCursorError(f"Cursor de paginación no válido: {cursor!r}")
+
+
+def encode_rank_cursor(rank: float, row_id: int, window_start: int = 0) -> str:
+    """
+    Cursor de listados ordenados por relevancia: `<rank>|<id>|<inicio de ventana>`.
+
+    `repr` conserva el float exacto; el inicio de ventana fija el conjunto
+    ordenado entre páginas (ver database/finding_search.py).
+    """
+    raw = f"{rank!r}|{row_id}|{window_start}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int, int]:
+    """(rank, id, inicio de ventana) codificados en el cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank_raw, id_raw, window_raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 2)
+        return float(rank_raw), int(id_raw), int(window_raw)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise InvalidCursorError(f"Cursor de paginación no válido: {cursor!r}")
+
+
+def keyset_filter(statement, created_col, id_col, cursor: Optional[str]):
+    """
+    Aplica a `statement` (Query o Select) la condición del cursor y el orden descendente.
+
+    Raises:
+        InvalidCursorError: Si el cursor no se puede decodificar
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            # Filas sin fecha: van al final del orden descendente y se paginan solo por id
+            statement = statement.filter(created_col.is_(None), id_col < row_id)
+        else:
+            statement = statement.filter(or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id),
+                created_col.is_(None)
+            ))
+    return statement.order_by(created_col.desc(), id_col.desc())
+
+
+def split_page(rows: List[Any], created_col, id_col, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Separa la fila extra pedida (`limit + 1`) y calcula el cursor de la página siguiente."""
+    # Una fila extra indica si existe página siguiente sin un COUNT(*)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+
+def keyset_page(query, created_col, id_col, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Página de `query` en orden descendente por (created_at, id).
+
+    Args:
+        query: Consulta ya filtrada (puede seleccionar solo algunas columnas)
+        created_col: Columna de fecha de creación
+        id_col: Columna de clave primaria
+        cursor: Cursor devuelto por la página anterior, o None para la primera
+        limit: Tamaño de página
+
+    Returns:
+        Tupla (filas, cursor de la página siguiente o None si no hay más)
+
+    Raises:
+        InvalidCursorError: Si el cursor no se puede decodificar
+    """
+    rows = keyset_filter(query, created_col, id_col, cursor).limit(limit + 1).all()
+    return split_page(rows, created_col, id_col, limit)
@@ -0,0 +1,271 @@
+"""
+Análisis rápido en proceso para respuesta inmediata tras `/upload/`.
+
+Un escaneo completo con Bandit en subproceso tarda segundos; este módulo
+recorre el AST de Python una sola vez y devuelve hallazgos preliminares en
+milisegundos. Las reglas son:
+
+- un conjunto propio pequeño (SQL construido con strings, eval/exec, secretos
+  en el código, subprocess con shell=True, os.system), con los mismos test_id
+  que Bandit para que el resultado completo los sustituya sin cambiar de formato,
+- los `sast_indicators` de `VulnerabilityCorrelator._load_correlation_rules`,
+  que marcan llamadas o atributos sospechosos con severidad baja.
+
+Para archivos que no son Python solo se aplican los indicadores, por línea.
+Los hallazgos llevan `preliminary: True`; el escaneo completo en segundo plano
+reemplaza el resultado cuando termina.
+"""
+
+import ast
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from backend.correlation_engine import VulnerabilityCorrelator
+except ImportError:
+    from correlation_engine import VulnerabilityCorrelator
+
+logger = logging.getLogger(__name__)
+
+# Tamaño máximo analizado; archivos mayores se dejan al escaneo completo
+QUICK_SCAN_MAX_BYTES = 1024 * 1024
+
+SQL_KEYWORDS = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|WITH)\b", re.IGNORECASE)
+SECRET_NAMES = re.compile(r"(pass(word|wd)?|pwd|secret|token|api_?key|private_?key|credential)s?$", re.IGNORECASE)
+SQL_SINKS = {"execute", "executemany", "executescript", "raw", "query"}
+SHELL_FUNCTIONS = {"os.system", "os.popen", "commands.getoutput", "commands.getstatusoutput"}
+
+# Reglas propias: test_id -> (nombre, severidad, confianza, CWE, tipo de vulnerabilidad)
+QUICK_RULES = {
+    "B608": ("hardcoded_sql_expressions", "MEDIUM", "MEDIUM", 89, "sql_injection"),
+    "B307": ("eval", "MEDIUM", "HIGH", 78, "security_misconfiguration"),
+    "B102": ("exec_used", "MEDIUM", "HIGH", 78, "security_misconfiguration"),
+    "B105": ("hardcoded_password_string", "LOW", "MEDIUM", 259, "sensitive_data_exposure"),
+    "B106": ("hardcoded_password_funcarg", "LOW", "MEDIUM", 259, "sensitive_data_exposure"),
+    "B602": ("subprocess_popen_with_shell_equals_true", "HIGH", "HIGH", 78, "security_misconfiguration"),
+    "B605": ("start_process_with_a_shell", "HIGH", "HIGH", 78, "security_misconfiguration"),
+}
+
+
+def _dotted_name(node: ast.AST) -> str:
+    """Nombre con puntos de una llamada (`cursor.execute`, `subprocess.run`)."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+    elif isinstance(node, ast.Call):
+        parts.append(_dotted_name(node.func) + "()")
+    return ".".join(reversed(parts))
+
+
+def _is_string_built_sql(node: ast.AST) -> bool:
+    """Consulta SQL construida con +, %, f-string o .format()."""
+    if isinstance(node, ast.JoinedStr):
+        text = "".join(v.value for v in node.values if isinstance(v, ast.Constant) and isinstance(v.value, str))
+        return bool(SQL_KEYWORDS.match(text)) and any(isinstance(v, ast.FormattedValue) for v in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        left = node.left
+        while isinstance(left, ast.BinOp):
+            left = left.left
+        return isinstance(left, ast.Constant) and isinstance(left.value, str) and bool(SQL_KEYWORDS.match(left.value))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format":
+        base = node.func.value
+        return isinstance(base, ast.Constant) and isinstance(base.value, str) and bool(SQL_KEYWORDS.match(base.value))
+    return False
+
+
+def _secret_literal(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, str) and len(node.value) >= 4
+
+
+def _target_names(target: ast.AST) -> Iterator[str]:
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, ast.Attribute):
+        yield target.attr
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for element in target.elts:
+            yield from _target_names(element)
+
+
+class _IndicatorIndex:
+    """sast_indicators de las reglas de correlación, agrupados por tipo."""
+
+    def __init__(self, rules: Dict[str, Dict[str, Any]]):
+        self.names: Dict[str, str] = {}
+        for vuln_type, rule in rules.items():
+            for indicator in rule.get("sast_indicators", []):
+                name = indicator.rstrip("(").strip()
+                if re.fullmatch(r"[A-Za-z_][\w.]*", name):
+                    self.names.setdefault(name, vuln_type)
+        if self.names:
+            alternatives = "|".join(re.escape(n) for n in sorted(self.names, key=len, reverse=True))
+            self.line_regex = re.compile(rf"(?:\.|\b)({alternatives})\s*(?:\(|=)")
+        else:
+            self.line_regex = None
+
+    def match(self, dotted: str) -> Optional[Tuple[str, str]]:
+        """(indicador, tipo) si el nombre con puntos coincide con un indicador."""
+        for name, vuln_type in self.names.items():
+            if dotted == name or dotted.endswith("." + name):
+                return name, vuln_type
+        return None
+
+
+class QuickScanner(ast.NodeVisitor):
+    """Recorrido único del AST que aplica las reglas propias y los indicadores."""
+
+    def __init__(self, filename: str, lines: List[str], indicators: _IndicatorIndex):
+        self.filename = filename
+        self.lines = lines
+        self.indicators = indicators
+        self.findings: List[Dict[str, Any]] = []
+        self._rule_lines = set()
+
+    def _code(self, line: int) -> str:
+        return self.lines[line - 1].strip() if 0 < line <= len(self.lines) else ""
+
+    def _add(self, test_id: str, node: ast.AST, text: str) -> None:
+        name, severity, confidence, cwe, vuln_type = QUICK_RULES[test_id]
+        line = getattr(node, "lineno", 0)
+        self._rule_lines.add(line)
+        self.findings.append(_finding(self.filename, line, getattr(node, "end_lineno", line) or line,
+                                      test_id, name, severity, confidence, cwe, vuln_type, text, self._code(line)))
+
+    def visit_Call(self, node: ast.Call) -> None:
+        dotted = _dotted_name(node.func)
+        short = dotted.rsplit(".", 1)[-1]
+
+        if short in SQL_SINKS and node.args and _is_string_built_sql(node.args[0]):
+            self._add("B608", node, "Possible SQL injection vector through string-based query construction.")
+        elif dotted == "eval":
+            self._add("B307", node, "Use of possibly insecure function - consider using safer ast.literal_eval.")
+        elif dotted == "exec":
+            self._add("B102", node, "Use of exec detected.")
+        elif dotted in SHELL_FUNCTIONS:
+            self._add("B605", node, "Starting a process with a shell: Seems safe, but may be changed in the future, "
+                                    "consider rewriting without shell")
+        elif any(kw.arg == "shell" and isinstance(kw.value, ast.Constant) and kw.value.value is True
+                 for kw in node.keywords):
+            self._add("B602", node, f"{dotted} call with shell=True identified, security issue.")
+
+        for kw in node.keywords:
+            if kw.arg and SECRET_NAMES.search(kw.arg) and _secret_literal(kw.value):
+                self._add("B106", kw.value, f"Possible hardcoded password: '{kw.value.value}'")
+
+        match = self.indicators.match(dotted)
+        if match and node.lineno not in self._rule_lines:
+            self._indicator(node, dotted, *match)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if _secret_literal(node.value):
+            for target in node.targets:
+                if any(SECRET_NAMES.search(name) for name in _target_names(target)):
+                    self._add("B105", node, f"Possible hardcoded password: '{node.value.value}'")
+                    break
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        # Indicadores usados como atributo (p.ej. element.innerHTML en código generado)
+        if isinstance(node.ctx, ast.Store):
+            match = self.indicators.match(node.attr)
+            if match and node.lineno not in self._rule_lines:
+                self._indicator(node, node.attr, *match)
+        self.generic_visit(node)
+
+    def _indicator(self, node: ast.AST, name: str, indicator: str, vuln_type: str) -> None:
+        line = getattr(node, "lineno", 0)
+        self.findings.append(_indicator_finding(self.filename, line, indicator, vuln_type, name, self._code(line)))
+
+
+def _finding(filename: str, line: int, end_line: int, test_id: str, name: str, severity: str, confidence: str,
+             cwe: int, vuln_type: str, text: str, code: str) -> Dict[str, Any]:
+    return {
+        "filename": filename,
+        "line_number": line,
+        "line_range": list(range(line, max(line, end_line) + 1)),
+        "test_id": test_id,
+        "test_name": name,
+        "issue_severity": severity,
+        "issue_confidence": confidence,
+        "issue_cwe": {"id": cwe, "link": f"https://cwe.mitre.org/data/definitions/{cwe}.html"},
+        "issue_text": text,
+        "code": code,
+        "vulnerability_type": vuln_type,
+        "preliminary": True
+    }
+
+
+def _indicator_finding(filename: str, line: int, indicator: str, vuln_type: str, name: str,
+                       code: str) -> Dict[str, Any]:
+    return _finding(filename, line, line, f"QS-{vuln_type}", "correlation_indicator", "LOW", "LOW", 0, vuln_type,
+                    f"Indicador de {vuln_type}: uso de '{name}' (regla de correlación '{indicator}')", code)
+
+
+_indicator_index: Optional[_IndicatorIndex] = None
+
+
+def _indicators() -> _IndicatorIndex:
+    global _indicator_index
+    if _indicator_index is None:
+        _indicator_index = _IndicatorIndex(VulnerabilityCorrelator._load_correlation_rules())
+    return _indicator_index
+
+
+def quick_scan_source(source: str, filename: str = "<upload>") -> List[Dict[str, Any]]:
+    """
+    Hallazgos preliminares de un código fuente.
+
+    Los archivos `.py` se analizan por AST; el resto (o Python con errores de
+    sintaxis, o anidado tan profundo que el AST agota la pila o la memoria)
+    solo por indicadores en cada línea.
+    """
+    lines = source.splitlines()
+    if filename.endswith(".py"):
+        try:
+            tree = ast.parse(source, filename=filename)
+            scanner = QuickScanner(filename, lines, _indicators())
+            scanner.visit(tree)
+            return sorted(scanner.findings, key=lambda f: (f["line_number"], f["test_id"]))
+        except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+            logger.debug(f"Análisis rápido por AST no disponible para {filename}: {type(e).__name__}")
+
+    index = _indicators()
+    findings = []
+    if index.line_regex is None:
+        return findings
+    for number, line in enumerate(lines, start=1):
+        for match in index.line_regex.finditer(line):
+            name = match.group(1)
+            findings.append(_indicator_finding(filename, number, name, index.names[name], name, line.strip()))
+    return findings
+
+
+def quick_scan_file(path: Path) -> Dict[str, Any]:
+    """
+    Análisis rápido de un archivo subido.
+
+    Returns:
+        Resultado en formato Bandit (`results`) con `preliminary: True` y el tiempo empleado
+    """
+    started = time.perf_counter()
+    path = Path(path)
+    if path.stat().st_size > QUICK_SCAN_MAX_BYTES:
+        findings: List[Dict[str, Any]] = []
+        skipped = True
+    else:
+        findings = quick_scan_source(path.read_text(encoding="utf-8", errors="replace"), str(path))
+        skipped = False
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"⚡ Análisis rápido de {path.name}: {len(findings)} hallazgos en {elapsed_ms:.1f}ms")
+    return {
+        "results": findings,
+        "preliminary": True,
+        "quick_scan": {"elapsed_ms": round(elapsed_ms, 2), "skipped_large_file": skipped}
+    }
@@ -0,0 +1,170 @@
+"""
+Control adaptativo de concurrencia (AIMD) para escaneos DAST.
+
+Una concurrencia fija infrautiliza objetivos rápidos o tumba servicios de
+staging frágiles. `AimdConcurrencyLimiter` ajusta el número de peticiones en
+vuelo por host como el control de congestión de TCP:
+
+- aumento aditivo: cada respuesta rápida suma 1/limit (≈ +1 por ventana),
+- disminución multiplicativa: 429/503, timeouts o un aumento de latencia
+  frente a la mejor latencia observada multiplican el límite por
+  `decrease_factor`, como mucho una vez por ventana de peticiones en vuelo,
+- `Retry-After` pausa nuevas peticiones hasta la fecha indicada.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+# Límites por defecto de peticiones en vuelo por host
+DEFAULT_INITIAL_LIMIT = int(os.getenv("HYBRIDSCAN_DAST_INITIAL_CONCURRENCY", "4"))
+DEFAULT_MIN_LIMIT = 1
+
+# Latencia considerada congestión: > tolerancia × mejor latencia y > mejor latencia + margen
+DEFAULT_LATENCY_TOLERANCE = 2.0
+LATENCY_MARGIN_SECONDS = 0.05
+
+# Pausa máxima aceptada de un Retry-After
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+# Códigos que indican sobrecarga del objetivo
+BACKOFF_STATUS_CODES = (429, 503)
+
+
+class AimdConcurrencyLimiter:
+    """
+    Limitador de peticiones en vuelo con aumento aditivo y disminución multiplicativa.
+
+    Args:
+        max_limit: Techo de peticiones simultáneas
+        initial_limit: Límite inicial
+        min_limit: Suelo del límite
+        decrease_factor: Factor multiplicativo al detectar congestión
+        latency_tolerance: Ratio de latencia sobre la mejor observada considerado congestión
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(max(self.min_limit, min(initial_limit, self.max_limit)))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.best_latency: Optional[float] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+        self._started = time.monotonic()
+        self._stats = {"completed": 0, "backoffs": 0, "throttled": 0, "timeouts": 0, "slow_responses": 0}
+        self._min_reached = self.limit
+        self._max_reached = self.limit
+
+    def _cond(self) -> asyncio.Condition:
+        # Se crea bajo demanda para ligarse al bucle de eventos que lo usa
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self) -> float:
+        """
+        Espera un hueco dentro del límite actual.
+
+        Returns:
+            Instante de inicio de la petición (para `release`)
+        """
+        cond = self._cond()
+        async with cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < int(self.limit):
+                    break
+                await cond.wait()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return time.monotonic()
+
+    async def release(self, started: float, status_code: Optional[int] = None, timed_out: bool = False,
+                      retry_after: Optional[float] = None) -> None:
+        """
+        Libera el hueco y ajusta el límite según el resultado de la petición.
+
+        Args:
+            started: Valor devuelto por `acquire`
+            status_code: Código HTTP (None si la petición falló)
+            timed_out: La petición superó el timeout
+            retry_after: Segundos indicados por la cabecera Retry-After
+        """
+        now = time.monotonic()
+        latency = now - started
+        cond = self._cond()
+        async with cond:
+            self.in_flight -= 1
+            self._stats["completed"] += 1
+
+            if timed_out:
+                self._stats["timeouts"] += 1
+                self._decrease(started)
+            elif status_code in BACKOFF_STATUS_CODES:
+                self._stats["throttled"] += 1
+                self._decrease(started)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + min(retry_after, MAX_RETRY_AFTER_SECONDS))
+            elif status_code is not None:
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+                threshold = max(self.best_latency * self.latency_tolerance, self.best_latency + LATENCY_MARGIN_SECONDS)
+                if latency > threshold:
+                    self._stats["slow_responses"] += 1
+                    self._decrease(started)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                    self._max_reached = max(self._max_reached, self.limit)
+            cond.notify_all()
+
+    def _decrease(self, started: float) -> None:
+        # Una sola disminución por ventana: ignorar señales de peticiones iniciadas antes del último recorte
+        if started < self._last_decrease:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self._last_decrease = time.monotonic()
+        self._stats["backoffs"] += 1
+        self._min_reached = min(self._min_reached, self.limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del limitador y tasa conseguida."""
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        return {
+            **self._stats,
+            "current_limit": round(self.limit, 2),
+            "min_limit_reached": round(self._min_reached, 2),
+            "max_limit_reached": round(self._max_reached, 2),
+            "peak_in_flight": self.peak_in_flight,
+            "best_latency_ms": round(self.best_latency * 1000, 2) if self.best_latency is not None else None,
+            "achieved_rps": round(self._stats["completed"] / elapsed, 2)
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos de una cabecera Retry-After numérica (las fechas HTTP se ignoran)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
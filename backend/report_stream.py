@@ -0,0 +1,295 @@
+"""
+Lectura incremental (streaming) de reportes SAST/DAST de gran tamaño.
+
+`json.load` sobre un reporte de Semgrep de un monorepo (>500 MB) dispara el
+consumo de memoria. Este módulo recorre el objeto JSON de primer nivel sin
+materializarlo: los elementos de los arrays `results` / `vulnerabilities` se
+decodifican uno a uno, el resto de valores grandes se saltan y el resumen
+(severidades, categorías OWASP) se calcula sobre la marcha. Los hallazgos
+normalizados se escriben por lotes a un sumidero, de modo que la memoria
+máxima queda acotada por el tamaño de lote y no por el del reporte.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from backend.finding_normalizer import SEVERITIES, normalize_finding, normalize_severity
+except ImportError:
+    from finding_normalizer import SEVERITIES, normalize_finding, normalize_severity
+
+# Claves de los arrays de hallazgos según la herramienta
+FINDINGS_KEYS = ("results", "vulnerabilities")
+
+# Reportes por encima de este tamaño se procesan en streaming
+STREAMING_THRESHOLD_BYTES = int(os.getenv("HYBRIDSCAN_STREAMING_THRESHOLD_BYTES", str(50 * 1024 * 1024)))
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_BATCH_SIZE = 500
+
+_WHITESPACE = " \t\r\n"
+_SPECIAL = re.compile(r'["\\\[\]{}]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_DECODER = json.JSONDecoder()
+
+
+class ReportStreamError(ValueError):
+    """El reporte no es un objeto JSON válido."""
+
+
+class _Buffer:
+    """Ventana deslizante sobre un archivo de texto leído por bloques."""
+
+    def __init__(self, fileobj, chunk_size: int):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.data = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Lee otro bloque; devuelve False al llegar al final del archivo."""
+        if self.eof:
+            return False
+        chunk = self.fileobj.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > len(self.data) // 2:
+            self.data = self.data[self.pos:]
+            self.pos = 0
+        self.data += chunk
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter significativo (saltando espacios) o '' al final."""
+        while True:
+            while self.pos < len(self.data) and self.data[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.data):
+                return self.data[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ReportStreamError(f"Se esperaba '{char}' en la posición {self.pos}")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        """Decodifica un valor JSON completo, leyendo más bloques si está incompleto."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.data, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise ReportStreamError(f"Valor JSON incompleto en la posición {self.pos}")
+                continue
+            # Un número al final del buffer podría continuar en el siguiente bloque
+            if end == len(self.data) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Salta un valor JSON sin decodificarlo (arrays/objetos de cualquier tamaño)."""
+        first = self.peek()
+        if first not in "[{":
+            self.decode_value()
+            return
+
+        depth = 0
+        in_string = False
+        while True:
+            if self.pos >= len(self.data) and not self.fill():
+                raise ReportStreamError("Reporte truncado al saltar un valor")
+            pattern = _STRING_SPECIAL if in_string else _SPECIAL
+            match = pattern.search(self.data, self.pos)
+            if match is None:
+                self.pos = len(self.data)
+                continue
+            char = match.group()
+            self.pos = match.end()
+            if char == "\\":
+                # Saltar el carácter escapado (puede estar en el siguiente bloque)
+                if self.pos >= len(self.data) and not self.fill():
+                    raise ReportStreamError("Reporte truncado tras un escape")
+                self.pos += 1
+            elif char == '"':
+                in_string = not in_string
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def iter_report(
+    path: Path,
+    keys: Sequence[str] = FINDINGS_KEYS,
+    capture: Sequence[str] = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Recorre el objeto de primer nivel de un reporte JSON.
+
+    Genera tuplas `(clave, elemento)` por cada elemento de los arrays en
+    `keys`, y `(clave, valor)` para las claves en `capture` (valores pequeños
+    como `errors` o `summary`). El resto de claves se saltan sin decodificar.
+
+    Args:
+        path: Ruta del reporte
+        keys: Claves de arrays a recorrer elemento a elemento
+        capture: Claves cuyo valor completo se decodifica
+        chunk_size: Tamaño de bloque de lectura
+
+    Raises:
+        ReportStreamError: Si el reporte no es un objeto JSON válido
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buf = _Buffer(f, chunk_size)
+        buf.expect("{")
+        if buf.peek() == "}":
+            return
+        while True:
+            key = buf.decode_value()
+            if not isinstance(key, str):
+                raise ReportStreamError("Clave de objeto no válida")
+            buf.expect(":")
+            if key in keys and buf.peek() == "[":
+                buf.pos += 1
+                if buf.peek() == "]":
+                    buf.pos += 1
+                else:
+                    while True:
+                        yield key, buf.decode_value()
+                        nxt = buf.peek()
+                        buf.pos += 1
+                        if nxt == "]":
+                            break
+                        if nxt != ",":
+                            raise ReportStreamError(f"Se esperaba ',' o ']' en la posición {buf.pos}")
+            elif key in capture:
+                yield key, buf.decode_value()
+            else:
+                buf.skip_value()
+
+            nxt = buf.peek()
+            buf.pos += 1
+            if nxt == "}":
+                return
+            if nxt != ",":
+                raise ReportStreamError(f"Se esperaba ',' o '}}' en la posición {buf.pos}")
+
+
+class ReportSummary:
+    """
+    Acumulador de resumen de hallazgos en una sola pasada.
+
+    Calcula a la vez la distribución de severidades y las categorías OWASP a
+    partir de los registros canónicos (`finding_normalizer`);
+    `update_scan_result` lo usa tanto para reportes cargados en memoria como
+    para reportes procesados en streaming.
+    """
+
+    normalize_severity = staticmethod(normalize_severity)
+
+    def __init__(self, tool: Optional[str] = None, scan_type: Optional[str] = None):
+        self.tool = tool
+        self.scan_type = scan_type
+        self.total = 0
+        self.severity_breakdown = dict.fromkeys(SEVERITIES, 0)
+        self.owasp_categories = set()
+
+    def add(self, vuln: Any) -> Optional[Dict[str, Any]]:
+        """Normaliza y cuenta un hallazgo bruto; devuelve su registro canónico."""
+        if not isinstance(vuln, dict):
+            self.total += 1
+            return None
+        record = normalize_finding(vuln, self.tool, self.scan_type)
+        self.add_record(record)
+        return record
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """Cuenta un hallazgo ya normalizado."""
+        self.total += 1
+        self.severity_breakdown[record["severity"]] += 1
+        if record["owasp_category"]:
+            self.owasp_categories.add(record["owasp_category"])
+
+    def add_all(self, items: Iterable[Any]) -> "ReportSummary":
+        for item in items:
+            self.add(item)
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "vulnerabilities_found": self.total,
+            "severity_breakdown": dict(self.severity_breakdown),
+            "owasp_categories_detected": sorted(self.owasp_categories)
+        }
+
+
+def stream_report(
+    path: Path,
+    tool: str,
+    sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    capture: Sequence[str] = ("errors", "summary")
+) -> Dict[str, Any]:
+    """
+    Procesa un reporte en streaming: resumen sobre la marcha y hallazgos normalizados por lotes.
+
+    Args:
+        path: Ruta del reporte JSON
+        tool: Herramienta que generó el reporte
+        sink: Función que recibe cada lote de hallazgos normalizados
+        batch_size: Tamaño de lote
+        capture: Claves pequeñas a conservar completas (p.ej. `errors`)
+
+    Returns:
+        Diccionario con el resumen (`vulnerabilities_found`,
+        `severity_breakdown`, `owasp_categories_detected`) y las claves capturadas
+    """
+    summary = ReportSummary(tool)
+    captured: Dict[str, Any] = {}
+    batch: List[Dict[str, Any]] = []
+
+    for key, value in iter_report(path, FINDINGS_KEYS, capture):
+        if key in FINDINGS_KEYS:
+            record = summary.add(value)
+            if sink is not None and record is not None:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    sink(batch)
+                    batch = []
+        else:
+            captured[key] = value
+
+    if sink is not None and batch:
+        sink(batch)
+
+    return {**summary.as_dict(), "captured": captured}
+
+
+def iter_findings(results: Dict[str, Any], report_path: Optional[str] = None) -> Iterator[Any]:
+    """
+    Itera los hallazgos brutos de un resultado almacenado.
+
+    Para escaneos procesados en streaming (`streamed=True`) los hallazgos no
+    se guardan en la base de datos y se leen de nuevo del reporte original.
+    """
+    if results.get("streamed") and report_path and Path(report_path).exists():
+        for _key, item in iter_report(Path(report_path)):
+            yield item
+        return
+    for key in FINDINGS_KEYS:
+        if key in results:
+            items = results.get(key) or []
+            yield from items if isinstance(items, list) else []
+            return
@@ -0,0 +1,378 @@
+"""
+Retención, archivado y compactación de resultados antiguos.
+
+Nada caducaba: las filas de `scan_results` y `findings` y los archivos de
+`reports/` crecían sin límite y las consultas se hacían más lentas. Este
+módulo aplica una política de retención por tipo de escaneo:
+
+- las filas más antiguas que su política se copian a archivos de archivo
+  columnares (Parquet con zstd si `pyarrow` está instalado; si no, JSON Lines
+  con gzip) y después se borran de la base, por lotes y en transacciones
+  cortas para no bloquear a la API,
+- se borran los reportes de las filas archivadas y los archivos de
+  `reports/` sin fila viva que superan `REPORT_RETENTION_DAYS`,
+- se devuelve al sistema el espacio libre con `PRAGMA incremental_vacuum`
+  por tramos (requiere `auto_vacuum=INCREMENTAL`, ver `database/storage.py`).
+
+Los archivos se consultan sin la API con `load_archive` (DataFrame de
+pandas) o con cualquier lector de Parquet (DuckDB, Spark...).
+
+El mantenimiento programado borra datos, así que está desactivado por
+defecto. Para activarlo, revisar antes lo que archivaría con
+`python scripts/run_retention.py --dry-run` y arrancar la API con
+`HYBRIDSCAN_RETENTION_INTERVAL_HOURS=24` (o el periodo deseado).
+
+Las tablas se reciben como parámetro porque `backend/main.py` carga
+`database/models.py` por ruta (igual que `findings_store`).
+
+Variables de entorno:
+    HYBRIDSCAN_RETENTION_<TIPO>_DAYS: Días de retención de un tipo (p.ej. SAST, HYBRID)
+    HYBRIDSCAN_RETENTION_DEFAULT_DAYS: Días para tipos sin política propia
+    HYBRIDSCAN_REPORT_RETENTION_DAYS: Días de los archivos de reports/ sin fila viva
+    HYBRIDSCAN_RETENTION_INTERVAL_HOURS: Periodo del mantenimiento programado (0, el valor por defecto, lo desactiva)
+    HYBRIDSCAN_ARCHIVE_DIR: Directorio de los archivos (por defecto archive/)
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Engine
+
+# Parquet es opcional: sin pyarrow se archiva en JSON Lines comprimido
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    from database.counters import apply_deltas, completed_scan_counts, finding_counts, negate
+except ImportError:
+    from counters import apply_deltas, completed_scan_counts, finding_counts, negate
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Días de retención por tipo de escaneo
+DEFAULT_RETENTION_DAYS: Dict[str, int] = {
+    "SAST": 180,
+    "DAST": 180,
+    "HYBRID": 365,          # Los reportes híbridos son el resultado final que se consulta
+    "FILE_UPLOAD": 30,
+}
+FALLBACK_RETENTION_DAYS = int(os.getenv("HYBRIDSCAN_RETENTION_DEFAULT_DAYS", "180"))
+REPORT_RETENTION_DAYS = int(os.getenv("HYBRIDSCAN_REPORT_RETENTION_DAYS", "30"))
+RETENTION_INTERVAL_HOURS = float(os.getenv("HYBRIDSCAN_RETENTION_INTERVAL_HOURS", "0"))
+ARCHIVE_DIR = Path(os.getenv("HYBRIDSCAN_ARCHIVE_DIR", str(BASE_DIR / "archive")))
+REPORTS_DIR = BASE_DIR / "reports"
+
+ARCHIVE_BATCH_SIZE = 500
+VACUUM_STEP_PAGES = 2000        # ~8 MB por paso con páginas de 4 KiB
+BATCH_PAUSE_SECONDS = 0.05      # Pausa entre lotes para dejar pasar a otros escritores
+REPORT_SUFFIXES = (".json", ".jsonl", ".pdf")
+
+
+def retention_policies() -> Dict[str, int]:
+    """Política efectiva: valores por defecto sobrescritos por `HYBRIDSCAN_RETENTION_<TIPO>_DAYS`."""
+    policies = dict(DEFAULT_RETENTION_DAYS)
+    prefix, suffix = "HYBRIDSCAN_RETENTION_", "_DAYS"
+    for name, value in os.environ.items():
+        if name.startswith(prefix) and name.endswith(suffix) and name != "HYBRIDSCAN_RETENTION_DEFAULT_DAYS":
+            scan_type = name[len(prefix):-len(suffix)].upper()
+            try:
+                policies[scan_type] = int(value)
+            except ValueError:
+                logger.warning(f"⚠️ Valor de retención inválido en {name}: {value!r}")
+    return policies
+
+
+def _utcnow() -> datetime:
+    # SQLite guarda las fechas sin zona horaria (UTC)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _archive_value(value: Any) -> Any:
+    """Valores aptos para un archivo columnar: JSON anidado como texto."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def write_archive(rows: List[Dict[str, Any]], path_stem: Path) -> Path:
+    """
+    Escribe filas en `<path_stem>.parquet` (o `.jsonl.gz` sin pyarrow).
+
+    Se escribe a un archivo temporal y se renombra, así un archivo a medias
+    nunca aparece en el directorio de archivo.
+    """
+    path_stem.parent.mkdir(parents=True, exist_ok=True)
+    rows = [{key: _archive_value(value) for key, value in row.items()} for row in rows]
+    if PARQUET_AVAILABLE:
+        path = path_stem.with_name(path_stem.name + ".parquet")
+        tmp = path.with_name(path.name + ".tmp")
+        pq.write_table(pa.Table.from_pylist(rows), tmp, compression="zstd")
+    else:
+        path = path_stem.with_name(path_stem.name + ".jsonl.gz")
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def load_archive(archive_dir: Optional[Path] = None, kind: str = "scan_results"):
+    """
+    Carga los archivos de un tipo (`scan_results` o `findings`) en un DataFrame.
+
+    Lee tanto Parquet como JSON Lines comprimido. Las columnas JSON
+    (`results`, `summary`) quedan como texto: `json.loads` para expandirlas.
+    """
+    import pandas as pd
+
+    archive_dir = Path(archive_dir or ARCHIVE_DIR)
+    frames = [pd.read_parquet(path) for path in sorted(archive_dir.glob(f"{kind}-*.parquet"))]
+    frames += [pd.read_json(path, lines=True, compression="gzip")
+               for path in sorted(archive_dir.glob(f"{kind}-*.jsonl.gz"))]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _report_files(row: Dict[str, Any]) -> List[str]:
+    """Reportes de una fila: `result_path` y el JSONL de hallazgos que escribían las versiones anteriores."""
+    paths = [row.get("result_path")]
+    results = row.get("results")
+    if isinstance(results, dict):
+        paths.append(results.get("findings_file"))
+    return [p for p in paths if p]
+
+
+def _remove_report(path: str, reports_dir: Path) -> bool:
+    """Borra un reporte solo si está dentro de `reports_dir` (nunca código subido ni rutas ajenas)."""
+    try:
+        resolved = Path(path).resolve()
+        resolved.relative_to(reports_dir.resolve())
+    except (ValueError, OSError):
+        return False
+    try:
+        resolved.unlink()
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"⚠️ No se pudo borrar el reporte {resolved}: {e}")
+        return False
+
+
+def archive_expired(engine: Engine, scan_table, findings_table, archive_dir: Path, reports_dir: Path,
+                    policies: Optional[Dict[str, int]] = None, now: Optional[datetime] = None,
+                    batch_size: int = ARCHIVE_BATCH_SIZE, dry_run: bool = False,
+                    counters_table=None) -> Dict[str, Any]:
+    """
+    Archiva y borra las filas caducadas según la política de su tipo.
+
+    Cada lote se archiva antes de borrarse (escaneos y sus hallazgos) en su
+    propia transacción corta; entre lotes se cede la base a otros escritores.
+    Con `counters_table`, lo archivado se resta de los contadores del panel
+    en la misma transacción que el borrado.
+    """
+    policies = retention_policies() if policies is None else policies
+    now = now or _utcnow()
+    stats = {"scans_archived": 0, "findings_archived": 0, "reports_deleted": 0, "archive_files": []}
+
+    with engine.connect() as conn:
+        scan_types = [row[0] for row in conn.execute(select(scan_table.c.scan_type).distinct())]
+
+    for scan_type in scan_types:
+        days = policies.get((scan_type or "").upper(), FALLBACK_RETENTION_DAYS)
+        if days <= 0:
+            continue
+        cutoff = now - timedelta(days=days)
+        expired = (scan_table.c.scan_type == scan_type) if scan_type is not None else scan_table.c.scan_type.is_(None)
+        if dry_run:
+            with engine.connect() as conn:
+                ids = select(scan_table.c.id).where(expired, scan_table.c.created_at < cutoff)
+                stats["scans_archived"] += conn.execute(select(func.count()).select_from(ids.subquery())).scalar()
+                stats["findings_archived"] += conn.execute(
+                    select(func.count()).where(findings_table.c.scan_id.in_(ids))).scalar()
+            continue
+        part = 0
+        while True:
+            query = (select(scan_table).where(expired, scan_table.c.created_at < cutoff)
+                     .order_by(scan_table.c.created_at, scan_table.c.id).limit(batch_size))
+            with engine.connect() as conn:
+                scans = [dict(row._mapping) for row in conn.execute(query)]
+                if not scans:
+                    break
+                ids = [scan["id"] for scan in scans]
+                findings = [dict(row._mapping) for row in
+                            conn.execute(select(findings_table).where(findings_table.c.scan_id.in_(ids)))]
+            stats["scans_archived"] += len(scans)
+            stats["findings_archived"] += len(findings)
+
+            stamp = f"{(scan_type or 'UNKNOWN').upper()}-{now:%Y%m%dT%H%M%S}-{part:04d}"
+            stats["archive_files"].append(str(write_archive(scans, archive_dir / f"scan_results-{stamp}")))
+            if findings:
+                stats["archive_files"].append(str(write_archive(findings, archive_dir / f"findings-{stamp}")))
+
+            with engine.begin() as conn:
+                if counters_table is not None:
+                    apply_deltas(conn, counters_table,
+                                 negate(finding_counts(conn, findings_table, findings_table.c.scan_id.in_(ids))))
+                    apply_deltas(conn, counters_table,
+                                 negate(completed_scan_counts(conn, scan_table, scan_table.c.id.in_(ids))))
+                conn.execute(delete(findings_table).where(findings_table.c.scan_id.in_(ids)))
+                conn.execute(delete(scan_table).where(scan_table.c.id.in_(ids)))
+
+            for scan in scans:
+                stats["reports_deleted"] += sum(_remove_report(p, reports_dir) for p in _report_files(scan))
+            logger.info(f"🗄️ Archivados {len(scans)} escaneos {scan_type} anteriores a {cutoff:%Y-%m-%d}")
+            part += 1
+            time.sleep(BATCH_PAUSE_SECONDS)
+    return stats
+
+
+def purge_report_files(engine: Engine, scan_table, reports_dir: Path, max_age_days: int = REPORT_RETENTION_DAYS,
+                       now: Optional[float] = None, dry_run: bool = False) -> int:
+    """Borra los reportes de `reports_dir` más antiguos que `max_age_days` que ninguna fila referencia."""
+    if max_age_days <= 0 or not reports_dir.is_dir():
+        return 0
+    cutoff = (now or time.time()) - max_age_days * 86400
+    with engine.connect() as conn:
+        referenced = {str(Path(path).resolve()) for (path,) in
+                      conn.execute(select(scan_table.c.result_path).where(scan_table.c.result_path.isnot(None)))}
+    deleted = 0
+    for path in reports_dir.iterdir():
+        if not path.is_file() or not path.name.endswith(REPORT_SUFFIXES):
+            continue
+        if str(path.resolve()) in referenced or path.stat().st_mtime >= cutoff:
+            continue
+        if dry_run:
+            deleted += 1
+        elif _remove_report(str(path), reports_dir):
+            deleted += 1
+    return deleted
+
+
+def incremental_vacuum(engine: Engine, step_pages: int = VACUUM_STEP_PAGES) -> int:
+    """
+    Libera las páginas libres por tramos con `PRAGMA incremental_vacuum`.
+
+    Cada tramo es una transacción corta. Si la base no está en
+    `auto_vacuum=INCREMENTAL` no hace nada (convertirla exige un VACUUM
+    completo, ver `enable_incremental_vacuum`). Devuelve las páginas liberadas.
+    """
+    if engine.dialect.name != "sqlite":
+        return 0
+    released = 0
+    raw = engine.raw_connection()
+    try:
+        # El módulo sqlite3 da un solo paso a cada sentencia (una página por
+        # ejecución); executescript ejecuta el pragma hasta el final.
+        sqlite_conn = raw.driver_connection
+        if sqlite_conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            free = sqlite_conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free:
+                logger.info(f"ℹ️ {free} páginas libres sin recuperar: la base no usa auto_vacuum=INCREMENTAL "
+                            "(scripts/run_retention.py --enable-incremental-vacuum)")
+            return 0
+        while True:
+            free = sqlite_conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                break
+            sqlite_conn.executescript(f"PRAGMA incremental_vacuum({min(free, step_pages)});")
+            freed = free - sqlite_conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if freed <= 0:
+                break
+            released += freed
+            time.sleep(BATCH_PAUSE_SECONDS)
+    finally:
+        raw.close()
+    return released
+
+
+def enable_incremental_vacuum(engine: Engine) -> None:
+    """Convierte una base existente a `auto_vacuum=INCREMENTAL` (VACUUM completo, bloquea la base)."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+
+
+def run_retention(engine: Engine, scan_table, findings_table, archive_dir: Optional[Path] = None,
+                  reports_dir: Optional[Path] = None, policies: Optional[Dict[str, int]] = None,
+                  report_retention_days: int = REPORT_RETENTION_DAYS, dry_run: bool = False,
+                  counters_table=None) -> Dict[str, Any]:
+    """Ejecuta una pasada completa: archivado, limpieza de reportes y vacuum incremental."""
+    archive_dir = Path(archive_dir or ARCHIVE_DIR)
+    reports_dir = Path(reports_dir or REPORTS_DIR)
+    start = time.perf_counter()
+    stats = archive_expired(engine, scan_table, findings_table, archive_dir, reports_dir,
+                            policies=policies, dry_run=dry_run, counters_table=counters_table)
+    stats["reports_deleted"] += purge_report_files(engine, scan_table, reports_dir, report_retention_days,
+                                                   dry_run=dry_run)
+    stats["pages_released"] = 0 if dry_run else incremental_vacuum(engine)
+    stats["duration_seconds"] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+class RetentionScheduler:
+    """Ejecuta `job` periódicamente en un hilo en segundo plano (fuera del bucle de eventos)."""
+
+    def __init__(self, job: Callable[[], Any], interval_seconds: float, initial_delay: float = 60.0):
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self.initial_delay = initial_delay
+        self.runs = 0
+        self.last_stats: Optional[Any] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="retention-scheduler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        delay = self.initial_delay
+        while not self._stop.wait(delay):
+            try:
+                self.last_stats = self.job()
+                self.runs += 1
+                logger.info(f"🧹 Mantenimiento de retención completado: {self.last_stats}")
+            except Exception as e:
+                logger.error(f"❌ Error en el mantenimiento de retención: {e}")
+            delay = self.interval_seconds
+
+
+_scheduler: Optional[RetentionScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_retention_scheduler(engine: Engine, scan_table, findings_table, counters_table=None,
+                              interval_hours: float = RETENTION_INTERVAL_HOURS) -> Optional[RetentionScheduler]:
+    """Arranca (una sola vez) el mantenimiento programado; None si está desactivado."""
+    global _scheduler
+    if interval_hours <= 0:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RetentionScheduler(
+                lambda: run_retention(engine, scan_table, findings_table, counters_table=counters_table),
+                interval_hours * 3600
+            )
+            _scheduler.start()
+        return _scheduler
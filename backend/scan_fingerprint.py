@@ -0,0 +1,155 @@
+"""
+Huellas (fingerprints) de escaneos SAST para memoización.
+
+Los disparadores de CI piden a menudo re-escanear exactamente el mismo commit.
+La huella combina un hash de Merkle del árbol preparado (contenido y nombres
+relativos, independiente de la ruta temporal donde se copió) con la
+herramienta, su versión y su configuración. Dos escaneos con la misma huella
+producen el mismo reporte, por lo que el resultado almacenado puede
+reutilizarse.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Tamaño de bloque para hashear archivos grandes sin cargarlos en memoria
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Versión del esquema de huella: incrementarla invalida todas las huellas previas
+FINGERPRINT_VERSION = 1
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tree_fingerprint(root: Path) -> str:
+    """
+    Hash de Merkle de un archivo o directorio.
+
+    El hash de un directorio se calcula sobre la lista ordenada de
+    (tipo, nombre, hash) de sus hijos, de modo que solo depende del contenido
+    y de las rutas relativas, no de la ubicación del árbol. Un archivo suelto
+    se hashea con su nombre, igual que una entrada de directorio.
+
+    Args:
+        root: Archivo o directorio preparado para el escaneo
+
+    Returns:
+        Hash SHA256 hexadecimal
+    """
+    root = Path(root)
+    if root.is_file():
+        entry = f"f\0{root.name}\0{_file_digest(root)}"
+        return hashlib.sha256(entry.encode("utf-8")).hexdigest()
+
+    entries = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_symlink():
+                continue
+            if entry.is_dir():
+                entries.append(f"d\0{entry.name}\0{tree_fingerprint(Path(entry.path))}")
+            elif entry.is_file():
+                entries.append(f"f\0{entry.name}\0{_file_digest(Path(entry.path))}")
+    entries.sort()
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def tool_version(tool: str) -> str:
+    """Versión instalada de la herramienta ('unknown' si no se puede determinar)."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            return version(tool)
+        except PackageNotFoundError:
+            pass
+    except ImportError:
+        pass
+
+    import subprocess
+    try:
+        result = subprocess.run([tool, "--version"], capture_output=True, text=True, timeout=30)
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip().splitlines()[-1]
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    return "unknown"
+
+
+def scan_fingerprint(target: Path, tool: str, config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Huella completa de un escaneo: árbol + herramienta + versión + configuración.
+
+    Args:
+        target: Ruta preparada (tras validate_scan_path)
+        tool: Herramienta SAST
+        config: Configuración que afecta al reporte (p.ej. versión de reglas)
+
+    Returns:
+        Hash SHA256 hexadecimal
+    """
+    payload = {
+        "v": FINGERPRINT_VERSION,
+        "tree": tree_fingerprint(target),
+        "tool": tool,
+        "tool_version": tool_version(tool),
+        "config": config or {}
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class MemoStats:
+    """Contadores de reutilización de resultados memoizados."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def record(self, reused: bool, forced: bool = False) -> None:
+        with self._lock:
+            self._lookups += 1
+            if forced:
+                self._forced += 1
+            elif reused:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de reutilización.
+
+        Returns:
+            Diccionario con lookups, hits, misses, forced y reuse_rate_percent
+        """
+        with self._lock:
+            reuse_rate = (self._hits / self._lookups * 100) if self._lookups > 0 else 0
+            return {
+                "lookups": self._lookups,
+                "hits": self._hits,
+                "misses": self._misses,
+                "forced_rescans": self._forced,
+                "reuse_rate_percent": round(reuse_rate, 2)
+            }
+
+    def reset_stats(self) -> None:
+        """Reinicia los contadores."""
+        self._lookups = 0
+        self._hits = 0
+        self._misses = 0
+        self._forced = 0
+
+
+# Instancia global de estadísticas de memoización
+memo_stats = MemoStats()
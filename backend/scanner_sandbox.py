@@ -0,0 +1,233 @@
+"""
+Ejecución aislada de los escáneres con límites de recursos por escaneo.
+
+Una ejecución grande de Semgrep puede consumir toda la RAM y la CPU del host
+de la API y degradar el resto de peticiones. `run_sandboxed` sustituye a
+`subprocess.run` para los escáneres y aplica en el proceso hijo:
+
+- memoria máxima (RLIMIT_AS y, si hay cgroup v2 delegado, memory.max),
+- tiempo de CPU (RLIMIT_CPU) y cuota de CPU (cpu.max, solo con cgroups),
+- prioridad reducida (nice),
+- número de archivos abiertos (RLIMIT_NOFILE),
+- tiempo real máximo: al vencer se mata todo el grupo de procesos.
+
+Cuando un límite detiene el escaneo, el resultado indica el motivo
+(`limit_reason`) para registrarlo en el ScanResult.
+
+En plataformas sin el módulo `resource` (Windows) solo se aplica el límite
+de tiempo real.
+"""
+
+import logging
+import os
+import re
+import signal
+import subprocess
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Límites por defecto de cada escaneo (0 desactiva el límite)
+DEFAULT_MEMORY_MB = int(os.getenv("HYBRIDSCAN_SCAN_MEMORY_MB", "4096"))
+DEFAULT_CPU_SECONDS = int(os.getenv("HYBRIDSCAN_SCAN_CPU_SECONDS", "1800"))
+DEFAULT_NICE = int(os.getenv("HYBRIDSCAN_SCAN_NICE", "10"))
+DEFAULT_MAX_OPEN_FILES = int(os.getenv("HYBRIDSCAN_SCAN_MAX_OPEN_FILES", "4096"))
+DEFAULT_CPU_QUOTA_PERCENT = int(os.getenv("HYBRIDSCAN_SCAN_CPU_QUOTA", "0"))
+
+# Directorio cgroup v2 delegado en el que crear un sub-grupo por escaneo
+CGROUP_ROOT = os.getenv("HYBRIDSCAN_CGROUP_ROOT")
+
+# Motivos registrados en ScanResult.limit_reason
+LIMIT_MEMORY = "memory"
+LIMIT_CPU_TIME = "cpu_time"
+LIMIT_OPEN_FILES = "open_files"
+LIMIT_WALL_CLOCK = "wall_clock"
+
+_MEMORY_ERRORS = re.compile(
+    r"MemoryError|out of memory|Cannot allocate memory|std::bad_alloc|failed to map segment", re.IGNORECASE
+)
+_OPEN_FILE_ERRORS = re.compile(r"Too many open files|EMFILE")
+
+
+@dataclass
+class SandboxLimits:
+    """Límites de recursos de un escaneo (None o 0 = sin límite)."""
+    memory_mb: Optional[int] = DEFAULT_MEMORY_MB
+    cpu_seconds: Optional[int] = DEFAULT_CPU_SECONDS
+    nice: int = DEFAULT_NICE
+    max_open_files: Optional[int] = DEFAULT_MAX_OPEN_FILES
+    cpu_quota_percent: Optional[int] = DEFAULT_CPU_QUOTA_PERCENT
+
+
+class SandboxTimeout(subprocess.TimeoutExpired):
+    """Tiempo real agotado; el grupo de procesos ya fue terminado."""
+    limit_reason = LIMIT_WALL_CLOCK
+
+
+def _set_limit(kind: int, value: int) -> None:
+    _soft, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    resource.setrlimit(kind, (value, hard))
+
+
+def apply_process_limits(limits: SandboxLimits, cpu_time: bool = True) -> None:
+    """
+    Aplica los límites al proceso actual (pensado para `preexec_fn` o para
+    procesos de trabajo persistentes, que usan `cpu_time=False` porque el
+    tiempo de CPU se acumula entre escaneos).
+    """
+    if limits.nice:
+        os.nice(limits.nice)
+    if not RESOURCE_AVAILABLE:
+        return
+    if limits.memory_mb:
+        _set_limit(resource.RLIMIT_AS, limits.memory_mb * 1024 * 1024)
+    if limits.max_open_files:
+        _set_limit(resource.RLIMIT_NOFILE, limits.max_open_files)
+    if cpu_time and limits.cpu_seconds:
+        # SIGXCPU al alcanzar el límite blando; SIGKILL unos segundos después
+        soft = limits.cpu_seconds
+        _soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        if hard == resource.RLIM_INFINITY or hard > soft:
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 5 if hard == resource.RLIM_INFINITY else hard))
+
+
+class _CgroupScope:
+    """Sub-grupo cgroup v2 efímero para un escaneo (solo si hay un directorio delegado)."""
+
+    def __init__(self, root: str, limits: SandboxLimits):
+        self.path = Path(root) / f"scan-{uuid.uuid4().hex[:12]}"
+        self.path.mkdir()
+        if limits.memory_mb:
+            (self.path / "memory.max").write_text(str(limits.memory_mb * 1024 * 1024))
+            swap = self.path / "memory.swap.max"
+            if swap.exists():
+                swap.write_text("0")
+        if limits.cpu_quota_percent:
+            period = 100_000
+            (self.path / "cpu.max").write_text(f"{period * limits.cpu_quota_percent // 100} {period}")
+
+    def join(self) -> None:
+        (self.path / "cgroup.procs").write_text(str(os.getpid()))
+
+    def oom_killed(self) -> bool:
+        try:
+            events = (self.path / "memory.events").read_text()
+        except OSError:
+            return False
+        counts = dict(line.split() for line in events.splitlines() if line.strip())
+        return int(counts.get("oom_kill", 0)) > 0
+
+    def remove(self) -> None:
+        try:
+            self.path.rmdir()
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo eliminar el cgroup {self.path}: {e}")
+
+
+def _open_cgroup(limits: SandboxLimits) -> Optional[_CgroupScope]:
+    if not CGROUP_ROOT or not (limits.memory_mb or limits.cpu_quota_percent):
+        return None
+    try:
+        return _CgroupScope(CGROUP_ROOT, limits)
+    except OSError as e:
+        logger.warning(f"⚠️ cgroup no disponible en {CGROUP_ROOT}, solo se aplican rlimits: {e}")
+        return None
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def classify_exit(returncode: int, stderr: str, limits: SandboxLimits, oom_killed: bool = False) -> Optional[str]:
+    """Motivo por el que un límite detuvo el proceso, o None si terminó por sí mismo."""
+    if oom_killed:
+        return LIMIT_MEMORY
+    if os.name == "posix" and limits.cpu_seconds and returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+        if returncode == -signal.SIGXCPU or not limits.memory_mb:
+            return LIMIT_CPU_TIME
+    if returncode != 0 and limits.memory_mb and _MEMORY_ERRORS.search(stderr or ""):
+        return LIMIT_MEMORY
+    if returncode != 0 and limits.max_open_files and _OPEN_FILE_ERRORS.search(stderr or ""):
+        return LIMIT_OPEN_FILES
+    return None
+
+
+def run_sandboxed(
+    cmd: Sequence[str],
+    timeout: Optional[float] = None,
+    limits: Optional[SandboxLimits] = None,
+    cwd: Optional[str] = None,
+    env: Optional[dict] = None
+) -> subprocess.CompletedProcess:
+    """
+    Equivalente a `subprocess.run(cmd, capture_output=True, text=True, timeout=...)`
+    con límites de recursos.
+
+    Returns:
+        CompletedProcess con el atributo adicional `limit_reason`
+        (memory, cpu_time, open_files o None)
+
+    Raises:
+        SandboxTimeout: Si se supera `timeout` (subclase de TimeoutExpired)
+        FileNotFoundError: Si el ejecutable no existe
+    """
+    limits = limits or SandboxLimits()
+    cgroup = _open_cgroup(limits)
+
+    # `preexec_fn` no es seguro si otros hilos pueden tener tomado un lock
+    # (p.ej. el de logging) en el momento del fork: el hijo solo ejecuta aquí
+    # llamadas al sistema (setrlimit, nice, escritura en cgroup.procs), sin
+    # logging ni imports, antes del exec.
+    def _preexec() -> None:
+        if cgroup is not None:
+            cgroup.join()
+        apply_process_limits(limits)
+
+    preexec: Optional[Callable[[], None]] = _preexec if os.name == "posix" else None
+
+    kwargs: Any = {"start_new_session": True} if os.name == "posix" else {}
+    try:
+        process = subprocess.Popen(
+            list(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            cwd=cwd, env=env, preexec_fn=preexec, **kwargs
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_group(process)
+            stdout, stderr = process.communicate()
+            logger.warning(f"⏰ Escaneo terminado por límite de tiempo real ({timeout}s): {cmd[0]}")
+            raise SandboxTimeout(process.args, timeout, output=stdout, stderr=stderr)
+        except BaseException:
+            _kill_group(process)
+            process.wait()
+            raise
+        # Procesos hijos que sigan vivos en el grupo no deben sobrevivir al escaneo
+        _kill_group(process)
+
+        result = subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+        result.limit_reason = classify_exit(process.returncode, stderr, limits,
+                                            oom_killed=cgroup is not None and cgroup.oom_killed())
+        if result.limit_reason:
+            logger.warning(f"🛑 Escaneo detenido por límite de recursos ({result.limit_reason}): {cmd[0]}")
+        return result
+    finally:
+        if cgroup is not None:
+            cgroup.remove()
@@ -0,0 +1,302 @@
+"""
+Almacén local y versionado de rule packs de Semgrep.
+
+`--config auto` y los packs del registro (p/owasp-top-ten, p/security-audit)
+se descargan y parsean en cada ejecución, lo que añade latencia y falla sin
+red. Este módulo vendoriza los packs una sola vez, los fusiona en un único
+archivo de configuración (reglas deduplicadas por id) y fija su versión
+mediante un lockfile con el hash SHA256 de cada pack y del archivo fusionado.
+
+Todas las ejecuciones de Semgrep reutilizan el archivo fusionado; la CLI
+`scripts/refresh_semgrep_rules.py` lo regenera cuando hay acceso a red.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RULES_DIR = Path(os.getenv("HYBRIDSCAN_SEMGREP_RULES_DIR", str(BASE_DIR / "data" / "semgrep_rules")))
+MERGED_RULES_FILE = "merged_rules.yml"
+LOCK_FILE = "packs.lock.json"
+
+REGISTRY_URL = os.getenv("SEMGREP_REGISTRY_URL", "https://semgrep.dev/c")
+
+# Packs usados por run_sast_scan y experimental_validation
+DEFAULT_PACKS = ["p/owasp-top-ten", "p/security-audit"]
+
+# Clave de metadatos donde se anota a qué packs pertenece cada regla fusionada
+PACKS_METADATA_KEY = "hybridsecscan_packs"
+
+# Subconjuntos del archivo fusionado filtrados por lenguaje
+SUBSETS_DIR = "subsets"
+
+# Alias de lenguaje que Semgrep acepta en `languages`; generic/regex aplican a cualquier árbol
+LANGUAGE_ALIASES = {
+    "javascript": {"javascript", "js"}, "typescript": {"typescript", "ts"},
+    "go": {"go", "golang"}, "csharp": {"csharp", "c#"}, "c": {"c", "cpp", "c++"},
+}
+LANGUAGE_AGNOSTIC = {"generic", "regex"}
+
+
+class RulePackError(Exception):
+    """Error al descargar, parsear o verificar un rule pack."""
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _parse_rules(raw: bytes, source: str) -> List[Dict[str, Any]]:
+    """Parsea el contenido YAML/JSON de un pack y devuelve su lista de reglas."""
+    text = raw.decode("utf-8")
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        if not YAML_AVAILABLE:
+            raise RulePackError(f"{source}: se requiere PyYAML para parsear packs en YAML (pip install pyyaml)")
+        try:
+            document = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise RulePackError(f"{source}: YAML inválido: {e}")
+
+    rules = document.get("rules") if isinstance(document, dict) else None
+    if not isinstance(rules, list):
+        raise RulePackError(f"{source}: el pack no contiene una lista 'rules'")
+    return rules
+
+
+def fetch_pack(pack: str, timeout: int = 60) -> bytes:
+    """
+    Descarga un pack del registro de Semgrep.
+
+    Args:
+        pack: Nombre del pack (p.ej. "p/owasp-top-ten")
+        timeout: Timeout de la petición en segundos
+
+    Returns:
+        Contenido bruto del pack
+    """
+    import requests
+
+    url = f"{REGISTRY_URL.rstrip('/')}/{pack}"
+    try:
+        response = requests.get(url, timeout=timeout, headers={"Accept": "application/x-yaml, application/json"})
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise RulePackError(f"No se pudo descargar {pack} desde {url}: {e}")
+    return response.content
+
+
+def _pack_slug(pack: str) -> str:
+    return pack.replace("/", "_").replace(":", "_")
+
+
+def merge_packs(packs: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Fusiona las reglas de varios packs deduplicando por id.
+
+    Cada regla conserva en `metadata.hybridsecscan_packs` la lista de packs
+    que la incluyen, para poder seleccionar subconjuntos sin volver a red.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for pack, rules in packs.items():
+        for rule in rules:
+            rule_id = rule.get("id")
+            if not rule_id:
+                continue
+            if rule_id not in merged:
+                entry = json.loads(json.dumps(rule))
+                # `metadata: null` (o ausente) en el pack original
+                if not isinstance(entry.get("metadata"), dict):
+                    entry["metadata"] = {}
+                entry["metadata"][PACKS_METADATA_KEY] = []
+                merged[rule_id] = entry
+            members = merged[rule_id]["metadata"][PACKS_METADATA_KEY]
+            if pack not in members:
+                members.append(pack)
+    return [merged[rule_id] for rule_id in sorted(merged)]
+
+
+def refresh_rule_packs(
+    packs: Sequence[str] = DEFAULT_PACKS,
+    rules_dir: Path = RULES_DIR,
+    source_dir: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    Vendoriza los packs indicados y regenera el archivo fusionado y el lockfile.
+
+    Args:
+        packs: Packs a vendorizar
+        rules_dir: Directorio del almacén local
+        source_dir: Si se indica, lee `<slug>.yml` desde este directorio en
+            lugar de descargar (útil para vendorizar en máquinas sin red)
+
+    Returns:
+        Contenido del lockfile generado
+    """
+    rules_dir = Path(rules_dir)
+    rules_dir.mkdir(parents=True, exist_ok=True)
+
+    parsed: Dict[str, List[Dict[str, Any]]] = {}
+    lock_packs: Dict[str, Dict[str, Any]] = {}
+    for pack in packs:
+        if source_dir is not None:
+            candidates = [Path(source_dir) / f"{_pack_slug(pack)}{ext}" for ext in (".yml", ".yaml", ".json")]
+            path = next((c for c in candidates if c.exists()), None)
+            if path is None:
+                raise RulePackError(f"No se encontró {pack} en {source_dir}")
+            raw = path.read_bytes()
+            origin = str(path)
+        else:
+            raw = fetch_pack(pack)
+            origin = f"{REGISTRY_URL.rstrip('/')}/{pack}"
+
+        parsed[pack] = _parse_rules(raw, pack)
+        lock_packs[pack] = {
+            "sha256": _sha256(raw),
+            "rules": len(parsed[pack]),
+            "source": origin,
+            "fetched_at": datetime.now(timezone.utc).isoformat()
+        }
+        logger.info(f"📦 Pack {pack}: {len(parsed[pack])} reglas")
+
+    merged_rules = merge_packs(parsed)
+    # JSON es YAML válido: Semgrep lo lee directamente y se evita depender de PyYAML al escribir
+    merged_bytes = json.dumps({"rules": merged_rules}, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    merged_path = rules_dir / MERGED_RULES_FILE
+    tmp_path = merged_path.with_suffix(".tmp")
+    tmp_path.write_bytes(merged_bytes)
+    os.replace(tmp_path, merged_path)
+
+    lock = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "registry": REGISTRY_URL,
+        "packs": lock_packs,
+        "merged_file": MERGED_RULES_FILE,
+        "merged_sha256": _sha256(merged_bytes),
+        "rule_count": len(merged_rules)
+    }
+    (rules_dir / LOCK_FILE).write_text(json.dumps(lock, indent=2, sort_keys=True))
+    _verified_cache.clear()
+    logger.info(f"✅ Almacén de reglas actualizado: {len(merged_rules)} reglas en {merged_path}")
+    return lock
+
+
+def load_lock(rules_dir: Path = RULES_DIR) -> Optional[Dict[str, Any]]:
+    """Carga el lockfile del almacén o None si no existe."""
+    lock_path = Path(rules_dir) / LOCK_FILE
+    if not lock_path.exists():
+        return None
+    try:
+        return json.loads(lock_path.read_text())
+    except json.JSONDecodeError:
+        logger.warning(f"⚠️ Lockfile de reglas Semgrep corrupto: {lock_path}")
+        return None
+
+
+# Verificaciones de hash ya realizadas: (ruta, mtime, tamaño) -> válido
+_verified_cache: Dict[tuple, bool] = {}
+
+
+def get_rules_config(rules_dir: Path = RULES_DIR) -> Optional[Path]:
+    """
+    Devuelve la ruta del archivo de reglas fusionado si existe y coincide con el lockfile.
+
+    La verificación del hash se cachea por mtime/tamaño para no releer el
+    archivo en cada escaneo.
+
+    Returns:
+        Ruta al archivo fusionado, o None si el almacén no está disponible
+    """
+    lock = load_lock(rules_dir)
+    merged_path = Path(rules_dir) / MERGED_RULES_FILE
+    if lock is None or not merged_path.exists():
+        return None
+
+    stat = merged_path.stat()
+    key = (str(merged_path), stat.st_mtime_ns, stat.st_size, lock.get("merged_sha256"))
+    if key not in _verified_cache:
+        _verified_cache[key] = _sha256(merged_path.read_bytes()) == lock.get("merged_sha256")
+        if not _verified_cache[key]:
+            logger.warning(f"⚠️ El archivo de reglas {merged_path} no coincide con {LOCK_FILE}; se ignora")
+    return merged_path if _verified_cache[key] else None
+
+
+def language_subset_config(languages: Iterable[str], rules_dir: Path = RULES_DIR) -> Optional[Path]:
+    """
+    Archivo con las reglas del almacén fusionado que aplican a `languages`.
+
+    El subconjunto se genera una vez por versión del almacén y combinación de
+    lenguajes, y se reutiliza en los escaneos siguientes.
+
+    Returns:
+        Ruta al subconjunto, o None si el almacén local no está disponible
+    """
+    merged_path = get_rules_config(rules_dir)
+    if merged_path is None:
+        return None
+    wanted = set(LANGUAGE_AGNOSTIC)
+    for language in languages:
+        wanted |= LANGUAGE_ALIASES.get(language, {language})
+
+    lock = load_lock(rules_dir) or {}
+    key = _sha256(f"{lock.get('merged_sha256')}:{','.join(sorted(wanted))}".encode("utf-8"))[:16]
+    subset_path = Path(rules_dir) / SUBSETS_DIR / f"{key}.json"
+    if subset_path.exists():
+        return subset_path
+
+    rules = json.loads(merged_path.read_text()).get("rules", [])
+    selected = [r for r in rules if wanted & {str(lang).lower() for lang in r.get("languages", [])}]
+    subset_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = subset_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"rules": selected}, sort_keys=True, separators=(",", ":")))
+    os.replace(tmp_path, subset_path)
+    logger.info(f"✂️ Subconjunto de reglas para {sorted(languages)}: {len(selected)}/{len(rules)} reglas")
+    return subset_path
+
+
+def semgrep_config_args(fallback: Sequence[str] = ("auto",), rules_dir: Path = RULES_DIR,
+                        languages: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Argumentos `--config` para Semgrep.
+
+    Usa el almacén local si está disponible (solo las reglas de `languages`
+    si se indican); si no, los configs de respaldo (que requieren red).
+    Incluye `--metrics off` salvo con `--config auto`.
+    """
+    local = get_rules_config(rules_dir)
+    if local is not None:
+        if languages is not None:
+            local = language_subset_config(languages, rules_dir) or local
+        return ['--config', str(local), '--metrics', 'off']
+
+    logger.warning("⚠️ Almacén local de reglas Semgrep no disponible; usando registro remoto "
+                   "(ejecuta scripts/refresh_semgrep_rules.py)")
+    args: List[str] = []
+    for config in fallback:
+        args.extend(['--config', config])
+    # `--config auto` exige métricas activadas; los packs explícitos no
+    if "auto" not in fallback:
+        args.extend(['--metrics', 'off'])
+    return args
+
+
+def rules_version(rules_dir: Path = RULES_DIR) -> str:
+    """Identificador de versión del almacén (hash del archivo fusionado) o 'remote'."""
+    lock = load_lock(rules_dir)
+    if lock and get_rules_config(rules_dir) is not None:
+        return lock.get("merged_sha256", "remote")[:16]
+    return "remote"
@@ -0,0 +1,455 @@
+"""
+Sesión persistente con un daemon de OWASP ZAP.
+
+`zap-cli quick-scan --self-contained` arranca una JVM de ZAP nueva en cada
+escaneo y paga decenas de segundos antes de la primera petición. Este módulo
+mantiene un único daemon (`zap.sh -daemon`) vivo durante la vida del backend
+y lo controla a través de su API JSON:
+
+- cada escaneo abre su propio contexto (`ZapScanSession`) limitado al origen
+  del objetivo, de modo que escaneos concurrentes no se mezclan,
+- spider y escaneo activo se limitan al contexto y se detienen si vencen,
+- las alertas se recogen por los ids del escaneo activo (`ascan/view/alertsIds`)
+  y, para las pasivas, por las URLs del spider entre las alertas nuevas: el
+  daemon acumula las alertas de todos los escaneos y filtrar solo por
+  `baseurl` devolvía también las de escaneos anteriores del mismo objetivo,
+- los escaneos de un mismo origen se serializan,
+- al terminar se elimina el contexto.
+
+Si `HYBRIDSCAN_ZAP_API_URL` apunta a un daemon ya arrancado (o al servidor
+simulado de scripts/mock_zap_server.py) se usa sin lanzar ningún proceso.
+"""
+
+import atexit
+import logging
+import os
+import re
+import secrets
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Daemon externo ya en marcha (desactiva el lanzamiento local)
+ZAP_API_URL = os.getenv("HYBRIDSCAN_ZAP_API_URL")
+ZAP_API_KEY = os.getenv("HYBRIDSCAN_ZAP_API_KEY")
+
+# Ejecutable de ZAP y puerto del daemon lanzado localmente
+ZAP_COMMAND = os.getenv("HYBRIDSCAN_ZAP_COMMAND")
+ZAP_PORT = int(os.getenv("HYBRIDSCAN_ZAP_PORT", "8090"))
+ZAP_EXECUTABLES = ("zap.sh", "zap", "owasp-zap", "zap.bat")
+
+# Escaneos simultáneos sobre el mismo daemon
+MAX_CONCURRENT_SCANS = int(os.getenv("HYBRIDSCAN_ZAP_MAX_SCANS", "4"))
+
+# Tiempos de arranque, sondeo y límite por fase (segundos)
+STARTUP_TIMEOUT = 180
+POLL_INTERVAL = 1.0
+PHASE_TIMEOUT = int(os.getenv("HYBRIDSCAN_ZAP_PHASE_TIMEOUT", "600"))
+
+# Riesgo de ZAP -> severidad del esquema de vulnerabilidades
+RISK_SEVERITY = {"high": "HIGH", "medium": "MEDIUM", "low": "LOW", "informational": "INFO"}
+
+
+class ZapError(RuntimeError):
+    """Error devuelto por la API de ZAP o escaneo que no termina."""
+
+
+class ZapUnavailableError(ZapError):
+    """No hay daemon de ZAP accesible ni forma de lanzarlo."""
+
+
+class ZapClient:
+    """Cliente mínimo de la API JSON de ZAP (/JSON/<componente>/<view|action>/<nombre>/)."""
+
+    def __init__(self, api_url: str, api_key: Optional[str] = None, timeout: float = 30.0):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self._client = httpx.Client(base_url=self.api_url, timeout=timeout)
+
+    def call(self, component: str, kind: str, name: str, **params: Any) -> Dict[str, Any]:
+        """
+        Invoca una vista o acción de la API.
+
+        Raises:
+            ZapUnavailableError: Si el daemon no responde
+            ZapError: Si la API devuelve un error
+        """
+        query = {k: str(v) for k, v in params.items() if v is not None}
+        if self.api_key:
+            query["apikey"] = self.api_key
+        try:
+            response = self._client.get(f"/JSON/{component}/{kind}/{name}/", params=query)
+        except httpx.HTTPError as e:
+            raise ZapUnavailableError(f"Daemon ZAP no accesible en {self.api_url}: {e}")
+        try:
+            data = response.json()
+        except ValueError:
+            raise ZapError(f"Respuesta no JSON de ZAP ({response.status_code}) en {component}/{name}")
+        if response.status_code != 200 or ("code" in data and "message" in data):
+            raise ZapError(f"ZAP {component}/{name}: {data.get('message', response.status_code)}")
+        return data
+
+    def version(self) -> str:
+        return self.call("core", "view", "version")["version"]
+
+    def close(self) -> None:
+        self._client.close()
+
+
+@dataclass
+class ZapScanResult:
+    """Resultado de un escaneo ZAP con alertas en el esquema de vulnerabilidades."""
+    target_url: str
+    vulnerabilities: List[Dict[str, Any]] = field(default_factory=list)
+    urls_found: int = 0
+    duration: float = 0.0
+    phase_durations: Dict[str, float] = field(default_factory=dict)
+    zap_version: str = ""
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "urls_found": self.urls_found,
+            "alerts": len(self.vulnerabilities),
+            "duration_seconds": round(self.duration, 3),
+            "phase_durations": {k: round(v, 3) for k, v in self.phase_durations.items()},
+            "zap_version": self.zap_version
+        }
+
+
+def normalize_alert(alert: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte una alerta de la API de ZAP al esquema de hallazgos DAST del backend."""
+    name = alert.get("alert") or alert.get("name") or "Unknown"
+    risk = str(alert.get("risk", "Low"))
+    cweid = str(alert.get("cweid", "") or "")
+    return {
+        "type": name,
+        "alert": name,
+        "severity": RISK_SEVERITY.get(risk.lower(), "LOW"),
+        "risk": risk,
+        "confidence": alert.get("confidence", "Medium"),
+        "parameter": alert.get("param", ""),
+        "description": alert.get("description", ""),
+        "solution": alert.get("solution", ""),
+        "evidence": alert.get("evidence", ""),
+        "cwe": f"CWE-{cweid}" if cweid and cweid != "-1" else "CWE-0",
+        "cweid": cweid,
+        "url": alert.get("url", ""),
+        "method": alert.get("method", "GET"),
+        "plugin_id": alert.get("pluginId", "")
+    }
+
+
+class ZapScanSession:
+    """
+    Escaneo aislado en un contexto propio del daemon.
+
+    Uso:
+        with daemon.session(url) as session:
+            session.spider()
+            session.active_scan()
+            alerts = session.alerts()
+
+    `origin_lock` (del daemon) se mantiene durante toda la sesión para que dos
+    escaneos del mismo origen no se atribuyan las alertas pasivas del otro.
+    """
+
+    def __init__(self, client: ZapClient, target_url: str, poll_interval: float = POLL_INTERVAL,
+                 phase_timeout: float = PHASE_TIMEOUT, origin_lock: Optional[threading.Lock] = None):
+        parsed = urlparse(target_url)
+        self.client = client
+        self.target_url = target_url
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.context_name = f"hybridsecscan-{uuid.uuid4().hex[:12]}"
+        self.context_id: Optional[str] = None
+        self.poll_interval = poll_interval
+        self.phase_timeout = phase_timeout
+        self.urls_found = 0
+        self.origin_lock = origin_lock
+        self._running: Dict[str, str] = {}  # componente -> scanId en curso
+        self._spider_urls: set = set()
+        self._ascan_id: Optional[str] = None
+        self._previous_alert_ids: set = set()
+
+    def __enter__(self) -> "ZapScanSession":
+        if self.origin_lock is not None:
+            self.origin_lock.acquire()
+        try:
+            self._previous_alert_ids = {a.get("id") for a in self._origin_alerts()}
+            self._open_context()
+        except BaseException:
+            if self.origin_lock is not None:
+                self.origin_lock.release()
+            raise
+        return self
+
+    def _open_context(self) -> None:
+        self.context_id = self.client.call("context", "action", "newContext", contextName=self.context_name)["contextId"]
+        self.client.call("context", "action", "includeInContext", contextName=self.context_name,
+                         regex=re.escape(self.origin) + ".*")
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            self._close_context()
+        finally:
+            if self.origin_lock is not None:
+                self.origin_lock.release()
+
+    def _close_context(self) -> None:
+        for component, scan_id in list(self._running.items()):
+            try:
+                self.client.call(component, "action", "stop", scanId=scan_id)
+            except ZapError:
+                pass
+        try:
+            self.client.call("context", "action", "removeContext", contextName=self.context_name)
+        except ZapError as e:
+            logger.warning(f"⚠️ No se pudo eliminar el contexto ZAP {self.context_name}: {e}")
+
+    def _wait(self, component: str, scan_id: str) -> None:
+        self._running[component] = scan_id
+        deadline = time.monotonic() + self.phase_timeout
+        while int(self.client.call(component, "view", "status", scanId=scan_id)["status"]) < 100:
+            if time.monotonic() > deadline:
+                raise ZapError(f"La fase {component} no terminó en {self.phase_timeout}s")
+            time.sleep(self.poll_interval)
+        del self._running[component]
+
+    def spider(self, max_children: Optional[int] = None) -> int:
+        """Rastrea el objetivo dentro del contexto; devuelve las URLs encontradas."""
+        scan_id = self.client.call("spider", "action", "scan", url=self.target_url, maxChildren=max_children,
+                                   contextName=self.context_name, recurse="true")["scan"]
+        self._wait("spider", scan_id)
+        self._spider_urls = set(self.client.call("spider", "view", "results", scanId=scan_id).get("results", []))
+        self.urls_found = len(self._spider_urls)
+        return self.urls_found
+
+    def active_scan(self, policy: Optional[str] = None) -> None:
+        """Lanza el escaneo activo limitado al contexto y espera a que termine."""
+        scan_id = self.client.call("ascan", "action", "scan", url=self.target_url, recurse="true",
+                                   contextId=self.context_id, scanPolicyName=policy)["scan"]
+        self._wait("ascan", scan_id)
+        self._ascan_id = scan_id
+
+    def _origin_alerts(self, page_size: int = 500) -> List[Dict[str, Any]]:
+        """Todas las alertas del daemon para el origen del objetivo (de cualquier escaneo)."""
+        alerts: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            page = self.client.call("core", "view", "alerts", baseurl=self.origin,
+                                    start=start, count=page_size).get("alerts", [])
+            alerts.extend(page)
+            if len(page) < page_size:
+                return alerts
+            start += page_size
+
+    def raw_alerts(self, page_size: int = 500) -> List[Dict[str, Any]]:
+        """
+        Alertas de este escaneo tal como las devuelve la API.
+
+        Las del escaneo activo se identifican por sus ids; las pasivas son las
+        alertas nuevas (no presentes al abrir la sesión) sobre URLs del spider.
+        """
+        active_ids: set = set()
+        if self._ascan_id is not None:
+            active_ids = {str(i) for i in self.client.call("ascan", "view", "alertsIds",
+                                                           scanId=self._ascan_id).get("alertsIds", [])}
+        return [
+            a for a in self._origin_alerts(page_size)
+            if str(a.get("id")) in active_ids
+            or (a.get("id") not in self._previous_alert_ids and a.get("url") in self._spider_urls)
+        ]
+
+    def alerts(self, page_size: int = 500) -> List[Dict[str, Any]]:
+        """Alertas de este escaneo, ya normalizadas."""
+        return [normalize_alert(a) for a in self.raw_alerts(page_size)]
+
+
+class ZapDaemon:
+    """
+    Daemon de ZAP compartido por todos los escaneos del backend.
+
+    Args:
+        api_url: API de un daemon ya arrancado (si no, se lanza uno local)
+        api_key: Clave de la API (se genera si se lanza el daemon)
+        command: Ejecutable de ZAP (por defecto se busca en el PATH)
+        port: Puerto del daemon lanzado localmente
+        max_concurrent_scans: Escaneos simultáneos permitidos
+    """
+
+    def __init__(self, api_url: Optional[str] = ZAP_API_URL, api_key: Optional[str] = ZAP_API_KEY,
+                 command: Optional[str] = ZAP_COMMAND, port: int = ZAP_PORT,
+                 max_concurrent_scans: int = MAX_CONCURRENT_SCANS, poll_interval: float = POLL_INTERVAL):
+        self.external = api_url is not None
+        self.api_url = api_url or f"http://127.0.0.1:{port}"
+        self.api_key = api_key
+        self.command = command
+        self.port = port
+        self.poll_interval = poll_interval
+        self._client: Optional[ZapClient] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._scan_slots = threading.BoundedSemaphore(max(1, max_concurrent_scans))
+        self._origin_locks: Dict[str, threading.Lock] = {}
+        self._stats = {"scans": 0, "failed_scans": 0, "daemon_starts": 0, "startup_seconds": 0.0}
+
+    def _find_command(self) -> Optional[str]:
+        if self.command:
+            return self.command
+        for name in ZAP_EXECUTABLES:
+            found = shutil.which(name)
+            if found:
+                return found
+        return None
+
+    def _ping(self, client: ZapClient) -> bool:
+        try:
+            client.version()
+            return True
+        except ZapError:
+            return False
+
+    def ensure_running(self) -> ZapClient:
+        """
+        Devuelve un cliente de un daemon operativo, lanzándolo si es necesario.
+
+        Raises:
+            ZapUnavailableError: Si no hay daemon y no se puede lanzar
+        """
+        with self._lock:
+            if self._client is not None and self._ping(self._client):
+                return self._client
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+            if self.external:
+                client = ZapClient(self.api_url, self.api_key)
+                if not self._ping(client):
+                    client.close()
+                    raise ZapUnavailableError(f"El daemon ZAP configurado en {self.api_url} no responde")
+                self._client = client
+                return client
+
+            self._client = self._launch()
+            return self._client
+
+    def _launch(self) -> ZapClient:
+        command = self._find_command()
+        if command is None:
+            raise ZapUnavailableError(
+                "OWASP ZAP no encontrado. Instálelo o configure HYBRIDSCAN_ZAP_COMMAND / HYBRIDSCAN_ZAP_API_URL"
+            )
+        self.api_key = self.api_key or secrets.token_hex(16)
+        args = [
+            command, "-daemon", "-host", "127.0.0.1", "-port", str(self.port),
+            "-config", f"api.key={self.api_key}",
+            "-config", "api.addrs.addr.name=127.0.0.1",
+            "-config", "api.addrs.addr.regex=false"
+        ]
+        logger.info(f"🚀 Lanzando daemon ZAP en el puerto {self.port}...")
+        started = time.monotonic()
+        try:
+            self._process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            raise ZapUnavailableError(f"No se pudo lanzar ZAP ({command}): {e}")
+        client = ZapClient(self.api_url, self.api_key)
+
+        while time.monotonic() - started < STARTUP_TIMEOUT:
+            if self._process.poll() is not None:
+                raise ZapUnavailableError(f"El daemon ZAP terminó al arrancar (código {self._process.returncode})")
+            if self._ping(client):
+                elapsed = time.monotonic() - started
+                self._stats["daemon_starts"] += 1
+                self._stats["startup_seconds"] = round(elapsed, 2)
+                logger.info(f"✓ Daemon ZAP listo en {elapsed:.1f}s")
+                return client
+            time.sleep(self.poll_interval)
+
+        self._process.kill()
+        self._process = None
+        raise ZapUnavailableError(f"El daemon ZAP no respondió en {STARTUP_TIMEOUT}s")
+
+    def _origin_lock(self, target_url: str) -> threading.Lock:
+        parsed = urlparse(target_url)
+        with self._lock:
+            return self._origin_locks.setdefault(f"{parsed.scheme}://{parsed.netloc}", threading.Lock())
+
+    def session(self, target_url: str) -> ZapScanSession:
+        """Abre un contexto de escaneo aislado (usar como context manager)."""
+        return ZapScanSession(self.ensure_running(), target_url, poll_interval=self.poll_interval,
+                              origin_lock=self._origin_lock(target_url))
+
+    def scan(self, target_url: str, active: bool = True, max_children: Optional[int] = None) -> ZapScanResult:
+        """
+        Spider + escaneo activo del objetivo en un contexto propio.
+
+        Los escaneos que comparten origen con otro escaneo en curso esperan
+        turno sin ocupar plaza; el resto espera si se supera
+        `max_concurrent_scans`. El bloqueo de origen se toma antes que la
+        plaza para que los escaneos de un mismo origen no acaparen todas las
+        plazas mientras esperan.
+        """
+        result = ZapScanResult(target_url=target_url)
+        started = time.perf_counter()
+        with self._origin_lock(target_url), self._scan_slots:
+            try:
+                client = self.ensure_running()
+                result.zap_version = client.version()
+                # El bloqueo de origen ya está tomado: la sesión no lo vuelve a pedir
+                with ZapScanSession(client, target_url, poll_interval=self.poll_interval) as session:
+                    phase = time.perf_counter()
+                    result.urls_found = session.spider(max_children)
+                    result.phase_durations["spider"] = time.perf_counter() - phase
+                    if active:
+                        phase = time.perf_counter()
+                        session.active_scan()
+                        result.phase_durations["ascan"] = time.perf_counter() - phase
+                    result.vulnerabilities = session.alerts()
+            except ZapError:
+                self._stats["failed_scans"] += 1
+                raise
+        self._stats["scans"] += 1
+        result.duration = time.perf_counter() - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "api_url": self.api_url, "external": self.external,
+                "running": self._client is not None}
+
+    def shutdown(self) -> None:
+        """Detiene el daemon si lo lanzó este proceso."""
+        with self._lock:
+            if self._process is not None:
+                try:
+                    if self._client is not None:
+                        self._client.call("core", "action", "shutdown")
+                    self._process.wait(timeout=30)
+                except (ZapError, subprocess.TimeoutExpired):
+                    self._process.kill()
+                self._process = None
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_daemon: Optional[ZapDaemon] = None
+_daemon_lock = threading.Lock()
+
+
+def get_zap_daemon() -> ZapDaemon:
+    """Devuelve el daemon global (creado bajo demanda)."""
+    global _daemon
+    with _daemon_lock:
+        if _daemon is None:
+            _daemon = ZapDaemon()
+            atexit.register(_daemon.shutdown)
+    return _daemon
@@ -0,0 +1,116 @@
+"""
+Contadores materializados del panel (tabla `dashboard_counters`).
+
+Las estadísticas del panel (totales por severidad, por herramienta, por
+categoría OWASP...) se recalculaban en Python recorriendo los resultados de
+cada escaneo. Ahora cada combinación (dimensión, clave) tiene una fila con
+su contador, que se actualiza en la misma transacción que el cambio que la
+provoca:
+
+- un escaneo pasa a `completed`: listener de `ScanResult` en `models.py`,
+- se indexan sus hallazgos: `_index_findings` en `backend/main.py` aplica
+  la diferencia entre las filas de `findings` antes y después,
+- se archivan escaneos: `backend/retention.py` resta lo archivado.
+
+Leer el panel cuesta lo mismo con cien escaneos que con un millón: la tabla
+tiene una fila por clave distinta, no por escaneo.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# Dimensiones de los contadores
+TOTALS = "totals"                   # claves: scans, findings
+SCAN_TYPE = "scan_type"             # escaneos completados por tipo
+SCAN_TOOL = "scan_tool"             # escaneos completados por herramienta
+SEVERITY = "severity"               # hallazgos por severidad
+FINDING_TOOL = "finding_tool"       # hallazgos por herramienta
+OWASP_CATEGORY = "owasp_category"   # hallazgos por categoría OWASP API Top 10
+CWE = "cwe"                         # hallazgos por CWE
+
+UNKNOWN_KEY = "unknown"
+
+Deltas = Dict[Tuple[str, str], int]
+
+
+def apply_deltas(conn, table, deltas: Deltas) -> None:
+    """Suma `deltas` a los contadores con un único upsert por lotes (los ceros se omiten)."""
+    rows = [{"dimension": dimension, "key": key, "count": delta}
+            for (dimension, key), delta in deltas.items() if delta]
+    if not rows:
+        return
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.dimension, table.c.key],
+        set_={"count": table.c.count + statement.excluded.count}
+    )
+    conn.execute(statement, rows)
+
+
+def scan_deltas(scan_type: Optional[str], tool: Optional[str], sign: int = 1) -> Deltas:
+    """Contribución de un escaneo completado."""
+    return {
+        (TOTALS, "scans"): sign,
+        (SCAN_TYPE, scan_type or UNKNOWN_KEY): sign,
+        (SCAN_TOOL, tool or UNKNOWN_KEY): sign,
+    }
+
+
+def finding_counts(conn, findings_table, where) -> Deltas:
+    """Contribución de las filas de `findings` que cumplen `where` (consulta agregada)."""
+    deltas: Counter = Counter()
+    columns = ((SEVERITY, findings_table.c.severity), (FINDING_TOOL, findings_table.c.tool),
+               (OWASP_CATEGORY, findings_table.c.owasp_category), (CWE, findings_table.c.cwe))
+    for dimension, column in columns:
+        for key, count in conn.execute(select(column, func.count()).where(where).group_by(column)):
+            deltas[(dimension, key or UNKNOWN_KEY)] += count
+            deltas[(TOTALS, "findings")] += count if dimension == SEVERITY else 0
+    return dict(deltas)
+
+
+def completed_scan_counts(conn, scan_table, where) -> Deltas:
+    """Contribución de los escaneos completados que cumplen `where`."""
+    deltas: Counter = Counter()
+    statement = (select(scan_table.c.scan_type, scan_table.c.tool, func.count())
+                 .where(where, scan_table.c.status == "completed")
+                 .group_by(scan_table.c.scan_type, scan_table.c.tool))
+    for scan_type, tool, count in conn.execute(statement):
+        for key, delta in scan_deltas(scan_type, tool, count).items():
+            deltas[key] += delta
+    return dict(deltas)
+
+
+def difference(after: Deltas, before: Deltas) -> Deltas:
+    """`after - before` por clave, conservando las restas (a diferencia de `Counter`)."""
+    return {key: after.get(key, 0) - before.get(key, 0) for key in set(after) | set(before)}
+
+
+def negate(deltas: Deltas) -> Deltas:
+    return {key: -value for key, value in deltas.items()}
+
+
+def read_counters(rows: Iterable) -> Dict[str, Dict[str, int]]:
+    """Filas (dimension, key, count) -> `{dimension: {key: count}}` sin contadores a cero."""
+    aggregates: Dict[str, Dict[str, int]] = {}
+    for dimension, key, count in rows:
+        if count:
+            aggregates.setdefault(dimension, {})[key] = count
+    return aggregates
+
+
+def rebuild_counters(conn, table, scan_table, findings_table) -> None:
+    """Recalcula todos los contadores desde `scan_results` y `findings` (bases anteriores a la tabla)."""
+    conn.execute(table.delete())
+    apply_deltas(conn, table, completed_scan_counts(conn, scan_table, scan_table.c.id.isnot(None)))
+    apply_deltas(conn, table, finding_counts(conn, findings_table, findings_table.c.id.isnot(None)))
+
+
+def seed_counters(conn, table, scan_table, findings_table) -> bool:
+    """Construye los contadores si la tabla está vacía; True si se reconstruyeron."""
+    if conn.execute(select(table.c.dimension).limit(1)).first() is not None:
+        return False
+    rebuild_counters(conn, table, scan_table, findings_table)
+    return True
@@ -0,0 +1,205 @@
+"""
+Búsqueda de texto completo sobre los hallazgos (SQLite FTS5).
+
+Buscar "pickle" o "jwt" en el historial obligaba a recorrer cada JSON de
+resultados. `findings_fts` es una tabla virtual FTS5 de contenido externo
+sobre `findings` (descripción, regla, archivo y endpoint): el índice
+invertido vive en SQLite y el texto no se duplica. Los triggers sobre
+`findings` la mantienen sincronizada en la misma transacción que la ingesta
+(`store_findings`) y que los borrados de la retención.
+
+Los resultados se ordenan por relevancia (`bm25`, con más peso para la regla
+y la ruta que para la descripción) y se paginan por cursor `(rank, id)`.
+Calcular bm25 cuesta en proporción al número de coincidencias: un término
+presente en medio historial tardaría cientos de milisegundos. Por eso el
+ranking se limita a las `RANK_WINDOW` coincidencias más recientes (el primer
+rowid de la ventana viaja en el cursor). El orden `recent` recorre el índice
+por rowid descendente, cuesta lo mismo que la página y alcanza todas las
+coincidencias.
+
+Si el SQLite disponible no incluye FTS5 (o la base no es SQLite), la
+búsqueda recurre a `LIKE` sobre las mismas columnas, sin ranking.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "findings_fts"
+FTS_COLUMNS = ("description", "rule_id", "file_path", "endpoint")
+# Pesos de bm25 por columna (mismo orden que FTS_COLUMNS)
+COLUMN_WEIGHTS = (1.0, 4.0, 2.0, 2.0)
+SNIPPET_TOKENS = 12
+RANK_WINDOW = 5000      # Coincidencias más recientes que se ordenan por relevancia
+ORDERS = ("relevance", "recent")
+LIKE_ESCAPE = "\\"
+
+_COLUMNS_SQL = ", ".join(FTS_COLUMNS)
+_NEW_SQL = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+_OLD_SQL = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+
+FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_COLUMNS_SQL}, content='findings', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON findings BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS_SQL}) VALUES (new.id, {_NEW_SQL}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON findings BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS_SQL}) VALUES ('delete', old.id, {_OLD_SQL}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON findings BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS_SQL}) VALUES ('delete', old.id, {_OLD_SQL}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS_SQL}) VALUES (new.id, {_NEW_SQL}); END",
+)
+
+
+def fts5_available(conn) -> bool:
+    """True si la conexión es SQLite compilado con FTS5."""
+    if conn.dialect.name != "sqlite":
+        return False
+    options = {row[0] for row in conn.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+def search_index_exists(conn) -> bool:
+    if conn.dialect.name != "sqlite":
+        return False
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first() is not None
+
+
+def ensure_search_index(conn) -> bool:
+    """
+    Crea la tabla FTS5 y sus triggers si faltan; una tabla nueva se puebla
+    con los hallazgos existentes (`rebuild`). Devuelve False sin FTS5.
+    """
+    if not fts5_available(conn):
+        return False
+    created = not search_index_exists(conn)
+    for statement in FTS_DDL:
+        conn.exec_driver_sql(statement)
+    if created:
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        logger.info("🔎 Índice de búsqueda de hallazgos creado")
+    return True
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    Consulta del usuario -> expresión MATCH segura.
+
+    Cada término se cita como frase (la sintaxis FTS5 del usuario nunca se
+    interpreta) y todos deben aparecer; `jwt*` busca por prefijo.
+    """
+    terms = []
+    for raw in query.split():
+        prefix = raw.endswith("*")
+        word = raw.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+def _filters_sql(filters: Dict[str, Any], params: Dict[str, Any]) -> str:
+    clauses = []
+    for column, value in filters.items():
+        if value is not None:
+            clauses.append(f"f.{column} = :filter_{column}")
+            params[f"filter_{column}"] = value
+    return "".join(f" AND {clause}" for clause in clauses)
+
+
+def window_start_statement(query: str, filters: Optional[Dict[str, Any]] = None):
+    """
+    Primer rowid de la ventana de ranking: la coincidencia número
+    `RANK_WINDOW + 1` empezando por la más reciente (sin fila, no hay límite).
+
+    Con filtros la ventana cuenta solo las coincidencias que los cumplen; si
+    no, un filtro selectivo dejaría fuera de la ventana sus resultados más antiguos.
+    """
+    match = match_expression(query)
+    if match is None:
+        return None
+    params: Dict[str, Any] = {"match": match, "window": RANK_WINDOW}
+    where = _filters_sql(filters or {}, params)
+    join = f" JOIN findings f ON f.id = {FTS_TABLE}.rowid" if where else ""
+    sql = (f"SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE}{join} WHERE {FTS_TABLE} MATCH :match{where} "
+           f"ORDER BY {FTS_TABLE}.rowid DESC LIMIT 1 OFFSET :window")
+    return text(sql), params
+
+
+def _like_pattern(term: str) -> str:
+    """`%término%` con `%`, `_` y el carácter de escape tratados como literales."""
+    for char in (LIKE_ESCAPE, "%", "_"):
+        term = term.replace(char, LIKE_ESCAPE + char)
+    return f"%{term}%"
+
+
+def search_statement(query: str, filters: Dict[str, Any], limit: int, columns: Sequence[str],
+                     after: Optional[Tuple[float, int]] = None, use_fts: bool = True, order: str = "relevance",
+                     window_start: int = 0):
+    """
+    Consulta de búsqueda de hallazgos.
+
+    Args:
+        query: Texto introducido por el usuario
+        filters: Igualdades sobre columnas de `findings` (None se ignora)
+        limit: Filas a devolver (pedir `limit + 1` para saber si hay más)
+        columns: Columnas de `findings` a devolver, seleccionadas por nombre
+            (más `rank` y `snippet`)
+        after: Última clave `(rank, id)` de la página anterior
+        use_fts: False para la búsqueda con LIKE (siempre en orden `recent`)
+        order: `relevance` (bm25) o `recent` (id descendente)
+        window_start: rowid mínimo de la ventana de ranking (ver `window_start_statement`)
+
+    Returns:
+        (sentencia `text`, parámetros) o None si la consulta no tiene términos
+    """
+    params: Dict[str, Any] = {"limit": limit}
+    selected = ", ".join(f"f.{column} AS {column}" for column in columns)
+    if use_fts:
+        match = match_expression(query)
+        if match is None:
+            return None
+        params["match"] = match
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+        rank = f"bm25({FTS_TABLE}, {weights})"
+        where = f"{FTS_TABLE} MATCH :match" + _filters_sql(filters, params)
+        if order == "relevance":
+            if window_start:
+                where += f" AND {FTS_TABLE}.rowid >= :window_start"
+                params["window_start"] = window_start
+            if after is not None:
+                where += f" AND ({rank} > :after_rank OR ({rank} = :after_rank AND f.id > :after_id))"
+                params.update(after_rank=after[0], after_id=after[1])
+            order_by = "rank, f.id"
+        else:
+            if after is not None:
+                where += f" AND {FTS_TABLE}.rowid < :after_id"
+                params["after_id"] = after[1]
+            # El índice FTS5 entrega las filas en este orden: sin ordenación intermedia
+            order_by = f"{FTS_TABLE}.rowid DESC"
+        sql = (f"SELECT {selected}, {rank} AS rank, "
+               f"snippet({FTS_TABLE}, -1, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet "
+               f"FROM {FTS_TABLE} JOIN findings f ON f.id = {FTS_TABLE}.rowid "
+               f"WHERE {where} ORDER BY {order_by} LIMIT :limit")
+        return text(sql), params
+
+    terms = query.split()
+    if not terms:
+        return None
+    clauses = []
+    for index, term in enumerate(terms):
+        params[f"term_{index}"] = _like_pattern(term.rstrip('*'))
+        clauses.append("(" + " OR ".join(f"f.{column} LIKE :term_{index} ESCAPE '{LIKE_ESCAPE}'"
+                                         for column in FTS_COLUMNS) + ")")
+    where = " AND ".join(clauses) + _filters_sql(filters, params)
+    if after is not None:
+        where += " AND f.id < :after_id"
+        params["after_id"] = after[1]
+    sql = (f"SELECT {selected}, 0.0 AS rank, NULL AS snippet FROM findings f "
+           f"WHERE {where} ORDER BY f.id DESC LIMIT :limit")
+    return text(sql), params
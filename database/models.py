@@ -1,15 +1,29 @@
 # Modelos para la base de datos SQLite
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, create_engine
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Text, JSON, Boolean, ForeignKey, Index, bindparam, inspect, select, text, update
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import column_property, deferred, sessionmaker
+from sqlalchemy import event
 from datetime import datetime, timezone
 import os
+import re
+
+try:
+    from database.storage import DATABASE_URL, get_engine
+    from database.payload_codec import CompressedJSON, summarize_payload
+    from database.counters import apply_deltas, negate, scan_deltas, seed_counters
+    from database.finding_search import ensure_search_index
+except ImportError:
+    from storage import DATABASE_URL, get_engine
+    from payload_codec import CompressedJSON, summarize_payload
+    from counters import apply_deltas, negate, scan_deltas, seed_counters
+    from finding_search import ensure_search_index
 
 Base = declarative_base()
 
-# Configuración de la base de datos
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database/hybridsecscan.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Configuración de la base de datos: motor compartido con WAL y pragmas (database/storage.py)
+engine = get_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -56,25 +70,211 @@ class ScanResult(Base):
     scan_type = Column(String(50), index=True)  # SAST, DAST, FILE_UPLOAD
     tool = Column(String(50), index=True)       # bandit, semgrep, OWASP ZAP, upload_service
     result_path = Column(String(500))           # Ruta al archivo de reporte
+    report_uuid = Column(String(36), index=True, nullable=True)  # UUID del nombre del reporte (descargas por UUID)
     target = Column(String(500))                # Ruta del código o URL analizada
-    status = Column(String(20), default='completed')  # completed, failed, running, uploading
+    # completed, failed, running, uploading; active_history: los contadores del panel necesitan el estado anterior
+    status = column_property(Column(String(20), default='completed', index=True), active_history=True)
     error_message = Column(Text, nullable=True) # Mensaje de error si falló
-    results = Column(JSON, nullable=True)       # Resultados del escaneo en formato JSON
+    # Resultados completos comprimidos; carga diferida: solo se descomprimen al acceder a `results`
+    results = deferred(Column(CompressedJSON, nullable=True))
+    summary = Column(JSON, nullable=True)       # Claves ligeras de `results` sin comprimir (ver payload_codec)
+    fingerprint = Column(String(64), index=True, nullable=True)  # Huella árbol+herramienta+config (memoización)
+    limit_reason = Column(String(20), nullable=True)  # Límite que detuvo el escaneo: memory, cpu_time, open_files, wall_clock
+    progress = Column(Integer, nullable=True)   # Progreso 0-100 mientras el escaneo está en curso
     timestamp = Column(DateTime, default=lambda: datetime.now(timezone.utc))  # Timestamp de inicio
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
+    # Paginación por cursor (created_at, id) en los listados
+    __table_args__ = (Index('ix_scan_results_created_at_id', 'created_at', 'id'),)
+    
     def to_dict(self):
         return {
             "id": self.id,
             "scan_type": self.scan_type,
             "tool": self.tool,
             "result_path": self.result_path,
+            "report_uuid": self.report_uuid,
             "target": self.target,
             "status": self.status,
             "error_message": self.error_message,
             "results": self.results,
+            "summary": self.summary,
+            "fingerprint": self.fingerprint,
+            "limit_reason": self.limit_reason,
+            "progress": self.progress,
             "timestamp": self.timestamp.isoformat() if self.timestamp else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+
+
+_REPORT_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+
+
+def report_uuid_from_path(path) -> str:
+    """UUID del nombre de un reporte (`bandit_report_<uuid>.json`); None si no lleva uno."""
+    match = _REPORT_UUID.search(os.path.basename(str(path))) if path else None
+    return match.group(0).lower() if match else None
+
+
+@event.listens_for(ScanResult, "before_insert")
+@event.listens_for(ScanResult, "before_update")
+def _refresh_summary(mapper, connection, target):
+    """Recalcula `summary` cada vez que se asignan nuevos resultados y `report_uuid` con cada reporte."""
+    state = inspect(target)
+    if state.attrs.results.history.has_changes():
+        target.summary = summarize_payload(target.results)
+    if state.attrs.result_path.history.has_changes():
+        target.report_uuid = report_uuid_from_path(target.result_path)
+
+
+class Finding(Base):
+    """Hallazgo normalizado de un escaneo; una fila por hallazgo para consultas indexadas."""
+    __tablename__ = 'findings'
+
+    id = Column(Integer, primary_key=True)
+    scan_id = Column(Integer, ForeignKey('scan_results.id', ondelete='CASCADE'), nullable=False, index=True)
+    scan_type = Column(String(50))                  # SAST, DAST
+    tool = Column(String(50), index=True)
+    rule_id = Column(String(200))                   # test_id de Bandit, check_id de Semgrep, tipo de alerta DAST
+    severity = Column(String(10))                   # critical, high, medium, low, info
+    cwe = Column(String(20))                        # CWE-89
+    owasp_category = Column(String(50), index=True)
+    file_path = Column(String(500))
+    line_number = Column(Integer)
+    endpoint = Column(String(500))
+    fingerprint = Column(String(64), index=True)   # Huella estable entre escaneos (sin número de línea)
+    description = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))  # Fecha del escaneo
+    # Campos canónicos añadidos después (al final: `ALTER TABLE` los añade en este mismo orden)
+    title = Column(String(200))                     # test_name de Bandit, nombre de la alerta DAST
+    vuln_type = Column(String(50))                  # Tipo del motor de correlación (sql_injection, xss...)
+    confidence = Column(String(10))
+    recommendation = Column(Text)
+
+    __table_args__ = (
+        # "Hallazgos HIGH CWE-89 de la última semana"
+        Index('ix_findings_severity_cwe_created_at', 'severity', 'cwe', 'created_at'),
+        # Paginación por cursor (created_at, id)
+        Index('ix_findings_created_at_id', 'created_at', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "scan_id": self.scan_id,
+            "scan_type": self.scan_type,
+            "tool": self.tool,
+            "rule_id": self.rule_id,
+            "severity": self.severity,
+            "cwe": self.cwe,
+            "owasp_category": self.owasp_category,
+            "file_path": self.file_path,
+            "line_number": self.line_number,
+            "endpoint": self.endpoint,
+            "fingerprint": self.fingerprint,
+            "description": self.description,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "title": self.title,
+            "vuln_type": self.vuln_type,
+            "confidence": self.confidence,
+            "recommendation": self.recommendation
+        }
+
+
+@event.listens_for(Finding.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    """Tabla FTS5 y triggers de búsqueda junto con `findings` (database/finding_search.py)."""
+    ensure_search_index(connection)
+
+
+class DashboardCounter(Base):
+    """Contador materializado del panel: una fila por (dimensión, clave), ver database/counters.py."""
+    __tablename__ = 'dashboard_counters'
+
+    dimension = Column(String(30), primary_key=True)    # totals, severity, scan_tool, owasp_category...
+    key = Column(String(100), primary_key=True)         # p.ej. "high", "bandit", "API1:2023"
+    count = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(ScanResult, "before_insert")
+def _count_new_completed_scan(mapper, connection, target):
+    """Suma al panel los escaneos que se crean ya completados (p.ej. DAST)."""
+    status = target.status if target.status is not None else ScanResult.__table__.c.status.default.arg
+    if status == "completed":
+        apply_deltas(connection, DashboardCounter.__table__, scan_deltas(target.scan_type, target.tool))
+
+
+@event.listens_for(ScanResult, "before_update")
+def _count_completed_scan(mapper, connection, target):
+    """Suma (o resta) el escaneo a los contadores del panel al entrar en (o salir de) `completed`."""
+    history = inspect(target).attrs.status.history
+    if not history.has_changes():
+        return
+    was_completed = "completed" in (history.deleted or ())
+    if target.status == "completed" and not was_completed:
+        apply_deltas(connection, DashboardCounter.__table__, scan_deltas(target.scan_type, target.tool))
+    elif target.status != "completed" and was_completed:
+        apply_deltas(connection, DashboardCounter.__table__, negate(scan_deltas(target.scan_type, target.tool)))
+
+
+def backfill_report_uuids(conn) -> int:
+    """Rellena `report_uuid` a partir de `result_path` en las filas anteriores a la columna."""
+    table = ScanResult.__table__
+    rows = conn.execute(
+        select(table.c.id, table.c.result_path)
+        .where(table.c.report_uuid.is_(None), table.c.result_path.isnot(None))
+    ).fetchall()
+    updates = [{"row_id": row_id, "uuid": report_uuid_from_path(path)} for row_id, path in rows]
+    updates = [u for u in updates if u["uuid"]]
+    if updates:
+        conn.execute(
+            update(table).where(table.c.id == bindparam("row_id")).values(report_uuid=bindparam("uuid")),
+            updates
+        )
+    return len(updates)
+
+
+# Rellenos que se ejecutan una sola vez, al añadir la columna a una base existente
+COLUMN_BACKFILLS = {
+    ("scan_results", "report_uuid"): backfill_report_uuids,
+}
+
+
+def upgrade_schema(bind) -> None:
+    """
+    Añade a tablas existentes las columnas e índices nuevos del modelo.
+
+    `create_all` solo crea tablas que no existen; las bases de datos creadas
+    con versiones anteriores necesitan `ALTER TABLE ADD COLUMN` para las
+    columnas añadidas después (todas ellas nullable) y `CREATE INDEX` para
+    los índices declarados después. Las columnas con relleno en
+    `COLUMN_BACKFILLS` se rellenan en la misma transacción; el índice de
+    búsqueda FTS5 y los contadores del panel se construyen desde el
+    historial si faltan.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            added = []
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                added.append(column.name)
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+            # Después de añadir todas las columnas (los UPDATE tocan también `updated_at`)
+            for name in added:
+                backfill = COLUMN_BACKFILLS.get((table.name, name))
+                if backfill:
+                    backfill(conn)
+        if inspector.has_table(Finding.__tablename__):
+            ensure_search_index(conn)
+        if inspector.has_table(DashboardCounter.__tablename__):
+            seed_counters(conn, DashboardCounter.__table__, ScanResult.__table__, Finding.__table__)
@@ -0,0 +1,99 @@
+"""
+Almacenamiento comprimido de los resultados de escaneo.
+
+La columna `scan_results.results` guardaba el JSON completo en texto
+(reportes híbridos con `correlation_report` y `model_metrics`, salida bruta
+de Bandit...), y la base de datos crecía en gigabytes al mes. `CompressedJSON`
+guarda el mismo valor como BLOB comprimido con una cabecera de 4 bytes:
+
+    b"HZ" + versión + códec ("z" zstd si `zstandard` está instalado, "d" DEFLATE)
+
+Las filas antiguas en texto JSON se siguen leyendo sin migración: el tipo
+detecta la cabecera y, si no está, decodifica el texto. La columna se carga
+de forma diferida (ver `ScanResult.results`), así que solo se descomprime
+cuando se accede a los resultados completos.
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# zstd es opcional: comprime mejor y descomprime más rápido que DEFLATE
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+MAGIC = b"HZ1"
+CODEC_ZSTD = b"z"
+CODEC_DEFLATE = b"d"
+DEFLATE_LEVEL = 6
+ZSTD_LEVEL = 9
+
+# Claves pesadas que no se copian al resumen sin comprimir
+HEAVY_KEYS = frozenset({
+    "results", "vulnerabilities", "correlation_report", "model_metrics",
+    "raw_stdout", "raw_stderr", "raw_output", "route_table", "errors", "findings"
+})
+
+
+def encode_payload(value: Any) -> bytes:
+    """Serializa y comprime un valor JSON."""
+    raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    if ZSTD_AVAILABLE:
+        return MAGIC + CODEC_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return MAGIC + CODEC_DEFLATE + zlib.compress(raw, DEFLATE_LEVEL)
+
+
+def decode_payload(stored: Any) -> Any:
+    """Inverso de `encode_payload`; acepta también JSON en texto de filas anteriores."""
+    if stored is None:
+        return None
+    if isinstance(stored, memoryview):
+        stored = stored.tobytes()
+    if isinstance(stored, (bytes, bytearray)) and stored[:len(MAGIC)] == MAGIC:
+        codec, body = stored[len(MAGIC):len(MAGIC) + 1], stored[len(MAGIC) + 1:]
+        if codec == CODEC_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Resultado comprimido con zstd pero 'zstandard' no está instalado")
+            raw = zstandard.ZstdDecompressor().decompress(body)
+        elif codec == CODEC_DEFLATE:
+            raw = zlib.decompress(body)
+        else:
+            raise ValueError(f"Códec de resultados desconocido: {codec!r}")
+        return json.loads(raw)
+    if isinstance(stored, (bytes, bytearray)):
+        stored = stored.decode("utf-8")
+    return json.loads(stored) if isinstance(stored, str) else stored
+
+
+def summarize_payload(results: Any) -> Optional[Dict[str, Any]]:
+    """
+    Resumen sin comprimir de unos resultados: sus claves ligeras.
+
+    Se descartan los arrays de hallazgos y las claves de `HEAVY_KEYS`; del
+    reporte híbrido se conserva solo `correlation_report.summary`.
+    """
+    if not isinstance(results, dict):
+        return None
+    summary = {k: v for k, v in results.items() if k not in HEAVY_KEYS and not isinstance(v, list)}
+    correlation = results.get("correlation_report")
+    if isinstance(correlation, dict) and isinstance(correlation.get("summary"), dict):
+        summary["correlation_summary"] = correlation["summary"]
+    return summary
+
+
+class CompressedJSON(TypeDecorator):
+    """Valor JSON almacenado comprimido en un BLOB (lee también JSON en texto)."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else encode_payload(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_payload(value)
@@ -0,0 +1,299 @@
+"""
+Configuración de almacenamiento compartida por `database/models.py` y `backend/main.py`.
+
+Con el journal por defecto (DELETE) cada commit bloquea toda la base de datos
+y los lectores esperan al escritor, de modo que los escaneos concurrentes se
+serializan en las actualizaciones de estado. Este módulo:
+
+- crea un único motor por URL (`get_engine`) con `busy_timeout` y los pragmas
+  de `SQLITE_PRAGMAS` aplicados en cada conexión: WAL (lectores y un escritor
+  en paralelo), `synchronous=NORMAL` (sin fsync por commit en WAL), caché y
+  tablas temporales en memoria,
+- ofrece `WriteBatcher`, que agrupa actualizaciones frecuentes y no críticas
+  (progreso, estado intermedio) por fila y las escribe en una sola transacción
+  cada pocos milisegundos en lugar de un commit por actualización.
+
+Variables de entorno:
+    DATABASE_URL: URL de la base de datos (por defecto database/hybridsecscan.db)
+    HYBRIDSCAN_SQLITE_BUSY_TIMEOUT_MS: Espera máxima por un bloqueo de escritura
+    HYBRIDSCAN_SQLITE_JOURNAL_MODE: Modo de journal (WAL por defecto)
+    HYBRIDSCAN_SQLITE_SYNCHRONOUS: Nivel de `synchronous` (NORMAL por defecto)
+
+Para los endpoints `async def`, `async_session_for` devuelve una sesión
+asíncrona sobre la misma base que una sesión síncrona: `AsyncSession` con
+aiosqlite si está instalado y, si no, `ThreadedSession`, que ejecuta la
+sesión síncrona en un hilo. En ambos casos el bucle de eventos no espera a
+la base de datos. El motor asíncrono aplica los mismos pragmas que el motor
+síncrono del que deriva: una base abierta con `create_engine` a secas (p.ej.
+las de los tests) no pasa a WAL ni deja archivos `-wal`/`-shm`.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import bindparam, create_engine, event, update
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool
+
+# Acceso asíncrono: SQLAlchemy asyncio con el driver aiosqlite (opcional)
+try:
+    import aiosqlite  # noqa: F401
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+    ASYNC_DB_AVAILABLE = True
+except ImportError:
+    ASYNC_DB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(DATABASE_DIR, 'hybridsecscan.db')}"
+DATABASE_URL = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+
+BUSY_TIMEOUT_MS = int(os.getenv("HYBRIDSCAN_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Pragmas aplicados a cada conexión nueva (orden relevante: auto_vacuum antes de
+# crear la base en WAL; en una base existente no tiene efecto sin un VACUUM completo)
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "auto_vacuum": "INCREMENTAL",   # backend/retention.py libera páginas con incremental_vacuum
+    "journal_mode": os.getenv("HYBRIDSCAN_SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("HYBRIDSCAN_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    "cache_size": -20000,       # 20 MB (valores negativos en KiB)
+    "temp_store": "MEMORY",
+    "mmap_size": 128 * 1024 * 1024,
+}
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+# Pragmas registrados por motor, para que su motor asíncrono use los mismos
+_engine_pragmas: "weakref.WeakKeyDictionary[Engine, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def is_sqlite(url: str) -> bool:
+    return str(url).startswith("sqlite")
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """Registra los pragmas para que se apliquen a cada conexión que abra el motor."""
+    pragmas = dict(SQLITE_PRAGMAS if pragmas is None else pragmas)
+    _engine_pragmas[engine] = pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine(url: Optional[str] = None, pragmas: Optional[Dict[str, Any]] = None, **kwargs) -> Engine:
+    """
+    Crea un motor configurado; para SQLite aplica `busy_timeout` y los pragmas.
+
+    Args:
+        url: URL de la base de datos (por defecto `DATABASE_URL`)
+        pragmas: Pragmas a aplicar en lugar de `SQLITE_PRAGMAS` (`{}` para ninguno)
+        **kwargs: Argumentos adicionales para `create_engine`
+    """
+    url = url or DATABASE_URL
+    if not is_sqlite(url):
+        return create_engine(url, **kwargs)
+    connect_args = {"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000}
+    connect_args.update(kwargs.pop("connect_args", {}))
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    apply_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """Motor compartido por URL: todos los módulos que usan la misma base reutilizan su pool."""
+    url = url or DATABASE_URL
+    with _engines_lock:
+        if url not in _engines:
+            _engines[url] = build_engine(url)
+            logger.info(f"🗄️ Motor de base de datos configurado: {url}")
+        return _engines[url]
+
+
+class WriteBatcher:
+    """
+    Agrupa actualizaciones por fila y las escribe por lotes en segundo plano.
+
+    `submit(row_id, progress=40)` solo guarda el valor en memoria; varias
+    actualizaciones de la misma fila se combinan (gana la última) y un hilo
+    las escribe cada `flush_interval` segundos, o antes si se acumulan
+    `max_pending` filas, con un `UPDATE ... WHERE id = ?` ejecutado como
+    `executemany` en una única transacción. Pensado para valores que pueden
+    llegar con unos milisegundos de retraso; las escrituras finales del
+    escaneo siguen siendo síncronas (`flush()` antes de ellas).
+    """
+
+    def __init__(self, engine: Engine, table, flush_interval: float = 0.05, max_pending: int = 500):
+        self.engine = engine
+        self.table = table
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flushes = 0
+        self.rows_written = 0
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="sqlite-write-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, row_id: Any, **values: Any) -> None:
+        """Encola valores de columna para la fila `row_id`."""
+        if self._closed:
+            raise RuntimeError("WriteBatcher cerrado")
+        with self._lock:
+            self._pending.setdefault(row_id, {}).update(values)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Escribe ahora todas las actualizaciones pendientes; devuelve las filas actualizadas."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            # executemany necesita las mismas columnas en cada fila: agrupar por conjunto de columnas
+            groups: Dict[tuple, list] = {}
+            for row_id, values in pending.items():
+                groups.setdefault(tuple(sorted(values)), []).append(
+                    {"_row_id": row_id, **{f"_v_{name}": value for name, value in values.items()}}
+                )
+
+            id_column = self.table.c.id
+            try:
+                with self.engine.begin() as conn:
+                    for columns, rows in groups.items():
+                        statement = update(self.table).where(id_column == bindparam("_row_id")).values(
+                            {name: bindparam(f"_v_{name}") for name in columns}
+                        )
+                        conn.execute(statement, rows)
+            except Exception:
+                # Devolver el lote a la cola sin pisar valores más recientes
+                with self._lock:
+                    for row_id, values in pending.items():
+                        self._pending[row_id] = {**values, **self._pending.get(row_id, {})}
+                raise
+            self.flushes += 1
+            self.rows_written += len(pending)
+            return len(pending)
+
+    def close(self) -> None:
+        """Detiene el hilo y escribe lo pendiente."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"⚠️ Error escribiendo lote de actualizaciones: {e}")
+                time.sleep(self.flush_interval)
+
+
+_batchers: Dict[tuple, WriteBatcher] = {}
+
+
+def get_write_batcher(engine: Engine, table) -> WriteBatcher:
+    """Batcher compartido por motor y tabla (las sesiones de prueba usan su propio motor)."""
+    key = (engine, table.name)
+    with _engines_lock:
+        if key not in _batchers:
+            _batchers[key] = WriteBatcher(engine, table)
+        return _batchers[key]
+
+
+_async_engines: Dict[str, Any] = {}
+
+
+def get_async_engine(engine: Engine) -> "AsyncEngine":
+    """
+    Motor aiosqlite para la misma base de datos que `engine`, con los mismos pragmas.
+
+    Si `engine` no se creó con `build_engine` no se aplica ninguno: cambiar
+    el journal de una base ajena (p.ej. a WAL) persistiría en el archivo.
+
+    Usa `NullPool`: las conexiones aiosqlite quedan ligadas al bucle de eventos
+    que las crea, y el motor se comparte entre bucles (p.ej. el TestClient).
+    """
+    url = make_url(str(engine.url)).set(drivername="sqlite+aiosqlite")
+    key = url.render_as_string(hide_password=False)
+    with _engines_lock:
+        if key not in _async_engines:
+            async_engine = create_async_engine(url, poolclass=NullPool,
+                                               connect_args={"timeout": BUSY_TIMEOUT_MS / 1000})
+            apply_sqlite_pragmas(async_engine.sync_engine, _engine_pragmas.get(engine, {}))
+            _async_engines[key] = async_engine
+        return _async_engines[key]
+
+
+class ThreadedSession:
+    """
+    Subconjunto de la API de `AsyncSession` sobre una sesión síncrona.
+
+    Alternativa cuando aiosqlite no está instalado (o la base no es SQLite):
+    cada operación con E/S se ejecuta en un hilo con `asyncio.to_thread`.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def execute(self, statement, params=None):
+        return await asyncio.to_thread(self.sync_session.execute, statement, params)
+
+    async def scalar(self, statement, params=None):
+        return await asyncio.to_thread(self.sync_session.scalar, statement, params)
+
+    async def get(self, entity, ident, **kwargs):
+        return await asyncio.to_thread(self.sync_session.get, entity, ident, **kwargs)
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    async def commit(self) -> None:
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await asyncio.to_thread(self.sync_session.rollback)
+
+    async def refresh(self, instance) -> None:
+        await asyncio.to_thread(self.sync_session.refresh, instance)
+
+    async def close(self) -> None:
+        # La sesión síncrona la cierra su propia dependencia
+        return None
+
+
+# Tipo de la sesión que devuelve `async_session_for` (anotación de dependencias)
+AsyncDbSession = Union[AsyncSession, ThreadedSession] if ASYNC_DB_AVAILABLE else ThreadedSession
+
+
+def async_session_for(session) -> AsyncDbSession:
+    """Sesión asíncrona sobre la base de datos de `session` (ver docstring del módulo)."""
+    bind = session.get_bind()
+    # Una base en memoria solo existe en la conexión síncrona
+    in_memory = bind.url.database in (None, "", ":memory:")
+    if ASYNC_DB_AVAILABLE and is_sqlite(str(bind.url)) and not in_memory:
+        return AsyncSession(get_async_engine(bind), expire_on_commit=False)
+    return ThreadedSession(session)
@@ -36,6 +36,7 @@ function App() {
   const [scanError, setScanError] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const [results, setResults] = useState<ScanResult[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [downloadError, setDownloadError] = useState('');
   const [downloadMessage, setDownloadMessage] = useState('');
   const [selectedSastId, setSelectedSastId] = useState<string>('');
@@ -77,7 +78,10 @@ function App() {
         throw new Error(errorData.detail || 'Error subiendo archivo');
       }
       const data = await res.json();
-      setUploadMessage('Archivo subido correctamente');
+      const quick = data.quick_scan;
+      setUploadMessage(quick
+        ? `Archivo subido correctamente · ${quick.vulnerabilities_found} hallazgos preliminares en ${quick.elapsed_ms} ms`
+        : 'Archivo subido correctamente');
       setTargetPath(data.file_path);
     } catch (error) {
       setUploadError(error instanceof Error ? error.message : 'Error desconocido');
@@ -184,12 +188,16 @@ function App() {
     }
   };
 
-  const fetchResults = async () => {
+  // Listado paginado por cursor: la cabecera X-Next-Cursor indica si hay más páginas
+  const fetchResults = async (cursor?: string) => {
     try {
-      const res = await fetch(`${API_BASE_URL}/scan-results`);
+      const params = new URLSearchParams({ limit: '50' });
+      if (cursor) params.set('cursor', cursor);
+      const res = await fetch(`${API_BASE_URL}/scan-results?${params}`);
       if (res.ok) {
-        const data = await res.json();
-        setResults(data);
+        const data: ScanResult[] = await res.json();
+        setResults(prev => (cursor ? [...prev, ...data] : data));
+        setNextCursor(res.headers.get('X-Next-Cursor'));
       }
     } catch (error) {
       console.error('Error:', error);
@@ -376,7 +384,7 @@ function App() {
         <div className="card history-section">
           <div className="card-header" style={{ justifyContent: 'space-between', display: 'flex' }}>
             <h2>Historial de Auditorías</h2>
-            <button onClick={fetchResults} title="Actualizar" style={{background:'transparent', color: 'var(--primary)'}}>
+            <button onClick={() => fetchResults()} title="Actualizar" style={{background:'transparent', color: 'var(--primary)'}}>
               <Icons.Refresh />
             </button>
           </div>
@@ -425,6 +433,11 @@ function App() {
                 </tbody>
               </table>
             )}
+            {nextCursor && (
+              <button className="btn-sm" style={{ margin: '1rem' }} onClick={() => fetchResults(nextCursor)}>
+                Cargar más
+              </button>
+            )}
           </div>
         </div>
 
@@ -0,0 +1,79 @@
+# Benchmark de la búsqueda de hallazgos: FTS5 (relevancia y recientes) frente a LIKE sobre la tabla findings
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import Float, String, func, insert, select
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.finding_search import search_statement, window_start_statement
+from database.models import Base, Finding, ScanResult
+from database.storage import build_engine
+
+WORDS = ("sql injection subprocess shell assert yaml load hardcoded password token request timeout tempfile "
+         "random hash md5 xml parse eval exec bind all interfaces").split()
+QUERIES = ("pickle", "jwt signature", "pick*", "sql injection")
+
+
+def _populate(engine, findings: int, batch: int = 20000) -> None:
+    rnd = random.Random(1)
+    with engine.begin() as conn:
+        scan_id = conn.execute(insert(ScanResult.__table__).values(scan_type="SAST")).inserted_primary_key[0]
+    for start in range(0, findings, batch):
+        rows = []
+        for i in range(start, min(start + batch, findings)):
+            description = " ".join(rnd.choice(WORDS) for _ in range(12))
+            if i % 5000 == 0:
+                description += " pickle deserialization of untrusted data"
+            if i % 20000 == 7:
+                description += " jwt signature not verified"
+            rows.append({"scan_id": scan_id, "tool": "bandit", "rule_id": f"B{rnd.randint(100, 699)}",
+                         "severity": rnd.choice(("high", "medium", "low")), "description": description,
+                         "file_path": f"src/mod{i % 3000}/file{i % 97}.py"})
+        with engine.begin() as conn:
+            conn.execute(insert(Finding.__table__), rows)
+
+
+def _timed(engine, query: str, use_fts: bool, order: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            window_start = 0
+            if use_fts and order == "relevance":
+                row = conn.execute(*window_start_statement(query)).first()
+                window_start = row[0] + 1 if row else 0
+            statement, params = search_statement(query, {}, 51, use_fts=use_fts, order=order,
+                                                 window_start=window_start)
+            conn.execute(statement.columns(*Finding.__table__.columns, rank=Float, snippet=String), params).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark full-text search over findings')
+    parser.add_argument('--findings', type=int, default=200000, help='Synthetic findings to generate')
+    parser.add_argument('--database', help='Reuse (or create) this SQLite file instead of a temporary one')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query (median reported)')
+    args = parser.parse_args()
+
+    path = Path(args.database) if args.database else Path(tempfile.mkdtemp()) / "search_benchmark.db"
+    engine = build_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(Finding.__table__)).scalar()
+    if existing < args.findings:
+        start = time.perf_counter()
+        _populate(engine, args.findings - existing)
+        print(f"Insertados {args.findings - existing:,} hallazgos en {time.perf_counter() - start:.1f} s")
+
+    print(f"{'consulta':<16}{'FTS relevancia':>16}{'FTS recientes':>16}{'LIKE':>12}   (ms, mediana)")
+    for query in QUERIES:
+        relevance = _timed(engine, query, True, "relevance", args.repeat)
+        recent = _timed(engine, query, True, "recent", args.repeat)
+        like = _timed(engine, query, False, "recent", args.repeat)
+        print(f"{query:<16}{relevance:>16.1f}{recent:>16.1f}{like:>12.1f}")
@@ -0,0 +1,125 @@
+# Benchmark de escrituras concurrentes en SQLite: journal por defecto vs WAL + pragmas + lotes
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.models import Base, ScanResult
+from database.storage import WriteBatcher, build_engine
+
+TABLE = ScanResult.__table__
+
+
+def _prepare(engine, scans: int) -> list:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        return [conn.execute(insert(TABLE).values(scan_type="SAST", tool="bandit", status="running",
+                                                  created_at=datetime.now(timezone.utc))).inserted_primary_key[0]
+                for _ in range(scans)]
+
+
+def _concurrent_updates(engine, scan_ids: list, updates: int, batcher=None) -> dict:
+    """Un hilo por escaneo que escribe `updates` actualizaciones de progreso; un lector lista escaneos."""
+    errors = []
+    stop = threading.Event()
+    reads = [0]
+
+    def writer(scan_id):
+        for step in range(1, updates + 1):
+            progress = step * 100 // updates
+            try:
+                if batcher is not None:
+                    batcher.submit(scan_id, progress=progress)
+                else:
+                    with engine.begin() as conn:
+                        conn.execute(update(TABLE).where(TABLE.c.id == scan_id).values(progress=progress))
+            except OperationalError as e:
+                errors.append(str(e.orig))
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(TABLE.select().with_only_columns(TABLE.c.id, TABLE.c.progress)).fetchall()
+                reads[0] += 1
+            except OperationalError as e:
+                errors.append(str(e.orig))
+
+    threads = [threading.Thread(target=writer, args=(scan_id,)) for scan_id in scan_ids]
+    read_thread = threading.Thread(target=reader)
+    start = time.perf_counter()
+    read_thread.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if batcher is not None:
+        batcher.close()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    read_thread.join()
+
+    with engine.connect() as conn:
+        final = dict(conn.execute(TABLE.select().with_only_columns(TABLE.c.id, TABLE.c.progress)).fetchall())
+    total = len(scan_ids) * updates
+    return {
+        "updates": total,
+        "seconds": round(elapsed, 3),
+        "updates_per_second": round(total / elapsed, 1),
+        "reads": reads[0],
+        "lock_errors": len(errors),
+        "all_completed": all(final.get(scan_id) == 100 for scan_id in scan_ids),
+        "batched_flushes": batcher.flushes if batcher is not None else None
+    }
+
+
+def run_benchmark(scans: int, updates: int, work_dir: Path) -> dict:
+    """Ejecuta los tres escenarios sobre bases de datos nuevas en `work_dir`."""
+    scenarios = {}
+
+    # Antes: motor por defecto (journal DELETE, synchronous FULL) y un commit por actualización
+    engine = create_engine(f"sqlite:///{work_dir / 'default.db'}", connect_args={"check_same_thread": False})
+    scenarios["default_journal"] = _concurrent_updates(engine, _prepare(engine, scans), updates)
+    engine.dispose()
+
+    # WAL + pragmas, todavía un commit por actualización
+    engine = build_engine(f"sqlite:///{work_dir / 'wal.db'}")
+    scenarios["wal_pragmas"] = _concurrent_updates(engine, _prepare(engine, scans), updates)
+    engine.dispose()
+
+    # WAL + pragmas + WriteBatcher
+    engine = build_engine(f"sqlite:///{work_dir / 'batched.db'}")
+    scan_ids = _prepare(engine, scans)
+    scenarios["wal_batched"] = _concurrent_updates(engine, scan_ids, updates, WriteBatcher(engine, TABLE))
+    engine.dispose()
+    return scenarios
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark concurrent SQLite status/progress writes')
+    parser.add_argument('--scans', type=int, default=8, help='Concurrent scans (one writer thread each)')
+    parser.add_argument('--updates', type=int, default=200, help='Progress updates per scan')
+    parser.add_argument('--json', type=Path, default=None, help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="hybridscan_bench_") as tmp:
+        results = run_benchmark(args.scans, args.updates, Path(tmp))
+
+    print(f"{args.scans} escaneos concurrentes x {args.updates} actualizaciones de progreso")
+    print(f"{'Escenario':<18}{'upd/s':>10}{'segundos':>10}{'lecturas':>10}{'bloqueos':>10}")
+    for name, row in results.items():
+        print(f"{name:<18}{row['updates_per_second']:>10}{row['seconds']:>10}{row['reads']:>10}{row['lock_errors']:>10}")
+    baseline = results["default_journal"]["updates_per_second"]
+    for name in ("wal_pragmas", "wal_batched"):
+        print(f"{name}: x{results[name]['updates_per_second'] / baseline:.1f} respecto al journal por defecto")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
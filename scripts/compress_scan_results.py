@@ -0,0 +1,104 @@
+# Comprime los resultados de escaneo guardados como texto JSON y mide el ahorro y la latencia de lectura
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.models import Base, upgrade_schema
+from database.payload_codec import decode_payload, encode_payload, summarize_payload
+from database.storage import DATABASE_URL, build_engine
+
+
+def database_bytes(conn) -> int:
+    """Tamaño ocupado por la base (páginas en uso, sin contar páginas libres)."""
+    page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+    pages = conn.exec_driver_sql("PRAGMA page_count").scalar() - conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+    return page_size * pages
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def compress_rows(engine, batch_size: int = 200) -> dict:
+    """
+    Reescribe comprimidas las filas con `results` en texto y rellena `summary`.
+
+    Lee por lotes ordenados por id (keyset) y cada lote se reescribe en su
+    propia transacción corta: la memoria queda acotada por el tamaño de lote y
+    el bloqueo de escritura se libera entre lotes.
+    """
+    converted = text_bytes = blob_bytes = 0
+    json_ms, decode_ms = [], []
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text("SELECT id, results FROM scan_results WHERE typeof(results) = 'text' AND id > :last "
+                     "ORDER BY id LIMIT :batch"),
+                {"last": last_id, "batch": batch_size}
+            ).fetchall()
+            if not rows:
+                break
+            updates = []
+            for row_id, stored in rows:
+                start = time.perf_counter()
+                value = json.loads(stored)
+                json_ms.append((time.perf_counter() - start) * 1000)
+
+                blob = encode_payload(value)
+                start = time.perf_counter()
+                decode_payload(blob)
+                decode_ms.append((time.perf_counter() - start) * 1000)
+
+                text_bytes += len(stored.encode("utf-8"))
+                blob_bytes += len(blob)
+                summary = summarize_payload(value)
+                updates.append({"id": row_id, "results": blob,
+                                "summary": json.dumps(summary) if summary is not None else None})
+            conn.execute(text("UPDATE scan_results SET results = :results, summary = :summary WHERE id = :id"),
+                         updates)
+            converted += len(updates)
+            last_id = rows[-1][0]
+    return {
+        "rows_converted": converted,
+        "payload_text_bytes": text_bytes,
+        "payload_compressed_bytes": blob_bytes,
+        "json_decode_ms": {"p50": round(statistics.median(json_ms), 3) if json_ms else 0,
+                           "p95": round(_percentile(json_ms, 0.95), 3)},
+        "compressed_decode_ms": {"p50": round(statistics.median(decode_ms), 3) if decode_ms else 0,
+                                 "p95": round(_percentile(decode_ms, 0.95), 3)},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compress stored scan result payloads and report savings')
+    parser.add_argument('--database-url', default=DATABASE_URL, help='SQLite URL (default: DATABASE_URL)')
+    parser.add_argument('--no-vacuum', action='store_true', help='Skip VACUUM after converting rows')
+    args = parser.parse_args()
+
+    engine = build_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    with engine.connect() as conn:
+        before = database_bytes(conn)
+    stats = compress_rows(engine)
+    if not args.no_vacuum:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+    with engine.connect() as conn:
+        after = database_bytes(conn)
+
+    ratio = stats["payload_compressed_bytes"] / stats["payload_text_bytes"] if stats["payload_text_bytes"] else 1
+    print(f"Filas comprimidas: {stats['rows_converted']}")
+    print(f"Resultados: {stats['payload_text_bytes']:,} -> {stats['payload_compressed_bytes']:,} bytes ({ratio:.0%})")
+    print(f"Base de datos: {before:,} -> {after:,} bytes")
+    print(f"Lectura por fila (ms): JSON p50 {stats['json_decode_ms']['p50']} / p95 {stats['json_decode_ms']['p95']}, "
+          f"comprimido p50 {stats['compressed_decode_ms']['p50']} / p95 {stats['compressed_decode_ms']['p95']}")
@@ -56,6 +56,10 @@ logger = logging.getLogger(__name__)
 
 # Directorios
 BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+from backend.semgrep_rules import semgrep_config_args
+from backend.language_detection import detect_and_plan
+from scripts.scan_config import get_walk_config
 DATA_DIR = BASE_DIR / "data" / "experiments"
 RESULTS_DIR = DATA_DIR / "results"
 APPS_DIR = DATA_DIR / "test_apps"
@@ -344,31 +348,43 @@ class ExperimentalValidator:
         start_time = time.time()
         report_path = RESULTS_DIR / f"sast_{tool}_{app_path.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
+        # Filtros include/exclude de APP_SCAN_CONFIG para la aplicación
+        walk_config = get_walk_config(app_path.name)
+        
+        # Omitir herramientas que no analizan ningún lenguaje de la aplicación
+        scan_plan = detect_and_plan(app_path, requested_tools=(tool,), walk_config=walk_config)
+        if not scan_plan.runs(tool):
+            reason = scan_plan.skipped_tools.get(tool, "herramienta no aplicable")
+            logger.info(f"⏭️ {tool} omitido en {app_path.name}: {reason}")
+            return {"tool": tool, "findings": [], "duration": 0, "success": True,
+                    "skipped": True, "skip_reason": reason, "stack_detection": scan_plan.to_dict()}
+        
         try:
             if tool == "bandit":
+                # Bandit no admite filtros de inclusión por ruta; solo se le pasan las exclusiones
                 result = subprocess.run(
-                    [sys.executable, '-m', 'bandit', '-r', str(app_path), 
+                    [sys.executable, '-m', 'bandit', '-r', str(app_path),
+                     '-x', ','.join(walk_config.exclude),
                      '-f', 'json', '-o', str(report_path)],
                     capture_output=True,
                     text=True,
                     timeout=600
                 )
             elif tool == "semgrep":
-                # Configuraciones de Semgrep según el lenguaje detectado
-                semgrep_configs = [
-                    "p/owasp-top-ten",
-                    "p/security-audit",
-                    "p/ci"
-                ]
+                # Reglas de los lenguajes detectados: almacén local fijado o packs del registro
+                semgrep_configs = semgrep_config_args(
+                    tuple(scan_plan.semgrep_packs), languages=scan_plan.profile.detected_languages
+                )
+                path_filters = [arg for pattern in walk_config.include for arg in ('--include', pattern)]
+                path_filters += [arg for pattern in walk_config.exclude for arg in ('--exclude', pattern)]
                 
                 result = subprocess.run(
                     ['semgrep', 
-                     '--config', 'p/owasp-top-ten',
-                     '--config', 'p/security-audit',
+                     *semgrep_configs,
+                     *path_filters,
                      str(app_path),
                      '--json', '--output', str(report_path),
-                     '--severity', 'ERROR', '--severity', 'WARNING',
-                     '--metrics', 'off'],
+                     '--severity', 'ERROR', '--severity', 'WARNING'],
                     capture_output=True,
                     text=True,
                     timeout=600
@@ -0,0 +1,282 @@
+# Servidor simulado de la API JSON de OWASP ZAP para pruebas sin la herramienta real
+import argparse
+import json
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse
+
+import httpx
+
+MOCK_VERSION = "2.15.0-mock"
+XSS_PROBE = "<zapxss>"
+
+
+class _Links(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+
+
+class MockZapState:
+    """
+    Estado del daemon simulado: contextos, escaneos y alertas.
+
+    El spider descarga el objetivo y sus enlaces del mismo origen; el escaneo
+    activo envía una sonda XSS a cada parámetro de query y comprueba la
+    cabecera X-Content-Type-Options. Ambas fases terminan tras `scan_delay`.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, scan_delay: float = 0.0):
+        self.api_key = api_key
+        self.scan_delay = scan_delay
+        self.lock = threading.Lock()
+        self.contexts: Dict[str, Dict[str, Any]] = {}
+        self.scans: Dict[str, Dict[str, Any]] = {}
+        self.alerts: List[Dict[str, Any]] = []
+        self.peak_contexts = 0
+        self.calls: Dict[str, int] = {}
+        self.shutdown_requested = threading.Event()
+        self._next_id = 0
+
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return str(self._next_id)
+
+    # -- Contextos --------------------------------------------------------
+
+    def new_context(self, name: str) -> Dict[str, Any]:
+        with self.lock:
+            if name in self.contexts:
+                return {"code": "already_exists", "message": f"Context {name} already exists"}
+            context_id = self._new_id()
+            self.contexts[name] = {"id": context_id, "include": []}
+            self.peak_contexts = max(self.peak_contexts, len(self.contexts))
+        return {"contextId": context_id}
+
+    def include(self, name: str, regex: str) -> Dict[str, Any]:
+        with self.lock:
+            if name not in self.contexts:
+                return {"code": "context_not_found", "message": f"Context {name} not found"}
+            self.contexts[name]["include"].append(re.compile(regex))
+        return {"Result": "OK"}
+
+    def remove_context(self, name: str) -> Dict[str, Any]:
+        with self.lock:
+            if self.contexts.pop(name, None) is None:
+                return {"code": "context_not_found", "message": f"Context {name} not found"}
+        return {"Result": "OK"}
+
+    def _context_by(self, name: Optional[str] = None, context_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            for ctx_name, ctx in self.contexts.items():
+                if ctx_name == name or ctx["id"] == context_id:
+                    return ctx
+        return None
+
+    # -- Escaneos ---------------------------------------------------------
+
+    def _start(self, kind: str, work) -> Dict[str, Any]:
+        with self.lock:
+            scan_id = self._new_id()
+            self.scans[scan_id] = {"kind": kind, "done": False, "stopped": False, "results": [], "alert_ids": []}
+
+        def runner():
+            time.sleep(self.scan_delay)
+            scan = self.scans[scan_id]
+            if not scan["stopped"]:
+                work(scan)
+            scan["done"] = True
+
+        threading.Thread(target=runner, daemon=True).start()
+        return {"scan": scan_id}
+
+    def spider(self, url: str, context_name: Optional[str]) -> Dict[str, Any]:
+        ctx = self._context_by(name=context_name) if context_name else None
+        if context_name and ctx is None:
+            return {"code": "context_not_found", "message": f"Context {context_name} not found"}
+
+        def work(scan):
+            seen = [url]
+            try:
+                response = httpx.get(url, timeout=10)
+                parser = _Links()
+                parser.feed(response.text)
+                for href in parser.links:
+                    absolute = urljoin(url, href)
+                    if absolute not in seen and (ctx is None or any(r.match(absolute) for r in ctx["include"])):
+                        seen.append(absolute)
+            except httpx.HTTPError:
+                pass
+            scan["results"] = seen
+
+        return self._start("spider", work)
+
+    def active_scan(self, url: str, context_id: Optional[str]) -> Dict[str, Any]:
+        ctx = self._context_by(context_id=context_id) if context_id else None
+        if context_id and ctx is None:
+            return {"code": "context_not_found", "message": f"Context {context_id} not found"}
+        with self.lock:
+            urls = [u for s in self.scans.values() if s["kind"] == "spider" for u in s["results"]
+                    if ctx is None or any(r.match(u) for r in ctx["include"])]
+        urls = list(dict.fromkeys(urls)) or [url]
+
+        def work(scan):
+            for target in urls:
+                self._probe(target, scan)
+
+        return self._start("ascan", work)
+
+    def _probe(self, url: str, scan: Dict[str, Any]) -> None:
+        parsed = urlparse(url)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        try:
+            response = httpx.get(url, timeout=10)
+            if "x-content-type-options" not in {h.lower() for h in response.headers}:
+                self._alert(scan, "X-Content-Type-Options Header Missing", "Low", "Medium", url, "", "693")
+            for name in params:
+                probe_url = parsed._replace(query=urlencode({**params, name: XSS_PROBE})).geturl()
+                if XSS_PROBE in httpx.get(probe_url, timeout=10).text:
+                    self._alert(scan, "Cross Site Scripting (Reflected)", "High", "Medium", url, name, "79",
+                                evidence=XSS_PROBE)
+        except httpx.HTTPError:
+            pass
+
+    def _alert(self, scan, name, risk, confidence, url, param, cweid, evidence=""):
+        # Como el daemon real, las alertas se acumulan entre escaneos del mismo objetivo
+        with self.lock:
+            scan["alert_ids"].append(str(len(self.alerts)))
+            self.alerts.append({
+                "id": str(len(self.alerts)), "alert": name, "name": name, "risk": risk,
+                "confidence": confidence, "url": url, "param": param, "evidence": evidence,
+                "cweid": cweid, "wascid": "", "method": "GET", "pluginId": "mock",
+                "description": f"{name} (simulado)", "solution": "", "reference": ""
+            })
+
+    def status(self, scan_id: str) -> Dict[str, Any]:
+        scan = self.scans.get(scan_id)
+        if scan is None:
+            return {"code": "does_not_exist", "message": f"Scan {scan_id} does not exist"}
+        return {"status": "100" if scan["done"] else "50"}
+
+    def stop(self, scan_id: str) -> Dict[str, Any]:
+        if scan_id in self.scans:
+            self.scans[scan_id]["stopped"] = True
+        return {"Result": "OK"}
+
+    def dispatch(self, component: str, kind: str, name: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """Atiende /JSON/<componente>/<kind>/<nombre>/."""
+        with self.lock:
+            key = f"{component}/{name}"
+            self.calls[key] = self.calls.get(key, 0) + 1
+        if self.api_key and params.get("apikey") != self.api_key:
+            return {"code": "bad_api_key", "message": "Missing or invalid API key"}
+
+        if (component, name) == ("core", "version"):
+            return {"version": MOCK_VERSION}
+        if (component, name) == ("core", "shutdown"):
+            self.shutdown_requested.set()
+            return {"Result": "OK"}
+        if (component, name) == ("core", "alerts"):
+            base = params.get("baseurl", "")
+            start = int(params.get("start", 0))
+            count = int(params.get("count", 0)) or None
+            with self.lock:
+                matching = [a for a in self.alerts if a["url"].startswith(base)]
+            return {"alerts": matching[start:start + count if count else None]}
+        if (component, name) == ("context", "newContext"):
+            return self.new_context(params.get("contextName", ""))
+        if (component, name) == ("context", "includeInContext"):
+            return self.include(params.get("contextName", ""), params.get("regex", ""))
+        if (component, name) == ("context", "removeContext"):
+            return self.remove_context(params.get("contextName", ""))
+        if (component, name) == ("spider", "scan"):
+            return self.spider(params.get("url", ""), params.get("contextName"))
+        if (component, name) == ("spider", "results"):
+            scan = self.scans.get(params.get("scanId", ""))
+            return {"results": scan["results"] if scan else []}
+        if (component, name) == ("ascan", "alertsIds"):
+            scan = self.scans.get(params.get("scanId", ""))
+            if scan is None:
+                return {"code": "does_not_exist", "message": f"Scan {params.get('scanId')} does not exist"}
+            return {"alertsIds": list(scan["alert_ids"])}
+        if (component, name) == ("ascan", "scan"):
+            return self.active_scan(params.get("url", ""), params.get("contextId"))
+        if name == "status" and component in ("spider", "ascan"):
+            return self.status(params.get("scanId", ""))
+        if name == "stop" and component in ("spider", "ascan"):
+            return self.stop(params.get("scanId", ""))
+        return {"code": "bad_view", "message": f"No implementation for {component}/{kind}/{name}"}
+
+
+class MockZapServer:
+    """Servidor HTTP con la API simulada; `start()` devuelve la URL de la API."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, api_key: Optional[str] = None,
+                 scan_delay: float = 0.0):
+        self.state = MockZapState(api_key, scan_delay)
+        state = self.state
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split("/") if p]
+                if len(parts) != 4 or parts[0] != "JSON":
+                    payload, status = {"code": "bad_format", "message": "Unsupported path"}, 400
+                else:
+                    params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    payload = state.dispatch(parts[1], parts[2], parts[3], params)
+                    status = 400 if "code" in payload else 200
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.api_url
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    # Acepta los argumentos de `zap.sh -daemon` para sustituir al ejecutable real
+    parser = argparse.ArgumentParser(description='Mock OWASP ZAP API server')
+    parser.add_argument('-daemon', action='store_true', help='Ignorado (compatibilidad con zap.sh)')
+    parser.add_argument('-host', default='127.0.0.1')
+    parser.add_argument('-port', type=int, default=8090)
+    parser.add_argument('-config', action='append', default=[], help='Opciones key=value (api.key)')
+    parser.add_argument('--scan-delay', type=float, default=0.0)
+    args = parser.parse_args()
+
+    options = dict(item.split('=', 1) for item in args.config if '=' in item)
+    mock = MockZapServer(args.host, args.port, api_key=options.get('api.key'), scan_delay=args.scan_delay)
+    print(f"Mock ZAP API escuchando en {mock.start()}", flush=True)
+    try:
+        mock.state.shutdown_requested.wait()
+    except KeyboardInterrupt:
+        pass
+    mock.stop()
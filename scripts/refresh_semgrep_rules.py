@@ -0,0 +1,49 @@
+# Script para vendorizar y fijar los rule packs de Semgrep (almacén local sin red)
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from backend.semgrep_rules import (
+    DEFAULT_PACKS, RULES_DIR, RulePackError, get_rules_config, load_lock, refresh_rule_packs
+)
+
+
+def show_status(rules_dir: Path) -> bool:
+    """Muestra el estado del almacén local de reglas"""
+    lock = load_lock(rules_dir)
+    if lock is None:
+        print(f"Almacén de reglas no inicializado en {rules_dir}")
+        return False
+
+    valid = get_rules_config(rules_dir) is not None
+    print(f"Almacén: {rules_dir}")
+    print(f"Generado: {lock.get('generated_at')}")
+    print(f"Reglas fusionadas: {lock.get('rule_count')} (sha256 {lock.get('merged_sha256', '')[:16]})")
+    print(f"Integridad: {'OK' if valid else 'NO COINCIDE CON EL LOCKFILE'}")
+    for pack, info in sorted(lock.get("packs", {}).items()):
+        print(f"  - {pack}: {info.get('rules')} reglas, sha256 {info.get('sha256', '')[:16]}, {info.get('fetched_at')}")
+    return valid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Refresh the local, version-pinned Semgrep rule-pack store')
+    parser.add_argument('--pack', action='append', dest='packs',
+                        help=f'Rule pack to vendor (repeatable). Default: {", ".join(DEFAULT_PACKS)}')
+    parser.add_argument('--from-dir', type=Path, default=None,
+                        help='Read packs from <dir>/<p_pack-name>.yml instead of the Semgrep registry')
+    parser.add_argument('--rules-dir', type=Path, default=RULES_DIR, help='Local rule store directory')
+    parser.add_argument('--status', action='store_true', help='Show the current store and exit')
+    args = parser.parse_args()
+
+    if args.status:
+        sys.exit(0 if show_status(args.rules_dir) else 1)
+
+    try:
+        lock = refresh_rule_packs(args.packs or DEFAULT_PACKS, args.rules_dir, args.from_dir)
+    except RulePackError as e:
+        print(f'Error refreshing Semgrep rule packs: {e}')
+        sys.exit(1)
+
+    print(json.dumps(lock, indent=2))
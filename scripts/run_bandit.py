@@ -5,6 +5,9 @@ import os
 import uuid
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from backend.scanner_sandbox import run_sandboxed
+
 def run_bandit(target_path):
     """Ejecuta análisis Bandit con manejo mejorado de errores"""
     if not os.path.exists(target_path):
@@ -20,12 +23,15 @@ def run_bandit(target_path):
     report_path.parent.mkdir(exist_ok=True)
     
     try:
-        result = subprocess.run([
+        result = run_sandboxed([
             sys.executable, '-m', 'bandit', '-r', target_path, 
             '-f', 'json', '-o', str(report_path)
-        ], capture_output=True, text=True, timeout=300)
+        ], timeout=300)
         
-        if result.returncode == 0:
+        if result.limit_reason:
+            print(f'Bandit analysis stopped by resource limit: {result.limit_reason}')
+            return False
+        elif result.returncode == 0:
             print(f'Bandit analysis completed successfully. Report: {report_path}')
             return True
         elif result.returncode == 1:
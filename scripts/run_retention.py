@@ -0,0 +1,45 @@
+# Ejecuta a mano (o desde cron) el mantenimiento de retención: archivado, limpieza de reportes y vacuum incremental
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from backend.retention import (
+    ARCHIVE_DIR, REPORT_RETENTION_DAYS, REPORTS_DIR, enable_incremental_vacuum, load_archive,
+    retention_policies, run_retention
+)
+from database.models import Base, DashboardCounter, Finding, ScanResult, upgrade_schema
+from database.storage import DATABASE_URL, build_engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Archive expired scan results and compact the database')
+    parser.add_argument('--database-url', default=DATABASE_URL, help='SQLite URL (default: DATABASE_URL)')
+    parser.add_argument('--archive-dir', default=str(ARCHIVE_DIR), help='Directory for archive files')
+    parser.add_argument('--reports-dir', default=str(REPORTS_DIR), help='Directory with report files')
+    parser.add_argument('--report-days', type=int, default=REPORT_RETENTION_DAYS,
+                        help='Delete unreferenced report files older than this many days')
+    parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived or deleted')
+    parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                        help='Convert an existing database to auto_vacuum=INCREMENTAL (full VACUUM, run offline)')
+    parser.add_argument('--show-archive', action='store_true', help='Print archived scans per type and exit')
+    args = parser.parse_args()
+
+    if args.show_archive:
+        frame = load_archive(Path(args.archive_dir))
+        print(frame.groupby("scan_type").size().to_string() if not frame.empty else "Archivo vacío")
+        sys.exit(0)
+
+    engine = build_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    if args.enable_incremental_vacuum:
+        enable_incremental_vacuum(engine)
+        print("Base convertida a auto_vacuum=INCREMENTAL")
+
+    print(f"Políticas (días): {retention_policies()}")
+    stats = run_retention(engine, ScanResult.__table__, Finding.__table__, archive_dir=Path(args.archive_dir),
+                          reports_dir=Path(args.reports_dir), report_retention_days=args.report_days,
+                          dry_run=args.dry_run, counters_table=DashboardCounter.__table__)
+    print(json.dumps(stats, indent=2))
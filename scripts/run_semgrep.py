@@ -5,6 +5,11 @@ import os
 import uuid
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from backend.semgrep_rules import semgrep_config_args
+from backend.language_detection import detect_and_plan
+from backend.scanner_sandbox import run_sandboxed
+
 def run_semgrep(target_path):
     """Ejecuta análisis Semgrep con manejo mejorado de errores"""
     if not os.path.exists(target_path):
@@ -19,13 +24,23 @@ def run_semgrep(target_path):
     # Ensure reports directory exists
     report_path.parent.mkdir(exist_ok=True)
     
+    # Only load rule packs for the languages present in the target
+    scan_plan = detect_and_plan(Path(target_path), requested_tools=("semgrep",))
+    if not scan_plan.runs("semgrep"):
+        print(f'Semgrep skipped: {scan_plan.skipped_tools["semgrep"]}')
+        return True
+    config_args = semgrep_config_args(tuple(scan_plan.semgrep_packs), languages=scan_plan.profile.detected_languages)
+    
     try:
-        result = subprocess.run([
-            'semgrep', '--config', 'auto', target_path, 
+        result = run_sandboxed([
+            'semgrep', *config_args, target_path, 
             '--json', '--output', str(report_path)
-        ], capture_output=True, text=True, timeout=300)
+        ], timeout=300)
         
-        if result.returncode == 0:
+        if result.limit_reason:
+            print(f'Semgrep analysis stopped by resource limit: {result.limit_reason}')
+            return False
+        elif result.returncode == 0:
             print(f'Semgrep analysis completed successfully. Report: {report_path}')
             return True
         else:
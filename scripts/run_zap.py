@@ -1,4 +1,5 @@
 # Script para ejecutar OWASP ZAP (DAST)
+import os
 import subprocess
 import sys
 import uuid
@@ -27,6 +28,10 @@ def run_zap(target_url: str) -> Dict[str, Any]:
             "vulnerabilities": []
         }
     
+    # Reutilizar un daemon ZAP ya arrancado en lugar de lanzar una JVM por escaneo
+    if os.getenv("HYBRIDSCAN_ZAP_API_URL"):
+        return run_zap_daemon(target_url)
+    
     # Generate unique report filename
     report_id = str(uuid.uuid4())
     base_dir = Path(__file__).parent.parent
@@ -86,6 +91,57 @@ def run_zap(target_url: str) -> Dict[str, Any]:
         }
 
 
+def run_zap_daemon(target_url: str) -> Dict[str, Any]:
+    """
+    Ejecuta el análisis contra el daemon ZAP configurado en HYBRIDSCAN_ZAP_API_URL
+    (ver backend/zap_daemon.py), en un contexto propio del escaneo.
+    """
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from backend.zap_daemon import ZapError, get_zap_daemon
+
+    try:
+        with get_zap_daemon().session(target_url) as session:
+            session.spider()
+            session.active_scan()
+            alerts = session.raw_alerts()
+    except ZapError as e:
+        return {
+            "success": False,
+            "error": f"ZAP daemon error: {e}",
+            "vulnerabilities": []
+        }
+
+    vulnerabilities = [_alert_to_vulnerability(alert) for alert in alerts]
+    return {
+        "success": True,
+        "target_url": target_url,
+        "vulnerabilities": vulnerabilities,
+        "total_vulnerabilities": len(vulnerabilities),
+        "severity_summary": _calculate_severity_summary(vulnerabilities)
+    }
+
+
+def _alert_to_vulnerability(alert: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte una alerta de ZAP (reporte JSON o API) a formato estructurado."""
+    return {
+        "id": str(uuid.uuid4()),
+        "type": _map_zap_alert_to_type(alert.get('name', alert.get('alert', 'Unknown'))),
+        "severity": _map_zap_risk_level(alert.get('riskdesc', alert.get('risk', 'Low'))),
+        "name": alert.get('name', alert.get('alert', 'Unknown')),
+        "description": alert.get('desc', alert.get('description', '')),
+        "solution": alert.get('solution', ''),
+        "reference": alert.get('reference', ''),
+        "cwe_id": alert.get('cweid', ''),
+        "wasc_id": alert.get('wascid', ''),
+        "url": alert.get('url', ''),
+        "method": alert.get('method', 'GET'),
+        "evidence": alert.get('evidence', ''),
+        "confidence": _map_zap_confidence(alert.get('confidence', 'Medium')),
+        "source_tool": "OWASP ZAP",
+        "owasp_category": _map_to_owasp_api_top10(alert.get('name', alert.get('alert', '')))
+    }
+
+
 def parse_zap_results(json_path: Path) -> List[Dict[str, Any]]:
     """
     Parsea resultados JSON de ZAP a formato estructurado.
@@ -110,24 +166,7 @@ def parse_zap_results(json_path: Path) -> List[Dict[str, Any]]:
                 alerts = site.get('alerts', [])
                 
                 for alert in alerts:
-                    vuln = {
-                        "id": str(uuid.uuid4()),
-                        "type": _map_zap_alert_to_type(alert.get('name', 'Unknown')),
-                        "severity": _map_zap_risk_level(alert.get('riskdesc', 'Low')),
-                        "name": alert.get('name', 'Unknown'),
-                        "description": alert.get('desc', ''),
-                        "solution": alert.get('solution', ''),
-                        "reference": alert.get('reference', ''),
-                        "cwe_id": alert.get('cweid', ''),
-                        "wasc_id": alert.get('wascid', ''),
-                        "url": alert.get('url', ''),
-                        "method": alert.get('method', 'GET'),
-                        "evidence": alert.get('evidence', ''),
-                        "confidence": _map_zap_confidence(alert.get('confidence', 'Medium')),
-                        "source_tool": "OWASP ZAP",
-                        "owasp_category": _map_to_owasp_api_top10(alert.get('name', ''))
-                    }
-                    vulnerabilities.append(vuln)
+                    vulnerabilities.append(_alert_to_vulnerability(alert))
         
         return vulnerabilities
         
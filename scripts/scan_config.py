@@ -3,9 +3,18 @@ Configuración de Directorios Relevantes para Análisis SAST
 ===========================================================
 
 Define qué directorios analizar en cada aplicación vulnerable
-para optimizar el tiempo de escaneo.
+para optimizar el tiempo de escaneo. `get_walk_config` aplica los patrones
+con el recorrido de backend/file_walker.py, que poda los directorios
+excluidos antes de descender; `get_scan_paths` devuelve los directorios y
+archivos que casan con los patrones de inclusión.
 """
 
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from backend.file_walker import WalkConfig
+
 # Directorios a incluir/excluir por aplicación
 APP_SCAN_CONFIG = {
     "owasp_webgoat": {
@@ -77,12 +86,21 @@ APP_SCAN_CONFIG = {
     }
 }
 
+def _app_config(app_name: str) -> dict:
+    """Configuración de la aplicación (admite espacios, guiones o guiones bajos en el nombre)"""
+    key = app_name.lower().replace(" ", "_").replace("-", "_")
+    for name, config in APP_SCAN_CONFIG.items():
+        if name.replace("-", "_") == key:
+            return config
+    return {}
+
+def get_walk_config(app_name: str, extensions=None) -> WalkConfig:
+    """Retorna la configuración de recorrido (include/exclude/max_depth) de una aplicación"""
+    return WalkConfig.from_dict(_app_config(app_name), extensions)
+
 def get_scan_paths(app_name: str, base_path: str):
     """Retorna las rutas específicas a escanear para una aplicación"""
-    from pathlib import Path
-    
-    config = APP_SCAN_CONFIG.get(app_name.lower().replace(" ", "_"), {})
-    include_patterns = config.get("include", ["**/*"])
+    include_patterns = _app_config(app_name).get("include", ["**/*"])
     
     base = Path(base_path)
     scan_paths = []
@@ -99,5 +117,4 @@ def get_scan_paths(app_name: str, base_path: str):
 
 def get_exclude_patterns(app_name: str):
     """Retorna los patrones de exclusión para una aplicación"""
-    config = APP_SCAN_CONFIG.get(app_name.lower().replace(" ", "_"), {})
-    return config.get("exclude", [])
+    return _app_config(app_name).get("exclude", [])
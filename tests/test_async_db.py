@@ -0,0 +1,95 @@
+"""
+Tests del acceso asíncrono a la base de datos.
+Prueba que los endpoints de lectura no usan la sesión síncrona y la alternativa sin aiosqlite.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database.storage as storage
+from backend.main import app, get_db, Base, ScanResult
+from database.storage import ThreadedSession, async_session_for
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    scan = ScanResult(scan_type="SAST", tool="bandit", target="app.py", status="completed",
+                      results={"results": [{"test_id": "B602"}]})
+    db.add(scan)
+    db.commit()
+    scan_id = scan.id
+    db.close()
+
+    sync_statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: sync_statements.append(args[2]))
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), scan_id, sync_statements
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+class TestAsyncEndpoints:
+    """Lecturas con la sesión asíncrona sobre la base de la dependencia get_db"""
+
+    def test_result_fetch(self, client):
+        http, scan_id, sync_statements = client
+        response = http.get(f"/scan-results/{scan_id}")
+        assert response.status_code == 200
+        assert response.json()["results"]["results"] == [{"test_id": "B602"}]
+        assert http.get("/scan-results/999999").status_code == 404
+        assert http.get("/scan-results").json()[0]["id"] == scan_id
+        # Ninguna consulta pasó por la conexión síncrona del bucle de eventos
+        assert sync_statements == []
+
+    def test_threaded_fallback_without_aiosqlite(self, client, monkeypatch):
+        http, scan_id, sync_statements = client
+        monkeypatch.setattr(storage, "ASYNC_DB_AVAILABLE", False)
+        response = http.get(f"/scan-results/{scan_id}")
+        assert response.status_code == 200
+        assert response.json()["id"] == scan_id
+        # Sin aiosqlite la sesión síncrona se ejecuta en un hilo
+        assert sync_statements
+
+
+class TestThreadedSession:
+    """Sesión síncrona expuesta con la API de AsyncSession"""
+
+    def test_in_memory_database_uses_threaded_session(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        adapter = async_session_for(session)
+        assert isinstance(adapter, ThreadedSession)
+
+        async def roundtrip():
+            adapter.add(ScanResult(scan_type="DAST", tool="native-dast", status="completed"))
+            await adapter.commit()
+            return (await adapter.execute(select(ScanResult.tool))).scalars().all()
+
+        assert asyncio.run(roundtrip()) == ["native-dast"]
+        session.close()
@@ -0,0 +1,112 @@
+"""
+Tests del pool de procesos Bandit pre-calentados.
+Verifica que el reporte coincide con la CLI y que los escaneos pequeños son rápidos.
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import backend.bandit_warm_pool as bandit_warm_pool
+from backend.bandit_warm_pool import BanditWarmPool, is_small_target
+
+
+@pytest.fixture(scope="module")
+def warm_pool():
+    """Pool con un único proceso, compartido por los tests del módulo."""
+    pool = BanditWarmPool(size=1)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def vulnerable_file(tmp_path):
+    """Archivo Python pequeño con hallazgos conocidos de Bandit."""
+    path = tmp_path / "upload.py"
+    path.write_text(
+        'import subprocess\n'
+        'password = "hunter2-secret"\n'
+        'def run(cmd):\n'
+        '    return subprocess.call(cmd, shell=True)\n'
+    )
+    return path
+
+
+class TestWarmPool:
+    """Pruebas del pool pre-calentado."""
+
+    def test_report_matches_cli(self, warm_pool, vulnerable_file, tmp_path):
+        """El reporte del pool tiene la misma forma y hallazgos que la CLI de Bandit."""
+        warm_report = tmp_path / "warm.json"
+        result = warm_pool.scan(vulnerable_file, warm_report, timeout=60)
+
+        cli_report = tmp_path / "cli.json"
+        subprocess.run(
+            [sys.executable, '-m', 'bandit', '-r', str(vulnerable_file), '-f', 'json', '-o', str(cli_report)],
+            capture_output=True, text=True, timeout=120
+        )
+
+        warm = json.loads(warm_report.read_text())
+        cli = json.loads(cli_report.read_text())
+
+        assert result.returncode == 1 and result.limit_reason is None
+        assert set(warm) == set(cli)
+        assert sorted(r["test_id"] for r in warm["results"]) == sorted(r["test_id"] for r in cli["results"])
+        assert warm["metrics"]["_totals"] == cli["metrics"]["_totals"]
+
+    def test_small_file_scan_is_fast(self, warm_pool, vulnerable_file, tmp_path):
+        """Con el proceso ya caliente, un archivo pequeño se analiza muy por debajo del arranque de la CLI."""
+        warm_pool.scan(vulnerable_file, tmp_path / "first.json", timeout=60)
+
+        start = time.perf_counter()
+        warm_pool.scan(vulnerable_file, tmp_path / "second.json", timeout=60)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+
+    def test_small_target_detection(self, vulnerable_file, tmp_path):
+        """Solo los objetivos por debajo del umbral usan el pool."""
+        assert is_small_target(vulnerable_file)
+        big = tmp_path / "big.py"
+        big.write_text("x = 1\n" * 400000)
+        assert not is_small_target(big)
+
+    def test_lost_workers_fail_fast(self, vulnerable_file, tmp_path, monkeypatch):
+        """Si el reemplazo no arranca, el pool se vacía y `scan` falla al momento en lugar de esperar el timeout."""
+        pool = BanditWarmPool(size=1)
+        pool.start()
+        try:
+            monkeypatch.setattr(bandit_warm_pool, "WORKER_STARTUP_TIMEOUT", 0)
+            pool._workers[0].process.kill()
+            with pytest.raises(RuntimeError):
+                pool.scan(vulnerable_file, tmp_path / "dead.json", timeout=60)
+
+            start = time.perf_counter()
+            with pytest.raises(RuntimeError):
+                pool.scan(vulnerable_file, tmp_path / "empty.json", timeout=60)
+            assert time.perf_counter() - start < 10
+            assert pool.stats()["workers"] == 0 and pool.stats()["lost"] == 1
+        finally:
+            pool.shutdown()
+
+    def test_worker_memory_error_sets_limit_reason(self, vulnerable_file, tmp_path, monkeypatch):
+        """Un MemoryError en el proceso de trabajo se registra como límite de memoria, igual que en el sandbox."""
+        responses = queue.Queue()
+        responses.put({"type": "result", "returncode": 2, "error": "MemoryError: ", "elapsed": 0.1})
+        worker = SimpleNamespace(requests=queue.Queue(), responses=responses,
+                                 process=SimpleNamespace(is_alive=lambda: True))
+        pool = BanditWarmPool(size=1)
+        monkeypatch.setattr(pool, "start", lambda: None)
+        monkeypatch.setattr(pool, "_acquire", lambda args, timeout: worker)
+
+        result = pool.scan(vulnerable_file, tmp_path / "oom.json", timeout=5)
+        assert (result.returncode, result.limit_reason) == (2, "memory")
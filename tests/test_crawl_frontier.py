@@ -0,0 +1,107 @@
+"""
+Tests de la frontera de rastreo DAST.
+Prueba plantillas de URL, filtro de Bloom, huellas de respuesta y su efecto en el motor DAST.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.crawl_frontier import BloomFilter, CrawlFrontier, response_fingerprint, url_template
+from backend.dast_engine import run_native_dast
+
+
+class TestUrlTemplates:
+    """Tests de normalización de URLs"""
+
+    @pytest.mark.parametrize("url_a,url_b", [
+        ("http://h/users/1", "http://h/users/982"),
+        ("http://h/orders/0b6f3a52-8c1e-4b8a-9d2c-1f2e3d4c5b6a", "http://h/orders/7a1c2b3d-4e5f-4a6b-8c7d-9e0f1a2b3c4d"),
+        ("http://h/search?q=a&page=2", "http://h/search?page=9&q=zzz"),
+        ("http://H/files/deadbeefdeadbeef00", "http://h/files/0123456789abcdef01"),
+    ])
+    def test_equivalent_urls_share_template(self, url_a, url_b):
+        assert url_template(url_a) == url_template(url_b)
+
+    def test_distinct_endpoints_keep_distinct_templates(self):
+        assert url_template("http://h/users/1") != url_template("http://h/users/1/orders")
+        assert url_template("http://h/search?q=a") != url_template("http://h/search?term=a")
+        assert url_template("http://h/login", "GET") != url_template("http://h/login", "POST")
+
+
+class TestBloomFilter:
+    """Tests del filtro de Bloom"""
+
+    def test_no_false_negatives_and_low_false_positive_rate(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"item-{i}")
+        assert all(f"item-{i}" in bloom for i in range(5000))
+
+        false_positives = sum(f"otro-{i}" in bloom for i in range(5000))
+        assert false_positives < 5000 * 0.03
+
+    def test_frontier_dedups_by_template(self):
+        frontier = CrawlFrontier(capacity=100)
+        assert frontier.offer("http://h/users/1")
+        assert not frontier.offer("http://h/users/2")
+        assert frontier.offer("http://h/users/1/orders")
+        assert frontier.pop_batch(10) == ["http://h/users/1", "http://h/users/1/orders"]
+        assert frontier.stats()["duplicate_urls"] == 1
+
+
+class TestResponseFingerprint:
+    """Tests de huellas de respuesta"""
+
+    def test_volatile_fragments_are_ignored(self):
+        a = response_fingerprint(200, "text/html", "<h1>Not found</h1> request 81 at 2024-01-02T10:00:00Z")
+        b = response_fingerprint(200, "text/html; charset=utf-8", "<h1>Not found</h1>  request 93 at 2024-03-04T11:22:33Z")
+        assert a == b
+        assert a != response_fingerprint(404, "text/html", "<h1>Not found</h1> request 81 at 2024-01-02T10:00:00Z")
+        assert a != response_fingerprint(200, "text/html", "<h1>Bienvenido</h1>")
+
+
+class _LargeApiHandler(BaseHTTPRequestHandler):
+    """API con cientos de URLs equivalentes y páginas de error idénticas con estado 200."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/":
+            links = "".join(f'<a href="/items/{i}">item</a><a href="/legacy/page{i}">legacy</a>' for i in range(300))
+            body = f"<html>{links}</html>"
+        elif self.path.startswith("/items/"):
+            body = f"<html>Item {self.path.rsplit('/', 1)[-1]}</html>"
+        else:
+            body = f"<html>Página no encontrada (ref {self.path.rsplit('page', 1)[-1]})</html>"
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestFrontierInEngine:
+    """El coste del escaneo depende de los endpoints distintos"""
+
+    def test_requests_scale_with_distinct_endpoints(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _LargeApiHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = run_native_dast(f"http://127.0.0.1:{server.server_address[1]}/", max_pages=1000)
+        finally:
+            server.shutdown()
+
+        stats = result.stats()
+        # 600 enlaces -> plantillas /items/{id} y /legacy/pageN (estas últimas son todas distintas)
+        assert stats["frontier"]["duplicate_urls"] >= 299
+        # Las 300 páginas legacy devuelven el mismo error: solo se inyecta en una
+        assert stats["skipped_injection_points"] >= 299
+        assert stats["requests_sent"] < 302 + 3 * 4 + 300 + 20
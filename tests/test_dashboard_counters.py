@@ -0,0 +1,170 @@
+"""
+Tests de los contadores materializados del panel.
+Prueba la actualización al completar escaneos e indexar hallazgos, el endpoint y la reconstrucción.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database.storage as storage
+from backend.main import app, get_db, _index_findings, Base, ScanResult, Finding, DashboardCounter
+from backend.retention import run_retention
+from database.counters import read_counters, rebuild_counters
+from database.models import upgrade_schema
+
+COUNTERS = DashboardCounter.__table__
+BANDIT_RESULTS = {"results": [
+    {"filename": "app.py", "line_number": 3, "test_id": "B608", "issue_severity": "HIGH",
+     "issue_cwe": {"id": 89}, "issue_text": "SQL injection"},
+    {"filename": "app.py", "line_number": 9, "test_id": "B602", "issue_severity": "HIGH",
+     "issue_cwe": {"id": 78}, "issue_text": "subprocess with shell=True"},
+    {"filename": "util.py", "line_number": 1, "test_id": "B101", "issue_severity": "LOW",
+     "issue_cwe": {"id": 703}, "issue_text": "assert used"},
+]}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'counters.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _counters(engine):
+    with engine.connect() as conn:
+        return read_counters(conn.execute(select(COUNTERS.c.dimension, COUNTERS.c.key, COUNTERS.c.count)))
+
+
+def _completed_sast(db, results=BANDIT_RESULTS):
+    scan = ScanResult(scan_type="SAST", tool="bandit", target="app.py", status="running")
+    db.add(scan)
+    db.commit()
+    scan.results = results
+    scan.status = "completed"
+    _index_findings(db, scan)
+    db.commit()
+    return scan
+
+
+class TestCountersOnWrite:
+    """Contadores actualizados en la misma transacción que el escaneo"""
+
+    def test_scan_completion_counted_once(self, session_factory):
+        engine, SessionLocal = session_factory
+        db = SessionLocal()
+        scan = ScanResult(scan_type="SAST", tool="bandit", status="running")
+        db.add(scan)
+        db.commit()
+        assert _counters(engine) == {}
+
+        scan.status = "completed"
+        db.commit()
+        scan.progress = 100         # Actualizaciones posteriores no vuelven a contar
+        db.commit()
+        db.add(ScanResult(scan_type="DAST", tool="native-dast"))   # Completado por defecto
+        db.commit()
+        counters = _counters(engine)
+        assert counters["totals"] == {"scans": 2}
+        assert counters["scan_tool"] == {"bandit": 1, "native-dast": 1}
+
+        scan.status = "failed"
+        db.commit()
+        assert _counters(engine)["scan_type"] == {"DAST": 1}
+        db.close()
+
+    def test_reindexing_replaces_finding_counts(self, session_factory):
+        engine, SessionLocal = session_factory
+        db = SessionLocal()
+        scan = _completed_sast(db)
+        _index_findings(db, scan)
+        db.commit()
+        counters = _counters(engine)
+        assert counters["totals"] == {"scans": 1, "findings": 3}
+        assert counters["severity"] == {"high": 2, "low": 1}
+        assert counters["cwe"]["CWE-89"] == 1
+
+        scan.results = {"results": BANDIT_RESULTS["results"][:1]}
+        _index_findings(db, scan)
+        db.commit()
+        assert _counters(engine)["severity"] == {"high": 1}
+        db.close()
+
+    def test_incremental_matches_rebuild(self, session_factory):
+        engine, SessionLocal = session_factory
+        db = SessionLocal()
+        for _ in range(3):
+            _completed_sast(db)
+        db.close()
+        incremental = _counters(engine)
+        with engine.begin() as conn:
+            rebuild_counters(conn, COUNTERS, ScanResult.__table__, Finding.__table__)
+        assert _counters(engine) == incremental
+
+    def test_seeded_from_history_and_decremented_by_retention(self, session_factory, tmp_path):
+        engine, SessionLocal = session_factory
+        db = SessionLocal()
+        old = _completed_sast(db)
+        old.created_at = datetime(2020, 1, 1)
+        db.commit()
+        _completed_sast(db)
+        db.close()
+        with engine.begin() as conn:
+            conn.execute(COUNTERS.delete())
+        upgrade_schema(engine)
+        assert _counters(engine)["totals"] == {"scans": 2, "findings": 6}
+
+        run_retention(engine, ScanResult.__table__, Finding.__table__, archive_dir=tmp_path / "archive",
+                      reports_dir=tmp_path / "reports", policies={"SAST": 30}, counters_table=COUNTERS)
+        assert _counters(engine)["totals"] == {"scans": 1, "findings": 3}
+
+
+class TestAggregatesEndpoint:
+    """Lectura del panel sin recorrer el historial"""
+
+    def test_reads_only_counter_table(self, session_factory, monkeypatch):
+        engine, SessionLocal = session_factory
+        # Sesión síncrona en un hilo para poder observar las consultas en el motor
+        monkeypatch.setattr(storage, "ASYNC_DB_AVAILABLE", False)
+        db = SessionLocal()
+        _completed_sast(db)
+        db.close()
+
+        def override_get_db():
+            session = SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        previous = app.dependency_overrides.get(get_db)
+        app.dependency_overrides[get_db] = override_get_db
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            response = TestClient(app).get("/dashboard/aggregates")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+            if previous is None:
+                app.dependency_overrides.pop(get_db, None)
+            else:
+                app.dependency_overrides[get_db] = previous
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["totals"] == {"scans": 1, "findings": 3}
+        assert body["owasp_category"]
+        assert len(statements) == 1 and "dashboard_counters" in statements[0]
+        assert "scan_results" not in statements[0] and "findings" not in statements[0].split("FROM")[1]
@@ -0,0 +1,192 @@
+"""
+Tests del motor DAST nativo asíncrono.
+Levanta un servidor HTTP local vulnerable y comprueba las alertas de cada familia de payloads.
+"""
+
+import html
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.dast_engine import run_native_dast, target_allowed
+
+INDEX = """<html><body>
+<a href="/search?q=hola">buscar</a>
+<a href="/safe?q=hola">buscar seguro</a>
+<a href="/go?next=/home">ir</a>
+<a href="/users/1">perfil</a>
+<a href="https://externo.example.com/">fuera de alcance</a>
+<form action="/login" method="post"><input name="username"><input name="password" type="password"></form>
+</body></html>"""
+
+
+class _VulnerableHandler(BaseHTTPRequestHandler):
+    """Réplica mínima de ProgramasPruebas/vulnerable_app.py sin depender de Flask."""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body="", headers=None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/":
+            self._reply(200, INDEX)
+        elif url.path == "/search":
+            self._reply(200, f"Resultados para {query.get('q', '')}")
+        elif url.path == "/safe":
+            self._reply(200, f"Resultados para {html.escape(query.get('q', ''))}")
+        elif url.path == "/go":
+            self._reply(302, headers={"Location": query.get("next", "/")})
+        elif url.path.startswith("/users/"):
+            self._reply(200, f"Usuario {url.path.rsplit('/', 1)[-1]}: email privado")
+        elif url.path == "/login":
+            self._reply(405)
+        else:
+            self._reply(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+        if self.path == "/login":
+            query = f"SELECT * FROM users WHERE username='{form.get('username')}' AND password='{form.get('password')}'"
+            self._reply(200, f"Query: {query}")
+        else:
+            self._reply(404)
+
+
+@pytest.fixture(scope="module")
+def vulnerable_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _VulnerableHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+
+
+class TestAsyncDastEngine:
+    """Tests de rastreo y familias de payloads"""
+
+    def test_detects_each_payload_family(self, vulnerable_server):
+        """Cada familia genera su alerta en el endpoint vulnerable y no en el seguro"""
+        result = run_native_dast(vulnerable_server, per_host_concurrency=4)
+        found = {(v["alert"], urlparse(v["url"]).path, v["parameter"]) for v in result.vulnerabilities}
+
+        assert ("SQL Injection", "/login", "username") in found
+        assert ("Cross-Site Scripting (XSS)", "/search", "q") in found
+        assert ("Open Redirect", "/go", "next") in found
+        assert ("Insecure Direct Object Reference", "/users/1", "path") in found
+        assert not any(path == "/safe" for _alert, path, _param in found)
+
+    def test_alerts_use_vulnerabilities_schema(self, vulnerable_server):
+        """Las alertas tienen las claves que esperan PDF, correlación y update_scan_result"""
+        result = run_native_dast(vulnerable_server)
+        required = {"type", "alert", "severity", "risk", "confidence", "parameter",
+                    "description", "solution", "evidence", "cwe", "cweid", "url"}
+        assert result.vulnerabilities
+        for alert in result.vulnerabilities:
+            assert required <= set(alert)
+        assert result.stats()["pages_crawled"] >= 5
+
+    def test_per_host_concurrency_limit(self):
+        """El servidor nunca recibe más peticiones simultáneas que el límite por host"""
+        import time
+
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        class SlowHandler(_VulnerableHandler):
+            def do_GET(self):
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                time.sleep(0.02)
+                try:
+                    super().do_GET()
+                finally:
+                    with lock:
+                        state["active"] -= 1
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = run_native_dast(f"http://127.0.0.1:{server.server_address[1]}/", per_host_concurrency=2)
+        finally:
+            server.shutdown()
+
+        assert result.requests_sent > 10
+        assert state["peak"] == 2
+
+
+class TestAllowedHosts:
+    """El tráfico de ataque solo sale hacia hosts permitidos"""
+
+    def test_default_allows_only_localhost(self):
+        assert target_allowed("http://127.0.0.1:8000/") and target_allowed("http://LOCALHOST/api")
+        assert target_allowed("http://[::1]:5000/")
+        assert not target_allowed("http://169.254.169.254/latest/meta-data/")
+        assert not target_allowed("https://ejemplo.com/") and not target_allowed("http:///sin-host")
+        assert target_allowed("https://ejemplo.com/", {"*"})
+
+    def test_engine_sends_nothing_to_blocked_host(self):
+        hits = []
+
+        class CountingHandler(_VulnerableHandler):
+            def do_GET(self):
+                hits.append(self.path)
+                super().do_GET()
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = run_native_dast(f"http://127.0.0.1:{server.server_address[1]}/", allowed_hosts={"localhost"})
+        finally:
+            server.shutdown()
+
+        assert hits == [] and result.vulnerabilities == []
+
+    def test_endpoint_rejects_remote_target(self):
+        from fastapi.testclient import TestClient
+        from backend.main import app
+
+        client = TestClient(app)
+        for engine in ("native", "zap"):
+            response = client.post("/scan/dast", data={"target_url": "http://169.254.169.254/", "engine": engine})
+            assert response.status_code == 403
+
+
+class TestVulnerableApp:
+    """Prueba contra ProgramasPruebas/vulnerable_app.py (requiere Flask)"""
+
+    def test_detects_sqli_in_vulnerable_app(self):
+        pytest.importorskip("flask")
+        from werkzeug.serving import make_server
+
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'ProgramasPruebas'))
+        import vulnerable_app
+
+        server = make_server("127.0.0.1", 0, vulnerable_app.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base = f"http://127.0.0.1:{server.server_port}/"
+            result = run_native_dast(base, seed_paths=["login", "read_file", "token"])
+        finally:
+            server.shutdown()
+
+        assert any(v["alert"] == "SQL Injection" and v["url"].endswith("/login") for v in result.vulnerabilities)
@@ -0,0 +1,198 @@
+"""
+Tests del análisis SAST limitado a los cambios entre dos revisiones git.
+Prueba los rangos de líneas, la preparación de archivos y la clasificación new/existing.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import backend.main as main_module
+from backend.diff_scan import DiffScanError, changed_files, resolve_ref, run_diff_scan
+from backend.main import app, get_db, Base, ScanResult
+
+BASE_SERVICE = """import subprocess
+
+
+def run(cmd):
+    return subprocess.call(cmd, shell=True)
+"""
+
+HEAD_SERVICE = """import subprocess
+
+TIMEOUT = 5
+
+
+def run(cmd):
+    return subprocess.call(cmd, shell=True)
+
+
+def evaluate(expr):
+    return eval(expr)
+"""
+
+UNTOUCHED = """import pickle
+
+
+def load(data):
+    return pickle.loads(data)
+
+
+VERSION = 1
+"""
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repositorio con una rama base y una rama de PR."""
+    root = tmp_path / "repo"
+    root.mkdir()
+    _git(root, "init", "-q", "-b", "main")
+    (root / "service.py").write_text(BASE_SERVICE)
+    (root / "loader.py").write_text(UNTOUCHED)
+    (root / "old_name.py").write_text("import os\n\n\ndef ok():\n    return os.getcwd()\n")
+    (root / "README.md").write_text("docs\n")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "base")
+
+    _git(root, "checkout", "-q", "-b", "feature")
+    (root / "service.py").write_text(HEAD_SERVICE)
+    (root / "loader.py").write_text(UNTOUCHED.replace("VERSION = 1", "VERSION = 2"))
+    _git(root, "mv", "old_name.py", "new_name.py")
+    (root / "README.md").write_text("docs\nmore\n")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "feature")
+    return root
+
+
+class TestGitDiff:
+    """Archivos y rangos de líneas añadidas"""
+
+    def test_changed_ranges_and_renames(self, repo):
+        base, head = resolve_ref(repo, "main"), resolve_ref(repo, "feature")
+        changes = {c.path: c for c in changed_files(repo, base, head, extensions={".py"})}
+        assert set(changes) == {"service.py", "loader.py"}  # el renombrado sin cambios no añade líneas
+        assert changes["loader.py"].ranges == [(8, 8)]
+        assert changes["service.py"].touches(11, 11)
+        assert not changes["service.py"].touches(7, 7)
+
+    def test_diff_from_merge_base(self, repo):
+        """Los commits que solo avanzan la rama base no se atribuyen a head"""
+        _git(repo, "checkout", "-q", "main")
+        (repo / "hotfix.py").write_text("import os\n\n\ndef fix():\n    return os.system('ls')\n")
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", "hotfix en main")
+        _git(repo, "checkout", "-q", "feature")
+
+        changes = changed_files(repo, resolve_ref(repo, "main"), resolve_ref(repo, "feature"), extensions={".py"})
+        assert {c.path for c in changes} == {"service.py", "loader.py"}
+
+    def test_textconv_filters_are_not_run(self, repo, tmp_path):
+        marker = tmp_path / "textconv-ran"
+        (repo / ".gitattributes").write_text("*.py diff=malicioso\n")
+        _git(repo, "config", "diff.malicioso.textconv", f"touch {marker}; cat")
+        changes = changed_files(repo, resolve_ref(repo, "main"), resolve_ref(repo, "feature"), extensions={".py"})
+        assert {c.path for c in changes} == {"service.py", "loader.py"}
+        assert not marker.exists()
+
+    def test_rejects_option_like_refs(self, repo):
+        with pytest.raises(DiffScanError):
+            resolve_ref(repo, "--output=/tmp/x")
+        with pytest.raises(DiffScanError):
+            resolve_ref(repo, "no-existe")
+
+
+class TestDiffScan:
+    """Hallazgos filtrados a las líneas modificadas"""
+
+    def test_new_versus_existing(self, repo, tmp_path):
+        summary = run_diff_scan(repo, "main", "feature", tools=["bandit"], extensions={".py"}, work_root=tmp_path)
+        found = {(f["diff_path"], f["test_id"], f["classification"]) for f in summary["results"]}
+        assert ("service.py", "B307", "new") in found
+        # La llamada con shell=True se desplazó pero no es nueva; no está en líneas añadidas
+        assert not any(f["test_id"] == "B602" for f in summary["results"])
+        # pickle en loader.py está fuera de la línea modificada
+        assert summary["filtered_out"] >= 2
+        assert summary["new_findings"] == 1
+        assert summary["tools"]["bandit"]["status"] == "completed"
+        assert not any(p.name.startswith("diff_") for p in tmp_path.iterdir())
+
+    def test_moved_line_keeps_existing_classification(self, repo, tmp_path):
+        moved = HEAD_SERVICE.replace(
+            "def run(cmd):\n    return subprocess.call(cmd, shell=True)\n\n\n", ""
+        ) + "\n\ndef run(cmd):\n    return  subprocess.call(cmd,  shell=True)\n"
+        (repo / "service.py").write_text(moved)
+        _git(repo, "commit", "-q", "-am", "mover run")
+        summary = run_diff_scan(repo, "feature~1", "feature", tools=["bandit"], work_root=tmp_path)
+        assert [(f["test_id"], f["classification"]) for f in summary["results"]] == [("B602", "existing")]
+
+    def test_no_changes(self, repo, tmp_path):
+        summary = run_diff_scan(repo, "feature", "feature", tools=["bandit"], work_root=tmp_path)
+        assert summary["changed_files"] == [] and summary["results"] == []
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'diff.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(main_module, "get_warm_pool", lambda: None)
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), SessionLocal
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+class TestDiffEndpoint:
+    """Endpoint /scan/sast/diff"""
+
+    def test_endpoint_records_scan(self, client, repo):
+        http, SessionLocal = client
+        response = http.post("/scan/sast/diff", data={
+            "repo_path": str(repo), "base_ref": "main", "head_ref": "feature", "tools": "bandit"
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert body["new_findings"] == 1
+        assert body["findings"][0]["classification"] == "new"
+
+        db = SessionLocal()
+        try:
+            scan = db.query(ScanResult).filter(ScanResult.id == body["id"]).first()
+            assert scan.status == "completed"
+            assert scan.results["vulnerabilities_found"] == 1
+            assert scan.results["head"] == body["head"]
+        finally:
+            db.close()
+        os.remove(body["report_path"])
+
+    def test_invalid_ref_is_client_error(self, client, repo):
+        http, _ = client
+        response = http.post("/scan/sast/diff", data={
+            "repo_path": str(repo), "base_ref": "-x", "tools": "bandit"
+        })
+        assert response.status_code == 400
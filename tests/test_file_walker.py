@@ -0,0 +1,96 @@
+"""
+Tests del recorrido de archivos con filtrado previo por globs.
+Comprueba la poda de directorios excluidos, los filtros include/max_depth y la configuración por proyecto.
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.file_walker import FileWalker, GlobMatcher, WalkConfig, glob_to_regex
+from backend.main import validate_scan_path
+from scripts.scan_config import get_walk_config
+
+
+def _tree(root, files):
+    for rel in files:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n")
+
+
+def _rel(walker, root):
+    return sorted(rel for rel, _entry in walker.walk(root))
+
+
+class TestGlobs:
+    """Semántica de globs equivalente a pathlib"""
+
+    def test_glob_translation(self):
+        assert re.fullmatch(glob_to_regex("**/test/**"), "a/test/b.py")
+        assert re.fullmatch(glob_to_regex("**/test/**"), "test/b.py")
+        assert re.fullmatch(glob_to_regex("src/*.py"), "src/app.py")
+        assert not re.fullmatch(glob_to_regex("src/*.py"), "src/sub/app.py")
+        assert re.fullmatch(glob_to_regex("src/**/*.py"), "src/sub/deep/app.py")
+
+    def test_covers_dir(self):
+        matcher = GlobMatcher(["**/node_modules/**", "*.min.js"])
+        assert matcher.covers_dir("web/node_modules")
+        assert not matcher.covers_dir("web/src")
+        assert matcher.matches("bundle.min.js")
+
+
+class TestPruning:
+    """Los directorios excluidos no se listan"""
+
+    def test_default_excludes_pruned(self, tmp_path):
+        _tree(tmp_path, [
+            "app.py", "src/util.py",
+            "node_modules/lib/index.js", ".git/objects/ab/cd", "target/classes/A.class",
+            "web/node_modules/deep/x.js"
+        ])
+        walker = FileWalker()
+        assert _rel(walker, tmp_path) == ["app.py", "src/util.py"]
+        assert walker.stats()["dirs_pruned"] == 4
+        # Nunca se descendió dentro de los directorios podados
+        assert walker.stats()["dirs_visited"] == 3
+
+    def test_include_max_depth_and_extensions(self, tmp_path):
+        _tree(tmp_path, ["routes/a.ts", "routes/v1/b.ts", "routes/v1/deep/c.ts", "docs/readme.md", "lib/d.py"])
+        walker = FileWalker(WalkConfig(include=("routes/**/*.ts",), max_depth=2))
+        assert _rel(walker, tmp_path) == ["routes/a.ts", "routes/v1/b.ts"]
+
+        walker = FileWalker(WalkConfig(extensions=(".py",)))
+        assert _rel(walker, tmp_path) == ["lib/d.py"]
+
+    def test_project_config_file(self, tmp_path):
+        _tree(tmp_path, ["app/main.py", "app/generated/stub.py", "scripts/tool.py"])
+        (tmp_path / ".hybridscan.json").write_text(json.dumps({
+            "include": ["app"], "exclude": ["**/generated/**"]
+        }))
+        config = WalkConfig.for_project(tmp_path, extensions=(".py",))
+        assert "**/node_modules/**" in config.exclude
+        assert _rel(FileWalker(config), tmp_path) == ["app/main.py"]
+
+
+class TestScanConfig:
+    """APP_SCAN_CONFIG alimenta el mismo recorrido"""
+
+    def test_app_config_lookup(self):
+        config = get_walk_config("Juice Shop")
+        assert "routes/**/*.ts" in config.include
+        assert "**/node_modules/**" in config.exclude
+        assert get_walk_config("desconocida").include == ()
+
+    def test_validate_scan_path_skips_vendored_code(self, tmp_path):
+        _tree(tmp_path, ["api/views.py", "node_modules/pkg/index.js", ".venv/lib/site.py"])
+        copied = validate_scan_path(str(tmp_path))
+        try:
+            found = sorted(p.relative_to(copied).as_posix() for p in copied.rglob("*") if p.is_file())
+        finally:
+            shutil.rmtree(copied, ignore_errors=True)
+        assert found == ["api/views.py"]
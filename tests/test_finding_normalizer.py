@@ -0,0 +1,179 @@
+"""
+Tests del normalizador canónico de hallazgos.
+Prueba los mapas por herramienta, las tablas CWE -> OWASP y tipo, y que el resumen, la correlación y el PDF lean
+los registros normalizados en la ingesta.
+"""
+
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Float, String, create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.main import app, get_db, _finding_to_vulnerability, _index_findings, Base, ScanResult, Finding
+from backend.correlation_engine import ConfidenceLevel, VulnerabilityType
+from backend.finding_normalizer import normalize_finding, normalize_severity, owasp_for_cwe, vuln_type_for
+from backend.report_stream import ReportSummary
+from database.finding_search import search_statement
+from database.models import upgrade_schema
+
+BANDIT_ISSUE = {
+    "filename": "app/db.py", "line_number": 12, "test_id": "B608", "test_name": "hardcoded_sql_expressions",
+    "issue_severity": "MEDIUM", "issue_confidence": "LOW", "issue_cwe": {"id": 89},
+    "issue_text": "Possible SQL injection vector through string-based query construction.",
+    "more_info": "https://bandit.readthedocs.io/en/latest/plugins/b608_hardcoded_sql_expressions.html"
+}
+SEMGREP_ISSUE = {
+    "check_id": "python.django.security.injection.raw-html-format", "path": "app/views.py", "start": {"line": 30},
+    "extra": {
+        "severity": "ERROR", "message": "Data is formatted into HTML", "lines": "return HttpResponse(html)",
+        "fix": "Use django.shortcuts.render",
+        "metadata": {"cwe": ["CWE-79: Cross-site Scripting"], "confidence": "MEDIUM"}
+    }
+}
+DAST_ALERT = {
+    "type": "Session Fixation", "alert": "Session Fixation", "risk": "Medium", "confidence": "High",
+    "url": "http://localhost:8000/login", "evidence": "Set-Cookie reused after login",
+    "description": "Session identifiers are not rotated.", "solution": "Issue a new session id on login."
+}
+
+
+class TestCanonicalRecord:
+    """Un esquema para todas las herramientas"""
+
+    def test_bandit_and_semgrep(self):
+        bandit = normalize_finding(BANDIT_ISSUE, "bandit", "SAST")
+        assert (bandit["rule_id"], bandit["title"], bandit["severity"], bandit["confidence"]) == \
+            ("B608", "hardcoded_sql_expressions", "medium", "low")
+        assert (bandit["cwe"], bandit["owasp_category"], bandit["vuln_type"]) == \
+            ("CWE-89", "API3:2023", "sql_injection")
+        assert bandit["recommendation"] == BANDIT_ISSUE["more_info"]
+
+        semgrep = normalize_finding(SEMGREP_ISSUE, "semgrep", "SAST")
+        assert (semgrep["title"], semgrep["severity"], semgrep["confidence"]) == ("raw-html-format", "high", "medium")
+        assert (semgrep["cwe"], semgrep["owasp_category"], semgrep["vuln_type"]) == ("CWE-79", "API8:2023", "xss")
+        assert (semgrep["file_path"], semgrep["line_number"], semgrep["code"]) == \
+            ("app/views.py", 30, "return HttpResponse(html)")
+        assert semgrep["recommendation"] == "Use django.shortcuts.render"
+
+    def test_dast(self):
+        dast = normalize_finding(DAST_ALERT, "native-dast", "DAST")
+        assert (dast["rule_id"], dast["severity"], dast["endpoint"]) == \
+            ("Session Fixation", "medium", "http://localhost:8000/login")
+        # Sin CWE el tipo sale del nombre de la alerta
+        assert dast["cwe"] is None and dast["vuln_type"] == "broken_authentication"
+        assert dast["description"] == "Set-Cookie reused after login"
+        assert dast["recommendation"] == "Issue a new session id on login."
+
+    def test_lookup_tables_are_exact(self):
+        # CWE-789 contiene "89" pero no es una inyección SQL
+        assert owasp_for_cwe("CWE-789") is None and owasp_for_cwe("CWE-89") == "API3:2023"
+        assert vuln_type_for("CWE-789") == "security_misconfiguration"
+        assert vuln_type_for(None, "Broken Access Check", "Broken Access Check", "DAST") == "broken_access_control"
+        assert [normalize_severity(s) for s in ("ERROR", "Informational", " High ", None, "bogus")] == \
+            ["high", "info", "high", "info", "info"]
+
+    def test_summary_uses_semgrep_severity(self):
+        summary = ReportSummary("semgrep", "SAST").add_all([SEMGREP_ISSUE, "no es un hallazgo"]).as_dict()
+        assert summary["vulnerabilities_found"] == 2
+        assert summary["severity_breakdown"]["high"] == 1
+        assert summary["owasp_categories_detected"] == ["API8:2023"]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'normalizer.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+class TestConsumers:
+    """Los consumidores leen las filas normalizadas"""
+
+    def test_rows_feed_correlation(self, session_factory):
+        _, SessionLocal = session_factory
+        db = SessionLocal()
+        scan = ScanResult(scan_type="SAST", tool="semgrep", target="views.py", status="completed",
+                          results={"results": [SEMGREP_ISSUE]})
+        db.add(scan)
+        db.flush()
+        _index_findings(db, scan)
+        db.commit()
+        row = db.query(Finding).filter(Finding.scan_id == scan.id).one()
+        assert (row.title, row.vuln_type, row.recommendation) == ("raw-html-format", "xss",
+                                                                  "Use django.shortcuts.render")
+
+        vulnerability = _finding_to_vulnerability(row, "views.py")
+        assert vulnerability.type == VulnerabilityType.XSS and vulnerability.severity == ConfidenceLevel.HIGH
+        assert (vulnerability.owasp_category, vulnerability.source_tool) == ("API8:2023", "semgrep")
+
+        # Filas anteriores a `vuln_type`: el tipo se deduce con las mismas tablas
+        row.vuln_type = None
+        assert _finding_to_vulnerability(row, "views.py").type == VulnerabilityType.XSS
+        db.close()
+
+    def test_pdf_reads_rows_without_results(self, session_factory):
+        engine, SessionLocal = session_factory
+        db = SessionLocal()
+        scan = ScanResult(scan_type="SAST", tool="bandit", target="db.py", status="completed",
+                          results={"results": [BANDIT_ISSUE]})
+        db.add(scan)
+        db.flush()
+        _index_findings(db, scan)
+        db.commit()
+        scan_id = scan.id
+        db.close()
+
+        def override_get_db():
+            session = SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        previous = app.dependency_overrides.get(get_db)
+        app.dependency_overrides[get_db] = override_get_db
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            response = TestClient(app).get(f"/download/pdf/{scan_id}")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+            if previous is None:
+                app.dependency_overrides.pop(get_db, None)
+            else:
+                app.dependency_overrides[get_db] = previous
+
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+        assert not any("scan_results.results" in statement for statement in statements)
+
+    def test_legacy_table_gains_canonical_columns(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            for column in ("title", "vuln_type", "confidence", "recommendation"):
+                conn.exec_driver_sql(f"ALTER TABLE findings DROP COLUMN {column}")
+            conn.exec_driver_sql("INSERT INTO scan_results (scan_type) VALUES ('SAST')")
+            conn.exec_driver_sql("INSERT INTO findings (scan_id, rule_id, description) VALUES (1, 'B301', 'pickle')")
+        upgrade_schema(engine)
+
+        # Las columnas añadidas quedan al final, en el orden del modelo; la búsqueda las selecciona por nombre
+        columns = Finding.__table__.columns
+        statement, params = search_statement("pickle", {}, 10, [column.name for column in columns])
+        with engine.connect() as conn:
+            row = conn.execute(statement.columns(**{column.name: column.type for column in columns},
+                                                 rank=Float, snippet=String), params).one()
+            names = [r[1] for r in conn.execute(text("PRAGMA table_info(findings)"))]
+        assert (row.rule_id, row.description, row.title) == ("B301", "pickle", None)
+        assert names == [column.name for column in Finding.__table__.columns]
+        engine.dispose()
@@ -0,0 +1,166 @@
+"""
+Tests de la búsqueda de texto completo sobre hallazgos.
+Prueba la sincronización del índice FTS5, el ranking, la paginación, los filtros y la alternativa con LIKE.
+"""
+
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.main import app, get_db, _index_findings, Base, ScanResult, Finding
+import database.finding_search as finding_search
+from database.finding_search import FTS_TABLE, match_expression, search_index_exists
+from database.models import upgrade_schema
+
+BANDIT_RESULTS = {"results": [
+    {"filename": "app/serializers.py", "line_number": 4, "test_id": "B301", "issue_severity": "MEDIUM",
+     "issue_cwe": {"id": 502}, "issue_text": "Pickle and modules that wrap it can be unsafe when used to "
+                                             "deserialize untrusted data, possible security issue."},
+    {"filename": "app/auth.py", "line_number": 12, "test_id": "B105", "issue_severity": "LOW",
+     "issue_cwe": {"id": 259}, "issue_text": "Possible hardcoded password: 'jwt-secret'"},
+    {"filename": "app/pickle_cache.py", "line_number": 2, "test_id": "B403", "issue_severity": "LOW",
+     "issue_cwe": {"id": 502}, "issue_text": "Consider possible security implications associated with this module."},
+]}
+
+
+@pytest.fixture
+def search_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    scan = ScanResult(scan_type="SAST", tool="bandit", target="app", status="completed", results=BANDIT_RESULTS)
+    db.add(scan)
+    db.flush()
+    _index_findings(db, scan)
+    db.commit()
+    db.close()
+    yield engine, SessionLocal
+    engine.dispose()
+
+
+@pytest.fixture
+def client(search_db):
+    _, SessionLocal = search_db
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+def _drop_search_index(conn):
+    for trigger in ("ai", "ad", "au"):
+        conn.exec_driver_sql(f"DROP TRIGGER {FTS_TABLE}_{trigger}")
+    conn.exec_driver_sql(f"DROP TABLE {FTS_TABLE}")
+
+
+def _fts_count(engine, match):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?", (match,)).scalar()
+
+
+class TestSearchIndex:
+    """Índice FTS5 sincronizado con la tabla findings"""
+
+    def test_created_with_table_and_kept_in_sync(self, search_db):
+        engine, SessionLocal = search_db
+        assert _fts_count(engine, "pickle") == 2
+        with engine.begin() as conn:
+            conn.execute(Finding.__table__.update().where(Finding.rule_id == "B105").values(description="jwt none"))
+        assert _fts_count(engine, "hardcoded") == 0 and _fts_count(engine, "jwt") == 1
+        with engine.begin() as conn:
+            conn.execute(Finding.__table__.delete())
+        assert _fts_count(engine, "pickle") == 0
+
+    def test_existing_database_is_indexed_on_upgrade(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            _drop_search_index(conn)
+            conn.execute(insert(ScanResult.__table__).values(scan_type="SAST"))
+            conn.execute(insert(Finding.__table__).values(scan_id=1, tool="bandit", description="yaml load"))
+            assert not search_index_exists(conn)
+        upgrade_schema(engine)
+        assert _fts_count(engine, "yaml") == 1
+        engine.dispose()
+
+    def test_user_syntax_is_quoted(self):
+        assert match_expression('jwt* "OR') == '"jwt"* """OR"'
+        assert match_expression("  ") is None
+
+
+class TestSearchEndpoint:
+    """Búsqueda ordenada por relevancia y paginada"""
+
+    def test_ranked_results_with_snippet(self, client):
+        response = client.get("/findings/search", params={"q": "pickle"})
+        assert response.status_code == 200
+        results = response.json()
+        # La coincidencia en la ruta pesa más que en la descripción
+        assert [r["rule_id"] for r in results] == ["B403", "B301"]
+        assert results[0]["rank"] <= results[1]["rank"]
+        assert "[Pickle]" in results[1]["snippet"]
+        assert results[1]["cwe"] == "CWE-502" and results[1]["created_at"]
+
+    def test_pagination_and_filters(self, client):
+        first = client.get("/findings/search", params={"q": "pickle", "limit": 1})
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get("/findings/search", params={"q": "pickle", "limit": 1, "cursor": cursor})
+        assert "X-Next-Cursor" not in second.headers
+        assert {first.json()[0]["rule_id"], second.json()[0]["rule_id"]} == {"B301", "B403"}
+
+        filtered = client.get("/findings/search", params={"q": "pickle", "severity": "MEDIUM"}).json()
+        assert [r["rule_id"] for r in filtered] == ["B301"]
+        assert client.get("/findings/search", params={"q": "jwt*"}).json()[0]["rule_id"] == "B105"
+        assert client.get("/findings/search", params={"q": "pickle", "cursor": "@@"}).status_code == 400
+
+    def test_ranking_window_and_recent_order(self, client, monkeypatch):
+        # Ventana de una coincidencia: solo se ordena la más reciente
+        monkeypatch.setattr(finding_search, "RANK_WINDOW", 1)
+        ranked = client.get("/findings/search", params={"q": "pickle"})
+        assert [r["rule_id"] for r in ranked.json()] == ["B403"]
+
+        # `recent` alcanza todas las coincidencias, de la más nueva a la más antigua
+        first = client.get("/findings/search", params={"q": "pickle", "order": "recent", "limit": 1})
+        second = client.get("/findings/search", params={"q": "pickle", "order": "recent", "limit": 1,
+                                                        "cursor": first.headers["X-Next-Cursor"]})
+        assert [first.json()[0]["rule_id"], second.json()[0]["rule_id"]] == ["B403", "B301"]
+        assert client.get("/findings/search", params={"q": "pickle", "order": "oldest"}).status_code == 422
+
+    def test_ranking_window_applies_filters(self, client, monkeypatch):
+        # La ventana cuenta solo las coincidencias filtradas: B301 es la más reciente de severidad media
+        monkeypatch.setattr(finding_search, "RANK_WINDOW", 1)
+        filtered = client.get("/findings/search", params={"q": "pickle", "severity": "MEDIUM"})
+        assert [r["rule_id"] for r in filtered.json()] == ["B301"]
+
+    def test_like_fallback_without_fts(self, client, search_db):
+        engine, _ = search_db
+        with engine.begin() as conn:
+            _drop_search_index(conn)
+        results = client.get("/findings/search", params={"q": "hardcoded"}).json()
+        assert [r["rule_id"] for r in results] == ["B105"]
+        assert results[0]["snippet"] is None
+
+    def test_like_fallback_escapes_wildcards(self, client, search_db):
+        engine, _ = search_db
+        with engine.begin() as conn:
+            _drop_search_index(conn)
+        assert [r["rule_id"] for r in client.get("/findings/search", params={"q": "_"}).json()] == ["B403"]
+        assert client.get("/findings/search", params={"q": "%"}).json() == []
@@ -0,0 +1,151 @@
+"""
+Tests de la tabla normalizada de hallazgos.
+Prueba la proyección de cada herramienta, la inserción por lotes, las consultas y la lectura desde el correlador.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.main import app, get_db, Base, ScanResult, Finding
+from backend.finding_normalizer import normalize_cwe
+from backend.findings_store import finding_record, store_findings
+
+BANDIT_ISSUE = {
+    "filename": "/tmp/scan/app.py", "line_number": 12, "test_id": "B608", "issue_severity": "MEDIUM",
+    "issue_cwe": {"id": 89, "link": "https://cwe.mitre.org/data/definitions/89.html"},
+    "issue_text": "Possible SQL injection vector through string-based query construction.",
+    "code": "12     cursor.execute('SELECT * FROM t WHERE id=%s' % uid)\n"
+}
+SEMGREP_ISSUE = {
+    "check_id": "python.lang.security.audit.eval-detected", "path": "app.py",
+    "start": {"line": 7}, "extra": {"severity": "ERROR", "message": "Detected eval", "lines": "eval(x)",
+                                    "metadata": {"cwe": ["CWE-95: Eval Injection"]}}
+}
+DAST_ALERT = {
+    "type": "SQL Injection", "alert": "SQL Injection", "severity": "CRITICAL", "cwe": "CWE-89",
+    "url": "http://localhost:8000/api/users?id=1", "evidence": "SQL error in response",
+    "description": "SQL injection is a web security vulnerability..."
+}
+
+
+class TestFindingRecord:
+    """Proyección de hallazgos brutos a filas"""
+
+    def test_bandit(self):
+        record = finding_record(BANDIT_ISSUE, "bandit", "SAST")
+        assert record["severity"] == "medium"
+        assert record["cwe"] == "CWE-89"
+        assert record["owasp_category"] == "API3:2023"
+        assert (record["file_path"], record["line_number"], record["rule_id"]) == ("/tmp/scan/app.py", 12, "B608")
+
+    def test_semgrep_and_dast(self):
+        semgrep = finding_record(SEMGREP_ISSUE, "semgrep", "SAST")
+        assert (semgrep["severity"], semgrep["cwe"], semgrep["line_number"]) == ("high", "CWE-95", 7)
+        dast = finding_record(DAST_ALERT, "OWASP ZAP", "DAST")
+        assert (dast["severity"], dast["cwe"], dast["rule_id"]) == ("critical", "CWE-89", "SQL Injection")
+        assert dast["endpoint"] == DAST_ALERT["url"]
+        assert dast["description"] == "SQL error in response"
+
+    def test_fingerprint_ignores_line_number(self):
+        moved = dict(BANDIT_ISSUE, line_number=40)
+        assert finding_record(moved, "bandit", "SAST")["fingerprint"] == \
+            finding_record(BANDIT_ISSUE, "bandit", "SAST")["fingerprint"]
+        assert normalize_cwe("0") is None and normalize_cwe(79) == "CWE-79"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'findings.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+class TestStoreFindings:
+    """Inserción por lotes"""
+
+    def test_batched_insert_replaces_previous_rows(self, session_factory):
+        engine, SessionLocal = session_factory
+        inserts = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, params, context, executemany:
+                     inserts.append(executemany) if statement.startswith("INSERT INTO findings") else None)
+        db = SessionLocal()
+        scan = ScanResult(scan_type="SAST", tool="bandit", target="app.py",
+                          results={"results": [dict(BANDIT_ISSUE, line_number=i) for i in range(1, 6)]})
+        db.add(scan)
+        db.commit()
+
+        assert store_findings(db, Finding, scan, batch_size=2) == 5
+        # Dos lotes completos por executemany y un último lote de una fila
+        assert inserts == [True, True, False]
+        assert store_findings(db, Finding, scan, batch_size=2) == 5
+        db.commit()
+        assert db.query(Finding).filter(Finding.scan_id == scan.id).count() == 5
+        db.close()
+
+
+@pytest.fixture
+def client(session_factory):
+    _, SessionLocal = session_factory
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), SessionLocal
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+class TestFindingsQueries:
+    """Endpoint /findings y correlador"""
+
+    def test_dast_ingest_and_query(self, client):
+        http, _ = client
+        response = http.post("/scan/dast", data={"target_url": "http://localhost:8000/api/users"})
+        assert response.status_code == 200
+        scan_id = response.json()["id"]
+        rows = http.get("/findings", params={"scan_id": scan_id}).json()
+        assert rows and {r["scan_type"] for r in rows} == {"DAST"}
+        week_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
+        critical_sqli = http.get("/findings", params={"severity": "CRITICAL", "cwe": "89", "since": week_ago}).json()
+        assert all(r["severity"] == "critical" and r["cwe"] == "CWE-89" for r in critical_sqli)
+        assert http.get("/findings", params={"since": datetime.utcnow().isoformat(), "scan_id": scan_id}).json() == []
+        os.remove(response.json()["report_path"])
+
+    def test_hybrid_backfills_and_reads_rows(self, client):
+        http, SessionLocal = client
+        db = SessionLocal()
+        # Escaneo anterior a la tabla: sin filas en `findings`
+        sast = ScanResult(scan_type="SAST", tool="bandit", target="users.py", status="completed",
+                          results={"results": [BANDIT_ISSUE]})
+        dast = ScanResult(scan_type="DAST", tool="OWASP ZAP", target="http://localhost:8000/api/users",
+                          status="completed", results={"vulnerabilities": [DAST_ALERT]})
+        db.add_all([sast, dast])
+        db.commit()
+        sast_id, dast_id = sast.id, dast.id
+        db.close()
+
+        response = http.post("/scan/hybrid", data={"sast_scan_id": sast_id, "dast_scan_id": dast_id})
+        assert response.status_code == 200
+        assert response.json()["summary"]["total_sast_findings"] == 1
+        db = SessionLocal()
+        assert db.query(Finding).filter(Finding.scan_id.in_([sast_id, dast_id])).count() == 2
+        db.close()
+        os.remove(response.json()["report_path"])
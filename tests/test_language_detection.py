@@ -0,0 +1,148 @@
+"""
+Tests de la detección de lenguajes y frameworks previa al análisis SAST.
+Prueba el histograma, los manifiestos, la selección de herramientas/packs y su registro en /scan/sast.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.language_detection import detect_and_plan, detect_stack
+from backend.main import app, get_db, Base, ScanResult
+from backend.semgrep_rules import language_subset_config, refresh_rule_packs
+
+
+def _tree(root, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root
+
+
+@pytest.fixture
+def js_repo(tmp_path):
+    return _tree(tmp_path / "tienda", {
+        "package.json": json.dumps({"dependencies": {"express": "^4.18.0", "react": "^18.0.0"}}),
+        "server.js": "app.get('/', (req, res) => res.send(req.query.q))\n",
+        "src/App.tsx": "export const App = () => null\n",
+        "node_modules/lib/index.py": "import os\n",
+    })
+
+
+class TestDetection:
+    """Perfil del árbol"""
+
+    def test_javascript_repo_profile(self, js_repo):
+        profile = detect_stack(js_repo)
+        assert profile.languages == {"javascript": 1, "typescript": 1}
+        assert profile.manifests == ["package.json"]
+        assert profile.frameworks == ["express", "react"]
+        # El Python vendorizado en node_modules no cuenta
+        assert "python" not in profile.detected_languages
+
+    def test_python_manifest_frameworks(self, tmp_path):
+        _tree(tmp_path, {"requirements.txt": "Django==4.2\nrequests\n", "manage.py": "", "app/views.py": ""})
+        profile = detect_stack(tmp_path)
+        assert profile.frameworks == ["django"]
+        assert profile.languages == {"python": 2}
+
+
+class TestPlan:
+    """Herramientas y packs seleccionados"""
+
+    def test_bandit_skipped_on_javascript(self, js_repo):
+        plan = detect_and_plan(js_repo)
+        assert plan.tools == ["semgrep"]
+        assert "bandit" in plan.skipped_tools
+        assert {"p/javascript", "p/typescript", "p/nodejs", "p/react"} <= set(plan.semgrep_packs)
+        assert "p/python" in plan.skipped_packs
+        assert "p/django" in plan.skipped_packs
+
+    def test_empty_tree_runs_nothing(self, tmp_path):
+        plan = detect_and_plan(tmp_path)
+        assert plan.tools == []
+        assert plan.skipped_tools["semgrep"] == "no se detectaron archivos fuente"
+
+    def test_local_rules_subset_by_language(self, tmp_path):
+        source = _tree(tmp_path / "packs", {"p_owasp-top-ten.yml": json.dumps({"rules": [
+            {"id": "py-exec", "languages": ["python"], "message": "m", "severity": "ERROR", "pattern": "exec(...)"},
+            {"id": "js-eval", "languages": ["js"], "message": "m", "severity": "ERROR", "pattern": "eval(...)"},
+            {"id": "secret", "languages": ["generic"], "message": "m", "severity": "ERROR", "pattern": "key"},
+        ]})})
+        rules_dir = tmp_path / "rules"
+        refresh_rule_packs(["p/owasp-top-ten"], rules_dir=rules_dir, source_dir=source)
+
+        subset = language_subset_config({"javascript"}, rules_dir)
+        ids = {rule["id"] for rule in json.loads(subset.read_text())["rules"]}
+        assert ids == {"js-eval", "secret"}
+        assert language_subset_config({"javascript"}, rules_dir) == subset
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'detection.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), SessionLocal
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+class TestSastEndpoint:
+    """La decisión queda registrada en el escaneo"""
+
+    def test_bandit_on_javascript_is_skipped(self, client, js_repo):
+        http, SessionLocal = client
+        response = http.post("/scan/sast", data={"target_path": str(js_repo), "tool": "bandit"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["skipped"] is True
+        assert "javascript" in body["skip_reason"]
+
+        db = SessionLocal()
+        try:
+            scan = db.query(ScanResult).filter(ScanResult.id == body["id"]).first()
+            assert scan.status == "skipped"
+            detection = scan.results["metadata"]["stack_detection"]
+            assert detection["skipped_tools"]["bandit"] == body["skip_reason"]
+            assert detection["profile"]["manifests"] == ["package.json"]
+        finally:
+            db.close()
+
+    def test_bandit_on_python_records_detection(self, client, tmp_path):
+        http, SessionLocal = client
+        target = _tree(tmp_path / "api", {"requirements.txt": "flask\n", "app.py": "import pickle\n"})
+        response = http.post("/scan/sast", data={"target_path": str(target), "tool": "bandit"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["stack_detection"]["tools"] == ["bandit"]
+        assert body["stack_detection"]["profile"]["frameworks"] == ["flask"]
+
+        db = SessionLocal()
+        try:
+            scan = db.query(ScanResult).filter(ScanResult.id == body["id"]).first()
+            assert scan.results["metadata"]["stack_detection"]["tools"] == ["bandit"]
+        finally:
+            db.close()
+        os.remove(body["report_path"])
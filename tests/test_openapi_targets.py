@@ -0,0 +1,188 @@
+"""
+Tests de la enumeración de objetivos DAST desde OpenAPI/Swagger.
+Prueba la enumeración de operaciones, el escaneo sin rastreo y la unión exacta por ruta en la correlación.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.openapi_targets import OpenApiError, enumerate_operations, load_openapi, route_table
+from backend.dast_engine import points_from_operations, run_native_dast
+from backend.correlation_engine import VulnerabilityCorrelator
+
+OPENAPI_SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Tienda", "version": "1.0"},
+    "servers": [{"url": "https://staging.example.com/api/v1"}],
+    "paths": {
+        "/items": {
+            "get": {
+                "operationId": "searchItems",
+                "tags": ["items"],
+                "parameters": [{"name": "name", "in": "query", "schema": {"type": "string", "example": "lapiz"}}]
+            }
+        },
+        "/orders": {
+            "post": {
+                "operationId": "createOrder",
+                "tags": ["orders"],
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Order"}}}}
+            }
+        },
+        "/users/{id}": {
+            "parameters": [{"$ref": "#/components/parameters/UserId"}],
+            "get": {"operationId": "getUser", "tags": ["users"]}
+        }
+    },
+    "components": {
+        "parameters": {"UserId": {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}},
+        "schemas": {
+            "Order": {
+                "type": "object",
+                "properties": {"product": {"type": "string"}, "quantity": {"type": "integer", "minimum": 2}}
+            }
+        }
+    }
+}
+
+
+class TestEnumeration:
+    """Tests de lectura de especificaciones"""
+
+    def test_openapi3_operations_with_refs(self):
+        operations = enumerate_operations(OPENAPI_SPEC, "http://127.0.0.1:9000")
+        by_id = {op.operation_id: op for op in operations}
+
+        assert set(by_id) == {"searchItems", "createOrder", "getUser"}
+        assert by_id["searchItems"].url == "http://127.0.0.1:9000/api/v1/items"
+        assert by_id["searchItems"].query == {"name": "lapiz"}
+        assert by_id["createOrder"].body == {"product": "test", "quantity": 2}
+        assert by_id["createOrder"].body_type == "json"
+        assert by_id["getUser"].url == "http://127.0.0.1:9000/api/v1/users/1"
+        assert by_id["getUser"].route == "/api/v1/users/{id}"
+
+        routes = {r["operation_id"]: r for r in route_table(operations)}
+        assert re.match(routes["getUser"]["regex"], "/api/v1/users/42")
+        assert not re.match(routes["getUser"]["regex"], "/api/v1/users/42/orders")
+
+    def test_swagger2_base_path_and_form_data(self):
+        spec = {
+            "swagger": "2.0",
+            "basePath": "/legacy",
+            "paths": {"/login": {"post": {"parameters": [
+                {"name": "username", "in": "formData", "type": "string"},
+                {"name": "password", "in": "formData", "type": "string", "format": "password"}
+            ]}}}
+        }
+        (operation,) = enumerate_operations(spec, "http://127.0.0.1:9000/")
+        assert operation.url == "http://127.0.0.1:9000/legacy/login"
+        assert operation.body == {"username": "test", "password": "test"}
+        assert operation.body_type == "form"
+
+    def test_load_restrictions(self, tmp_path):
+        spec_file = tmp_path / "openapi.json"
+        spec_file.write_text(json.dumps(OPENAPI_SPEC))
+        assert load_openapi(str(spec_file))["openapi"] == "3.0.3"
+
+        with pytest.raises(OpenApiError):
+            load_openapi("https://api.example.com/openapi.json")
+        with pytest.raises(OpenApiError):
+            load_openapi(str(tmp_path / "spec.txt"))
+        not_openapi = tmp_path / "otro.json"
+        not_openapi.write_text(json.dumps({"paths": {}}))
+        with pytest.raises(OpenApiError):
+            load_openapi(str(not_openapi))
+
+    def test_endpoint_rejects_paths_outside_scan_directories(self, tmp_path):
+        from fastapi.testclient import TestClient
+        from backend.main import _openapi_source, app
+
+        spec_file = tmp_path / "openapi.json"
+        spec_file.write_text(json.dumps(OPENAPI_SPEC))
+        assert _openapi_source(str(spec_file)) == str(spec_file.resolve())
+
+        client = TestClient(app)
+        for source in ("/opt/servicio/openapi.json", "/etc/secreto.yaml", f"{tmp_path}/../../etc/x.json"):
+            response = client.post("/scan/dast", data={"target_url": "http://127.0.0.1:9/", "openapi": source})
+            assert response.status_code == 400
+            # Error genérico: sin ruta ni mensaje del parser
+            assert response.json()["detail"] == "Especificación OpenAPI inválida o no permitida"
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """API JSON sin enlaces HTML: un rastreo a ciegas no encontraría nada."""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/api/v1/items":
+            self._reply(200, f"Resultados para {query.get('name', '')}")
+        elif url.path.startswith("/api/v1/users/"):
+            self._reply(200, f"Usuario {url.path.rsplit('/', 1)[-1]}: email privado")
+        else:
+            self._reply(404, "{}")
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/api/v1/orders" and "'" in str(body.get("product", "")):
+            self._reply(500, "sqlite3.OperationalError: unrecognized token")
+        elif self.path == "/api/v1/orders":
+            self._reply(201, "Pedido creado")
+        else:
+            self._reply(404, "{}")
+
+
+class TestOpenApiDrivenScan:
+    """El motor DAST analiza las operaciones declaradas sin rastrear"""
+
+    def test_scans_declared_operations(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ApiHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        target = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            operations = enumerate_operations(OPENAPI_SPEC, target)
+            result = run_native_dast(target, injection_points=points_from_operations(operations))
+        finally:
+            server.shutdown()
+
+        found = {(v["alert"], v.get("route"), v["parameter"]) for v in result.vulnerabilities}
+        assert result.pages_crawled == 0
+        assert result.injection_points == 3
+        assert ("Cross-Site Scripting (XSS)", "/api/v1/items", "name") in found
+        assert any(alert == "SQL Injection" and route == "/api/v1/orders" and "product" in param
+                   for alert, route, param in found)
+        assert ("Insecure Direct Object Reference", "/api/v1/users/{id}", "path") in found
+
+
+class TestRouteCorrelation:
+    """Unión exacta de endpoints SAST y DAST por la tabla de rutas"""
+
+    def test_endpoints_join_by_route(self):
+        correlator = VulnerabilityCorrelator()
+        correlator.set_route_table(route_table(enumerate_operations(OPENAPI_SPEC, "http://127.0.0.1:9000")))
+
+        dast_endpoint = "http://127.0.0.1:9000/api/v1/users/7?fields=email"
+        assert correlator._calculate_endpoint_similarity(dast_endpoint, "/api/users") == 1.0
+        assert correlator._calculate_endpoint_similarity(dast_endpoint, "/api/orders") == 0.0
+        # Endpoints fuera de la tabla siguen comparándose por similitud de texto
+        assert 0.0 < correlator._calculate_endpoint_similarity("/api/reports", "/api/report") < 1.0
@@ -0,0 +1,119 @@
+"""
+Tests del almacenamiento comprimido de resultados de escaneo.
+Prueba el códec, la compatibilidad con filas en texto, el resumen y la carga diferida.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.models import Base, ScanResult
+from database.payload_codec import MAGIC, decode_payload, encode_payload, summarize_payload
+from scripts.compress_scan_results import compress_rows
+
+HYBRID = {
+    "scan_type": "HYBRID",
+    "sast_scan_id": 1,
+    "dast_scan_id": 2,
+    "correlation_report": {"summary": {"total_sast_findings": 3, "high_confidence_correlations": 1},
+                           "correlations": [{"id": i, "evidence": "x" * 200} for i in range(200)]},
+    "model_metrics": {"precision": 0.9, "history": list(range(500))}
+}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'payload.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+class TestCodec:
+    """Compresión y lectura de filas antiguas"""
+
+    def test_roundtrip_and_ratio(self):
+        blob = encode_payload(HYBRID)
+        assert blob.startswith(MAGIC)
+        assert decode_payload(blob) == HYBRID
+        assert len(blob) < len(json.dumps(HYBRID)) / 5
+
+    def test_legacy_text_is_decoded(self):
+        assert decode_payload('{"results": [1]}') == {"results": [1]}
+        assert decode_payload(None) is None
+
+    def test_summary_keeps_light_keys(self):
+        summary = summarize_payload(HYBRID)
+        assert set(summary) == {"scan_type", "sast_scan_id", "dast_scan_id", "correlation_summary"}
+        assert summary["correlation_summary"]["total_sast_findings"] == 3
+
+
+class TestScanResultStorage:
+    """Columna comprimida con carga diferida"""
+
+    def test_stored_as_blob_with_summary(self, session_factory):
+        engine, SessionLocal = session_factory
+        db = SessionLocal()
+        scan = ScanResult(scan_type="HYBRID", tool="HybridSecScan Correlator", results=dict(HYBRID))
+        db.add(scan)
+        db.flush()
+        # Reasignar los resultados (como update_scan_result) actualiza el resumen
+        scan.results = {**HYBRID, "vulnerabilities_found": 3}
+        db.commit()
+        scan_id = scan.id
+        db.close()
+
+        with engine.connect() as conn:
+            stored_type, = conn.exec_driver_sql("SELECT typeof(results) FROM scan_results").fetchone()
+        assert stored_type == "blob"
+
+        db = SessionLocal()
+        loaded = db.get(ScanResult, scan_id)
+        assert loaded.summary["vulnerabilities_found"] == 3
+        assert "results" in inspect(loaded).unloaded
+        assert loaded.results["model_metrics"]["precision"] == 0.9
+        db.close()
+
+    def test_compress_legacy_rows(self, session_factory):
+        engine, SessionLocal = session_factory
+        with engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO scan_results (scan_type, results) VALUES ('HYBRID', ?)",
+                                 (json.dumps(HYBRID),))
+        stats = compress_rows(engine)
+        assert stats["rows_converted"] == 1
+        assert stats["payload_compressed_bytes"] < stats["payload_text_bytes"]
+        assert compress_rows(engine)["rows_converted"] == 0
+
+        db = SessionLocal()
+        scan = db.query(ScanResult).one()
+        assert scan.summary["correlation_summary"]["high_confidence_correlations"] == 1
+        assert scan.results == HYBRID
+        db.close()
+
+    def test_compress_in_keyset_batches(self, session_factory):
+        engine, _ = session_factory
+        with engine.begin() as conn:
+            for _ in range(5):
+                conn.exec_driver_sql("INSERT INTO scan_results (scan_type, results) VALUES ('HYBRID', ?)",
+                                     (json.dumps(HYBRID),))
+        commits = []
+
+        def listener(conn):
+            commits.append(conn)
+
+        event.listen(engine, "commit", listener)
+        try:
+            assert compress_rows(engine, batch_size=2)["rows_converted"] == 5
+        finally:
+            event.remove(engine, "commit", listener)
+        # Un commit por lote (2 + 2 + 1) más la lectura final vacía
+        assert len(commits) == 4
+        with engine.connect() as conn:
+            remaining = conn.exec_driver_sql("SELECT count(*) FROM scan_results WHERE typeof(results) = 'text'")
+            assert remaining.scalar() == 0
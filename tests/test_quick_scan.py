@@ -0,0 +1,177 @@
+"""
+Tests del análisis rápido en proceso tras /upload/.
+Prueba las reglas propias, los indicadores de correlación, el tiempo de respuesta y el reemplazo en segundo plano.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import backend.main as main_module
+from backend.main import app, get_db, Base, ScanResult
+from backend.quick_scan import quick_scan_file, quick_scan_source
+
+VULNERABLE = '''import os
+import sqlite3
+import subprocess
+
+API_KEY = "sk-live-1234567890"
+
+
+def find_user(conn, name):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE name = '%s'" % name)
+    cursor.execute(f"DELETE FROM users WHERE name = '{name}'")
+    cursor.execute("SELECT * FROM users WHERE name = ?", (name,))
+    return cursor.fetchall()
+
+
+def run(cmd, expr):
+    subprocess.run(cmd, shell=True)
+    os.system(cmd)
+    connect(password="hunter22")
+    return eval(expr)
+'''
+
+
+class TestQuickRules:
+    """Reglas propias con test_id de Bandit"""
+
+    def test_builtin_rules(self):
+        findings = quick_scan_source(VULNERABLE, "app.py")
+        by_id = {}
+        for finding in findings:
+            by_id.setdefault(finding["test_id"], []).append(finding["line_number"])
+        assert by_id["B608"] == [10, 11]
+        assert by_id["B105"] == [5]
+        assert by_id["B602"] == [17]
+        assert by_id["B605"] == [18]
+        assert by_id["B106"] == [19]
+        assert by_id["B307"] == [20]
+        assert all(f["preliminary"] for f in findings)
+
+    def test_correlation_indicators(self):
+        findings = quick_scan_source(VULNERABLE, "app.py")
+        indicators = [f for f in findings if f["test_id"].startswith("QS-")]
+        # La consulta parametrizada solo produce un indicador de baja severidad
+        assert [(f["line_number"], f["vulnerability_type"]) for f in indicators] == [(12, "sql_injection")]
+        assert indicators[0]["issue_severity"] == "LOW"
+
+    def test_non_python_uses_line_indicators(self):
+        findings = quick_scan_source("el.innerHTML = data;\ndocument.write(x);\n", "view.js")
+        assert [(f["line_number"], f["vulnerability_type"]) for f in findings] == [(1, "xss"), (2, "xss")]
+
+    def test_deep_nesting_falls_back_to_line_indicators(self):
+        """Un AST que agota la pila o la memoria no rompe el análisis rápido"""
+        for expr in ("1+" * 200000 + "1", "-" * 200000 + "1"):
+            source = f"x = {expr}\nel.innerHTML = data\n"
+            findings = quick_scan_source(source, "bomba.py")
+            assert [(f["line_number"], f["vulnerability_type"]) for f in findings] == [(2, "xss")]
+
+    def test_under_100ms(self, tmp_path):
+        source = tmp_path / "big.py"
+        source.write_text(VULNERABLE * 20)
+        quick_scan_file(source)  # primera llamada: carga de reglas
+        start = time.perf_counter()
+        result = quick_scan_file(source)
+        assert (time.perf_counter() - start) < 0.1
+        assert result["quick_scan"]["elapsed_ms"] < 100
+        assert len(result["results"]) >= 20 * 6
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'quick.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(main_module, "get_warm_pool", lambda: None)
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), SessionLocal
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+class TestUploadQuickScan:
+    """Resultados preliminares reemplazados por el escaneo completo"""
+
+    def test_upload_returns_preliminary_and_background_replaces(self, client):
+        http, SessionLocal = client
+        response = http.post("/upload/", files={"file": ("servicio.py", VULNERABLE.encode(), "text/x-python")})
+        assert response.status_code == 200
+        quick = response.json()["quick_scan"]
+        assert quick["preliminary"] is True
+        assert quick["full_scan_tool"] == "bandit"
+        assert any(f["test_id"] == "B602" for f in quick["findings"])
+
+        # TestClient ejecuta las tareas en segundo plano antes de devolver la respuesta
+        db = SessionLocal()
+        try:
+            scan = db.query(ScanResult).filter(ScanResult.id == quick["sast_scan_id"]).first()
+            assert scan.status == "completed"
+            assert not any(r.get("preliminary") for r in scan.results["results"])
+            assert any(r["test_id"] == "B602" for r in scan.results["results"])
+            assert scan.results["metadata"]["replaced_preliminary"] == quick["vulnerabilities_found"]
+            report_path = scan.result_path
+        finally:
+            db.close()
+        os.remove(report_path)
+        os.remove(response.json()["file_path"])
+
+    def test_quick_scan_failure_does_not_fail_upload(self, client, monkeypatch):
+        http, SessionLocal = client
+
+        def broken_quick_scan(*args, **kwargs):
+            raise RuntimeError("fallo del análisis rápido")
+
+        monkeypatch.setattr(main_module, "_start_upload_quick_scan", broken_quick_scan)
+        response = http.post("/upload/", files={"file": ("servicio.py", VULNERABLE.encode(), "text/x-python")})
+        assert response.status_code == 200
+        assert response.json()["quick_scan"] is None
+        db = SessionLocal()
+        try:
+            upload = db.query(ScanResult).filter(ScanResult.id == response.json()["result_id"]).first()
+            assert upload.status == "uploaded"
+        finally:
+            db.close()
+        os.remove(response.json()["file_path"])
+
+    def test_quick_scan_runs_off_the_event_loop(self, client, monkeypatch):
+        http, _ = client
+        original = main_module._start_upload_quick_scan
+        loops = []
+
+        def recording_quick_scan(*args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(main_module, "_start_upload_quick_scan", recording_quick_scan)
+        monkeypatch.setattr(main_module, "_complete_upload_scan", lambda *args: None)
+        response = http.post("/upload/", files={"file": ("servicio.py", VULNERABLE.encode(), "text/x-python")})
+        assert response.status_code == 200
+        assert response.json()["quick_scan"]["preliminary"] is True
+        # Ejecutado en un hilo del pool, sin bucle de eventos en curso
+        assert loops == [None]
+        os.remove(response.json()["file_path"])
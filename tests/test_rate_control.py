@@ -0,0 +1,117 @@
+"""
+Tests del control adaptativo de concurrencia (AIMD) para DAST.
+Prueba el aumento aditivo, la disminución multiplicativa y el comportamiento contra un servidor frágil.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.dast_engine import run_native_dast
+from backend.rate_control import AimdConcurrencyLimiter
+
+
+class TestAimdLimiter:
+    """Tests unitarios del limitador"""
+
+    def test_additive_increase_on_fast_responses(self):
+        async def scenario():
+            limiter = AimdConcurrencyLimiter(max_limit=16, initial_limit=2)
+            for _ in range(40):
+                started = await limiter.acquire()
+                await limiter.release(started, 200)
+            return limiter
+
+        limiter = asyncio.run(scenario())
+        assert limiter.limit > 8
+        assert limiter.limit <= 16
+
+    def test_multiplicative_decrease_once_per_window(self):
+        async def scenario():
+            limiter = AimdConcurrencyLimiter(max_limit=16, initial_limit=8)
+            # Ocho peticiones en vuelo a la vez reciben 429: una sola reducción
+            starts = [await limiter.acquire() for _ in range(8)]
+            for started in starts:
+                await limiter.release(started, 429)
+            after_burst = limiter.limit
+            # Una petición nueva que también falla vuelve a reducir
+            started = await limiter.acquire()
+            await limiter.release(started, None, timed_out=True)
+            return after_burst, limiter
+
+        after_burst, limiter = asyncio.run(scenario())
+        assert after_burst == 4
+        assert limiter.limit == 2
+        assert limiter.stats()["backoffs"] == 2
+        assert limiter.stats()["throttled"] == 8
+
+    def test_retry_after_pauses_new_requests(self):
+        async def scenario():
+            limiter = AimdConcurrencyLimiter(max_limit=4, initial_limit=4)
+            started = await limiter.acquire()
+            await limiter.release(started, 503, retry_after=0.2)
+            before = time.monotonic()
+            await limiter.acquire()
+            return time.monotonic() - before
+
+        assert asyncio.run(scenario()) >= 0.15
+
+
+def _fragile_server(capacity):
+    """Servidor que responde 503 cuando tiene más de `capacity` peticiones en curso."""
+    state = {"active": 0, "overloaded": 0, "served": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                state["active"] += 1
+                overloaded = state["active"] > capacity
+                state["overloaded" if overloaded else "served"] += 1
+            try:
+                if overloaded:
+                    status, body = 503, "busy"
+                else:
+                    time.sleep(0.01)
+                    links = "".join(f'<a href="/seccion{i}">p</a>' for i in range(80)) if self.path == "/" else ""
+                    status, body = 200, f"<html>Página {self.path.replace('/', '-')} {links}</html>"
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+class TestAdaptiveDast:
+    """El motor DAST se adapta a la capacidad del objetivo"""
+
+    def test_backs_off_on_fragile_target_and_reports_rate(self):
+        server, state = _fragile_server(capacity=3)
+        try:
+            result = run_native_dast(f"http://127.0.0.1:{server.server_address[1]}/", per_host_concurrency=32)
+        finally:
+            server.shutdown()
+
+        (host_stats,) = result.rate_control.values()
+        assert host_stats["throttled"] > 0
+        assert host_stats["current_limit"] <= 8
+        # Los rechazos por sobrecarga quedan muy por debajo de lo servido
+        assert state["overloaded"] < state["served"] * 0.3
+        assert result.stats()["requests_per_second"] > 0
+        assert result.pages_crawled >= 80
@@ -0,0 +1,85 @@
+"""
+Tests del lector incremental de reportes SAST/DAST.
+Comprueba que el streaming produce los mismos hallazgos y resumen que json.load.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.report_stream import ReportSummary, iter_findings, iter_report, stream_report
+
+
+def _semgrep_report(count):
+    return {
+        "version": "1.0.0",
+        "paths": {"scanned": [f"src/módulo_{i}.py" for i in range(count)]},
+        "results": [
+            {
+                "check_id": f"rule-{i % 3}",
+                "path": f"src/módulo_{i}.py",
+                "start": {"line": i + 1, "col": 1},
+                "extra": {
+                    "severity": ["ERROR", "WARNING", "INFO"][i % 3],
+                    "message": 'Uso de "eval" con entrada \\ no confiable {[',
+                    "metadata": {"cwe": ["CWE-89: SQL Injection"]}
+                },
+                "cwe": "CWE-89" if i % 2 else "CWE-79",
+                "severity": ["high", "MEDIUM", "low"][i % 3]
+            }
+            for i in range(count)
+        ],
+        "errors": [{"message": "timeout", "path": "src/grande.py"}],
+        "skipped_rules": []
+    }
+
+
+class TestReportStream:
+    """Tests del recorrido incremental"""
+
+    def test_items_match_json_load_with_small_chunks(self, tmp_path):
+        """Bloques diminutos obligan a cortar claves, cadenas y escapes entre lecturas"""
+        report = _semgrep_report(40)
+        path = tmp_path / "semgrep.json"
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        items = list(iter_report(path, capture=("errors", "version"), chunk_size=7))
+
+        assert [v for k, v in items if k == "results"] == report["results"]
+        assert dict((k, v) for k, v in items if k != "results") == {
+            "errors": report["errors"], "version": report["version"]
+        }
+
+    def test_summary_matches_in_memory_summary(self, tmp_path):
+        """El resumen en streaming coincide con el calculado sobre el reporte completo"""
+        report = _semgrep_report(25)
+        path = tmp_path / "semgrep.json"
+        path.write_text(json.dumps(report))
+
+        batches = []
+        streamed = stream_report(path, "semgrep", sink=batches.append, batch_size=10)
+        expected = ReportSummary().add_all(report["results"]).as_dict()
+
+        assert streamed["vulnerabilities_found"] == 25
+        assert streamed["severity_breakdown"] == expected["severity_breakdown"]
+        assert streamed["owasp_categories_detected"] == expected["owasp_categories_detected"]
+        assert streamed["captured"]["errors"] == report["errors"]
+        assert [len(b) for b in batches] == [10, 10, 5]
+        assert batches[0][0]["severity"] == "high"
+        assert batches[0][0]["file_path"] == "src/módulo_0.py"
+        assert batches[0][0]["line_number"] == 1
+
+    def test_sink_and_reread_from_report(self, tmp_path):
+        """Los hallazgos se entregan por lotes y pueden releerse del reporte original"""
+        report = {"vulnerabilities": [{"alert": "XSS", "risk": "High", "url": "http://x/a"}] * 3}
+        path = tmp_path / "dast.json"
+        path.write_text(json.dumps(report))
+
+        batches = []
+        stream_report(path, "dast", sink=batches.append, batch_size=2)
+
+        assert [len(b) for b in batches] == [2, 1]
+        assert batches[0][0]["rule_id"] == "XSS"
+        assert list(iter_findings({"streamed": True, "results": []}, str(path))) == report["vulnerabilities"]
@@ -0,0 +1,102 @@
+"""
+Tests de la columna indexada `report_uuid`.
+Prueba el relleno al crear reportes, el relleno de filas existentes y las descargas por UUID.
+"""
+
+import os
+import sys
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.main import app, get_db, Base, ScanResult
+from database.models import report_uuid_from_path, upgrade_schema
+
+REPORT_ID = str(uuid.uuid4())
+REPORT_PATH = f"/srv/hybridsecscan/reports/bandit_report_{REPORT_ID}.json"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'uuid.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+class TestReportUuid:
+    """Columna rellenada a partir del nombre del reporte"""
+
+    def test_parsed_from_report_name(self):
+        assert report_uuid_from_path(REPORT_PATH) == REPORT_ID
+        assert report_uuid_from_path("uploads/20250101_ab12cd34.py") is None
+        assert report_uuid_from_path(None) is None
+
+    def test_filled_when_report_is_assigned(self, session_factory):
+        _, SessionLocal = session_factory
+        db = SessionLocal()
+        scan = ScanResult(scan_type="SAST", tool="bandit", status="running")
+        db.add(scan)
+        db.commit()
+        assert scan.report_uuid is None
+        scan.result_path = REPORT_PATH
+        db.commit()
+        assert scan.report_uuid == REPORT_ID
+        db.close()
+
+    def test_backfill_when_column_is_added(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE scan_results (id INTEGER PRIMARY KEY, scan_type VARCHAR(50), "
+                                 "result_path VARCHAR(500), created_at DATETIME)")
+            conn.exec_driver_sql("INSERT INTO scan_results (scan_type, result_path) VALUES ('SAST', ?), ('SAST', ?)",
+                                 (REPORT_PATH, "uploads/app.py"))
+        upgrade_schema(engine)
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql("SELECT report_uuid FROM scan_results ORDER BY id").fetchall()
+            plan = " ".join(str(row[-1]) for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM scan_results WHERE report_uuid = ?", (REPORT_ID,)))
+        assert [row[0] for row in rows] == [REPORT_ID, None]
+        assert "ix_scan_results_report_uuid" in plan
+        assert "ix_scan_results_report_uuid" in {ix["name"] for ix in inspect(engine).get_indexes("scan_results")}
+        engine.dispose()
+
+
+class TestDownloadLookup:
+    """Descargas por ID numérico o por UUID del reporte"""
+
+    def test_json_download_by_either_id(self, session_factory):
+        _, SessionLocal = session_factory
+        db = SessionLocal()
+        scan = ScanResult(scan_type="SAST", tool="bandit", target="app.py", status="completed",
+                          result_path=REPORT_PATH, results={"results": []})
+        db.add(scan)
+        db.commit()
+        scan_id = scan.id
+        db.close()
+
+        def override_get_db():
+            session = SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        previous = app.dependency_overrides.get(get_db)
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            client = TestClient(app)
+            assert client.get(f"/download/json/{scan_id}").status_code == 200
+            assert client.get(f"/download/json/{REPORT_ID.upper()}").status_code == 200
+            assert client.get(f"/download/json/{uuid.uuid4()}").status_code == 404
+            assert client.get("/download/json/not-an-id").status_code == 400
+        finally:
+            if previous is None:
+                app.dependency_overrides.pop(get_db, None)
+            else:
+                app.dependency_overrides[get_db] = previous
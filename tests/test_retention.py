@@ -0,0 +1,160 @@
+"""
+Tests de retención, archivado y compactación.
+Prueba las políticas por tipo, el archivo consultable, el borrado de reportes y el vacuum incremental.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import backend.retention as retention
+from backend.retention import (
+    RetentionScheduler, incremental_vacuum, load_archive, purge_report_files, retention_policies, run_retention
+)
+from database.models import Base, Finding, ScanResult
+from database.storage import build_engine
+
+SCANS = ScanResult.__table__
+FINDINGS = Finding.__table__
+NOW = datetime(2026, 6, 1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    Base.metadata.create_all(bind=engine)
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    yield engine, reports, tmp_path / "archive"
+    engine.dispose()
+
+
+def _add_scan(engine, reports, scan_type, age_days, findings=1):
+    report = reports / f"{scan_type.lower()}_{age_days}.json"
+    report.write_text("{}")
+    with engine.begin() as conn:
+        scan_id = conn.execute(insert(SCANS).values(
+            scan_type=scan_type, tool="bandit", status="completed", result_path=str(report),
+            results={"results": [{"test_id": "B602"}] * findings}, created_at=NOW - timedelta(days=age_days)
+        )).inserted_primary_key[0]
+        for _ in range(findings):
+            conn.execute(insert(FINDINGS).values(scan_id=scan_id, tool="bandit", severity="high", cwe="CWE-78"))
+    return scan_id, report
+
+
+class TestPolicies:
+    """Política por tipo de escaneo"""
+
+    def test_env_overrides(self, monkeypatch):
+        monkeypatch.setenv("HYBRIDSCAN_RETENTION_SAST_DAYS", "7")
+        policies = retention_policies()
+        assert policies["SAST"] == 7
+        assert policies["HYBRID"] == 365
+
+
+class TestArchive:
+    """Archivado de filas caducadas"""
+
+    def test_archives_expired_rows_per_policy(self, store, monkeypatch):
+        engine, reports, archive = store
+        monkeypatch.setattr(retention, "_utcnow", lambda: NOW)
+        old_sast, old_report = _add_scan(engine, reports, "SAST", 40, findings=3)
+        recent_sast, recent_report = _add_scan(engine, reports, "SAST", 5)
+        old_hybrid, _ = _add_scan(engine, reports, "HYBRID", 40)
+
+        stats = run_retention(engine, SCANS, FINDINGS, archive_dir=archive, reports_dir=reports,
+                              policies={"SAST": 30, "HYBRID": 365})
+        assert stats["scans_archived"] == 1
+        assert stats["findings_archived"] == 3
+        assert not old_report.exists() and recent_report.exists()
+
+        with engine.connect() as conn:
+            assert {row.id for row in conn.execute(select(SCANS.c.id))} == {recent_sast, old_hybrid}
+            assert conn.execute(select(func.count()).select_from(FINDINGS)
+                                .where(FINDINGS.c.scan_id == old_sast)).scalar() == 0
+
+        # El archivo sigue siendo consultable sin la base
+        scans = load_archive(archive)
+        assert list(scans["id"]) == [old_sast]
+        assert json.loads(scans["results"][0])["results"][0]["test_id"] == "B602"
+        assert len(load_archive(archive, "findings")) == 3
+
+    def test_dry_run_changes_nothing(self, store, monkeypatch):
+        engine, reports, archive = store
+        monkeypatch.setattr(retention, "_utcnow", lambda: NOW)
+        _add_scan(engine, reports, "DAST", 400, findings=2)
+        stats = run_retention(engine, SCANS, FINDINGS, archive_dir=archive, reports_dir=reports, dry_run=True)
+        assert (stats["scans_archived"], stats["findings_archived"]) == (1, 2)
+        assert not archive.exists()
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(SCANS)).scalar() == 1
+
+    def test_jsonl_fallback_without_pyarrow(self, store, monkeypatch):
+        engine, reports, archive = store
+        monkeypatch.setattr(retention, "_utcnow", lambda: NOW)
+        monkeypatch.setattr(retention, "PARQUET_AVAILABLE", False)
+        scan_id, _ = _add_scan(engine, reports, "FILE_UPLOAD", 60)
+        stats = run_retention(engine, SCANS, FINDINGS, archive_dir=archive, reports_dir=reports)
+        assert all(path.endswith(".jsonl.gz") for path in stats["archive_files"])
+        assert list(load_archive(archive)["id"]) == [scan_id]
+
+
+class TestCompaction:
+    """Limpieza de reportes y vacuum incremental"""
+
+    def test_purges_only_unreferenced_old_reports(self, store):
+        engine, reports, _ = store
+        _, referenced = _add_scan(engine, reports, "SAST", 0)
+        orphan, fresh, readme = reports / "zap_report_x.json", reports / "new.json", reports / "README.md"
+        for path in (orphan, fresh, readme):
+            path.write_text("{}")
+        old = time.time() - 90 * 86400
+        for path in (referenced, orphan, readme):
+            os.utime(path, (old, old))
+
+        assert purge_report_files(engine, SCANS, reports, max_age_days=30) == 1
+        assert not orphan.exists()
+        assert referenced.exists() and fresh.exists() and readme.exists()
+
+    def test_incremental_vacuum_releases_pages(self, store):
+        engine, reports, _ = store
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2  # INCREMENTAL en bases nuevas
+        with engine.begin() as conn:
+            conn.execute(insert(SCANS), [{"scan_type": "SAST", "error_message": "x" * 4000} for _ in range(200)])
+        with engine.begin() as conn:
+            conn.execute(SCANS.delete())
+        assert incremental_vacuum(engine, step_pages=50) > 0
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA freelist_count").scalar() == 0
+
+    def test_scheduler_runs_in_background(self):
+        calls = []
+        scheduler = RetentionScheduler(lambda: calls.append(1) or {"ok": True}, interval_seconds=0.01,
+                                       initial_delay=0)
+        scheduler.start()
+        deadline = time.time() + 2
+        while scheduler.runs < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        scheduler.stop()
+        assert scheduler.runs >= 2 and scheduler.last_stats == {"ok": True}
+
+    def test_scheduler_is_opt_in(self, store, monkeypatch):
+        """Sin HYBRIDSCAN_RETENTION_INTERVAL_HOURS no se programa ningún borrado"""
+        import importlib
+
+        engine, _reports, _archive = store
+        monkeypatch.delenv("HYBRIDSCAN_RETENTION_INTERVAL_HOURS", raising=False)
+        fresh = importlib.reload(retention)
+        try:
+            assert fresh.RETENTION_INTERVAL_HOURS == 0
+            assert fresh.start_retention_scheduler(engine, SCANS, FINDINGS) is None
+        finally:
+            importlib.reload(retention)
@@ -0,0 +1,150 @@
+"""
+Tests de la ejecución fragmentada de Bandit.
+Prueba el reparto por tamaño, la fusión de reportes y los reintentos por lote.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend import bandit_sharding
+from backend.bandit_sharding import merge_bandit_reports, partition_by_size, run_bandit_sharded
+
+VULNERABLE_SNIPPET = '''
+import os
+import subprocess
+
+password = "super-secret-123"
+
+def run(cmd):
+    subprocess.call(cmd, shell=True)
+    os.system(cmd)
+'''
+
+
+@pytest.fixture
+def python_tree(tmp_path):
+    """Árbol de código con varios módulos vulnerables de distinto tamaño."""
+    for i in range(6):
+        module = tmp_path / f"pkg{i % 2}" / f"module_{i}.py"
+        module.parent.mkdir(exist_ok=True)
+        module.write_text(VULNERABLE_SNIPPET * (i + 1))
+    (tmp_path / "README.md").write_text("no es python")
+    return tmp_path
+
+
+class TestPartitioning:
+    """Pruebas del reparto de archivos en lotes."""
+
+    def test_partition_is_balanced_and_complete(self, tmp_path):
+        """Todos los archivos se asignan una sola vez y los lotes quedan equilibrados."""
+        files = []
+        for i, size in enumerate([900, 500, 400, 300, 300, 100]):
+            path = tmp_path / f"f{i}.py"
+            path.write_text("x" * size)
+            files.append(path)
+
+        shards = partition_by_size(files, 3)
+
+        assert len(shards) == 3
+        assert sorted(p for shard in shards for p in shard) == sorted(files)
+        totals = [sum(p.stat().st_size for p in shard) for shard in shards]
+        assert max(totals) - min(totals) <= 200
+
+    def test_partition_never_creates_empty_shards(self, tmp_path):
+        """Con menos archivos que lotes, no se generan lotes vacíos."""
+        path = tmp_path / "only.py"
+        path.write_text("print(1)")
+        assert partition_by_size([path], 8) == [[path]]
+
+
+class TestReportMerge:
+    """Pruebas de la fusión de reportes JSON de Bandit."""
+
+    def test_merge_keeps_bandit_shape(self):
+        """El reporte fusionado conserva las claves de Bandit y suma los totales."""
+        first = {
+            "errors": [],
+            "metrics": {"a.py": {"loc": 3, "SEVERITY.LOW": 1}, "_totals": {"loc": 3, "SEVERITY.LOW": 1}},
+            "results": [{"filename": "b.py", "line_number": 2, "test_id": "B605"}]
+        }
+        second = {
+            "errors": [{"filename": "c.py", "reason": "syntax error"}],
+            "metrics": {"b.py": {"loc": 5, "SEVERITY.LOW": 2}, "_totals": {"loc": 5, "SEVERITY.LOW": 2}},
+            "results": [{"filename": "a.py", "line_number": 1, "test_id": "B105"}]
+        }
+
+        merged = merge_bandit_reports([first, second])
+
+        assert set(merged) == {"errors", "generated_at", "metrics", "results"}
+        assert merged["metrics"]["_totals"] == {"loc": 8, "SEVERITY.LOW": 3}
+        assert set(merged["metrics"]) == {"a.py", "b.py", "_totals"}
+        assert [r["filename"] for r in merged["results"]] == ["a.py", "b.py"]
+        assert merged["errors"] == [{"filename": "c.py", "reason": "syntax error"}]
+
+
+class TestShardedRun:
+    """Pruebas de la ejecución fragmentada extremo a extremo."""
+
+    def test_sharded_run_matches_single_run(self, python_tree, tmp_path):
+        """Los hallazgos fragmentados coinciden con una ejecución única de Bandit."""
+        sharded_report = tmp_path / "sharded.json"
+        run = run_bandit_sharded(python_tree, sharded_report, shard_count=3)
+
+        single_report = tmp_path / "single.json"
+        subprocess.run(
+            [sys.executable, '-m', 'bandit', '-r', str(python_tree), '-f', 'json', '-o', str(single_report)],
+            capture_output=True, text=True, timeout=300
+        )
+
+        sharded = json.loads(sharded_report.read_text())
+        single = json.loads(single_report.read_text())
+
+        assert run.returncode == 1
+        assert run.stats()["shard_count"] == 3
+        assert set(sharded) == set(single)
+
+        def key(r):
+            return (r["filename"], r["line_number"], r["test_id"])
+
+        assert sorted(map(key, sharded["results"])) == sorted(map(key, single["results"]))
+        assert sharded["metrics"]["_totals"]["loc"] == single["metrics"]["_totals"]["loc"]
+
+    def test_failed_shard_is_retried_individually(self, python_tree, tmp_path, monkeypatch):
+        """Un lote que falla una vez se reintenta sin repetir los demás."""
+        original = bandit_sharding._run_bandit_on_files
+        calls = []
+
+        def flaky(files, timeout):
+            calls.append(tuple(files))
+            if len(calls) == 1:
+                raise RuntimeError("fallo transitorio")
+            return original(files, timeout)
+
+        monkeypatch.setattr(bandit_sharding, "_run_bandit_on_files", flaky)
+        run = run_bandit_sharded(python_tree, tmp_path / "report.json", shard_count=2)
+
+        assert len(calls) == 3
+        assert run.stats()["retried_shards"] == 1
+        assert run.stats()["failed_shards"] == 0
+        assert run.returncode == 1
+
+    def test_timed_out_shard_is_not_retried(self, python_tree, tmp_path, monkeypatch):
+        """Un lote que agota el timeout no se repite con el mismo timeout."""
+        calls = []
+
+        def hung(files, timeout):
+            calls.append(tuple(files))
+            raise subprocess.TimeoutExpired("bandit", timeout)
+
+        monkeypatch.setattr(bandit_sharding, "_run_bandit_on_files", hung)
+        run = run_bandit_sharded(python_tree, tmp_path / "report.json", shard_count=2)
+
+        assert len(calls) == 2
+        assert run.stats()["failed_shards"] == 2
+        assert all(o.limit_reason == bandit_sharding.LIMIT_WALL_CLOCK for o in run.shards)
@@ -0,0 +1,103 @@
+"""
+Tests del listado paginado de escaneos.
+Prueba la paginación por cursor, los filtros y que la columna JSON no se carga.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.main import app, get_db, Base, ScanResult
+from backend.pagination import decode_cursor, encode_cursor
+from database.storage import get_async_engine
+
+
+@pytest.fixture
+def listing(tmp_path):
+    """Cliente con 25 escaneos; varios comparten created_at para probar el desempate por id."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'listing.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    db = SessionLocal()
+    for i in range(25):
+        db.add(ScanResult(
+            scan_type="SAST" if i % 2 == 0 else "DAST",
+            tool="bandit" if i % 2 == 0 else "native",
+            target=f"objetivo-{i}",
+            status="failed" if i % 5 == 0 else "completed",
+            results={"results": [{"payload": "x" * 1000}]},
+            created_at=base + timedelta(minutes=i // 3)
+        ))
+    db.commit()
+    db.close()
+
+    # El listado usa la sesión asíncrona (motor aiosqlite sobre el mismo archivo)
+    statements = []
+    event.listen(get_async_engine(engine).sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), statements
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+class TestKeysetPagination:
+    """Cursor sobre (created_at, id)"""
+
+    def test_cursor_roundtrip(self):
+        created = datetime(2026, 3, 4, 5, 6, 7, 123)
+        assert decode_cursor(encode_cursor(created, 42)) == (created, 42)
+
+    def test_pages_cover_all_rows_without_duplicates(self, listing):
+        client, _ = listing
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/scan-results", params=params)
+            assert response.status_code == 200
+            seen.extend(row["id"] for row in response.json())
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert pages == 4
+        assert seen == sorted(range(1, 26), reverse=True)
+
+    def test_filters(self, listing):
+        client, _ = listing
+        rows = client.get("/scan-results", params={"scan_type": "SAST", "status": "failed"}).json()
+        assert [r["id"] for r in rows] == [21, 11, 1]
+        assert {r["tool"] for r in rows} == {"bandit"}
+        assert {"target", "status", "created_at"} <= set(rows[0])
+
+    def test_results_column_not_loaded(self, listing):
+        client, statements = listing
+        client.get("/scan-results", params={"limit": 5})
+        select = [s for s in statements if "FROM scan_results" in s][-1]
+        assert "scan_results.results" not in select
+        assert "LIMIT" in select
+
+    def test_invalid_cursor(self, listing):
+        client, _ = listing
+        assert client.get("/scan-results", params={"cursor": "no-es-un-cursor"}).status_code == 400
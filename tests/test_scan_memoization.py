@@ -0,0 +1,114 @@
+"""
+Tests de memoización de escaneos SAST por huella del objetivo.
+Prueba el hash de Merkle del árbol y la reutilización de resultados en /scan/sast.
+"""
+
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.main import app, get_db, Base
+from backend.scan_fingerprint import memo_stats, scan_fingerprint, tree_fingerprint
+
+
+@pytest.fixture
+def source_tree(tmp_path):
+    root = tmp_path / "servicio"
+    (root / "api").mkdir(parents=True)
+    (root / "api" / "views.py").write_text("import subprocess\nsubprocess.call('ls', shell=True)\n")
+    (root / "main.py").write_text("print('hola')\n")
+    return root
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Cliente con base de datos temporal propia."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'memo.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    memo_stats.reset_stats()
+    yield TestClient(app)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+class TestTreeFingerprint:
+    """Tests del hash de Merkle"""
+
+    def test_fingerprint_ignores_location(self, source_tree, tmp_path):
+        """Copias idénticas en rutas distintas tienen la misma huella"""
+        import shutil
+        copy = tmp_path / "otra" / "copia"
+        shutil.copytree(source_tree, copy)
+        assert tree_fingerprint(copy) == tree_fingerprint(source_tree)
+
+    def test_fingerprint_changes_with_content_name_and_config(self, source_tree):
+        """Cambiar contenido, nombres o configuración cambia la huella"""
+        base = scan_fingerprint(source_tree, "bandit")
+        assert scan_fingerprint(source_tree, "bandit", {"rules_version": "abc"}) != base
+
+        (source_tree / "main.py").rename(source_tree / "app.py")
+        renamed = scan_fingerprint(source_tree, "bandit")
+        assert renamed != base
+
+        (source_tree / "app.py").write_text("print('adiós')\n")
+        assert scan_fingerprint(source_tree, "bandit") != renamed
+
+    def test_single_file_fingerprint_includes_name(self, tmp_path):
+        """Un archivo suelto con el mismo contenido y otro nombre no comparte huella"""
+        (tmp_path / "a.py").write_text("print('hola')\n")
+        (tmp_path / "a.txt").write_text("print('hola')\n")
+        assert tree_fingerprint(tmp_path / "a.py") != tree_fingerprint(tmp_path / "a.txt")
+
+
+class TestSastMemoization:
+    """Tests de reutilización en el endpoint /scan/sast"""
+
+    def test_identical_rescan_is_reused(self, client, source_tree):
+        """El segundo escaneo del mismo árbol devuelve el resultado almacenado"""
+        first = client.post("/scan/sast", data={"target_path": str(source_tree), "tool": "bandit"})
+        assert first.status_code == 200
+        assert first.json()["memoized"] is False
+
+        second = client.post("/scan/sast", data={"target_path": str(source_tree), "tool": "bandit"})
+        assert second.status_code == 200
+        body = second.json()
+        assert body["memoized"] is True
+        assert body["id"] == first.json()["id"]
+        assert body["vulnerabilities_found"] == first.json()["vulnerabilities_found"]
+        assert body["stack_detection"] == first.json()["stack_detection"]
+
+        forced = client.post(
+            "/scan/sast",
+            data={"target_path": str(source_tree), "tool": "bandit", "force_rescan": "true"}
+        )
+        assert forced.json()["memoized"] is False
+        assert forced.json()["id"] != first.json()["id"]
+
+        stats = client.get("/scan/sast/memo-stats").json()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["forced_rescans"] == 1
+        assert stats["reuse_rate_percent"] == pytest.approx(33.33)
+
+        for report in {first.json()["report_path"], forced.json()["report_path"]}:
+            os.remove(report)
@@ -0,0 +1,114 @@
+"""
+Tests del sandbox de escáneres con límites de recursos.
+Prueba cada límite (memoria, CPU, archivos, tiempo real) y su registro en ScanResult.
+"""
+
+import functools
+import os
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import backend.main as main_module
+from backend.main import app, get_db, Base, ScanResult
+from backend.scanner_sandbox import (
+    LIMIT_CPU_TIME, LIMIT_MEMORY, LIMIT_OPEN_FILES, SandboxLimits, SandboxTimeout, run_sandboxed
+)
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="rlimits solo disponibles en POSIX")
+
+TIGHT = SandboxLimits(memory_mb=200, cpu_seconds=1, nice=5, max_open_files=64)
+
+
+@posix_only
+class TestLimits:
+    """Cada límite detiene el proceso y se identifica el motivo"""
+
+    def test_memory_limit(self):
+        result = run_sandboxed([sys.executable, "-c", "x = bytearray(1024 * 1024 * 1024)"], timeout=30, limits=TIGHT)
+        assert result.returncode != 0
+        assert result.limit_reason == LIMIT_MEMORY
+
+    def test_cpu_limit(self):
+        result = run_sandboxed([sys.executable, "-c", "while True: pass"], timeout=30, limits=TIGHT)
+        assert result.limit_reason == LIMIT_CPU_TIME
+
+    def test_open_files_limit(self):
+        script = "files = [open(%r) for _ in range(200)]" % os.devnull
+        result = run_sandboxed([sys.executable, "-c", script], timeout=30, limits=TIGHT)
+        assert result.limit_reason == LIMIT_OPEN_FILES
+
+    def test_normal_run_is_niced_and_unlimited_reason(self):
+        result = run_sandboxed([sys.executable, "-c", "import os; print(os.nice(0))"], timeout=30, limits=TIGHT)
+        assert result.returncode == 0
+        assert result.limit_reason is None
+        assert int(result.stdout) >= 5
+
+    def test_wall_clock_kills_process_group(self, tmp_path):
+        marker = tmp_path / "hijo.txt"
+        # El nieto sobreviviría a un kill del proceso directo
+        script = f"sleep 2 && echo vivo > {marker} & sleep 30"
+        start = time.monotonic()
+        with pytest.raises(SandboxTimeout) as excinfo:
+            run_sandboxed(["sh", "-c", script], timeout=0.5, limits=TIGHT)
+        assert time.monotonic() - start < 5
+        assert excinfo.value.limit_reason == "wall_clock"
+        time.sleep(2.5)
+        assert not marker.exists()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Cliente con base de datos temporal y límites de memoria insuficientes para Bandit."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'sandbox.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(main_module, "get_warm_pool", lambda: None)
+    monkeypatch.setattr(main_module, "run_sandboxed",
+                        functools.partial(run_sandboxed, limits=SandboxLimits(memory_mb=15)))
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app), SessionLocal
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+@posix_only
+class TestLimitRecorded:
+    """El motivo queda registrado en el ScanResult"""
+
+    def test_memory_kill_recorded_on_scan_result(self, client, tmp_path):
+        http, SessionLocal = client
+        target = tmp_path / "servicio"
+        target.mkdir()
+        (target / "app.py").write_text("import pickle\npickle.loads(b'')\n")
+
+        response = http.post("/scan/sast", data={"target_path": str(target), "tool": "bandit"})
+        assert response.status_code == 500
+        assert "memory" in response.json()["detail"]
+
+        db = SessionLocal()
+        try:
+            scan = db.query(ScanResult).order_by(ScanResult.id.desc()).first()
+            assert scan.status == "failed"
+            assert scan.limit_reason == LIMIT_MEMORY
+            assert scan.to_dict()["limit_reason"] == LIMIT_MEMORY
+        finally:
+            db.close()
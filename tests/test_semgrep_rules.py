@@ -0,0 +1,98 @@
+"""
+Tests del almacén local de rule packs de Semgrep.
+Prueba la vendorización sin red, la fusión deduplicada y la verificación del lockfile.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.semgrep_rules import (
+    PACKS_METADATA_KEY, get_rules_config, merge_packs, refresh_rule_packs, semgrep_config_args
+)
+
+OWASP_PACK = """
+rules:
+  - id: python-sqli
+    languages: [python]
+    severity: ERROR
+    message: SQL injection
+    pattern: cursor.execute($X + $Y)
+  - id: js-eval
+    languages: [javascript]
+    severity: WARNING
+    message: eval usage
+    pattern: eval(...)
+"""
+
+AUDIT_PACK = """
+rules:
+  - id: python-sqli
+    languages: [python]
+    severity: ERROR
+    message: SQL injection
+    pattern: cursor.execute($X + $Y)
+  - id: python-exec
+    languages: [python]
+    severity: WARNING
+    message: exec usage
+    pattern: exec(...)
+"""
+
+
+@pytest.fixture
+def vendored_packs(tmp_path):
+    """Directorio con packs descargados previamente (vendorización sin red)."""
+    source = tmp_path / "downloads"
+    source.mkdir()
+    (source / "p_owasp-top-ten.yml").write_text(OWASP_PACK)
+    (source / "p_security-audit.yml").write_text(AUDIT_PACK)
+    return source
+
+
+class TestRulePackStore:
+    """Pruebas del almacén local de reglas."""
+
+    def test_refresh_merges_and_pins(self, vendored_packs, tmp_path):
+        """Los packs se fusionan en un único archivo con reglas únicas y hashes fijados."""
+        store = tmp_path / "store"
+        lock = refresh_rule_packs(["p/owasp-top-ten", "p/security-audit"], store, vendored_packs)
+
+        merged = json.loads((store / "merged_rules.yml").read_text())
+        ids = [rule["id"] for rule in merged["rules"]]
+
+        assert ids == ["js-eval", "python-exec", "python-sqli"]
+        sqli = next(r for r in merged["rules"] if r["id"] == "python-sqli")
+        assert sqli["metadata"][PACKS_METADATA_KEY] == ["p/owasp-top-ten", "p/security-audit"]
+        assert lock["rule_count"] == 3
+        assert set(lock["packs"]) == {"p/owasp-top-ten", "p/security-audit"}
+        assert get_rules_config(store) == store / "merged_rules.yml"
+
+    def test_null_metadata_is_replaced(self):
+        """Reglas con `metadata: null` se fusionan igual que las que no tienen metadatos."""
+        merged = merge_packs({"p/python": [{"id": "r1", "metadata": None}, {"id": "r2", "metadata": {"cwe": "CWE-89"}}]})
+        assert merged[0]["metadata"] == {PACKS_METADATA_KEY: ["p/python"]}
+        assert merged[1]["metadata"] == {"cwe": "CWE-89", PACKS_METADATA_KEY: ["p/python"]}
+
+    def test_tampered_store_is_rejected(self, vendored_packs, tmp_path):
+        """Un archivo fusionado que no coincide con el lockfile no se usa."""
+        store = tmp_path / "store"
+        refresh_rule_packs(["p/owasp-top-ten"], store, vendored_packs)
+        (store / "merged_rules.yml").write_text('{"rules": []}')
+
+        assert get_rules_config(store) is None
+
+    def test_config_args_prefer_local_store(self, vendored_packs, tmp_path):
+        """Con almacén disponible no se usa el registro remoto; sin él se recurre al respaldo."""
+        store = tmp_path / "store"
+        assert semgrep_config_args(("auto",), store) == ['--config', 'auto']
+        assert semgrep_config_args(("p/owasp-top-ten",), store) == ['--config', 'p/owasp-top-ten', '--metrics', 'off']
+
+        refresh_rule_packs(["p/owasp-top-ten"], store, vendored_packs)
+        assert semgrep_config_args(("auto",), store) == [
+            '--config', str(store / "merged_rules.yml"), '--metrics', 'off'
+        ]
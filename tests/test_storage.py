@@ -0,0 +1,104 @@
+"""
+Tests de la capa de almacenamiento SQLite.
+Prueba los pragmas por conexión, el motor compartido y las escrituras agrupadas.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, event, insert, select
+
+from database.models import Base, ScanResult
+from database.storage import WriteBatcher, build_engine, get_async_engine, get_engine, get_write_batcher
+
+TABLE = ScanResult.__table__
+
+
+def _engine_with_scans(tmp_path, count):
+    engine = build_engine(f"sqlite:///{tmp_path / 'storage.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ids = [conn.execute(insert(TABLE).values(status="running")).inserted_primary_key[0] for _ in range(count)]
+    return engine, ids
+
+
+class TestEngine:
+    """Motor configurado"""
+
+    def test_pragmas_applied_to_every_connection(self, tmp_path):
+        engine = build_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+        for _ in range(2):
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+                assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+                assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            engine.dispose()
+
+    def test_async_engine_mirrors_sync_pragmas(self, tmp_path):
+        async def journal_mode(engine):
+            async with get_async_engine(engine).connect() as conn:
+                return (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+
+        configured = build_engine(f"sqlite:///{tmp_path / 'configured.db'}")
+        plain = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+        assert asyncio.run(journal_mode(configured)) == "wal"
+        # Una base de prueba creada sin `build_engine` conserva su journal
+        assert asyncio.run(journal_mode(plain)) == "delete"
+        assert not (tmp_path / "plain.db-wal").exists()
+        configured.dispose()
+        plain.dispose()
+
+    def test_shared_engine_per_url(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'shared.db'}"
+        assert get_engine(url) is get_engine(url)
+        get_engine(url).dispose()
+
+
+class TestWriteBatcher:
+    """Actualizaciones combinadas por fila y escritas por lotes"""
+
+    def test_coalesces_and_writes_in_one_transaction(self, tmp_path):
+        engine, ids = _engine_with_scans(tmp_path, 3)
+        commits = []
+        event.listen(engine, "commit", lambda conn: commits.append(1))
+        batcher = WriteBatcher(engine, TABLE, flush_interval=60)
+
+        for progress in (10, 50, 90):
+            for scan_id in ids:
+                batcher.submit(scan_id, progress=progress)
+        batcher.submit(ids[0], status="indexing", progress=95)
+
+        assert batcher.flush() == 3
+        assert len(commits) == 1
+        with engine.connect() as conn:
+            rows = dict(conn.execute(select(TABLE.c.id, TABLE.c.progress)).fetchall())
+            status = conn.execute(select(TABLE.c.status).where(TABLE.c.id == ids[0])).scalar()
+        assert rows == {ids[0]: 95, ids[1]: 90, ids[2]: 90}
+        assert status == "indexing"
+        batcher.close()
+        engine.dispose()
+
+    def test_background_flush_from_many_threads(self, tmp_path):
+        engine, ids = _engine_with_scans(tmp_path, 8)
+        batcher = get_write_batcher(engine, TABLE)
+        assert get_write_batcher(engine, TABLE) is batcher
+
+        def writer(scan_id):
+            for progress in range(1, 101):
+                batcher.submit(scan_id, progress=progress)
+
+        threads = [threading.Thread(target=writer, args=(scan_id,)) for scan_id in ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.flush()
+        with engine.connect() as conn:
+            assert {row.progress for row in conn.execute(select(TABLE.c.progress))} == {100}
+        # Muchas menos transacciones que actualizaciones
+        assert batcher.flushes < 8 * 100
+        engine.dispose()
@@ -0,0 +1,186 @@
+"""
+Tests de la integración con el daemon persistente de OWASP ZAP.
+Usa el servidor simulado de scripts/mock_zap_server.py en lugar de la herramienta real.
+"""
+
+import os
+import stat
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.zap_daemon import ZapDaemon, ZapUnavailableError
+from scripts.mock_zap_server import MockZapServer
+
+
+class _TargetHandler(BaseHTTPRequestHandler):
+    """Objetivo con un parámetro reflejado sin escapar."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/":
+            body = '<a href="/search?q=hola">buscar</a><a href="/about">info</a>'
+        elif url.path == "/search":
+            body = f"Resultados para {query.get('q', '')}"
+        else:
+            body = "Acerca de"
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _start_target():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TargetHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+@pytest.fixture
+def mock_zap():
+    mock = MockZapServer(api_key="clave-test", scan_delay=0.05)
+    mock.start()
+    yield mock
+    mock.stop()
+
+
+class TestZapSessions:
+    """Escaneos sobre un daemon externo (simulado)"""
+
+    def test_scan_in_isolated_context(self, mock_zap):
+        server, target = _start_target()
+        daemon = ZapDaemon(api_url=mock_zap.api_url, api_key="clave-test", poll_interval=0.02)
+        try:
+            result = daemon.scan(target)
+        finally:
+            server.shutdown()
+
+        found = {(v["alert"], urlparse(v["url"]).path, v["parameter"]) for v in result.vulnerabilities}
+        assert ("Cross Site Scripting (Reflected)", "/search", "q") in found
+        assert result.urls_found == 3
+        assert result.zap_version.endswith("mock")
+        for alert in result.vulnerabilities:
+            assert {"type", "severity", "cwe", "url", "parameter"} <= set(alert)
+        # El contexto del escaneo se elimina al terminar
+        assert mock_zap.state.contexts == {}
+        assert mock_zap.state.peak_contexts == 1
+
+    def test_concurrent_scans_share_daemon_without_mixing(self, mock_zap):
+        servers = [_start_target() for _ in range(3)]
+        daemon = ZapDaemon(api_url=mock_zap.api_url, api_key="clave-test", poll_interval=0.02)
+        results = {}
+
+        def scan(target):
+            results[target] = daemon.scan(target)
+
+        threads = [threading.Thread(target=scan, args=(target,)) for _server, target in servers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for server, _target in servers:
+            server.shutdown()
+
+        assert len(results) == 3
+        for target, result in results.items():
+            assert result.vulnerabilities
+            assert all(v["url"].startswith(target.rstrip("/")) for v in result.vulnerabilities)
+        assert mock_zap.state.peak_contexts > 1
+        assert mock_zap.state.contexts == {}
+        # Una sola comprobación de arranque por escaneo, nunca un lanzamiento
+        assert daemon.stats()["daemon_starts"] == 0
+        assert daemon.stats()["scans"] == 3
+
+    def test_repeated_scan_does_not_inherit_alerts(self, mock_zap):
+        server, target = _start_target()
+        daemon = ZapDaemon(api_url=mock_zap.api_url, api_key="clave-test", poll_interval=0.02)
+        try:
+            first = daemon.scan(target)
+            second = daemon.scan(target)
+        finally:
+            server.shutdown()
+
+        # El daemon acumula las alertas de ambos escaneos; cada resultado solo ve las suyas
+        assert len(mock_zap.state.alerts) == 2 * len(first.vulnerabilities)
+        assert len(second.vulnerabilities) == len(first.vulnerabilities) > 0
+
+    def test_same_origin_scans_do_not_take_all_slots(self, mock_zap):
+        release = threading.Event()
+
+        class _BlockedHandler(_TargetHandler):
+            def do_GET(self):
+                release.wait(10)
+                super().do_GET()
+
+        blocked = ThreadingHTTPServer(("127.0.0.1", 0), _BlockedHandler)
+        threading.Thread(target=blocked.serve_forever, daemon=True).start()
+        blocked_target = f"http://127.0.0.1:{blocked.server_address[1]}/"
+        server, target = _start_target()
+        daemon = ZapDaemon(api_url=mock_zap.api_url, api_key="clave-test", poll_interval=0.02,
+                           max_concurrent_scans=2)
+        results = []
+
+        def scan(url):
+            results.append((url, daemon.scan(url)))
+
+        same_origin = [threading.Thread(target=scan, args=(blocked_target,)) for _ in range(2)]
+        other_origin = threading.Thread(target=scan, args=(target,))
+        try:
+            for thread in same_origin:
+                thread.start()
+            # Mientras el primer escaneo del origen bloqueado sigue en curso, el otro origen tiene plaza
+            other_origin.start()
+            other_origin.join(5)
+            finished_while_blocked = not other_origin.is_alive()
+        finally:
+            release.set()
+            other_origin.join()
+            for thread in same_origin:
+                thread.join()
+            blocked.shutdown()
+            server.shutdown()
+
+        assert finished_while_blocked
+        assert results[0][0] == target
+        assert [url for url, _result in results].count(blocked_target) == 2
+        assert daemon.stats()["scans"] == 3
+
+    def test_unreachable_daemon_raises(self):
+        daemon = ZapDaemon(api_url="http://127.0.0.1:9", poll_interval=0.01)
+        with pytest.raises(ZapUnavailableError):
+            daemon.scan("http://127.0.0.1:1/")
+
+
+class TestZapLaunch:
+    """Lanzamiento del daemon con un ejecutable compatible con zap.sh"""
+
+    def test_launches_once_and_shuts_down(self, tmp_path):
+        mock_script = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'mock_zap_server.py')
+        wrapper = tmp_path / "zap.sh"
+        wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(mock_script)}" "$@"\n')
+        wrapper.chmod(wrapper.stat().st_mode | stat.S_IEXEC)
+
+        with ThreadingHTTPServer(("127.0.0.1", 0), _TargetHandler) as probe:
+            port = probe.server_address[1]  # puerto libre para el daemon
+        server, target = _start_target()
+        daemon = ZapDaemon(api_url=None, command=str(wrapper), port=port, poll_interval=0.1)
+        try:
+            daemon.scan(target)
+            daemon.scan(target)
+            assert daemon.stats()["daemon_starts"] == 1
+            process = daemon._process
+        finally:
+            daemon.shutdown()
+            server.shutdown()
+        assert process.wait(timeout=10) == 0